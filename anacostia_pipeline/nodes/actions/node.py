@@ -1,10 +1,18 @@
-from typing import List, Union
+from typing import List, Union, Collection
 from logging import Logger
+import threading
 import traceback
+import asyncio
+import inspect
+
+import httpx
 
 from anacostia_pipeline.nodes.node import BaseNode
 from anacostia_pipeline.utils.constants import Result, Status
 from anacostia_pipeline.nodes.utils import NodeModel
+from anacostia_pipeline.nodes.actions.process_pool import ProcessPool
+from anacostia_pipeline.utils.latch import AwaitableEvent
+from anacostia_pipeline.utils.run_context import current_run_id, set_current_run_id
 
 
 
@@ -17,13 +25,20 @@ class BaseActionNode(BaseNode):
         remote_successors: List[str] = None,
         client_url: str = None,
         wait_for_connection: bool = False,
-        loggers: Union[Logger, List[Logger]] = None
+        loggers: Union[Logger, List[Logger]] = None,
+        process_pool: ProcessPool = None
     ) -> None:
+        """
+        Args:
+            process_pool: run execute() in a worker process of the pool instead of the node's thread (see ProcessPool);
+                use for CPU-bound nodes. The pool can be shared by several nodes.
+        """
         super().__init__(
             name, predecessors, remote_predecessors=remote_predecessors, 
             remote_successors=remote_successors, client_url=client_url, wait_for_connection=wait_for_connection, loggers=loggers
         )
         self.run_id = 0
+        self.process_pool = process_pool
 
     def model(self) -> NodeModel:
         return NodeModel(
@@ -35,7 +50,14 @@ class BaseActionNode(BaseNode):
         )
 
     def get_run_id(self) -> int:
-        return self.run_id
+        run_id = current_run_id()
+        return run_id if run_id is not None else self.run_id
+
+    def _complete(self, ret):
+        # hooks overridden with `async def` (e.g., an async execute()) return a coroutine; run it to completion in the node's thread
+        if inspect.iscoroutine(ret):
+            return asyncio.run(ret)
+        return ret
     
     @BaseNode.log_exception
     def before_execution(self) -> None:
@@ -86,59 +108,389 @@ class BaseActionNode(BaseNode):
 
     def run(self) -> None:
         if self.wait_for_connection:
-            self.log(f"'{self.name}' waiting for root predecessors to connect", level='INFO')
+            self.log("'%s' waiting for root predecessors to connect", "INFO", self.name)
             
-            # this event is set by the LeafPipeline when all root predecessors are connected and after it adds to predecessors_events
+            # this event is set by the LeafPipeline when all root predecessors are connected and after it adds to predecessors_latch
             self.connection_event.wait()
             if self.exit_event.is_set(): return
 
-            self.log(f"'{self.name}' connected to root predecessors {list(self.predecessors_events.keys())}", level='INFO')
+            self.log("'%s' connected to root predecessors %s", "INFO", self.name, self.predecessors_latch.parties)
+
+        if self.is_pipelined() is True:
+            self.run_pipelined()
+            return
 
         while self.exit_event.is_set() is False:
-            self.status = Status.QUEUED
+            # a node skipped in the last run shows Status.SKIPPED until its next run
+            if self.predecessors_latch.skipped is False:
+                self.status = Status.QUEUED
             self.wait_for_predecessors()
             
             if self.exit_event.is_set(): return
-            self.status = Status.PREPARATION
-            self.before_execution()
+            ret, skip = self._execute_or_skip(self.predecessors_latch.skipped)
 
             if self.exit_event.is_set(): return
+            self.signal_successors(Result.SUCCESS if ret else Result.FAILURE, run_id=self.predecessors_latch.run_id, skip=skip)
 
-            ret = None
-            try:
-                if self.exit_event.is_set(): return
-                self.status = Status.EXECUTING
-                ret = self.execute()
-                
-                if self.exit_event.is_set(): return
-                
-                if ret:
-                    self.status = Status.COMPLETE
-                    self.on_success()
-                else:
-                    self.status = Status.FAILURE
-                    self.on_failure()
-
-            except Exception as e:
-                if self.exit_event.is_set(): return
-                self.log(f"Error executing action node '{self.name}': {traceback.format_exc()}", level="ERROR")
-                self.status = Status.ERROR
-                self.on_error(e)
+            # checking for successors signals before signalling predecessors will 
+            # ensure all action nodes have finished using the resource for current run
+            if self.exit_event.is_set(): return
+            self.wait_for_successors()
+
+            self.run_id += 1
+
+            if self.exit_event.is_set(): return
+            self.signal_predecessors(Result.SUCCESS if ret else Result.FAILURE)
+
+    def _execute_or_skip(self, skipped: bool):
+        # a node is skipped in a run if every predecessor skipped it (see BaseMetadataStoreNode.partial_runs); its successors are skipped too
+        if skipped is True:
+            self.status = Status.SKIPPED
+            return None, self.successors_latch.parties
+        return self.execute_run(), ()
+
+    def execute_run(self):
+        """Run the node's hooks for one run and return the result of execute() (None if the node exited in the meantime)."""
+
+        self.status = Status.PREPARATION
+        self._complete(self.before_execution())
+
+        if self.exit_event.is_set(): return
+
+        ret = None
+        try:
+            if self.exit_event.is_set(): return
+            self.status = Status.EXECUTING
+            if self.process_pool is not None:
+                ret = self.process_pool.execute(self)
+            else:
+                ret = self._complete(self.execute())
+            
+            if self.exit_event.is_set(): return
+            
+            if ret:
+                self.status = Status.COMPLETE
+                self._complete(self.on_success())
+            else:
+                self.status = Status.FAILURE
+                self._complete(self.on_failure())
+
+        except Exception as e:
+            if self.exit_event.is_set(): return
+            self.log("Error executing action node '%s': %s", "ERROR", self.name, traceback.format_exc())
+            self.status = Status.ERROR
+            self._complete(self.on_error(e))
+
+        finally:
+            if self.exit_event.is_set(): return
+            self.status = Status.CLEANUP
+            self._complete(self.after_execution())
+
+        return ret
+
+    def run_pipelined(self) -> None:
+        """
+        Run loop used when several runs can be in flight (run_concurrency > 1), so consecutive runs overlap like the stages of a CPU pipeline:
+        the node takes the next run as soon as it has handed the current run to its successors,
+        instead of waiting for its successors to finish the current run.
+        A run is handed to the successors once they are ready for it (i.e., they have taken the previous run);
+        the end of each run is passed on to the predecessors by a second thread as the successors finish it.
+        """
 
-            finally:
+        def _end_runs():
+            while self.exit_event.is_set() is False:
+                self.wait_for_successors()
                 if self.exit_event.is_set(): return
-                self.status = Status.CLEANUP
-                self.after_execution()
+                self.signal_predecessors(Result.SUCCESS, run_id=self.successors_latch.run_id)
+
+        if self.has_successors() is True:
+            threading.Thread(name=f"{self.name}_run_finisher", target=_end_runs, daemon=True).start()
+
+        handed_over = False
+        while self.exit_event.is_set() is False:
+            # a node skipped in the last run shows Status.SKIPPED until its next run
+            if self.predecessors_latch.skipped is False:
+                self.status = Status.QUEUED
+            self.wait_for_predecessors()
+            if self.exit_event.is_set(): return
+
+            self.run_id = self.predecessors_latch.run_id
+            set_current_run_id(self.run_id)
+            ret, skip = self._execute_or_skip(self.predecessors_latch.skipped)
+
+            # wait for the successors to take the previous run before handing them this one
+            if self.exit_event.is_set(): return
+            if handed_over is True:
+                self.wait_for_successors_ready()
+            
+            if self.exit_event.is_set(): return
+            self.signal_successors(Result.SUCCESS if ret else Result.FAILURE, run_id=self.run_id, skip=skip)
+            handed_over = self.has_successors()
 
             if self.exit_event.is_set(): return
-            self.signal_successors(Result.SUCCESS if ret else Result.FAILURE)
+            self.signal_predecessors_ready(run_id=self.run_id)
+            if self.has_successors() is False:
+                self.signal_predecessors(Result.SUCCESS if ret else Result.FAILURE, run_id=self.run_id)
+
+class AsyncActionNode(BaseActionNode):
+    """
+    Action node that runs as a coroutine on the pipeline's event loop instead of in a thread of its own,
+    so a pipeline can host thousands of I/O-bound action nodes without thousands of threads.
+
+    The hooks (before_execution, execute, after_execution, on_success, on_failure, on_error) are coroutines;
+    waiting for predecessors and successors and signalling them do not block the event loop.
+    Hooks must not block either (e.g., no time.sleep() or CPU-heavy work; use await asyncio.sleep() and run blocking work with
+    asyncio.to_thread()), because every node and the pipeline's connectors share the event loop.
+
+    The node is started by the Pipeline (see Pipeline.launch_nodes()); start() schedules the node's loop on the pipeline's event loop
+    and join() waits for it to finish.
+    """
+
+    def __init__(
+        self, 
+        name: str, 
+        predecessors: List[BaseNode], 
+        remote_predecessors: List[str] = None, 
+        remote_successors: List[str] = None,
+        client_url: str = None,
+        wait_for_connection: bool = False,
+        loggers: Union[Logger, List[Logger]] = None
+    ) -> None:
+        super().__init__(
+            name, predecessors, remote_predecessors=remote_predecessors, remote_successors=remote_successors, 
+            client_url=client_url, wait_for_connection=wait_for_connection, loggers=loggers
+        )
+        self.connection_event = AwaitableEvent()
+        self.loop: asyncio.AbstractEventLoop = None
+        self.future = None
+
+    def set_event_loop(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Set the event loop the node runs on (the pipeline's event loop)."""
+        self.loop = loop
+
+    def start(self) -> None:
+        if self.loop is None:
+            raise RuntimeError(f"Event loop of node '{self.name}' is not set; AsyncActionNodes are started by the Pipeline")
+        self.future = asyncio.run_coroutine_threadsafe(self.run_async(), self.loop)
+
+    def join(self, timeout: float = None) -> None:
+        if self.future is not None:
+            try:
+                self.future.result(timeout=timeout)
+            except Exception:
+                pass
+
+    def is_alive(self) -> bool:
+        return self.future is not None and self.future.done() is False
+
+    def run(self) -> None:
+        raise RuntimeError(f"AsyncActionNode '{self.name}' runs on the pipeline's event loop; use start() instead of run()")
+
+    @BaseNode.log_exception
+    async def before_execution(self) -> None:
+        pass
+
+    @BaseNode.log_exception
+    async def after_execution(self) -> None:
+        pass
+
+    @BaseNode.log_exception
+    async def execute(self, *args, **kwargs) -> bool:
+        """
+        the logic for a particular stage in your MLOps pipeline
+        """
+        raise NotImplementedError
+
+    @BaseNode.log_exception
+    async def on_failure(self) -> None:
+        pass
+
+    @BaseNode.log_exception
+    async def on_error(self, e: Exception) -> None:
+        pass
+
+    @BaseNode.log_exception
+    async def on_success(self) -> None:
+        pass
+
+    async def await_predecessors(self, timeout: float = None) -> bool:
+        """Async variant of wait_for_predecessors()."""
+        if await self.predecessors_latch.await_all(timeout=timeout) is False:
+            self.log("'%s' timed out waiting for predecessors %s", "WARNING", self.name, self.predecessors_latch.pending())
+            return False
+        return True
+
+    async def await_successors(self, timeout: float = None) -> bool:
+        """Async variant of wait_for_successors()."""
+        if await self.successors_latch.await_all(timeout=timeout) is False:
+            self.log("'%s' timed out waiting for successors %s", "WARNING", self.name, self.successors_latch.pending())
+            return False
+        return True
+
+    async def await_successors_ready(self, timeout: float = None) -> bool:
+        """Async variant of wait_for_successors_ready()."""
+        if await self.ready_latch.await_all(timeout=timeout) is False:
+            self.log("'%s' timed out waiting for successors %s to be ready", "WARNING", self.name, self.ready_latch.pending())
+            return False
+        return True
+
+    async def asignal_successors(self, result: Result, run_id: int = None, skip: Collection[str] = ()) -> None:
+        """Async variant of signal_successors()."""
+        for successor in self.successors:
+            successor.predecessors_latch.arrive(self.name, run_id, skip=successor.name in skip)
+
+        try:
+            await self.connector.asignal_remote_successors(run_id=run_id, skip=skip)
+            self.log("'%s' finished signalling remote successors", "INFO", self.name)
+        except httpx.ConnectError:
+            self.log("'%s' failed to signal successors from %s", "ERROR", self.name, self.name)
+            self.exit()
+
+    async def asignal_predecessors(self, result: Result, run_id: int = None) -> None:
+        """Async variant of signal_predecessors()."""
+        for predecessor in self.predecessors:
+            predecessor.successors_latch.arrive(self.name, run_id)
+
+        try:
+            await self.connector.asignal_remote_predecessors(run_id=run_id)
+            self.log("'%s' finished signalling remote predecessors", "INFO", self.name)
+        except httpx.ConnectError:
+            self.log("'%s' failed to signal remote predecessors", "ERROR", self.name)
+            self.exit()
+
+    async def asignal_predecessors_ready(self, run_id: int = None) -> None:
+        """Async variant of signal_predecessors_ready()."""
+        for predecessor in self.predecessors:
+            predecessor.ready_latch.arrive(self.name, run_id)
+
+        try:
+            await self.connector.asignal_remote_predecessors(run_id=run_id, ready=True)
+        except httpx.ConnectError:
+            self.log("'%s' failed to signal remote predecessors", "ERROR", self.name)
+            self.exit()
+
+    async def run_async(self) -> None:
+        try:
+            await self._run_async()
+        except Exception:
+            self.log("Error in node '%s': %s", "ERROR", self.name, traceback.format_exc())
+            raise
+
+    async def _run_async(self) -> None:
+        if self.wait_for_connection:
+            self.log("'%s' waiting for root predecessors to connect", "INFO", self.name)
+            
+            # this event is set by the LeafPipeline when all root predecessors are connected and after it adds to predecessors_latch
+            await self.connection_event.await_set()
+            if self.exit_event.is_set(): return
+
+            self.log("'%s' connected to root predecessors %s", "INFO", self.name, self.predecessors_latch.parties)
+
+        if self.is_pipelined() is True:
+            await self.run_pipelined_async()
+            return
+
+        while self.exit_event.is_set() is False:
+            # a node skipped in the last run shows Status.SKIPPED until its next run
+            if self.predecessors_latch.skipped is False:
+                self.status = Status.QUEUED
+            await self.await_predecessors()
+            
+            if self.exit_event.is_set(): return
+            ret, skip = await self._aexecute_or_skip(self.predecessors_latch.skipped)
+
+            if self.exit_event.is_set(): return
+            await self.asignal_successors(Result.SUCCESS if ret else Result.FAILURE, run_id=self.predecessors_latch.run_id, skip=skip)
 
             # checking for successors signals before signalling predecessors will 
             # ensure all action nodes have finished using the resource for current run
             if self.exit_event.is_set(): return
-            self.wait_for_successors()
+            await self.await_successors()
 
             self.run_id += 1
 
             if self.exit_event.is_set(): return
-            self.signal_predecessors(Result.SUCCESS if ret else Result.FAILURE)
\ No newline at end of file
+            await self.asignal_predecessors(Result.SUCCESS if ret else Result.FAILURE)
+
+    async def _aexecute_or_skip(self, skipped: bool):
+        if skipped is True:
+            self.status = Status.SKIPPED
+            return None, self.successors_latch.parties
+        return await self.aexecute_run(), ()
+
+    async def aexecute_run(self):
+        """Async variant of execute_run()."""
+
+        self.status = Status.PREPARATION
+        await self.before_execution()
+
+        if self.exit_event.is_set(): return
+
+        ret = None
+        try:
+            if self.exit_event.is_set(): return
+            self.status = Status.EXECUTING
+            ret = await self.execute()
+            
+            if self.exit_event.is_set(): return
+            
+            if ret:
+                self.status = Status.COMPLETE
+                await self.on_success()
+            else:
+                self.status = Status.FAILURE
+                await self.on_failure()
+
+        except Exception as e:
+            if self.exit_event.is_set(): return
+            self.log("Error executing action node '%s': %s", "ERROR", self.name, traceback.format_exc())
+            self.status = Status.ERROR
+            await self.on_error(e)
+
+        finally:
+            if self.exit_event.is_set(): return
+            self.status = Status.CLEANUP
+            await self.after_execution()
+
+        return ret
+
+    async def run_pipelined_async(self) -> None:
+        """Async variant of run_pipelined(); the end of each run is passed on to the predecessors by a second task."""
+
+        async def _end_runs():
+            while self.exit_event.is_set() is False:
+                await self.await_successors()
+                if self.exit_event.is_set(): return
+                await self.asignal_predecessors(Result.SUCCESS, run_id=self.successors_latch.run_id)
+
+        end_runs = asyncio.ensure_future(_end_runs()) if self.has_successors() is True else None
+
+        try:
+            handed_over = False
+            while self.exit_event.is_set() is False:
+                # a node skipped in the last run shows Status.SKIPPED until its next run
+                if self.predecessors_latch.skipped is False:
+                    self.status = Status.QUEUED
+                await self.await_predecessors()
+                if self.exit_event.is_set(): return
+
+                self.run_id = self.predecessors_latch.run_id
+                set_current_run_id(self.run_id)
+                ret, skip = await self._aexecute_or_skip(self.predecessors_latch.skipped)
+
+                # wait for the successors to take the previous run before handing them this one
+                if self.exit_event.is_set(): return
+                if handed_over is True:
+                    await self.await_successors_ready()
+
+                if self.exit_event.is_set(): return
+                await self.asignal_successors(Result.SUCCESS if ret else Result.FAILURE, run_id=self.run_id, skip=skip)
+                handed_over = self.has_successors()
+
+                if self.exit_event.is_set(): return
+                await self.asignal_predecessors_ready(run_id=self.run_id)
+                if self.has_successors() is False:
+                    await self.asignal_predecessors(Result.SUCCESS if ret else Result.FAILURE, run_id=self.run_id)
+        finally:
+            if end_runs is not None:
+                end_runs.cancel()
@@ -0,0 +1,229 @@
+from typing import List, Dict, Tuple, Any
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import importlib
+import threading
+import asyncio
+import inspect
+import pickle
+import queue
+import time
+import os
+
+from anacostia_pipeline.nodes.node import BaseNode
+from anacostia_pipeline.nodes.api import BaseClient
+
+
+
+def _preload(modules: List[str]) -> None:
+    # initializer of the worker processes; heavy imports (e.g., torch) are paid once per worker instead of once per run
+    for module in modules:
+        importlib.import_module(module)
+
+
+def _warm_up(seconds: float) -> int:
+    time.sleep(seconds)
+    return os.getpid()
+
+
+def _exception_args(exc_type, exc) -> Tuple:
+    # the traceback cannot be sent to the parent; exceptions that cannot be pickled are sent as a RuntimeError with the same message
+    try:
+        pickle.dumps(exc)
+        return (exc_type, exc, None)
+    except Exception:
+        return (RuntimeError, RuntimeError(f"{exc_type.__name__}: {exc}"), None)
+
+
+class _Channel:
+    """Worker end of the calls made by execute() to the node and to the nodes and clients it references (see ProcessPool)."""
+
+    def __init__(self, requests, responses):
+        self.requests = requests
+        self.responses = responses
+
+    def request(self, operation: str, target, attribute: str, args: Tuple = (), kwargs: Dict = None):
+        self.requests.put((operation, target, attribute, args, kwargs if kwargs is not None else {}))
+        kind, value = self.responses.get()
+        if kind == "error":
+            raise value
+        if kind == "handle":
+            return _RemoteObject(self, value)
+        if kind == "callable":
+            return lambda *args, **kwargs: self.request("call", target, attribute, args, kwargs)
+        return value
+
+
+class _RemoteObject:
+    """
+    Stand-in (in the worker process) for an object that stays in the parent process: the node itself, a node or client it references,
+    or a context manager returned by one of their methods (e.g., FilesystemStoreNode.save_artifact()).
+    Attribute reads and method calls are sent to the parent's node thread, which runs them and sends back the result.
+    """
+
+    def __init__(self, channel: _Channel, target):
+        self._channel = channel
+        self._target = target
+
+    def __getattr__(self, attribute: str):
+        if attribute.startswith("__"):
+            raise AttributeError(attribute)
+        return self._channel.request("get", self._target, attribute)
+
+    def __enter__(self):
+        return self._channel.request("call", self._target, "__enter__")
+
+    def __exit__(self, exc_type, exc, tb):
+        args = (None, None, None) if exc_type is None else _exception_args(exc_type, exc)
+        return self._channel.request("call", self._target, "__exit__", args)
+
+
+def _execute_in_worker(cls, state: Dict[str, Any], remote_attributes: List[str], requests, responses, args: Tuple, kwargs: Dict):
+    channel = _Channel(requests, responses)
+
+    # a copy of the node without its threads, locks, and servers; references to other nodes and clients are forwarded to the parent
+    node = object.__new__(cls)
+    node.__dict__.update(state)
+    for attribute in remote_attributes:
+        node.__dict__[attribute] = _RemoteObject(channel, attribute)
+    node.log = _RemoteObject(channel, None).log
+
+    ret = cls.execute(node, *args, **kwargs)
+    if inspect.iscoroutine(ret):
+        ret = asyncio.run(ret)
+    return ret
+
+
+class _CallServer:
+    """Parent end of the calls made by execute() in a worker process; runs in the node's thread while the node waits for the result."""
+
+    def __init__(self, node: BaseNode):
+        self.node = node
+        self._handles: Dict[int, Any] = {}
+        self._next_handle = 0
+
+    def _resolve(self, target):
+        if target is None:
+            return self.node
+        if isinstance(target, int):
+            return self._handles[target]
+        return getattr(self.node, target)
+
+    def handle(self, request: Tuple) -> Tuple[str, Any]:
+        operation, target, attribute, args, kwargs = request
+        try:
+            obj = self._resolve(target)
+            if operation == "get":
+                value = getattr(obj, attribute)
+                if callable(value):
+                    return ("callable", None)
+            else:
+                value = getattr(obj, attribute)(*args, **kwargs)
+                if attribute == "__exit__":
+                    self._handles.pop(target, None)
+        except Exception as e:
+            return ("error", _exception_args(type(e), e)[1])
+
+        if hasattr(value, "__enter__") and hasattr(value, "__exit__"):
+            self._next_handle += 1
+            self._handles[self._next_handle] = value
+            return ("handle", self._next_handle)
+
+        try:
+            pickle.dumps(value)
+        except Exception:
+            return ("error", TypeError(f"'{attribute}' returned a {type(value).__name__}, which cannot be sent to the worker process"))
+        return ("value", value)
+
+
+class ProcessPool:
+    """
+    Pool of warm worker processes that run the execute() method of CPU-bound action nodes (see BaseActionNode's process_pool argument),
+    so the nodes do not compete for the GIL with the rest of the pipeline (the observer threads, the event loops, and the other nodes)
+    and one pipeline can use every core. Several nodes can share one pool.
+
+    execute() runs on a copy of the node in a worker process: the node's picklable attributes are copied, and the nodes and clients
+    it references (e.g., self.metadata_store, self.data_store) are replaced by stand-ins that forward every attribute read and method call
+    (e.g., self.metadata_store.log_metrics(...), with self.data_store.save_artifact(...) as path) to the node's thread in the pipeline process.
+    self.log() is forwarded too. The return value and any exception raised by execute() are sent back to the node,
+    which continues with on_success(), on_failure(), or on_error() as usual. Changes execute() makes to the node's own attributes are not sent back.
+
+    The workers are started with the "spawn" start method by default (forking a process that runs threads is unsafe),
+    so the node's class must be importable by the workers: define it in a module, or guard the script that defines it
+    with `if __name__ == "__main__":`.
+
+    Args:
+        max_workers: number of worker processes; defaults to the number of CPUs.
+        preload_modules: modules imported by every worker when it starts (e.g., ["numpy", "torch"]).
+        mp_context: multiprocessing start method of the workers.
+    """
+
+    def __init__(self, max_workers: int = None, preload_modules: List[str] = None, mp_context: str = "spawn"):
+        self.max_workers = max_workers if max_workers is not None else os.cpu_count()
+        self.preload_modules = list(preload_modules) if preload_modules is not None else []
+        self.context = multiprocessing.get_context(mp_context)
+        self._executor: ProcessPoolExecutor = None
+        self._manager = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Start the worker processes (and import the preloaded modules) ahead of the first run; called by Pipeline.launch_nodes()."""
+
+        with self._lock:
+            if self._executor is not None:
+                return
+            self._manager = self.context.Manager()
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=self.context, initializer=_preload, initargs=(self.preload_modules,)
+            )
+
+            # the executor starts workers on demand; keep every worker busy for a moment so all of them are started now
+            futures = [self._executor.submit(_warm_up, 0.1) for _ in range(self.max_workers)]
+            for future in futures:
+                future.result()
+
+    def execute(self, node: BaseNode, *args, **kwargs) -> Any:
+        """
+        Run node.execute(*args, **kwargs) in a worker process and return its result (or raise its exception);
+        the calling thread serves the calls execute() makes to the node and the objects it references until execute() returns.
+        Returns None without waiting for the worker if the node exits in the meantime.
+        """
+
+        self.start()
+
+        state: Dict[str, Any] = {}
+        remote_attributes: List[str] = []
+        for attribute, value in node.__dict__.items():
+            if isinstance(value, (BaseNode, BaseClient)):
+                remote_attributes.append(attribute)
+                continue
+            try:
+                pickle.dumps(value)
+                state[attribute] = value
+            except Exception:
+                pass    # threads, locks, events, servers, etc. stay in the pipeline process
+
+        requests = self._manager.Queue()
+        responses = self._manager.Queue()
+        future = self._executor.submit(_execute_in_worker, type(node), state, remote_attributes, requests, responses, args, kwargs)
+
+        server = _CallServer(node)
+        while True:
+            try:
+                request = requests.get(timeout=0.05)
+            except queue.Empty:
+                if future.done():
+                    return future.result()
+                if node.exit_event.is_set():
+                    future.cancel()
+                    return None
+                continue
+            responses.put(server.handle(request))
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait, cancel_futures=True)
+                self._manager.shutdown()
+                self._executor = None
+                self._manager = None
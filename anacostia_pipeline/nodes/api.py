@@ -1,12 +1,19 @@
 from logging import Logger
 import httpx
 from fastapi import FastAPI, status
-from fastapi import HTTPException
+from fastapi import HTTPException, Request, Response
 from pydantic import BaseModel
-from typing import List, Union
+from typing import List, Union, Coroutine, Any
+import functools
 import asyncio
 import threading
 
+from anacostia_pipeline.utils.serialization import (
+    COLUMNAR_HEADER, COMPRESSION_THRESHOLD, accepted_media_types, negotiate_media_type, encode_payload, decode_payload
+)
+from anacostia_pipeline.utils.transport import TransportManager, create_client, is_unix_socket_url, unix_socket_url
+from anacostia_pipeline.utils.log import log_to_loggers
+
 
 
 class RPCConnectionModel(BaseModel):
@@ -19,6 +26,24 @@ class NetworkConnectionNotEstablished(Exception):
         super().__init__(message)
 
 
+def client_coroutine(method):
+    """
+    Decorator for the async methods of BaseClient subclasses.
+    The http client of a BaseClient is bound to the client's event loop, so when the method is awaited from another event loop
+    (e.g., an async execute() method running in a node thread), the coroutine is run on the client's event loop and awaited from the caller's loop.
+    When awaited on the client's event loop, the coroutine runs directly, so many calls can be gathered concurrently.
+    """
+
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        coroutine = method(self, *args, **kwargs)
+        if asyncio.get_running_loop() is self.loop:
+            return await coroutine
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coroutine, self.loop))
+
+    return wrapper
+
+
 class BaseServer(FastAPI):
     """
     BaseServer is a FastAPI application that acts as a server to handle remote procedure calls from clients.
@@ -46,27 +71,34 @@ class BaseServer(FastAPI):
         self.ssl_keyfile = ssl_keyfile
         self.ssl_certfile = ssl_certfile
         self.ssl_ca_certs = ssl_ca_certs
+        self.transport_manager: TransportManager = None
+        self.unix_socket: str = None
+
+        # responses encoded by encode_response() that are larger than this many bytes are gzipped (None disables compression)
+        self.compression_threshold = COMPRESSION_THRESHOLD
 
         if self.client_url is not None:
             if self.ssl_ca_certs is None or self.ssl_certfile is None or self.ssl_keyfile is None:
                 # If no SSL certificates are provided, create a client without them
-                self.client = httpx.AsyncClient(base_url=self.client_url)
+                self.client = create_client(base_url=self.client_url)
                 self.scheme = "http"
             else:
                 # If SSL certificates are provided, use them to create the client
                 try:
-                    self.client = httpx.AsyncClient(
+                    self.client = create_client(
                         base_url=self.client_url, 
                         verify=self.ssl_ca_certs, 
                         cert=(self.ssl_certfile, self.ssl_keyfile)
                     )
                     self.scheme = "https"
 
-                    # Validate that client_url is using HTTPS if SSL certificates are provided
+                    # Validate that client_url is using HTTPS if SSL certificates are provided (clients on the same host may use a Unix domain socket)
                     if self.client_url:
                         parsed_url = httpx.URL(self.client_url)
-                        if parsed_url.scheme != "https":
-                            raise ValueError(f"Invalid client URL scheme: {self.client_url}. Must be 'https' when SSL certificates are provided.")
+                        if parsed_url.scheme not in ("https", "http+unix"):
+                            raise ValueError(
+                                f"Invalid client URL scheme: {self.client_url}. Must be 'https' or 'http+unix' when SSL certificates are provided."
+                            )
                     
                 except httpx.ConnectError as e:
                     raise ValueError(f"Failed to create HTTP client with SSL certificates: {e}")
@@ -85,30 +117,44 @@ class BaseServer(FastAPI):
         else:
             self.loggers.extend(loggers)
 
-    def log(self, message: str, level="DEBUG") -> None:
-        if len(self.loggers) > 0:
-            for logger in self.loggers:
-                if level == "DEBUG":
-                    logger.debug(message)
-                elif level == "INFO":
-                    logger.info(message)
-                elif level == "WARNING":
-                    logger.warning(message)
-                elif level == "ERROR":
-                    logger.error(message)
-                elif level == "CRITICAL":
-                    logger.critical(message)
-                else:
-                    raise ValueError(f"Invalid log level: {level}")
-        else:
-            print(message)
+    def log(self, message: str, level="DEBUG", *args, **fields) -> None:
+        log_to_loggers(self.loggers, message, level, args, {"node": self.node.name, **fields})
 
     def get_node_prefix(self):
         return f"/{self.node.name}/api/server"
+
+    def encode_response(self, request: Request, payload) -> Response:
+        """
+        Encode a payload in the format the client asked for: msgpack if the client accepts it (and msgpack is installed), JSON otherwise.
+        Lists of rows are sent as column arrays if the client sent the columnar header,
+        and the body is gzipped if it is larger than compression_threshold and the client accepts gzip.
+        Clients that do not send these headers get the same JSON body FastAPI would have returned.
+        """
+
+        media_type = negotiate_media_type(request.headers.get("accept"))
+        columnar = request.headers.get(COLUMNAR_HEADER) == "1"
+        threshold = self.compression_threshold if "gzip" in request.headers.get("accept-encoding", "") else None
+
+        body, headers = encode_payload(payload, media_type=media_type, columnar=columnar, compression_threshold=threshold)
+        return Response(content=body, media_type=media_type, headers=headers)
+
+    async def decode_request(self, request: Request):
+        """Decode a request body sent by BaseClient.request_payload() (msgpack or JSON, optionally columnar and gzipped)."""
+        body = await request.body()
+        return decode_payload(body, request.headers.get("content-type"), request.headers.get("content-encoding"))
     
     def get_server_url(self):
         # sample output: http://127.0.0.1:8000/metadata/api/server
+        # a client on the same host that is reached over a Unix domain socket reaches the server over the pipeline's socket as well
+        if self.unix_socket is not None and is_unix_socket_url(self.client_url) is True:
+            return f"{unix_socket_url(self.unix_socket)}{self.get_node_prefix()}"
         return f"{self.scheme}://{self.host}:{self.port}{self.get_node_prefix()}"
+
+    def set_unix_socket(self, path: str) -> None:
+        """
+        Advertise the Unix domain socket the pipeline listens on (see PipelineServer's uds argument) to a client on the same host.
+        """
+        self.unix_socket = path
     
     def set_event_loop(self, loop: asyncio.AbstractEventLoop) -> None:
         """
@@ -116,6 +162,14 @@ class BaseServer(FastAPI):
         """
         self.loop = loop
 
+    def set_transport_manager(self, transport_manager: TransportManager) -> None:
+        """
+        Send the server's requests through the connection pools of the pipeline's TransportManager.
+        """
+        self.transport_manager = transport_manager
+        if self.client_url is not None:
+            self.client = transport_manager.client(base_url=self.client_url)
+
     def connect(self) -> None:
         """
         Connect to the client URL and register the server with the client.
@@ -171,6 +225,10 @@ class BaseClient(FastAPI):
         self.server_url = server_url
 
         self.loop: asyncio.AbstractEventLoop = None
+        self.transport_manager: TransportManager = None
+
+        # request bodies sent by request_payload() that are larger than this many bytes are gzipped (None disables compression)
+        self.compression_threshold = COMPRESSION_THRESHOLD
 
         if loggers is None:
             self.loggers: List[Logger] = list()
@@ -183,13 +241,13 @@ class BaseClient(FastAPI):
         if self.server_url is None:
             @self.post("/connect", status_code=status.HTTP_200_OK)
             async def connect(server: RPCConnectionModel):
-                self.log(f"server '{server.url}' connected to client at '{self.get_client_url()}'", level="INFO")
+                self.log("server '%s' connected to client at '%s'", "INFO", server.url, self.get_client_url())
                 self.server_url = server.url
                 self.setup_http_client()
                 return {"message": f"client '{self.get_client_url()}' connected to server at '{server.url}'"}
         else:
             self.setup_http_client()
-            self.log(f"Client '{self.get_client_url()}' initialized, connected to {self.server_url}", level="INFO")
+            self.log("Client '%s' initialized, connected to %s", "INFO", self.get_client_url(), self.server_url)
             
             # Function to start and run the event loop in a separate thread
             def start_loop(loop: asyncio.AbstractEventLoop):
@@ -210,6 +268,68 @@ class BaseClient(FastAPI):
         """
         self.loop = loop
 
+    def set_transport_manager(self, transport_manager: TransportManager) -> None:
+        """
+        Send the client's requests through the connection pools of the pipeline's TransportManager.
+        """
+        self.transport_manager = transport_manager
+        if self.server_url is not None:
+            self.setup_http_client()
+
+    def run_sync(self, coroutine: Coroutine) -> Any:
+        """
+        Run a coroutine on the client's event loop and block the calling thread until it returns.
+        Used by the synchronous methods of the client; async code should await the async variant of the method instead.
+        """
+
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+
+        if running_loop is not None and running_loop is self.loop:
+            coroutine.close()
+            raise RuntimeError(
+                "Synchronous client methods cannot be called from the client's own event loop (the call would deadlock); "
+                "await the async variant of the method instead."
+            )
+
+        task = asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+        return task.result()
+
+    async def request_payload(self, method: str, url: str, payload=None, params: dict = None, timeout=httpx.USE_CLIENT_DEFAULT):
+        """
+        Send a request to a server endpoint that uses BaseServer.encode_response()/decode_request() and return the decoded response payload.
+        The request and response are encoded as msgpack when msgpack is installed (JSON otherwise),
+        lists of rows are sent as column arrays, and large bodies are gzipped.
+        Raises httpx.HTTPStatusError if the server does not respond with 200 OK.
+        """
+
+        headers = {"Accept": accepted_media_types(), "Accept-Encoding": "gzip", COLUMNAR_HEADER: "1"}
+
+        content = None
+        if payload is not None:
+            media_type = negotiate_media_type(accepted_media_types())
+            content, content_headers = encode_payload(
+                payload, media_type=media_type, columnar=True, compression_threshold=self.compression_threshold
+            )
+            headers.update(content_headers)
+
+        # the body is read raw and decoded here (instead of letting httpx decode the gzip) so only one copy of the decompressed body is made
+        request = self.client.build_request(method, url, params=params, content=content, headers=headers, timeout=timeout)
+        response = await self.client.send(request, stream=True)
+        try:
+            body = b"".join([chunk async for chunk in response.aiter_raw()])
+        finally:
+            await response.aclose()
+
+        if response.status_code != status.HTTP_200_OK:
+            raise httpx.HTTPStatusError(
+                f"{method} {url} failed with status code {response.status_code}", request=request, response=response
+            )
+
+        return decode_payload(body, response.headers.get("content-type"), response.headers.get("content-encoding"))
+
     def set_credentials(self, host: str, port: int, ssl_keyfile: str, ssl_certfile: str, ssl_ca_certs: str) -> None:
         self.host = host
         self.port = port
@@ -226,23 +346,8 @@ class BaseClient(FastAPI):
         else:
             self.loggers.extend(loggers)
 
-    def log(self, message: str, level="DEBUG") -> None:
-        if len(self.loggers) > 0:
-            for logger in self.loggers:
-                if level == "DEBUG":
-                    logger.debug(message)
-                elif level == "INFO":
-                    logger.info(message)
-                elif level == "WARNING":
-                    logger.warning(message)
-                elif level == "ERROR":
-                    logger.error(message)
-                elif level == "CRITICAL":
-                    logger.critical(message)
-                else:
-                    raise ValueError(f"Invalid log level: {level}")
-        else:
-            print(message)
+    def log(self, message: str, level="DEBUG", *args, **fields) -> None:
+        log_to_loggers(self.loggers, message, level, args, {"node": self.client_name, **fields})
     
     def get_client_prefix(self):
         return f"/{self.client_name}/api/client"
@@ -261,27 +366,38 @@ class BaseClient(FastAPI):
     def setup_http_client(self) -> None:
         if self.ssl_ca_certs is None or self.ssl_certfile is None or self.ssl_keyfile is None:
             # If no SSL certificates are provided, create a client without them
-            self.client = httpx.AsyncClient(base_url=self.server_url)
+            if self.transport_manager is not None:
+                self.client = self.transport_manager.client(base_url=self.server_url)
+            else:
+                self.client = create_client(base_url=self.server_url)
 
             # Validate that server_url is using HTTPS if SSL certificates are provided
             if self.server_url:
                 parsed_url = httpx.URL(self.server_url)
-                if parsed_url.scheme != "http":
-                    raise ValueError(f"Invalid server URL scheme: {self.server_url}. Must be 'http' when SSL certificates are not provided.")
+                if parsed_url.scheme not in ("http", "http+unix"):
+                    raise ValueError(
+                        f"Invalid server URL scheme: {self.server_url}. Must be 'http' or 'http+unix' when SSL certificates are not provided."
+                    )
         else:
             # If SSL certificates are provided, use them to create the client
             try:
-                self.client = httpx.AsyncClient(
-                    base_url=self.server_url, 
-                    verify=self.ssl_ca_certs, 
-                    cert=(self.ssl_certfile, self.ssl_keyfile)
-                )
+                if self.transport_manager is not None:
+                    # the transport manager's SSL context is built from the same certificates (see PipelineServer)
+                    self.client = self.transport_manager.client(base_url=self.server_url)
+                else:
+                    self.client = create_client(
+                        base_url=self.server_url, 
+                        verify=self.ssl_ca_certs, 
+                        cert=(self.ssl_certfile, self.ssl_keyfile)
+                    )
 
-                # Validate that server_url is using HTTPS if SSL certificates are provided
+                # Validate that server_url is using HTTPS if SSL certificates are provided (servers on the same host may use a Unix domain socket)
                 if self.server_url:
                     parsed_url = httpx.URL(self.server_url)
-                    if parsed_url.scheme != "https":
-                        raise ValueError(f"Invalid server URL scheme: {self.server_url}. Must be 'https' when SSL certificates are provided.")
+                    if parsed_url.scheme not in ("https", "http+unix"):
+                        raise ValueError(
+                            f"Invalid server URL scheme: {self.server_url}. Must be 'https' or 'http+unix' when SSL certificates are provided."
+                        )
 
             except httpx.ConnectError as e:
                 raise ValueError(f"Failed to create HTTP client with SSL certificates: {e}")
@@ -1,12 +1,18 @@
 import asyncio
+import secrets
+import threading
+from collections import deque
 from urllib.parse import urlparse
-from typing import List, Coroutine, Union
+from typing import List, Coroutine, Union, Collection, Deque, Set
 from logging import Logger
 
 import httpx
 from fastapi import FastAPI, status
-from anacostia_pipeline.nodes.utils import NodeConnectionModel, NodeModel
+from anacostia_pipeline.nodes.utils import NodeConnectionModel, NodeModel, SignalModel
 from anacostia_pipeline.utils.constants import Result
+from anacostia_pipeline.utils.transport import TransportManager, UnixSocketTransport, is_unix_socket_url, unix_socket_url
+from anacostia_pipeline.utils.signalling import SignalChannelManager
+from anacostia_pipeline.utils.log import log_to_loggers
 
 
 
@@ -29,28 +35,36 @@ class Connector(FastAPI):
         self.ssl_keyfile = ssl_keyfile
         self.ssl_certfile = ssl_certfile
         self.ssl_ca_certs = ssl_ca_certs
+        self.transport_manager: TransportManager = None
+        self.signal_channels: SignalChannelManager = None
+        self.unix_socket: str = None
+
+        # ids of the signals received most recently; a signal sent again because its delivery could not be confirmed is ignored
+        self._received_signal_ids: Deque[str] = deque()
+        self._received_signal_id_set: Set[str] = set()
+        self._received_signals_lock = threading.Lock()
 
         # Note: the client will be bound to the PipelineServer's event loop;
         # this happens when the Connector is initialized when PipelineServer call node.setup_connector()
         if self.ssl_ca_certs is None or self.ssl_certfile is None or self.ssl_keyfile is None:
             # If no SSL certificates are provided, create a client without them
-            self.client = httpx.AsyncClient()
+            self.client = httpx.AsyncClient(transport=UnixSocketTransport())
             self.scheme = "http"
         else:
             # If SSL certificates are provided, use them to create the client
             try:
-                self.client = httpx.AsyncClient(verify=self.ssl_ca_certs, cert=(self.ssl_certfile, self.ssl_keyfile))
+                self.client = httpx.AsyncClient(transport=UnixSocketTransport(verify=self.ssl_ca_certs, cert=(self.ssl_certfile, self.ssl_keyfile)))
                 self.scheme = "https"
 
                 for predecessor_url in self.node.remote_predecessors:
                     parsed_url = urlparse(predecessor_url)
-                    if parsed_url.scheme != "https":
-                        raise ValueError(f"Invalid URL scheme for remote predecessor: {predecessor_url}. Must be 'https'.")
+                    if parsed_url.scheme not in ("https", "http+unix"):
+                        raise ValueError(f"Invalid URL scheme for remote predecessor: {predecessor_url}. Must be 'https' or 'http+unix'.")
 
                 for successor_url in self.node.remote_successors:
                     parsed_url = urlparse(successor_url)
-                    if parsed_url.scheme != "https":
-                        raise ValueError(f"Invalid URL scheme for remote successor: {successor_url}. Must be 'https'.")
+                    if parsed_url.scheme not in ("https", "http+unix"):
+                        raise ValueError(f"Invalid URL scheme for remote successor: {successor_url}. Must be 'https' or 'http+unix'.")
 
             except httpx.ConnectError as e:
                 raise ValueError(f"Failed to create HTTP client with SSL certificates: {e}")
@@ -61,17 +75,17 @@ class Connector(FastAPI):
             node_model: NodeModel = self.node.model()
             return NodeConnectionModel(
                 **node_model.model_dump(),
-                node_url=f"{self.scheme}://{self.host}:{self.port}{self.get_connector_prefix()}", 
+                node_url=f"{self.get_base_url(root.node_url)}{self.get_connector_prefix()}", 
             )
         
         @self.post("/forward_signal", status_code=status.HTTP_200_OK)
-        async def forward_signal(root: NodeConnectionModel):
-            self.node.predecessors_events[root.node_url].set()
+        async def forward_signal(root: SignalModel):
+            self.receive_signal("forward", root.node_url, run_id=root.run_id, skip=root.skip, signal_id=root.signal_id)
             return {"message": "Signalled successors"}
 
         @self.post("/backward_signal", status_code=status.HTTP_200_OK)
-        async def backward_signal(leaf: NodeConnectionModel):
-            self.node.successor_events[leaf.node_url].set()
+        async def backward_signal(leaf: SignalModel):
+            self.receive_signal("backward", leaf.node_url, run_id=leaf.run_id, ready=leaf.ready, signal_id=leaf.signal_id)
             return {"message": "Signalled predecessors"}
     
         if loggers is None:
@@ -88,30 +102,25 @@ class Connector(FastAPI):
         else:
             self.loggers.extend(loggers)
 
-    def log(self, message: str, level="DEBUG") -> None:
-        if len(self.loggers) > 0:
-            for logger in self.loggers:
-                if level == "DEBUG":
-                    logger.debug(message)
-                elif level == "INFO":
-                    logger.info(message)
-                elif level == "WARNING":
-                    logger.warning(message)
-                elif level == "ERROR":
-                    logger.error(message)
-                elif level == "CRITICAL":
-                    logger.critical(message)
-                else:
-                    raise ValueError(f"Invalid log level: {level}")
-        else:
-            print(message)
+    def log(self, message: str, level="DEBUG", *args, **fields) -> None:
+        log_to_loggers(self.loggers, message, level, args, {"node": self.node.name, **fields})
 
     def get_connector_prefix(self):
         # sample output: /metadata/connector
         return f"/{self.node.name}/connector"
     
-    def get_node_url(self) -> str:
-        return f"{self.scheme}://{self.host}:{self.port}/{self.node.name}"
+    def get_base_url(self, peer_url: str = None) -> str:
+        """
+        Return the URL of the node's pipeline as seen by the remote node at peer_url.
+        If the pipeline listens on a Unix domain socket, peers that are reached over a Unix domain socket (i.e., peers on the same host)
+        are given the socket's http+unix URL; all other peers are given the pipeline's TCP URL.
+        """
+        if self.unix_socket is not None and is_unix_socket_url(peer_url) is True:
+            return unix_socket_url(self.unix_socket)
+        return f"{self.scheme}://{self.host}:{self.port}"
+
+    def get_node_url(self, peer_url: str = None) -> str:
+        return f"{self.get_base_url(peer_url)}/{self.node.name}"
 
     def set_event_loop(self, loop: asyncio.AbstractEventLoop) -> None:
         """
@@ -119,6 +128,92 @@ class Connector(FastAPI):
         """
         self.loop = loop
 
+    def set_transport_manager(self, transport_manager: TransportManager) -> None:
+        """
+        Send the connector's requests through the connection pools of the pipeline's TransportManager.
+        """
+        self.transport_manager = transport_manager
+        self.client = transport_manager.client()
+
+    def set_unix_socket(self, path: str) -> None:
+        """
+        Advertise the Unix domain socket the pipeline listens on (see PipelineServer's uds argument) to remote nodes on the same host.
+        """
+        self.unix_socket = path
+
+    def set_signal_channels(self, signal_channels: SignalChannelManager) -> None:
+        """
+        Send the node's signals to remote nodes over the pipeline's persistent WebSocket signalling channels when they are available.
+        """
+        self.signal_channels = signal_channels
+
+    def receive_signal(
+        self, kind: str, node_url: str, run_id: int = None, ready: bool = False, skip: bool = False, signal_id: str = None
+    ) -> None:
+        """
+        Record the arrival of the signal from the remote node that sent it;
+        kind is "forward" for a signal from a remote predecessor, "backward" for a signal from a remote successor.
+        A backward signal with ready=True tells the node that the successor is ready for the next run;
+        a forward signal with skip=True tells the node that it is skipped in the run.
+        A signal whose signal_id was already received is ignored, so a signal the sender sent again
+        (over HTTP, after its delivery over a signal channel could not be confirmed) does not count as an arrival for the next phase.
+        """
+        if signal_id is not None and self._is_duplicate_signal(signal_id) is True:
+            self.log("Ignoring signal '%s' from '%s', it was already received", "DEBUG", signal_id, node_url)
+            return
+
+        if kind == "forward":
+            self.node.predecessors_latch.arrive(node_url, run_id, skip=skip)
+        elif kind == "backward":
+            if ready is True:
+                self.node.ready_latch.arrive(node_url, run_id)
+            else:
+                self.node.successors_latch.arrive(node_url, run_id)
+        else:
+            raise ValueError(f"Invalid signal kind: '{kind}'")
+
+    def _is_duplicate_signal(self, signal_id: str, max_signal_ids: int = 4096) -> bool:
+        with self._received_signals_lock:
+            if signal_id in self._received_signal_id_set:
+                return True
+
+            self._received_signal_ids.append(signal_id)
+            self._received_signal_id_set.add(signal_id)
+            if len(self._received_signal_ids) > max_signal_ids:
+                self._received_signal_id_set.discard(self._received_signal_ids.popleft())
+            return False
+
+    async def _send_signal(
+        self, node_url: str, kind: str, endpoint: str, run_id: int = None, ready: bool = False, skip: bool = False
+    ) -> Union[httpx.Response, None]:
+        """
+        Signal a remote node over the signalling channel to its pipeline, falling back to a POST to the node's connector
+        if no channel is available or the signal could not be delivered over the channel.
+        Both carry the same signal id: if the signal was delivered over the channel but its acknowledgement was lost,
+        the receiver ignores the copy sent over HTTP.
+        """
+
+        signal_id = secrets.token_hex(8)
+
+        if self.signal_channels is not None and self.signal_channels.available(node_url) is True:
+            try:
+                await self.signal_channels.signal(
+                    node_url, kind, self.get_node_url(node_url), run_id=run_id, ready=ready, skip=skip, signal_id=signal_id
+                )
+                return None
+            except Exception as e:
+                self.log("Signalling '%s' over the signal channel failed (%s), falling back to HTTP", "WARNING", node_url, e)
+
+        node_model: NodeModel = self.node.model()
+        signal = SignalModel(
+            **node_model.model_dump(), node_url=self.get_node_url(node_url), run_id=run_id, ready=ready, skip=skip, signal_id=signal_id
+        )
+        return await self.client.post(f"{node_url}/connector/{endpoint}", json=signal.model_dump())
+
+    def _connection_json(self, peer_url: str = None) -> dict:
+        node_model: NodeModel = self.node.model()
+        return NodeConnectionModel(**node_model.model_dump(), node_url=self.get_node_url(peer_url)).model_dump()
+
     def connect(self) -> List[Coroutine]:
         """
         Connect to all remote predecessors and successors.
@@ -128,14 +223,8 @@ class Connector(FastAPI):
         async def _connect():
             tasks = []
             for connection in self.node.remote_successors:
-                node_model: NodeModel = self.node.model()
-                connection_mode = NodeConnectionModel(
-                    **node_model.model_dump(),
-                    node_url=self.get_node_url(),
-                )
-                json = connection_mode.model_dump()
                 tasks.append(
-                    self.client.post(f"{connection}/connector/connect", json=json)
+                    self.client.post(f"{connection}/connector/connect", json=self._connection_json(connection))
                 )
             responses = await asyncio.gather(*tasks)
             return responses
@@ -145,61 +234,72 @@ class Connector(FastAPI):
                 response = asyncio.run_coroutine_threadsafe(_connect(), self.loop)
                 results = response.result()
                 results = [r.json() for r in results if r.status_code == 200]
-                self.log(f"Node '{self.node.name}' connected to remote successors: {[r['node_url'] for r in results]}", level="INFO")
+                self.log("Node '%s' connected to remote successors: %s", "INFO", self.node.name, [r['node_url'] for r in results])
                 return results
             else:
                 raise RuntimeError("Event loop is not running. Cannot connect to remote successors.")
 
-    def signal_remote_predecessors(self) -> List[Coroutine]:
+    async def _signal_remote_predecessors(self, run_id: int = None, ready: bool = False):
+        tasks = [
+            self._send_signal(predecessor_url, "backward", "backward_signal", run_id=run_id, ready=ready) 
+            for predecessor_url in self.node.remote_predecessors
+        ]
+
+        responses = await asyncio.gather(*tasks)
+        return responses
+
+    async def _signal_remote_successors(self, run_id: int = None, skip: Collection[str] = ()):
+        tasks = [
+            self._send_signal(successor_url, "forward", "forward_signal", run_id=run_id, skip=successor_url in skip) 
+            for successor_url in self.node.remote_successors
+        ]
+
+        responses = await asyncio.gather(*tasks)
+        return responses
+
+    def signal_remote_predecessors(self, run_id: int = None, ready: bool = False) -> List[Coroutine]:
         """
-        Signal all remote predecessors that the node has finished processing.
+        Signal all remote predecessors that the node has finished processing (or, with ready=True, that it is ready for the next run).
         Returns a list of coroutines that can be awaited to perform the signaling.
         """
 
-        async def _signal_remote_predecessors():
-            tasks = []
-            for predecessor_url in self.node.remote_predecessors:
-                node_model: NodeModel = self.node.model()
-                connection_mode = NodeConnectionModel(
-                    **node_model.model_dump(),
-                    node_url=self.get_node_url(),
-                )
-                json = connection_mode.model_dump()
-                tasks.append(self.client.post(f"{predecessor_url}/connector/backward_signal", json=json))
-
-            responses = await asyncio.gather(*tasks)
-            return responses
-        
         if len(self.node.remote_predecessors) > 0:
             if self.loop.is_running():
-                response = asyncio.run_coroutine_threadsafe(_signal_remote_predecessors(), self.loop)
+                response = asyncio.run_coroutine_threadsafe(self._signal_remote_predecessors(run_id=run_id, ready=ready), self.loop)
                 return response.result()
             else:
                 raise RuntimeError("Event loop is not running. Cannot signal remote predecessors.")
 
-    def signal_remote_successors(self) -> List[Coroutine]:
+    def signal_remote_successors(self, run_id: int = None, skip: Collection[str] = ()) -> List[Coroutine]:
         """
-        Signal all remote successors that the node has finished processing.
+        Signal all remote successors that the node has finished processing (the successors with urls in skip are skipped in the run).
         Returns a list of coroutines that can be awaited to perform the signaling.
         """
 
-        async def _signal_remote_successors():
-            tasks = []
-            for successor_url in self.node.remote_successors:
-                node_model: NodeModel = self.node.model()
-                connection_mode = NodeConnectionModel(
-                    **node_model.model_dump(),
-                    node_url=self.get_node_url(),
-                )
-                json = connection_mode.model_dump()
-                tasks.append(self.client.post(f"{successor_url}/connector/forward_signal", json=json))
-
-            responses = await asyncio.gather(*tasks)
-            return responses
-
         if len(self.node.remote_successors) > 0:
             if self.loop.is_running():
-                response = asyncio.run_coroutine_threadsafe(_signal_remote_successors(), self.loop)
+                response = asyncio.run_coroutine_threadsafe(self._signal_remote_successors(run_id=run_id, skip=skip), self.loop)
                 return response.result()
             else:
                 raise RuntimeError("Event loop is not running. Cannot signal remote successors.")
+
+    async def asignal_remote_predecessors(self, run_id: int = None, ready: bool = False) -> List[httpx.Response]:
+        """
+        Async variant of signal_remote_predecessors(), used by nodes running on the pipeline's event loop (see AsyncActionNode);
+        the signals are sent on the connector's event loop without blocking the caller's loop.
+        """
+        if len(self.node.remote_predecessors) > 0:
+            signal = self._signal_remote_predecessors(run_id=run_id, ready=ready)
+            if asyncio.get_running_loop() is self.loop:
+                return await signal
+            return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(signal, self.loop))
+
+    async def asignal_remote_successors(self, run_id: int = None, skip: Collection[str] = ()) -> List[httpx.Response]:
+        """
+        Async variant of signal_remote_successors(), used by nodes running on the pipeline's event loop (see AsyncActionNode).
+        """
+        if len(self.node.remote_successors) > 0:
+            signal = self._signal_remote_successors(run_id=run_id, skip=skip)
+            if asyncio.get_running_loop() is self.loop:
+                return await signal
+            return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(signal, self.loop))
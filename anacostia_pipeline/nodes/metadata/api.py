@@ -1,4 +1,4 @@
-from typing import List, Union
+from typing import List, Union, Callable, Iterable, Optional
 from logging import Logger
 
 from anacostia_pipeline.nodes.metadata.node import BaseMetadataStoreNode
@@ -6,6 +6,11 @@ from anacostia_pipeline.nodes.api import BaseClient, BaseServer
 
 
 
+# error types (see the "error_type" of /batch/ results) of operations the metadata store rejects no matter how often they are retried,
+# e.g., a ValueError for an entry that already exists or an artifact that does not exist; any other error may succeed on a retry
+REJECTED_ERROR_TYPES = {"ValueError"}
+
+
 class BaseMetadataStoreServer(BaseServer):
     def __init__(
         self, 
@@ -54,51 +59,141 @@ class BaseMetadataStoreClient(BaseClient):
 
     def add_node(self, node_name: str, node_type: str, base_type: str):
         raise NotImplementedError("add_node method not implemented in SqliteMetadataRPCclient")
+
+    async def aadd_node(self, node_name: str, node_type: str, base_type: str):
+        raise NotImplementedError("aadd_node method not implemented in SqliteMetadataRPCclient")
+
+    def transaction(self):
+        raise NotImplementedError("transaction method not implemented in SqliteMetadataRPCclient")
+
+    def execute_batch(self, operations: List[dict], stop_on_error: bool = False):
+        raise NotImplementedError("execute_batch method not implemented in SqliteMetadataRPCclient")
+
+    async def aexecute_batch(self, operations: List[dict], stop_on_error: bool = False):
+        raise NotImplementedError("aexecute_batch method not implemented in SqliteMetadataRPCclient")
     
     def get_run_id(self):
         raise NotImplementedError("get_run_id method not implemented in SqliteMetadataRPCclient")
 
+    async def aget_run_id(self):
+        raise NotImplementedError("aget_run_id method not implemented in SqliteMetadataRPCclient")
+
     def get_node_id(self, node_name: str):
         raise NotImplementedError("get_node_id method not implemented in SqliteMetadataRPCclient")
+
+    async def aget_node_id(self, node_name: str):
+        raise NotImplementedError("aget_node_id method not implemented in SqliteMetadataRPCclient")
     
     def create_entry(self, resource_node_name: str, filepath: str, state: str = "new", run_id: int = None):
         raise NotImplementedError("create_entry method not implemented in SqliteMetadataRPCclient")
+
+    async def acreate_entry(self, resource_node_name: str, filepath: str, state: str = "new", run_id: int = None):
+        raise NotImplementedError("acreate_entry method not implemented in SqliteMetadataRPCclient")
     
     def merge_artifacts_table(self, resource_node_name: str, entries: List[dict]):
         raise NotImplementedError("merge_artifacts_table method not implemented in SqliteMetadataRPCclient")
+
+    async def amerge_artifacts_table(self, resource_node_name: str, entries: List[dict]):
+        raise NotImplementedError("amerge_artifacts_table method not implemented in SqliteMetadataRPCclient")
+
+    def merge_artifacts_stream(self, resource_node_name: str, entries: Callable[[Optional[int], int], Iterable], merge_id: str = None, chunk_size: int = 1000):
+        raise NotImplementedError("merge_artifacts_stream method not implemented in SqliteMetadataRPCclient")
+
+    async def amerge_artifacts_stream(self, resource_node_name: str, entries: Callable[[Optional[int], int], Iterable], merge_id: str = None, chunk_size: int = 1000):
+        raise NotImplementedError("amerge_artifacts_stream method not implemented in SqliteMetadataRPCclient")
     
     def entry_exists(self, resource_node_name: str, location: str):
         raise NotImplementedError("entry_exists method not implemented in SqliteMetadataRPCclient")
+
+    async def aentry_exists(self, resource_node_name: str, location: str):
+        raise NotImplementedError("aentry_exists method not implemented in SqliteMetadataRPCclient")
     
-    def log_metrics(self, node_name: str, **kwargs):
+    def log_metrics(self, node_name: str, run_id: int = None, **kwargs):
         raise NotImplementedError("log_metrics method not implemented in SqliteMetadataRPCclient")
+
+    async def alog_metrics(self, node_name: str, run_id: int = None, **kwargs):
+        raise NotImplementedError("alog_metrics method not implemented in SqliteMetadataRPCclient")
     
     def tag_artifact(self, node_name: str, location: str, **kwargs) -> None:
         pass
 
-    def log_params(self, node_name: str, **kwargs):
+    def log_params(self, node_name: str, run_id: int = None, **kwargs):
         raise NotImplementedError("log_params method not implemented in SqliteMetadataRPCclient")
+
+    async def alog_params(self, node_name: str, run_id: int = None, **kwargs):
+        raise NotImplementedError("alog_params method not implemented in SqliteMetadataRPCclient")
     
-    def set_tags(self, node_name: str, **kwargs):
+    def set_tags(self, node_name: str, run_id: int = None, **kwargs):
         raise NotImplementedError("set_tags method not implemented in SqliteMetadataRPCclient")
+
+    async def aset_tags(self, node_name: str, run_id: int = None, **kwargs):
+        raise NotImplementedError("aset_tags method not implemented in SqliteMetadataRPCclient")
     
     def get_metrics(self, node_name: str = None, run_id: int = None):
         raise NotImplementedError("get_metrics method not implemented in SqliteMetadataRPCclient")
+
+    async def aget_metrics(self, node_name: str = None, run_id: int = None):
+        raise NotImplementedError("aget_metrics method not implemented in SqliteMetadataRPCclient")
     
     def get_params(self, node_name: str = None, run_id: int = None):
         raise NotImplementedError("get_params method not implemented in SqliteMetadataRPCclient")
+
+    async def aget_params(self, node_name: str = None, run_id: int = None):
+        raise NotImplementedError("aget_params method not implemented in SqliteMetadataRPCclient")
     
     def get_tags(self, node_name: str = None, run_id: int = None):
         raise NotImplementedError("get_tags method not implemented in SqliteMetadataRPCclient")
+
+    async def aget_tags(self, node_name: str = None, run_id: int = None):
+        raise NotImplementedError("aget_tags method not implemented in SqliteMetadataRPCclient")
         
     def get_entries(self, resource_node_name: str, state: str):
         raise NotImplementedError("get_entries method not implemented in SqliteMetadataRPCclient")
+
+    async def aget_entries(self, resource_node_name: str, state: str):
+        raise NotImplementedError("aget_entries method not implemented in SqliteMetadataRPCclient")
+
+    def search_artifacts(self, query: str, node: str = None, limit: int = 100, offset: int = 0):
+        raise NotImplementedError("search_artifacts method not implemented in SqliteMetadataRPCclient")
+
+    async def asearch_artifacts(self, query: str, node: str = None, limit: int = 100, offset: int = 0):
+        raise NotImplementedError("asearch_artifacts method not implemented in SqliteMetadataRPCclient")
+
+    def get_lineage(self, artifact: Union[int, str], direction: str = "downstream", depth: int = None, node: str = None):
+        raise NotImplementedError("get_lineage method not implemented in SqliteMetadataRPCclient")
+
+    async def aget_lineage(self, artifact: Union[int, str], direction: str = "downstream", depth: int = None, node: str = None):
+        raise NotImplementedError("aget_lineage method not implemented in SqliteMetadataRPCclient")
+
+    def get_entries_columnar(self, resource_node_name: str, state: str = "all", columns: List[str] = None, array_type: str = "list"):
+        raise NotImplementedError("get_entries_columnar method not implemented in SqliteMetadataRPCclient")
+
+    async def aget_entries_columnar(self, resource_node_name: str, state: str = "all", columns: List[str] = None, array_type: str = "list"):
+        raise NotImplementedError("aget_entries_columnar method not implemented in SqliteMetadataRPCclient")
     
     def get_num_entries(self, resource_node_name: str, state: str):
         raise NotImplementedError("get_num_entries method not implemented in SqliteMetadataRPCclient")
+
+    async def aget_num_entries(self, resource_node_name: str, state: str):
+        raise NotImplementedError("aget_num_entries method not implemented in SqliteMetadataRPCclient")
     
     def log_trigger(self, node_name: str, message: str):
         raise NotImplementedError("log_trigger method not implemented in SqliteMetadataRPCclient")
+
+    async def alog_trigger(self, node_name: str, message: str):
+        raise NotImplementedError("alog_trigger method not implemented in SqliteMetadataRPCclient")
+
+    def export_table(self, table_name: str, path: str, min_run_id: int = None, max_run_id: int = None, chunk_size: int = 50_000, format: str = "parquet"):
+        raise NotImplementedError("export_table method not implemented in SqliteMetadataRPCclient")
+
+    async def aexport_table(self, table_name: str, path: str, min_run_id: int = None, max_run_id: int = None, chunk_size: int = 50_000, format: str = "parquet"):
+        raise NotImplementedError("aexport_table method not implemented in SqliteMetadataRPCclient")
+
+    def import_table(self, table_name: str, path: str, chunk_size: int = 50_000):
+        raise NotImplementedError("import_table method not implemented in SqliteMetadataRPCclient")
+
+    async def aimport_table(self, table_name: str, path: str, chunk_size: int = 50_000):
+        raise NotImplementedError("aimport_table method not implemented in SqliteMetadataRPCclient")
     
     def get_num_entries(self, resource_node_name: str, state: str):
         raise NotImplementedError("get_num_entries method not implemented in SqliteMetadataRPCclient")
\ No newline at end of file
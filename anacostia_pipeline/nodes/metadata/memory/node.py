@@ -0,0 +1,728 @@
+from typing import List, Dict, Union, Set, Tuple, Any, Callable
+from collections import Counter
+from logging import Logger
+from contextlib import contextmanager
+from collections import defaultdict
+from threading import Thread, Event, RLock
+from datetime import datetime
+import traceback
+import hashlib
+import json
+import os
+
+from anacostia_pipeline.nodes.metadata.node import BaseMetadataStoreNode
+from anacostia_pipeline.nodes.metadata.utils import ARTIFACT_COLUMNS, encode_json_value, decode_json_object
+from anacostia_pipeline.nodes.metadata.sql.gui import SQLMetadataStoreGUI
+from anacostia_pipeline.nodes.metadata.sql.api import SQLMetadataStoreServer
+
+
+
+class InMemoryMetadataStoreNode(BaseMetadataStoreNode):
+    """
+    Metadata store that keeps all metadata in Python dictionaries.
+
+    Every lookup used by the pipeline (node by name, artifact by (node, location), artifacts by (node, state),
+    metrics/params/tags by run) is served from a dict or set index in O(1), and no operation touches the disk,
+    which makes InMemoryMetadataStoreNode the fastest metadata store for CI, load tests, and short-lived batch pipelines.
+    The records returned by each method have the same format as the ones returned by SQLiteMetadataStoreNode,
+    and the node uses the same RPC server and GUI, so it can be swapped in for SQLiteMetadataStoreNode without changing any client,
+    except for the bulk export and import of tables (export_table() and import_table() of the client), which read and write the SQL tables:
+    the server answers them with 501 Not Implemented for an InMemoryMetadataStoreNode.
+
+    Metadata is lost when the process exits unless snapshot_path is set.
+    If snapshot_path is set, the metadata is loaded from the snapshot (if it exists) in setup(),
+    written to the snapshot every snapshot_interval seconds (if snapshot_interval is set), and written to the snapshot when the node exits.
+
+    Args:
+        snapshot_path: path of the JSON file the metadata is saved to and loaded from.
+        snapshot_interval: how often (in seconds) to write the snapshot in the background; None only writes the snapshot on exit.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        snapshot_path: str = None,
+        snapshot_interval: float = None,
+        remote_successors: List[str] = None,
+        client_url: str = None,
+        loggers: Union[Logger, List[Logger]] = None
+    ) -> None:
+        super().__init__(name, uri="memory://", remote_successors=remote_successors, client_url=client_url, loggers=loggers)
+        self.snapshot_path = snapshot_path
+        self.snapshot_interval = snapshot_interval
+
+        self._lock = RLock()
+        self._snapshot_thread: Thread = None
+        self._snapshot_stop_event = Event()
+
+        # undo operations of the writes made inside transaction(), run in reverse order to roll the transaction back;
+        # None outside of a transaction (only the thread holding the lock writes, so one log is enough)
+        self._undo_log: List[Callable[[], None]] = None
+        self._reset()
+
+    def _reset(self) -> None:
+        # tables, keyed by id
+        self._nodes: Dict[int, Dict] = {}
+        self._runs: Dict[int, Dict] = {}
+        self._artifacts: Dict[int, Dict] = {}
+        self._metrics: Dict[int, Dict] = {}
+        self._params: Dict[int, Dict] = {}
+        self._tags: Dict[int, Dict] = {}
+        self._triggers: Dict[int, Dict] = {}
+        self._artifact_tags: Dict[int, List[int]] = defaultdict(list)
+        self._lineage_edges: Set[Tuple[int, int, str]] = set()      # (run_id, artifact_id, direction)
+
+        # indexes
+        self._node_ids: Dict[str, int] = {}
+        self._artifact_keys: Dict[Tuple[str, str], int] = {}                             # (node_name, location) -> artifact id
+        self._artifacts_by_location: Dict[str, List[int]] = defaultdict(list)
+        self._artifacts_by_state: Dict[str, Dict[str, Set[int]]] = defaultdict(lambda: defaultdict(set))   # node_name -> state -> ids
+        self._metrics_by_run: Dict[int, List[int]] = defaultdict(list)
+        self._params_by_run: Dict[int, List[int]] = defaultdict(list)
+        self._tags_by_run: Dict[int, List[int]] = defaultdict(list)
+        self._untriggered: Set[int] = set()                                              # triggers that have not triggered a run yet
+        self._run_edges: Dict[Tuple[int, str], Set[int]] = defaultdict(set)             # (run_id, direction) -> artifact ids
+        self._artifact_edges: Dict[Tuple[int, str], Set[int]] = defaultdict(set)        # (artifact_id, direction) -> run ids
+
+        self._next_ids: Dict[str, int] = defaultdict(lambda: 1)
+
+    def _next_id(self, table: str) -> int:
+        next_id = self._next_ids[table]
+        self._set_item(self._next_ids, table, next_id + 1)
+        return next_id
+
+    # ---- writes that can be undone (see transaction()) ---- #
+
+    def _set_item(self, mapping: Dict, key: Any, value: Any) -> None:
+        if self._undo_log is not None:
+            if key in mapping:
+                old_value = mapping[key]
+                self._undo_log.append(lambda: mapping.__setitem__(key, old_value))
+            else:
+                self._undo_log.append(lambda: mapping.pop(key, None))
+        mapping[key] = value
+
+    def _append(self, items: List, value: Any) -> None:
+        if self._undo_log is not None:
+            self._undo_log.append(items.pop)
+        items.append(value)
+
+    def _add_to_set(self, items: Set, value: Any) -> None:
+        if value in items:
+            return
+        if self._undo_log is not None:
+            self._undo_log.append(lambda: items.discard(value))
+        items.add(value)
+
+    def _discard_from_set(self, items: Set, value: Any) -> None:
+        if value not in items:
+            return
+        if self._undo_log is not None:
+            self._undo_log.append(lambda: items.add(value))
+        items.discard(value)
+
+    def _rollback(self, mark: int) -> None:
+        while len(self._undo_log) > mark:
+            self._undo_log.pop()()
+
+    def setup(self) -> None:
+        if self.snapshot_path is not None and os.path.exists(self.snapshot_path):
+            self.load_snapshot()
+
+        if self.snapshot_path is not None and self.snapshot_interval is not None:
+            self._snapshot_stop_event.clear()
+            self._snapshot_thread = Thread(name=f"{self.name}_snapshot", target=self._snapshot_thread_func, daemon=True)
+            self._snapshot_thread.start()
+
+    def setup_node_GUI(self, host: str, port: int, ssl_keyfile: str = None, ssl_certfile: str = None, ssl_ca_certs: str = None):
+        """Override to setup the node GUI."""
+        self.gui = SQLMetadataStoreGUI(node=self, host=host, port=port, ssl_keyfile=ssl_keyfile, ssl_certfile=ssl_certfile, ssl_ca_certs=ssl_ca_certs)
+        return self.gui
+
+    def setup_node_server(self, host: str, port: int, ssl_keyfile: str = None, ssl_certfile: str = None, ssl_ca_certs: str = None):
+        """Override to setup the RPC server."""
+        self.node_server = SQLMetadataStoreServer(
+            self, self.client_url, host, port, ssl_keyfile=ssl_keyfile, ssl_certfile=ssl_certfile, ssl_ca_certs=ssl_ca_certs, loggers=self.loggers
+        )
+        return self.node_server
+
+    def exit(self):
+        super().exit()
+
+        self._snapshot_stop_event.set()
+        if self._snapshot_thread is not None:
+            self._snapshot_thread.join()
+            self._snapshot_thread = None
+
+        if self.snapshot_path is not None:
+            self.save_snapshot()
+
+    @contextmanager
+    def transaction(self):
+        """
+        Hold the store's lock for the duration of the with block so no other thread observes a partially applied group of writes.
+        If any call inside the block raises an exception, every change made inside the block is undone.
+        Nested transaction() blocks join the outermost transaction.
+        """
+        with self._lock:
+            if self._undo_log is not None:
+                yield self
+                return
+
+            self._undo_log = []
+            try:
+                yield self
+            except BaseException:
+                self._rollback(0)
+                raise
+            finally:
+                self._undo_log = None
+
+    @contextmanager
+    def savepoint(self):
+        """
+        Inside transaction(), undo only the changes made inside the with block if it raises an exception, so the transaction can continue.
+        Outside of a transaction, every call already applies on its own.
+        """
+        with self._lock:
+            if self._undo_log is None:
+                yield self
+                return
+
+            mark = len(self._undo_log)
+            try:
+                yield self
+            except BaseException:
+                self._rollback(mark)
+                raise
+
+    # ---- snapshots ---- #
+
+    def save_snapshot(self, path: str = None) -> None:
+        """Write all metadata to a JSON file; the file is written to a temporary file first and then atomically renamed."""
+
+        path = path if path is not None else self.snapshot_path
+        if path is None:
+            raise ValueError("No snapshot path given")
+
+        with self._lock:
+            snapshot = {
+                "run_id": self.run_id,
+                "nodes": list(self._nodes.values()),
+                "runs": list(self._runs.values()),
+                "artifacts": list(self._artifacts.values()),
+                "metrics": list(self._metrics.values()),
+                "params": list(self._params.values()),
+                "tags": list(self._tags.values()),
+                "triggers": list(self._triggers.values()),
+                "artifact_tags": [[artifact_id, tag_id] for artifact_id, tag_ids in self._artifact_tags.items() for tag_id in tag_ids],
+                "lineage_edges": [list(edge) for edge in self._lineage_edges],
+            }
+            data = json.dumps(snapshot, default=encode_json_value)
+
+        folder = os.path.dirname(path)
+        if folder != "" and os.path.exists(folder) is False:
+            os.makedirs(folder, exist_ok=True)
+
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+
+    def load_snapshot(self, path: str = None) -> None:
+        """Replace all metadata in the store with the contents of a snapshot written by save_snapshot()."""
+
+        path = path if path is not None else self.snapshot_path
+        with open(path, "r", encoding="utf-8") as f:
+            snapshot = json.load(f, object_hook=decode_json_object)
+
+        with self._lock:
+            self._reset()
+            self.run_id = snapshot["run_id"]
+
+            for node in snapshot["nodes"]:
+                self._add_node_record(node)
+            for run in snapshot["runs"]:
+                self._runs[run["run_id"]] = run
+            for artifact in snapshot["artifacts"]:
+                self._add_artifact_record(artifact)
+            for metric in snapshot["metrics"]:
+                self._add_run_record(self._metrics, self._metrics_by_run, "metrics", metric)
+            for param in snapshot["params"]:
+                self._add_run_record(self._params, self._params_by_run, "params", param)
+            for tag in snapshot["tags"]:
+                self._add_run_record(self._tags, self._tags_by_run, "tags", tag)
+            for trigger in snapshot["triggers"]:
+                self._add_trigger_record(trigger)
+            for artifact_id, tag_id in snapshot["artifact_tags"]:
+                self._artifact_tags[artifact_id].append(tag_id)
+            for run_id, artifact_id, direction in snapshot["lineage_edges"]:
+                self._add_lineage_edge(run_id, artifact_id, direction)
+
+        self.log("Loaded metadata snapshot from %s", "INFO", path)
+
+    def _snapshot_thread_func(self) -> None:
+        while self._snapshot_stop_event.wait(self.snapshot_interval) is False:
+            try:
+                self.save_snapshot()
+            except Exception:
+                self.log("Error saving snapshot of metadata store '%s': %s", "ERROR", self.name, traceback.format_exc())
+
+    # ---- index maintenance ---- #
+
+    def _add_node_record(self, node: Dict) -> None:
+        self._set_item(self._nodes, node["id"], node)
+        self._set_item(self._node_ids, node["node_name"], node["id"])
+        self._set_item(self._next_ids, "nodes", max(self._next_ids["nodes"], node["id"] + 1))
+
+    def _add_artifact_record(self, artifact: Dict) -> None:
+        artifact_id = artifact["id"]
+        self._set_item(self._artifacts, artifact_id, artifact)
+        self._set_item(self._artifact_keys, (artifact["node_name"], artifact["location"]), artifact_id)
+        self._append(self._artifacts_by_location[artifact["location"]], artifact_id)
+        self._add_to_set(self._artifacts_by_state[artifact["node_name"]][artifact["state"]], artifact_id)
+        self._set_item(self._next_ids, "artifacts", max(self._next_ids["artifacts"], artifact_id + 1))
+
+    def _add_run_record(self, table: Dict[int, Dict], index: Dict[int, List[int]], table_name: str, record: Dict) -> None:
+        self._set_item(table, record["id"], record)
+        self._append(index[record["run_id"]], record["id"])
+        self._set_item(self._next_ids, table_name, max(self._next_ids[table_name], record["id"] + 1))
+
+    def _add_trigger_record(self, trigger: Dict) -> None:
+        self._set_item(self._triggers, trigger["id"], trigger)
+        if trigger["run_triggered"] is None:
+            self._add_to_set(self._untriggered, trigger["id"])
+        self._set_item(self._next_ids, "triggers", max(self._next_ids["triggers"], trigger["id"] + 1))
+
+    def _add_lineage_edge(self, run_id: int, artifact_id: int, direction: str) -> None:
+        if run_id is None:
+            return
+        self._add_to_set(self._lineage_edges, (run_id, artifact_id, direction))
+        self._add_to_set(self._run_edges[(run_id, direction)], artifact_id)
+        self._add_to_set(self._artifact_edges[(artifact_id, direction)], run_id)
+
+    def _set_artifact_state(self, artifact: Dict, state: str) -> None:
+        states = self._artifacts_by_state[artifact["node_name"]]
+        self._discard_from_set(states[artifact["state"]], artifact["id"])
+        self._add_to_set(states[state], artifact["id"])
+        self._set_item(artifact, "state", state)
+
+    def _get_artifact(self, resource_node_name: str, filepath: str) -> Dict:
+        artifact_id = self._artifact_keys.get((resource_node_name, filepath))
+        return self._artifacts[artifact_id] if artifact_id is not None else None
+
+    def _first_artifact_by_location(self, location: str) -> Dict:
+        artifact_ids = self._artifacts_by_location.get(location)
+        if not artifact_ids:
+            raise ValueError(f"Artifact with location '{location}' does not exist.")
+        return self._artifacts[artifact_ids[0]]
+
+    # ---- nodes ---- #
+
+    def node_exists(self, node_name: str) -> bool:
+        with self._lock:
+            return node_name in self._node_ids
+
+    def add_node(self, node_name: str, node_type: str, base_type: str) -> None:
+        with self._lock:
+            if node_name in self._node_ids:
+                raise ValueError(f"Node name '{node_name}' already exists in the nodes table.")
+
+            self._add_node_record({
+                "id": self._next_id("nodes"),
+                "node_name": node_name,
+                "node_type": node_type,
+                "base_type": base_type,
+                "init_time": datetime.now(),
+            })
+
+        self.notify_change("node_added", node_name=node_name)
+
+    def get_node_id(self, node_name: str) -> int:
+        with self._lock:
+            node_id = self._node_ids.get(node_name)
+            if node_id is None:
+                raise ValueError(f"Node name '{node_name}' does not exist in the nodes table.")
+            return node_id
+
+    def get_nodes_info(self, node_id: int = None, node_name: str = None) -> List[Dict]:
+        with self._lock:
+            if node_id is not None:
+                nodes = [self._nodes[node_id]] if node_id in self._nodes else []
+            elif node_name is not None:
+                nodes = [self._nodes[self._node_ids[node_name]]] if node_name in self._node_ids else []
+            else:
+                nodes = self._nodes.values()
+            return [dict(node) for node in nodes]
+
+    # ---- runs ---- #
+
+    def start_run(self) -> None:
+        run_id = self.get_run_id()
+        start_time = datetime.now()
+
+        with self._lock:
+            self._set_item(self._runs, run_id, {"run_id": run_id, "start_time": start_time, "end_time": None, "hash": None})
+
+            # Note: there are instances where multiple triggers are required to trigger a run (e.g., a metric trigger and a resource trigger)
+            for trigger_id in list(self._untriggered):
+                trigger = self._triggers[trigger_id]
+                if trigger["trigger_time"] < start_time:
+                    self._set_item(trigger, "run_triggered", run_id)
+                    self._discard_from_set(self._untriggered, trigger_id)
+
+        self.log("--------------------------- started run %s at %s", "DEBUG", run_id, start_time)
+
+    def end_run(self) -> None:
+        end_time = datetime.now()
+        run_id = self.get_run_id()
+
+        with self._lock:
+            # artifacts of runs started after this one (still in flight when runs are pipelined) are left out
+            entries = [
+                entry for entry in self.get_entries(state="using") + self.get_entries(state="produced") 
+                if entry["run_id"] is None or entry["run_id"] <= run_id
+            ]
+            artifact_hashes = ''.join(sorted(entry["hash"] for entry in entries))
+
+            run_metadata_hash = self.hash_run_metadata(
+                metrics=self.get_metrics(run_id=run_id),
+                params=self.get_params(run_id=run_id),
+                tags=self.get_tags(run_id=run_id)
+            )
+            run_hash = hashlib.sha256((artifact_hashes + run_metadata_hash).encode()).hexdigest()
+
+            for run in self._runs.values():
+                if run["end_time"] is None and run["run_id"] <= run_id:
+                    self._set_item(run, "end_time", end_time)
+                    self._set_item(run, "hash", run_hash)
+
+            # artifacts that have not been marked as "used" yet are marked as "unused"
+            for entry in entries:
+                self._set_artifact_state(self._artifacts[entry["id"]], "unused")
+
+        self.notify_change("entries_changed", node_name=None)
+
+        self.log("--------------------------- ended run %s at %s", "DEBUG", run_id, end_time)
+
+    def get_runs(self) -> List[Dict]:
+        with self._lock:
+            return [dict(run) for run in self._runs.values()]
+
+    # ---- artifacts ---- #
+
+    def create_entry(
+        self, resource_node_name: str, filepath: str, hash: str, hash_algorithm: str,
+        state: str = "new", run_id: int = None, file_size: int = None, content_type: str = None
+    ) -> None:
+        with self._lock:
+            self.get_node_id(resource_node_name)
+
+            if (resource_node_name, filepath) in self._artifact_keys:
+                raise ValueError(f"Entry with location '{filepath}' already exists for node '{resource_node_name}'.")
+
+            artifact = {
+                "id": self._next_id("artifacts"),
+                "run_id": self.get_run_id() if state == "using" else run_id,
+                "location": filepath,
+                "created_at": datetime.now(),
+                "state": state,
+                "hash": hash,
+                "hash_algorithm": hash_algorithm,
+                "size": file_size,
+                "content_type": content_type,
+                "node_name": resource_node_name,
+            }
+            self._add_artifact_record(artifact)
+
+            if state in ("using", "produced"):
+                direction = "input" if state == "using" else "output"
+                self._add_lineage_edge(artifact["run_id"], artifact["id"], direction)
+
+        self.notify_change("entries_changed", node_name=resource_node_name)
+
+    def merge_artifacts_table(self, resource_node_name: str, entries: List[Dict], skip_existing: bool = False) -> None:
+        locations = [entry["location"] for entry in entries]
+        if len(set(locations)) != len(locations):
+            duplicates = sorted(location for location, count in Counter(locations).items() if count > 1)
+            raise ValueError(f"Entries with locations {duplicates} appear more than once in the merged entries for node '{resource_node_name}'.")
+
+        with self._lock:
+            self.get_node_id(resource_node_name)
+
+            # check every entry before inserting any, so a rejected merge leaves the store unchanged
+            existing = [entry for entry in entries if (resource_node_name, entry["location"]) in self._artifact_keys]
+            if len(existing) > 0 and skip_existing is False:
+                raise ValueError(f"Entry with location '{existing[0]['location']}' already exists for node '{resource_node_name}'.")
+
+            for entry in entries:
+                if (resource_node_name, entry["location"]) in self._artifact_keys:
+                    continue
+
+                self._add_artifact_record({
+                    "id": self._next_id("artifacts"),
+                    "run_id": entry["run_id"],
+                    "location": entry["location"],
+                    "created_at": entry["created_at"],
+                    "state": "new",
+                    "hash": entry["hash"],
+                    "hash_algorithm": entry["hash_algorithm"],
+                    "size": entry["size"],
+                    "content_type": entry["content_type"],
+                    "node_name": resource_node_name,
+                })
+
+        self.notify_change("entries_changed", node_name=resource_node_name)
+
+    def entry_exists(self, resource_node_name: str, filepath: str) -> bool:
+        with self._lock:
+            self.get_node_id(resource_node_name)
+            return (resource_node_name, filepath) in self._artifact_keys
+
+    def mark_using(self, resource_node_name: str, filepath: str, run_id: int = None) -> None:
+        with self._lock:
+            self.get_node_id(resource_node_name)
+
+            artifact = self._get_artifact(resource_node_name, filepath)
+            if artifact is None:
+                raise ValueError(f"No artifact found for node '{resource_node_name}' with location '{filepath}' to mark as using.")
+
+            self._set_item(artifact, "run_id", run_id if run_id is not None else self.get_run_id())
+            self._set_artifact_state(artifact, "using")
+            self._add_lineage_edge(artifact["run_id"], artifact["id"], "input")
+
+        self.notify_change("entries_changed", node_name=resource_node_name)
+
+    def mark_used(self, resource_node_name: str, filepath: str) -> None:
+        with self._lock:
+            self.get_node_id(resource_node_name)
+
+            artifact = self._get_artifact(resource_node_name, filepath)
+            if artifact is None:
+                raise ValueError(f"No artifact found for node '{resource_node_name}' with location '{filepath}' to mark as used.")
+
+            self._set_artifact_state(artifact, "used")
+
+        self.notify_change("entries_changed", node_name=resource_node_name)
+
+    def get_num_entries(self, resource_node_name: str, state: str) -> int:
+        valid_states = {"new", "using", "used", "all", "unused"}
+        assert state in valid_states, f"Invalid state: '{state}'. Must be one of {valid_states}"
+
+        with self._lock:
+            self.get_node_id(resource_node_name)
+
+            states = self._artifacts_by_state.get(resource_node_name, {})
+            if state == "all":
+                return sum(len(artifact_ids) for artifact_ids in states.values())
+            return len(states.get(state, ()))
+
+    def get_entries(self, resource_node_name: str = None, state: str = "all", run_id: int = None) -> List[Dict]:
+        if run_id is not None and run_id < 0:
+            raise ValueError("Run ID must be a positive integer.")
+
+        with self._lock:
+            if resource_node_name is not None:
+                node_states = [self._artifacts_by_state.get(resource_node_name, {})]
+            else:
+                node_states = list(self._artifacts_by_state.values())
+
+            artifact_ids = []
+            for states in node_states:
+                if state == "all":
+                    for ids in states.values():
+                        artifact_ids.extend(ids)
+                else:
+                    artifact_ids.extend(states.get(state, ()))
+
+            entries = []
+            for artifact_id in sorted(artifact_ids):
+                artifact = self._artifacts[artifact_id]
+                if run_id is None or artifact["run_id"] == run_id:
+                    entries.append({column: artifact[column] for column in ARTIFACT_COLUMNS})
+            return entries
+
+    def tag_artifact(self, node_name: str, location: str, **kwargs) -> None:
+        run_id = self.get_run_id()
+
+        with self._lock:
+            node_id = self.get_node_id(node_name)
+
+            if not kwargs:
+                return
+
+            artifact_ids = self._artifacts_by_location.get(location)
+            if not artifact_ids:
+                raise ValueError(f"Artifact with location '{location}' does not exist for node '{node_name}'.")
+
+            for tag_name, tag_value in kwargs.items():
+                tag = {"id": self._next_id("tags"), "run_id": run_id, "node_id": node_id, "tag_name": tag_name, "tag_value": tag_value}
+                self._add_run_record(self._tags, self._tags_by_run, "tags", tag)
+                self._append(self._artifact_tags[artifact_ids[0]], tag["id"])
+
+    def get_artifact_tags(self, location: str) -> List[Dict]:
+        with self._lock:
+            artifact = self._first_artifact_by_location(location)
+            return [
+                {"id": tag_id, self._tags[tag_id]["tag_name"]: self._tags[tag_id]["tag_value"]}
+                for tag_id in self._artifact_tags.get(artifact["id"], [])
+            ]
+
+    def get_artifact_hash(self, location: str) -> str:
+        with self._lock:
+            return self._first_artifact_by_location(location)["hash"]
+
+    def search_artifacts(self, query: str, node: str = None, limit: int = 100, offset: int = 0) -> List[Dict]:
+        """
+        Search artifacts by location and by tag names/values (case-insensitive substring match).
+        Returns entries in the same format as get_entries(), each with an additional "tags" dictionary.
+        """
+
+        query = query.lower()
+        with self._lock:
+            results = []
+            for artifact_id in sorted(self._artifacts.keys()):
+                artifact = self._artifacts[artifact_id]
+                if node is not None and artifact["node_name"] != node:
+                    continue
+
+                tags = {self._tags[tag_id]["tag_name"]: self._tags[tag_id]["tag_value"] for tag_id in self._artifact_tags.get(artifact_id, [])}
+                tag_text = " ".join(f"{name} {value}" for name, value in tags.items()).lower()
+                if query in artifact["location"].lower() or query in tag_text:
+                    results.append({**{column: artifact[column] for column in ARTIFACT_COLUMNS}, "tags": tags})
+
+            return results[offset:offset + limit]
+
+    def get_lineage(self, artifact: Union[int, str], direction: str = "downstream", depth: int = None, node: str = None) -> Dict[str, List[Dict]]:
+        """
+        Get the runs and artifacts upstream or downstream of an artifact with a breadth-first walk of the lineage edges.
+        Returns the same format as SQLiteMetadataStoreNode.get_lineage().
+        """
+
+        valid_directions = {"upstream", "downstream"}
+        if direction not in valid_directions:
+            raise ValueError(f"Invalid direction: '{direction}'. Must be one of {valid_directions}")
+        if depth is not None and depth < 1:
+            raise ValueError(f"Invalid depth: {depth}. Must be a positive integer or None")
+
+        from_direction, to_direction = ("input", "output") if direction == "downstream" else ("output", "input")
+
+        with self._lock:
+            if isinstance(artifact, int):
+                if artifact not in self._artifacts:
+                    raise ValueError(f"Artifact '{artifact}' does not exist.")
+                start_id = artifact
+            else:
+                candidates = [
+                    artifact_id for artifact_id in self._artifacts_by_location.get(artifact, [])
+                    if node is None or self._artifacts[artifact_id]["node_name"] == node
+                ]
+                if len(candidates) == 0:
+                    raise ValueError(f"Artifact '{artifact}' does not exist.")
+                start_id = candidates[0]
+
+            run_depths: Dict[int, int] = {}
+            artifact_depths: Dict[int, int] = {start_id: 0}
+            frontier = [start_id]
+            current_depth = 0
+
+            while len(frontier) > 0 and (depth is None or current_depth < depth):
+                current_depth += 1
+                next_frontier = []
+                for artifact_id in frontier:
+                    for run_id in self._artifact_edges.get((artifact_id, from_direction), ()):
+                        if run_id in run_depths:
+                            continue
+                        run_depths[run_id] = current_depth
+                        for next_artifact_id in self._run_edges.get((run_id, to_direction), ()):
+                            if next_artifact_id not in artifact_depths:
+                                artifact_depths[next_artifact_id] = current_depth
+                                next_frontier.append(next_artifact_id)
+                frontier = next_frontier
+
+            del artifact_depths[start_id]
+            return {
+                "runs": [
+                    {"run_id": run_id, "depth": run_depth}
+                    for run_id, run_depth in sorted(run_depths.items(), key=lambda item: (item[1], item[0]))
+                ],
+                "artifacts": [
+                    {**{column: self._artifacts[artifact_id][column] for column in ARTIFACT_COLUMNS}, "depth": artifact_depth}
+                    for artifact_id, artifact_depth in sorted(artifact_depths.items(), key=lambda item: (item[1], item[0]))
+                ],
+            }
+
+    # ---- metrics, params, tags, and triggers ---- #
+
+    def _log_run_records(self, table: Dict[int, Dict], index: Dict[int, List[int]], table_name: str, prefix: str, node_name: str, **kwargs) -> None:
+        run_id = self.get_run_id()
+
+        with self._lock:
+            node_id = self.get_node_id(node_name)
+            for key, value in kwargs.items():
+                record = {"id": self._next_id(table_name), "run_id": run_id, "node_id": node_id, f"{prefix}_name": key, f"{prefix}_value": value}
+                self._add_run_record(table, index, table_name, record)
+
+    def _get_run_records(self, table: Dict[int, Dict], index: Dict[int, List[int]], prefix: str, node_name: str = None, run_id: int = None) -> List[Dict]:
+        with self._lock:
+            record_ids = index.get(run_id, []) if run_id is not None else sorted(table.keys())
+            node_id = self._node_ids.get(node_name) if node_name is not None else None
+
+            return [
+                {
+                    "id": record["id"],
+                    "run_id": record["run_id"],
+                    f"{prefix}_name": record[f"{prefix}_name"],
+                    f"{prefix}_value": record[f"{prefix}_value"],
+                    "node_name": self._nodes[record["node_id"]]["node_name"],
+                }
+                for record in (table[record_id] for record_id in record_ids)
+                if node_name is None or record["node_id"] == node_id
+            ]
+
+    def log_metrics(self, node_name: str, **kwargs) -> None:
+        self._log_run_records(self._metrics, self._metrics_by_run, "metrics", "metric", node_name, **kwargs)
+
+    def log_params(self, node_name: str, **kwargs) -> None:
+        self._log_run_records(self._params, self._params_by_run, "params", "param", node_name, **kwargs)
+
+    def set_tags(self, node_name: str, **kwargs) -> None:
+        self._log_run_records(self._tags, self._tags_by_run, "tags", "tag", node_name, **kwargs)
+
+    def get_metrics(self, node_name: str = None, run_id: int = None) -> List[Dict]:
+        return self._get_run_records(self._metrics, self._metrics_by_run, "metric", node_name=node_name, run_id=run_id)
+
+    def get_params(self, node_name: str = None, run_id: int = None) -> List[Dict]:
+        return self._get_run_records(self._params, self._params_by_run, "param", node_name=node_name, run_id=run_id)
+
+    def get_tags(self, node_name: str = None, run_id: int = None) -> List[Dict]:
+        return self._get_run_records(self._tags, self._tags_by_run, "tag", node_name=node_name, run_id=run_id)
+
+    def log_trigger(self, node_name: str, message: str = None) -> None:
+        if message is not None:
+            with self._lock:
+                node_id = self.get_node_id(node_name)
+                self._add_trigger_record({
+                    "id": self._next_id("triggers"),
+                    "run_triggered": None,
+                    "node_id": node_id,
+                    "trigger_time": datetime.now(),
+                    "message": message,
+                })
+
+    def get_triggers(self, node_name: str = None) -> List[Dict]:
+        with self._lock:
+            node_id = self._node_ids.get(node_name) if node_name is not None else None
+            return [
+                {
+                    "id": trigger["id"],
+                    "run_triggered": trigger["run_triggered"],
+                    "trigger_time": trigger["trigger_time"],
+                    "message": trigger["message"],
+                    "node_name": self._nodes[trigger["node_id"]]["node_name"],
+                }
+                for trigger in self._triggers.values()
+                if node_name is None or trigger["node_id"] == node_id
+            ]
@@ -1,14 +1,19 @@
-from typing import List, Union, Dict
+from typing import List, Union, Dict, Sequence, Iterator, Callable
 from logging import Logger
-from threading import Event
+from contextlib import contextmanager
+from threading import Event, BoundedSemaphore
 from threading import Thread
 import traceback
 import time
 import datetime
+import hashlib
+import json
 
 from anacostia_pipeline.nodes.node import BaseNode
 from anacostia_pipeline.utils.constants import Result, Status
 from anacostia_pipeline.nodes.utils import NodeModel
+from anacostia_pipeline.nodes.metadata.utils import ArtifactRow, entries_to_columns, validate_artifact_columns
+from anacostia_pipeline.utils.run_context import current_run_id, set_current_run_id
 
 
 
@@ -21,6 +26,9 @@ class BaseMetadataStoreNode(BaseNode):
     thus, by extension, the metadata store node will always be the root node of the DAG.
     """
 
+    # True if the node sends "rows_changed" events and implements get_changed_rows(), which lets leaf pipelines replicate it (see ChangeFeed)
+    supports_change_feed = False
+
     def __init__(
         self,
         name: str,
@@ -34,6 +42,10 @@ class BaseMetadataStoreNode(BaseNode):
         self.uri = uri
         self.run_id = 0
         self.trigger_event = Event()
+        self.partial_runs = False
+
+        # callbacks notified when cached metadata changes (e.g., the run id, the nodes, the number of entries)
+        self._change_listeners: List[Callable[[Dict], None]] = []
     
     def model(self) -> NodeModel:
         return NodeModel(
@@ -44,8 +56,90 @@ class BaseMetadataStoreNode(BaseNode):
             successors = [n.name for n in self.successors]
         )
 
+    def set_partial_runs(self, partial_runs: bool) -> None:
+        """
+        If partial_runs is True, a run is started as soon as any resource node is ready (i.e., has been triggered) 
+        instead of when every resource node is ready; the run only covers the nodes reachable from the resource nodes that were ready, 
+        and the other nodes are skipped in the run (their status is Status.SKIPPED), so independent data feeds do not wait for each other.
+        """
+        self.partial_runs = partial_runs
+
+    def wait_for_resources(self) -> List[str]:
+        """
+        Wait for the resource nodes to signal that their resources are ready for the next run and return the ones that did
+        (local node names or remote node urls): every resource node, or the first ones to be ready if partial_runs is True.
+        """
+        if self.partial_runs is True:
+            return self.ready_latch.wait_any()
+
+        self.wait_for_successors_ready()
+        return self.ready_latch.parties
+
+    def _skipped_resources(self, ready: List[str]) -> List[str]:
+        if len(ready) < len(self.ready_latch.parties):
+            self.log("'%s' skipping resource nodes %s", "INFO", self.name, [party for party in self.ready_latch.parties if party not in ready])
+        return [party for party in self.successors_latch.parties if party not in ready]
+
     def get_run_id(self) -> int:
-        return self.run_id
+        # while several runs are in flight, metadata is recorded for the run the calling node is working on
+        run_id = current_run_id()
+        return run_id if run_id is not None else self.run_id
+
+    def log_run_id(self) -> int:
+        return self.get_run_id()
+
+    def add_change_listener(self, listener: Callable[[Dict], None]) -> None:
+        """
+        Register a callback that is called with an event dictionary whenever metadata that clients may cache changes.
+        Events: 
+            {"type": "run_started", "run_id": ...}, {"type": "run_ended", "run_id": ...}, 
+            {"type": "node_added", "node_name": ...}, {"type": "entries_changed", "node_name": ...} (node_name is None if entries of all nodes changed).
+            Stores that set supports_change_feed also send {"type": "rows_changed", "table": ..., "ids": [...]} 
+            (or "resource_node_name" and "locations" instead of "ids" for the artifacts table) after every change to the artifacts, metrics, params, and tags tables,
+            and {"type": "rows_reset", "table": ...} when a table is changed in bulk.
+        Listeners are called from the thread that made the change and must not block.
+        """
+        self._change_listeners.append(listener)
+
+    def notify_change(self, event_type: str, **fields) -> None:
+        event = {"type": event_type, **fields}
+        for listener in self._change_listeners:
+            try:
+                listener(event)
+            except Exception as e:
+                self.log("Error notifying change listener of '%s' event: %s", "ERROR", event_type, e)
+
+    def hash_run_metadata(self, metrics: List[Dict], params: List[Dict], tags: List[Dict]) -> str:
+        def stable_hash(records: List[Dict], sort_key: str) -> str:
+            sorted_records = sorted(records, key=lambda r: r[sort_key])
+            serialized = json.dumps(sorted_records, sort_keys=True)
+            return hashlib.sha256(serialized.encode()).hexdigest()
+
+        metrics_hash = stable_hash(metrics, sort_key="id")
+        params_hash = stable_hash(params, sort_key="id")
+        tags_hash = stable_hash(tags, sort_key="id")
+
+        # Combine into a final hash for the run
+        combined = metrics_hash + params_hash + tags_hash
+        return hashlib.sha256(combined.encode()).hexdigest()
+
+    @contextmanager
+    def transaction(self):
+        """
+        Override to group the metadata store calls made inside the with block into a single unit of work.
+        E.g., share one database session and commit once at the end of the block.
+        The default implementation simply runs each call on its own.
+        """
+        yield self
+
+    @contextmanager
+    def savepoint(self):
+        """
+        Override to let the calls made inside the with block be rolled back on their own when called inside transaction(),
+        without rolling back the rest of the transaction. E.g., open a SAVEPOINT in the current database transaction.
+        The default implementation does not roll anything back.
+        """
+        yield self
     
     def get_node_id(self, node_name: str) -> int:
         """
@@ -66,12 +160,52 @@ class BaseMetadataStoreNode(BaseNode):
     def create_entry(self, resource_node_name: str, **kwargs) -> None:
         pass
 
-    def merge_artifacts_table(self, resource_node_name: str, entries: List[Dict]) -> None:
+    def merge_artifacts_table(self, resource_node_name: str, entries: List[Dict], skip_existing: bool = False) -> None:
         pass
 
     def get_entries(self, resource_node_name: str = None, state: str = "all", run_id: int = None) -> List[dict]:
         pass
 
+    def get_entries_columnar(
+        self, resource_node_name: str = None, state: str = "all", run_id: int = None, 
+        columns: List[str] = None, array_type: str = "list"
+    ) -> Dict[str, Sequence]:
+        """
+        Get entries as a dictionary of column arrays instead of a list of dictionaries, 
+        e.g., {"location": [...], "hash": [...]} if columns = ["location", "hash"].
+        See anacostia_pipeline.nodes.metadata.utils.rows_to_columns for the supported array types.
+        The default implementation converts the output of get_entries(); override to fetch the columns directly from the metadata store.
+        """
+        columns = validate_artifact_columns(columns)
+        entries = self.get_entries(resource_node_name=resource_node_name, state=state)
+        if run_id is not None:
+            entries = [entry for entry in entries if entry["run_id"] == run_id]
+        return entries_to_columns(entries, columns, array_type=array_type)
+
+    def iter_entries(
+        self, resource_node_name: str = None, state: str = "all", run_id: int = None, columns: List[str] = None,
+        after_id: int = None, limit: int = None
+    ) -> Iterator[ArtifactRow]:
+        """
+        Iterate over entries as compact ArtifactRow objects in ascending order of id.
+        after_id and limit select a page: at most limit entries whose id is greater than after_id (see merge_artifacts_stream).
+        The default implementation wraps the output of get_entries(); override to stream the rows from the metadata store.
+        """
+        columns = validate_artifact_columns(columns)
+        entries = sorted(self.get_entries(resource_node_name=resource_node_name, state=state), key=lambda entry: entry["id"])
+        num_entries = 0
+        for entry in entries:
+            if limit is not None and num_entries >= limit:
+                return
+            if (run_id is None or entry["run_id"] == run_id) and (after_id is None or entry["id"] > after_id):
+                num_entries += 1
+                yield ArtifactRow.from_values(columns, [entry.get(column) for column in columns])
+
+    def get_changed_rows(
+        self, table: str, ids: List[int] = None, resource_node_name: str = None, locations: List[str] = None
+    ) -> List[Dict]:
+        raise NotImplementedError(f"{type(self).__name__} does not support the change feed.")
+
     def update_entry(self, resource_node_name: str, entry_id: int, **kwargs) -> None:
         pass
 
@@ -109,7 +243,12 @@ class BaseMetadataStoreNode(BaseNode):
     def get_tags(self, node_name: str = None, run_id: int = None) -> List[Dict]:
         pass
     
-    def mark_using(self, resource_node_name: str, filepath: str) -> None:
+    def mark_using(self, resource_node_name: str, filepath: str, run_id: int = None) -> None:
+        """
+        Override to mark an artifact as being used in a run.
+        run_id is the run the artifact is used in; None means the current run (see get_run_id()).
+        Writes replayed from a leaf pipeline's MetadataSpool pass the run the write was made in.
+        """
         pass
 
     def mark_used(self, resource_node_name: str, filepath: str) -> None:
@@ -144,6 +283,20 @@ class BaseMetadataStoreNode(BaseNode):
     def get_artifact_hash(self, location: str) -> str:
         pass
 
+    def search_artifacts(self, query: str, node: str = None, limit: int = 100, offset: int = 0) -> List[Dict]:
+        """
+        Override to specify how to search artifacts by location and tags in the metadata store.
+        E.g., query a full-text index, query a search engine, etc.
+        """
+        pass
+
+    def get_lineage(self, artifact: Union[int, str], direction: str = "downstream", depth: int = None, node: str = None) -> Dict[str, List[Dict]]:
+        """
+        Override to specify how to retrieve the runs and artifacts upstream or downstream of an artifact.
+        E.g., walk a lineage edge table with a recursive query, query a graph database, etc.
+        """
+        pass
+
     def trigger(self, message: str = None) -> None:
         if self.trigger_event.is_set() is False:
             
@@ -156,26 +309,26 @@ class BaseMetadataStoreNode(BaseNode):
     def start_monitoring(self) -> None:
 
         def _monitor_thread_func():
-            self.log(f"Starting observer thread for node '{self.name}'", level='INFO')
+            self.log("Starting observer thread for node '%s'", "INFO", self.name)
             while self.exit_event.is_set() is False:
                 try:
                     self.metadata_store_trigger()
 
                 except Exception as e:
-                        self.log(f"Error checking metadata store data for node '{self.name}': {traceback.format_exc()}")
+                        self.log("Error checking metadata store data for node '%s': %s", "DEBUG", self.name, traceback.format_exc())
                 
                 # IMPORTANT: sleep for a while before checking again to enable other threads to access the database and to avoid starvation.
                 time.sleep(0.1)
             
-            self.log(f"Observer thread for node '{self.name}' exited", level="INFO")
+            self.log("Observer thread for node '%s' exited", "INFO", self.name)
 
         self.observer_thread = Thread(name=f"{self.name}_observer", target=_monitor_thread_func, daemon=True)
         self.observer_thread.start()
 
     def stop_monitoring(self) -> None:
-        self.log(f"Stopping observer thread for node '{self.name}'", level="INFO")
+        self.log("Stopping observer thread for node '%s'", "INFO", self.name)
         self.observer_thread.join()
-        self.log(f"Observer stopped for node '{self.name}'", level="INFO")
+        self.log("Observer stopped for node '%s'", "INFO", self.name)
 
     def metadata_store_trigger(self) -> None:
         """
@@ -190,17 +343,21 @@ class BaseMetadataStoreNode(BaseNode):
         super().exit()
         self.stop_monitoring()    
         self.trigger_event.set()
-        self.log(f"Node '{self.name}' trigger event set at {datetime.datetime.now()}", level='INFO')
+        self.log("Node '%s' trigger event set at %s", "INFO", self.name, datetime.datetime.now())
     
     def run(self) -> None:
         # start monitoring thread for metadata store node
         self.start_monitoring()
 
+        if self.is_pipelined() is True:
+            self.run_pipelined()
+            return
+
         while self.exit_event.is_set() is False:
 
-            # waiting for all resource nodes to signal their resources are ready to be used
+            # waiting for all resource nodes (or, with partial runs, any resource node) to signal their resources are ready to be used
             # self.log(f"{self.name} waiting for resource nodes to signal they are ready", level='INFO')
-            self.wait_for_successors()
+            ready = self.wait_for_resources()
 
             # wait for all metrics to meet trigger conditions
             # self.log(f"{self.name} waiting for metrics to meet trigger conditions", level='INFO')
@@ -212,14 +369,16 @@ class BaseMetadataStoreNode(BaseNode):
             self.status = Status.TRIGGERED
 
             # creating a new run
-            self.log(f"--------------------------------- {self.name} creating a run {self.run_id}", level='INFO')
+            self.log("--------------------------------- %s creating a run %s", "INFO", self.name, self.run_id)
             if self.exit_event.is_set(): return
             self.start_run()
+            self.notify_change("run_started", run_id=self.run_id)
 
             # signal to all successors that the run has been created; i.e., begin pipeline execution
+            # (the resource nodes that were not ready are skipped in the run)
             # self.log(f"{self.name} signaling successors that the run has been created", level='INFO')
             if self.exit_event.is_set(): return
-            self.signal_successors(Result.SUCCESS)
+            self.signal_successors(Result.SUCCESS, run_id=self.run_id, skip=self._skipped_resources(ready))
 
             # waiting for all resource nodes to signal they are done using the current state
             # self.log(f"{self.name} waiting for resource nodes to signal they are done using the current state", level='INFO')
@@ -227,15 +386,70 @@ class BaseMetadataStoreNode(BaseNode):
             self.wait_for_successors()
             
             # ending the run
-            self.log(f"--------------------------------- {self.name} ending run {self.run_id}", level='INFO')
+            self.log("--------------------------------- %s ending run %s", "INFO", self.name, self.run_id)
             if self.exit_event.is_set(): return
             self.end_run()
 
             # we are clearing the trigger event here to prevent the next run from being triggered before we record the end of the current run.
             self.trigger_event.clear()
             self.run_id += 1
+            self.notify_change("run_ended", run_id=self.run_id - 1)
             
             # signal to all successors that the run has ended; i.e., end pipeline execution
             # self.log(f"{self.name} signaling successors that the run has ended", level='INFO')
             if self.exit_event.is_set(): return
-            self.signal_successors(Result.SUCCESS)
\ No newline at end of file
+            self.signal_successors(Result.SUCCESS)
+
+    def run_pipelined(self) -> None:
+        """
+        Run loop used when several runs can be in flight (run_concurrency > 1).
+        A run is started as soon as every resource node is ready for it and the trigger conditions are met,
+        as long as fewer than run_concurrency runs are in flight; runs are ended (in the order they were started)
+        by a second thread as the resource nodes signal that the action nodes have finished them.
+        self.run_id is the id of the latest run that was started.
+        """
+
+        runs_in_flight = BoundedSemaphore(self.run_concurrency)
+
+        def _end_runs():
+            while self.exit_event.is_set() is False:
+                self.wait_for_successors()
+                if self.exit_event.is_set(): return
+
+                run_id = self.successors_latch.run_id
+                set_current_run_id(run_id)
+                self.log("--------------------------------- %s ending run %s", "INFO", self.name, run_id)
+                self.end_run()
+                self.notify_change("run_ended", run_id=run_id)
+                runs_in_flight.release()
+
+        Thread(name=f"{self.name}_run_finisher", target=_end_runs, daemon=True).start()
+
+        next_run_id = self.run_id
+        while self.exit_event.is_set() is False:
+
+            # wait for one of the runs in flight to end if there are already run_concurrency of them
+            while runs_in_flight.acquire(timeout=0.1) is False:
+                if self.exit_event.is_set(): return
+
+            # waiting for all resource nodes (or, with partial runs, any resource node) to signal they are ready for the next run
+            ready = self.wait_for_resources()
+
+            self.status = Status.WAITING_METRICS
+            self.trigger_event.wait()
+            
+            if self.exit_event.is_set(): return
+            
+            self.status = Status.TRIGGERED
+
+            run_id = next_run_id
+            self.log("--------------------------------- %s creating a run %s", "INFO", self.name, run_id)
+            set_current_run_id(run_id)
+            self.run_id = run_id
+            self.start_run()
+            self.notify_change("run_started", run_id=run_id)
+            self.trigger_event.clear()
+            next_run_id += 1
+
+            if self.exit_event.is_set(): return
+            self.signal_successors(Result.SUCCESS, run_id=run_id, skip=self._skipped_resources(ready))
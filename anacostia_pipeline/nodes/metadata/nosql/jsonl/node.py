@@ -0,0 +1,342 @@
+from typing import List, Dict, Union, Any, Set, Tuple
+from logging import Logger
+from threading import Thread, Event, RLock
+import traceback
+import operator
+import json
+import os
+
+from anacostia_pipeline.nodes.metadata.nosql.node import BaseNoSQLMetadataStoreNode
+from anacostia_pipeline.nodes.metadata.utils import encode_json_value, decode_json_object
+
+
+
+# fields with an in-memory hash index; equality filters on these fields are answered from the index instead of a scan.
+# location is indexed so the entry_exists() check done by every create_entry() does not scan all artifacts of the node.
+INDEXED_FIELDS = ("type", "node_name", "state", "run_id", "location")
+
+# operators supported in filters, e.g., {"trigger_time": ("$lt", start_time)}
+OPERATORS = {
+    "$lt": operator.lt,
+    "$lte": operator.le,
+    "$gt": operator.gt,
+    "$gte": operator.ge,
+    "$ne": operator.ne,
+    "$in": lambda value, values: value in values,
+}
+
+
+def matches(document: Dict, filters: Dict) -> bool:
+    for field, condition in filters.items():
+        value = document.get(field)
+
+        if isinstance(condition, tuple):
+            op, operand = condition
+            if op not in OPERATORS:
+                raise ValueError(f"Invalid operator: '{op}'. Must be one of {list(OPERATORS.keys())}")
+
+            # comparisons against missing fields never match (except $ne)
+            if value is None and op != "$ne":
+                return False
+            if OPERATORS[op](value, operand) is False:
+                return False
+
+        elif value != condition:
+            return False
+
+    return True
+
+
+class JSONLMetadataStoreNode(BaseNoSQLMetadataStoreNode):
+    """
+    Dependency-free metadata store backed by an append-only JSON Lines log.
+
+    Every insert and update is appended to the log as a single line, so writes cost one buffered write to the end of a file
+    instead of a database transaction; this makes the JSONL store well-suited to write-heavy ingestion.
+    All documents are kept in memory along with hash indexes on "type", "node_name", "state", "run_id", and "location".
+    When the node starts, the documents are rebuilt by replaying the log.
+
+    Because updates are appended rather than applied in place, the log grows with every update.
+    A background thread compacts the log (i.e., rewrites it with one line per live document)
+    once it holds more than compaction_min_records lines and more than compaction_ratio lines per document.
+    Writes are not blocked while the compacted log is being written.
+
+    Args:
+        uri: location of the log file, e.g., "jsonl:///metadata/metadata.jsonl".
+        sync: if True, fsync the log after every write so writes survive an OS crash (not just a process crash), at the cost of write throughput.
+        compaction_interval: how often (in seconds) the background thread checks whether the log needs to be compacted.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        uri: str,
+        remote_successors: List[str] = None,
+        client_url: str = None,
+        loggers: Union[Logger, List[Logger]] = None,
+        sync: bool = False,
+        compaction_interval: float = 60.0,
+        compaction_min_records: int = 10_000,
+        compaction_ratio: float = 2.0
+    ) -> None:
+        if uri.startswith("jsonl:///") is False:
+            raise ValueError(f"Invalid URI: {uri}. JSONL URIs must start with 'jsonl:///'")
+
+        super().__init__(name, uri, remote_successors=remote_successors, client_url=client_url, loggers=loggers)
+
+        self.path = uri[len("jsonl:///"):]
+        self.sync = sync
+        self.compaction_interval = compaction_interval
+        self.compaction_min_records = compaction_min_records
+        self.compaction_ratio = compaction_ratio
+
+        self._lock = RLock()
+        self._file = None
+        self._documents: Dict[int, Dict] = {}
+        self._indexes: Dict[str, Dict[Any, Set[int]]] = {field: {} for field in INDEXED_FIELDS}
+        self._next_key = 0
+        self._next_ids: Dict[str, int] = {}
+        self._num_records = 0
+
+        # lines written while a compaction is in progress; they are appended to the compacted log before it replaces the current log
+        self._pending_records: List[str] = None
+
+        self._compaction_thread: Thread = None
+        self._compaction_stop_event = Event()
+
+    def setup(self) -> None:
+        folder = os.path.dirname(self.path)
+        if folder != "" and os.path.exists(folder) is False:
+            os.makedirs(folder, exist_ok=True)
+
+        with self._lock:
+            self._load()
+            self._file = open(self.path, "a", encoding="utf-8")
+
+        self._compaction_stop_event.clear()
+        self._compaction_thread = Thread(name=f"{self.name}_compaction", target=self._compaction_thread_func, daemon=True)
+        self._compaction_thread.start()
+
+    def close(self) -> None:
+        """Stop the compaction thread and close the log file."""
+
+        self._compaction_stop_event.set()
+        if self._compaction_thread is not None:
+            self._compaction_thread.join()
+            self._compaction_thread = None
+
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def exit(self):
+        super().exit()
+        self.close()
+
+    # ---- log ---- #
+
+    def _load(self) -> None:
+        if os.path.exists(self.path) is False:
+            return
+
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line_number, line in enumerate(f, start=1):
+                if line.strip() == "":
+                    continue
+
+                try:
+                    record = json.loads(line, object_hook=decode_json_object)
+                except json.JSONDecodeError:
+                    # a partially written last line is left behind if the process dies in the middle of a write
+                    self.log("Skipping corrupted record on line %s of %s", "WARNING", line_number, self.path)
+                    continue
+
+                self._apply(record)
+                self._num_records += 1
+
+        self.log("Loaded %s documents from %s records in %s", "INFO", len(self._documents), self._num_records, self.path)
+
+    def _encode(self, record: Dict) -> str:
+        return json.dumps(record, default=encode_json_value, separators=(",", ":"))
+
+    def _append(self, record: Dict) -> None:
+        if self._file is None:
+            raise RuntimeError(f"Metadata store '{self.name}' is not open; call setup() first.")
+
+        line = self._encode(record) + "\n"
+        self._file.write(line)
+        self._file.flush()
+        if self.sync is True:
+            os.fsync(self._file.fileno())
+
+        self._num_records += 1
+        if self._pending_records is not None:
+            self._pending_records.append(line)
+
+    def _apply(self, record: Dict) -> None:
+        if record["op"] == "insert":
+            self._apply_insert(record["key"], record["doc"])
+        elif record["op"] == "update":
+            self._apply_update(record["keys"], record["updates"])
+        else:
+            raise ValueError(f"Invalid record operation: '{record['op']}'")
+
+    def _apply_insert(self, key: int, document: Dict) -> None:
+        self._documents[key] = document
+        self._index_add(key, document)
+        self._next_key = max(self._next_key, key + 1)
+
+        if "id" in document:
+            document_type = document.get("type")
+            self._next_ids[document_type] = max(self._next_ids.get(document_type, 1), document["id"] + 1)
+
+    def _apply_update(self, keys: List[int], updates: Dict) -> None:
+        for key in keys:
+            old_document = self._documents[key]
+
+            # documents are replaced rather than modified in place so a compaction can safely write out a snapshot of them
+            new_document = {**old_document, **updates}
+            self._index_remove(key, old_document)
+            self._index_add(key, new_document)
+            self._documents[key] = new_document
+
+    # ---- indexes ---- #
+
+    def _index_add(self, key: int, document: Dict) -> None:
+        for field in INDEXED_FIELDS:
+            # documents without the field are indexed under None, which is what {field: None} filters match
+            self._indexes[field].setdefault(document.get(field), set()).add(key)
+
+    def _index_remove(self, key: int, document: Dict) -> None:
+        for field in INDEXED_FIELDS:
+            keys = self._indexes[field].get(document.get(field))
+            if keys is not None:
+                keys.discard(key)
+                if len(keys) == 0:
+                    del self._indexes[field][document.get(field)]
+
+    def _plan(self, filters: Dict) -> Tuple[List[Set[int]], Dict]:
+        """
+        Split filters into the index entries that answer the indexed equality filters and the filters that must be checked per document.
+        The index entries are sorted from smallest to largest so intersecting them touches as few keys as possible.
+        """
+
+        index_sets = []
+        residual_filters = {}
+        for field, condition in filters.items():
+            if field in self._indexes and isinstance(condition, tuple) is False:
+                index_sets.append(self._indexes[field].get(condition, set()))
+            else:
+                residual_filters[field] = condition
+
+        index_sets.sort(key=len)
+        return index_sets, residual_filters
+
+    def _candidate_keys(self, index_sets: List[Set[int]]):
+        if len(index_sets) == 0:
+            return self._documents.keys()
+        if len(index_sets) == 1:
+            return index_sets[0]
+        return index_sets[0].intersection(*index_sets[1:])
+
+    def _find(self, filters: Dict) -> List[int]:
+        index_sets, residual_filters = self._plan(filters)
+        keys = self._candidate_keys(index_sets)
+        if len(residual_filters) > 0:
+            keys = [key for key in keys if matches(self._documents[key], residual_filters)]
+        return sorted(keys)
+
+    # ---- BaseNoSQLMetadataStoreNode primitives ---- #
+
+    def insert(self, doc: Dict) -> None:
+        with self._lock:
+            document = dict(doc)
+
+            # like an autoincrement primary key, ids are assigned per document type
+            if "id" not in document:
+                document["id"] = self._next_ids.get(document.get("type"), 1)
+
+            key = self._next_key
+            self._append({"op": "insert", "key": key, "doc": document})
+            self._apply_insert(key, document)
+
+    def query(self, filters: Dict) -> List[Dict]:
+        with self._lock:
+            return [dict(self._documents[key]) for key in self._find(filters)]
+
+    def update(self, filters: Dict, updates: Dict) -> int:
+        with self._lock:
+            keys = self._find(filters)
+            if len(keys) == 0:
+                return 0
+
+            self._append({"op": "update", "keys": keys, "updates": updates})
+            self._apply_update(keys, updates)
+            return len(keys)
+
+    def count(self, filters: Dict) -> int:
+        with self._lock:
+            index_sets, residual_filters = self._plan(filters)
+            keys = self._candidate_keys(index_sets)
+            if len(residual_filters) == 0:
+                return len(keys)
+            return sum(1 for key in keys if matches(self._documents[key], residual_filters))
+
+    # ---- compaction ---- #
+
+    def needs_compaction(self) -> bool:
+        with self._lock:
+            return (
+                self._num_records >= self.compaction_min_records and
+                self._num_records > self.compaction_ratio * len(self._documents)
+            )
+
+    def compact(self) -> None:
+        """
+        Rewrite the log with a single insert record per live document.
+        The snapshot is written to a temporary file without holding the lock;
+        records appended in the meantime are copied over before the temporary file atomically replaces the log.
+        """
+
+        with self._lock:
+            if self._pending_records is not None:
+                return
+            snapshot = list(self._documents.items())
+            self._pending_records = []
+
+        compacted_path = f"{self.path}.compact"
+        try:
+            with open(compacted_path, "w", encoding="utf-8") as f:
+                for key, document in snapshot:
+                    f.write(self._encode({"op": "insert", "key": key, "doc": document}) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+            with self._lock:
+                with open(compacted_path, "a", encoding="utf-8") as f:
+                    f.writelines(self._pending_records)
+                    f.flush()
+                    os.fsync(f.fileno())
+
+                num_records_before = self._num_records
+                self._file.close()
+                os.replace(compacted_path, self.path)
+                self._file = open(self.path, "a", encoding="utf-8")
+                self._num_records = len(snapshot) + len(self._pending_records)
+
+            self.log("Compacted %s from %s to %s records", "INFO", self.path, num_records_before, self._num_records)
+
+        finally:
+            with self._lock:
+                self._pending_records = None
+            if os.path.exists(compacted_path):
+                os.remove(compacted_path)
+
+    def _compaction_thread_func(self) -> None:
+        while self._compaction_stop_event.wait(self.compaction_interval) is False:
+            try:
+                if self.needs_compaction():
+                    self.compact()
+            except Exception:
+                self.log("Error compacting metadata store '%s': %s", "ERROR", self.name, traceback.format_exc())
@@ -3,6 +3,7 @@ from typing import List, Dict, Optional
 from datetime import datetime
 
 from anacostia_pipeline.nodes.metadata.node import BaseMetadataStoreNode
+from anacostia_pipeline.nodes.metadata.utils import ARTIFACT_COLUMNS
 
 
 
@@ -10,6 +11,8 @@ class BaseNoSQLMetadataStoreNode(BaseMetadataStoreNode, ABC):
     """
     Abstract base class for NoSQL metadata store nodes.
     Subclasses must implement NoSQL-backed versions of metadata logging and query methods.
+    Artifacts go through the same states as in the SQL store: "new" -> "using" (mark_using()) or "produced" -> "used" (mark_used()),
+    and artifacts that are still "using" or "produced" when the run ends are marked "unused" by end_run().
     """
 
     @abstractmethod
@@ -24,8 +27,24 @@ class BaseNoSQLMetadataStoreNode(BaseMetadataStoreNode, ABC):
     def update(self, filters: Dict, updates: Dict) -> int:
         pass
 
+    def count(self, filters: Dict) -> int:
+        """
+        Count the documents matching filters.
+        The default implementation materializes the documents; override to count without fetching them (e.g., from an index).
+        """
+        return len(self.query(filters))
+
     # ---- Required Implementations from BaseMetadataStoreNode ---- #
 
+    def node_exists(self, node_name: str) -> bool:
+        return self.count({"type": "node", "node_name": node_name}) > 0
+
+    def get_node_id(self, node_name: str) -> int:
+        nodes = self.query({"type": "node", "node_name": node_name})
+        if len(nodes) == 0:
+            raise ValueError(f"Node name '{node_name}' does not exist in the metadata store.")
+        return nodes[0]["id"]
+
     def add_node(self, node_name: str, node_type: str, base_type: str) -> None:
         self.insert({
             "type": "node",
@@ -43,33 +62,67 @@ class BaseNoSQLMetadataStoreNode(BaseMetadataStoreNode, ABC):
             filters["node_name"] = node_name
         return self.query(filters)
 
-    def create_entry(self, resource_node_name: str, **kwargs) -> None:
-        kwargs.update({
+    def create_entry(
+        self, resource_node_name: str, filepath: str, hash: str, hash_algorithm: str, 
+        state: str = "new", run_id: int = None, file_size: int = None, content_type: str = None
+    ) -> None:
+        if self.entry_exists(resource_node_name, filepath):
+            raise ValueError(f"Entry with location '{filepath}' already exists for node '{resource_node_name}'.")
+
+        self.insert({
             "type": "artifact",
             "node_name": resource_node_name,
-            "created_at": datetime.utcnow()
+            "run_id": self.get_run_id() if state == "using" else run_id,
+            "location": filepath,
+            "created_at": datetime.utcnow(),
+            "state": state,
+            "hash": hash,
+            "hash_algorithm": hash_algorithm,
+            "size": file_size,
+            "content_type": content_type
         })
-        self.insert(kwargs)
 
-    def get_entries(self, resource_node_name: str, state: str) -> List[Dict]:
-        filters = {"type": "artifact", "state": state}
+    def _entry_filters(self, resource_node_name: str = None, state: str = "all", run_id: int = None) -> Dict:
+        filters = {"type": "artifact"}
         if resource_node_name:
             filters["node_name"] = resource_node_name
-        return self.query(filters)
+        if state != "all":
+            filters["state"] = state
+        if run_id is not None:
+            filters["run_id"] = run_id
+        return filters
+
+    def get_entries(self, resource_node_name: str = None, state: str = "all", run_id: int = None) -> List[Dict]:
+        documents = self.query(self._entry_filters(resource_node_name, state, run_id))
+        return [{column: document.get(column) for column in ARTIFACT_COLUMNS} for document in documents]
 
     def update_entry(self, resource_node_name: str, entry_id: int, **kwargs) -> None:
         filters = {"type": "artifact", "id": entry_id, "node_name": resource_node_name}
         self.update(filters, kwargs)
 
     def get_num_entries(self, resource_node_name: str, state: str) -> int:
-        filters = {"type": "artifact", "state": state}
-        if resource_node_name:
-            filters["node_name"] = resource_node_name
-        return len(self.query(filters))
+        return self.count(self._entry_filters(resource_node_name, state))
+
+    def entry_exists(self, resource_node_name: str, filepath: str) -> bool:
+        filters = {"type": "artifact", "node_name": resource_node_name, "location": filepath}
+        return self.count(filters) > 0
 
-    def entry_exists(self, resource_node_name: str) -> bool:
-        filters = {"type": "artifact", "node_name": resource_node_name}
-        return len(self.query(filters)) > 0
+    def mark_using(self, resource_node_name: str, filepath: str, run_id: int = None) -> None:
+        filters = {"type": "artifact", "node_name": resource_node_name, "location": filepath}
+        run_id = run_id if run_id is not None else self.get_run_id()
+        if self.update(filters, {"state": "using", "run_id": run_id}) == 0:
+            raise ValueError(f"No artifact found for node '{resource_node_name}' with location '{filepath}' to mark as using.")
+
+    def mark_used(self, resource_node_name: str, filepath: str) -> None:
+        filters = {"type": "artifact", "node_name": resource_node_name, "location": filepath}
+        if self.update(filters, {"state": "used"}) == 0:
+            raise ValueError(f"No artifact found for node '{resource_node_name}' with location '{filepath}' to mark as used.")
+
+    def get_artifact_hash(self, location: str) -> str:
+        artifacts = self.query({"type": "artifact", "location": location})
+        if len(artifacts) == 0:
+            raise ValueError(f"Artifact with location '{location}' does not exist.")
+        return artifacts[0]["hash"]
 
     def log_metrics(self, node_name: str, **kwargs) -> None:
         run_id = self.get_run_id()
@@ -122,6 +175,14 @@ class BaseNoSQLMetadataStoreNode(BaseMetadataStoreNode, ABC):
         if run_id is not None: filters["run_id"] = run_id
         return self.query(filters)
 
+    def get_runs(self) -> List[Dict]:
+        return self.query({"type": "run"})
+
+    def get_triggers(self, node_name: str = None) -> List[Dict]:
+        filters = {"type": "trigger"}
+        if node_name: filters["node_name"] = node_name
+        return self.query(filters)
+
     def start_run(self) -> None:
         run_id = self.get_run_id()
         start_time = datetime.utcnow()
@@ -132,32 +193,36 @@ class BaseNoSQLMetadataStoreNode(BaseMetadataStoreNode, ABC):
             "start_time": start_time
         })
 
-        self.update(
-            {"type": "artifact", "run_id": None, "state": "new"},
-            {"run_id": run_id, "state": "current"}
-        )
-
         self.update(
             {"type": "trigger", "run_triggered": None, "trigger_time": ("$lt", start_time)},
             {"run_triggered": run_id}
         )
 
-        self.log(f"--------------------------- started run {run_id} at {start_time}")
+        self.log("--------------------------- started run %s at %s", "DEBUG", run_id, start_time)
 
     def end_run(self) -> None:
         end_time = datetime.utcnow()
+        run_id = self.get_run_id()
 
+        # runs started after this one (still in flight when runs are pipelined) are left open
         self.update(
-            {"type": "run", "end_time": None},
+            {"type": "run", "end_time": None, "run_id": ("$lte", run_id)},
             {"end_time": end_time}
         )
 
+        # artifacts used or produced in the run that have not been marked as "used" are marked as "unused" (same states as the SQL store);
+        # artifacts of runs started after this one are left out, artifacts without a run id are not part of any other run
+        # (comparisons never match documents without a run id, so those are updated separately)
+        self.update(
+            {"type": "artifact", "state": ("$in", ("using", "produced")), "run_id": ("$lte", run_id)},
+            {"state": "unused"}
+        )
         self.update(
-            {"type": "artifact", "end_time": None, "state": "current"},
-            {"end_time": end_time, "state": "old"}
+            {"type": "artifact", "state": ("$in", ("using", "produced")), "run_id": None},
+            {"state": "unused"}
         )
 
-        self.log(f"--------------------------- ended run {self.get_run_id()} at {end_time}")
+        self.log("--------------------------- ended run %s at %s", "DEBUG", run_id, end_time)
 
     def log_trigger(self, node_name: str, message: str = None) -> None:
         if message:
@@ -0,0 +1,211 @@
+from typing import List, Dict, Any, Tuple
+from collections import deque
+import itertools
+import threading
+import asyncio
+import uuid
+
+from anacostia_pipeline.utils.serialization import as_datetime
+from anacostia_pipeline.nodes.metadata.utils import entries_to_columns, validate_artifact_columns
+
+
+
+# tables of the metadata store that are sent over the change feed and kept by replicas
+REPLICATED_TABLES = ("artifacts", "metrics", "params", "tags")
+
+# response header carrying the position of the change feed ("<epoch>:<sequence>") when the response was sent;
+# a replica that has applied the feed up to this position has seen every write made before the response
+CHANGE_SEQUENCE_HEADER = "X-Anacostia-Change-Sequence"
+
+
+
+def parse_change_sequence(value: str) -> Tuple[str, int]:
+    """Parse the value of the X-Anacostia-Change-Sequence header into (epoch, sequence); returns (None, None) for a malformed value."""
+    epoch, _, sequence = value.partition(":")
+    try:
+        return epoch, int(sequence)
+    except ValueError:
+        return None, None
+
+
+class ChangeFeed:
+    """
+    Monotonic, sequence-numbered feed of the rows inserted into or updated in the artifacts, metrics, params, and tags tables
+    of a metadata store (i.e., the metadata store on the root pipeline).
+
+    The feed registers a change listener with the metadata store; for every "rows_changed" event, the committed rows are read back
+    from the store and appended to the feed, each with the next sequence number.
+    The last max_changes changes are kept in memory; a reader that falls further behind (or that read a feed from before a restart
+    of the root pipeline or a bulk import, i.e., a different epoch) is told to reset and reload the tables.
+
+    Args:
+        metadata_store: the metadata store the feed follows; must support the change feed (see BaseMetadataStoreNode.supports_change_feed).
+        max_changes: number of changes kept in memory.
+    """
+
+    def __init__(self, metadata_store, max_changes: int = 100_000):
+        self.metadata_store = metadata_store
+        self.max_changes = max_changes
+
+        self.epoch = uuid.uuid4().hex
+        self.sequence = 0
+        self._changes: deque = deque(maxlen=max_changes)
+        self._lock = threading.Lock()
+
+        # (event loop, event) of the requests long-polling the feed
+        self._waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = []
+
+        self.metadata_store.add_change_listener(self.on_change)
+
+    def on_change(self, event: Dict) -> None:
+        """Change listener registered with the metadata store; called from the thread that committed the change."""
+
+        if event["type"] == "rows_changed":
+            table = event["table"]
+            # the rows are read back while holding the lock so that when two writers race, the later sequence number always carries the later row
+            with self._lock:
+                rows = self.metadata_store.get_changed_rows(
+                    table, ids=event.get("ids"), resource_node_name=event.get("resource_node_name"), locations=event.get("locations")
+                )
+                for row in rows:
+                    self.sequence += 1
+                    self._changes.append((self.sequence, table, row))
+
+        elif event["type"] == "rows_reset":
+            with self._lock:
+                self.epoch = uuid.uuid4().hex
+                self._changes.clear()
+
+        else:
+            return
+
+        self._wake_waiters()
+
+    def _wake_waiters(self) -> None:
+        with self._lock:
+            waiters, self._waiters = self._waiters, []
+
+        for loop, event in waiters:
+            if loop.is_closed() is False:
+                loop.call_soon_threadsafe(event.set)
+
+    def position(self) -> Tuple[str, int]:
+        with self._lock:
+            return self.epoch, self.sequence
+
+    def changes_since(self, epoch: str = None, sequence: int = None, limit: int = 5000) -> Dict[str, Any]:
+        """
+        Return up to limit changes made after sequence as
+        {"epoch": <epoch>, "sequence": <sequence of the last change returned>, "reset": <bool>, "changes": [{"sequence", "table", "row"}, ...]}.
+        If the changes after sequence are no longer in the feed (or epoch is not the feed's epoch), "reset" is True and no changes are returned;
+        the reader must then reload the tables (e.g., from /snapshot/) and continue from the returned epoch and sequence.
+        """
+
+        with self._lock:
+            first_sequence = self._changes[0][0] if len(self._changes) > 0 else self.sequence + 1
+
+            if epoch != self.epoch or sequence is None or sequence > self.sequence or sequence < first_sequence - 1:
+                return {"epoch": self.epoch, "sequence": self.sequence, "reset": True, "changes": []}
+
+            start = sequence - first_sequence + 1
+            changes = list(itertools.islice(self._changes, start, start + limit))
+
+        return {
+            "epoch": epoch,
+            "sequence": changes[-1][0] if len(changes) > 0 else sequence,
+            "reset": False,
+            "changes": [{"sequence": number, "table": table, "row": row} for number, table, row in changes]
+        }
+
+    async def wait_for_changes(self, epoch: str, sequence: int, timeout: float) -> None:
+        """Wait until there are changes after sequence (or the feed was reset), for at most timeout seconds."""
+
+        event = asyncio.Event()
+        waiter = (asyncio.get_running_loop(), event)
+        with self._lock:
+            if epoch != self.epoch or sequence is None or self.sequence > sequence:
+                return
+            self._waiters.append(waiter)
+
+        try:
+            await asyncio.wait_for(event.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._lock:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+
+
+class MetadataReplica:
+    """
+    In-memory copy of the artifacts, metrics, params, and tags tables of the metadata store on the root pipeline,
+    kept up to date by applying the root's change feed (see ChangeFeed), so a leaf pipeline can answer reads without a round trip to the root.
+
+    Rows are kept in dictionaries keyed by id; a change either inserts a row or replaces the row with the same id.
+    The query methods return rows in the format of the corresponding metadata store methods.
+    """
+
+    def __init__(self):
+        self.epoch: str = None
+        self.sequence: int = None
+        self._tables: Dict[str, Dict[int, Dict]] = {table: {} for table in REPLICATED_TABLES}
+        self._lock = threading.Lock()
+
+    def _prepare(self, table: str, row: Dict) -> Dict:
+        if table == "artifacts":
+            row["created_at"] = as_datetime(row["created_at"])
+        return row
+
+    def load(self, epoch: str, sequence: int, tables: Dict[str, List[Dict]]) -> None:
+        """Replace the contents of the replica with a snapshot of the tables taken at the given position of the change feed."""
+
+        loaded = {
+            table: {row["id"]: self._prepare(table, row) for row in tables.get(table, [])}
+            for table in REPLICATED_TABLES
+        }
+        with self._lock:
+            self._tables = loaded
+            self.epoch = epoch
+            self.sequence = sequence
+
+    def apply(self, epoch: str, sequence: int, changes: List[Dict]) -> None:
+        """Apply the changes returned by ChangeFeed.changes_since() and advance the replica to sequence."""
+
+        with self._lock:
+            for change in changes:
+                table = change["table"]
+                row = self._prepare(table, change["row"])
+                self._tables[table][row["id"]] = row
+            self.epoch = epoch
+            self.sequence = sequence
+
+    def is_current(self, epoch: str, sequence: int) -> bool:
+        """Return True if the replica has applied the change feed at least up to the given position."""
+        with self._lock:
+            return self.epoch is not None and (epoch is None or (self.epoch == epoch and self.sequence >= sequence))
+
+    def _select(self, table: str, **filters) -> List[Dict]:
+        filters = {column: value for column, value in filters.items() if value is not None}
+        with self._lock:
+            rows = sorted(self._tables[table].values(), key=lambda row: row["id"])
+        return [dict(row) for row in rows if all(row[column] == value for column, value in filters.items())]
+
+    def get_entries(self, resource_node_name: str = None, state: str = "all", run_id: int = None) -> List[Dict]:
+        return self._select("artifacts", node_name=resource_node_name, state=None if state == "all" else state, run_id=run_id)
+
+    def get_entries_columnar(
+        self, resource_node_name: str = None, state: str = "all", run_id: int = None, columns: List[str] = None, array_type: str = "list"
+    ) -> Dict[str, Any]:
+        columns = validate_artifact_columns(columns)
+        entries = self.get_entries(resource_node_name=resource_node_name, state=state, run_id=run_id)
+        return entries_to_columns(entries, columns, array_type=array_type)
+
+    def get_metrics(self, node_name: str = None, run_id: int = None) -> List[Dict]:
+        return self._select("metrics", node_name=node_name, run_id=run_id)
+
+    def get_params(self, node_name: str = None, run_id: int = None) -> List[Dict]:
+        return self._select("params", node_name=node_name, run_id=run_id)
+
+    def get_tags(self, node_name: str = None, run_id: int = None) -> List[Dict]:
+        return self._select("tags", node_name=node_name, run_id=run_id)
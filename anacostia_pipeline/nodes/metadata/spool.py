@@ -0,0 +1,209 @@
+from typing import List, Dict, Callable, Set
+import threading
+import sqlite3
+import json
+import os
+import logging
+
+import httpx
+
+from anacostia_pipeline.nodes.metadata.api import BaseMetadataStoreClient, REJECTED_ERROR_TYPES
+from anacostia_pipeline.utils.log import log_function
+
+
+
+logger = logging.getLogger(__name__)
+
+
+class SpooledWriteFailed(Exception):
+    """Raised by MetadataSpool.flush() when the root fails to apply a spooled write for a reason a retry may fix (e.g., a locked database)."""
+    pass
+
+
+class MetadataSpool:
+    """
+    Write-ahead spool for the metadata writes a leaf pipeline sends to the metadata store on the root pipeline.
+
+    When the root cannot be reached, writes (e.g., create_entry, mark_using, mark_used, log_trigger) are appended to a local SQLite file
+    instead of failing, so the node keeps ingesting artifacts while the root is down.
+    A background thread replays the spooled writes to the root in the order they were made, in bulk through the client's /batch/ API,
+    and removes them from the spool once the root has committed them. The spool survives restarts of the leaf pipeline.
+
+    Spooled writes are stored as /batch/ operations, i.e., {"method": <metadata store method>, "kwargs": <metadata store arguments>}.
+
+    Args:
+        path: path of the SQLite file the writes are spooled to (the directory is created if it does not exist).
+        client: the metadata store client the writes are replayed through.
+        batch_size: maximum number of writes sent in one /batch/ request.
+        retry_interval: seconds between attempts to reach the root; doubled after every failed attempt up to max_retry_interval.
+        can_flush: returns True when writes can be replayed (e.g., once the leaf pipeline is connected to the root).
+        log: function used to log messages (e.g., BaseNode.log).
+    """
+
+    def __init__(
+        self,
+        path: str,
+        client: BaseMetadataStoreClient,
+        batch_size: int = 500,
+        retry_interval: float = 1.0,
+        max_retry_interval: float = 30.0,
+        can_flush: Callable[[], bool] = None,
+        log: Callable[..., None] = None
+    ):
+        self.path = os.path.abspath(path)
+        self.client = client
+        self.batch_size = batch_size
+        self.retry_interval = retry_interval
+        self.max_retry_interval = max_retry_interval
+        self.can_flush = can_flush if can_flush is not None else (lambda: True)
+        self._log = log if log is not None else log_function(logger)
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+        # the connection is shared by the threads writing to the spool and the flush thread; every access holds _lock
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS operations (id INTEGER PRIMARY KEY AUTOINCREMENT, method TEXT NOT NULL, kwargs TEXT NOT NULL)"
+        )
+        self._pending = self._connection.execute("SELECT COUNT(*) FROM operations").fetchone()[0]
+
+        # locations of the spooled create_entry calls of each resource node, so is_spooled() does not have to read the spool
+        self._spooled_locations: Dict[str, Set[str]] = {}
+        for (kwargs,) in self._connection.execute("SELECT kwargs FROM operations WHERE method = 'create_entry'"):
+            self._add_spooled_location(json.loads(kwargs))
+
+        self._stop_event = threading.Event()
+        self._wake_event = threading.Event()
+        self._thread: threading.Thread = None
+
+    def __len__(self) -> int:
+        return self._pending
+
+    def is_empty(self) -> bool:
+        return self._pending == 0
+
+    def _add_spooled_location(self, kwargs: Dict) -> None:
+        self._spooled_locations.setdefault(kwargs["resource_node_name"], set()).add(kwargs["filepath"])
+
+    def _discard_spooled_location(self, kwargs: Dict) -> None:
+        self._spooled_locations.get(kwargs["resource_node_name"], set()).discard(kwargs["filepath"])
+
+    def append(self, method: str, **kwargs) -> None:
+        """Append a write to the end of the spool; it is replayed after every write appended before it."""
+
+        with self._lock:
+            self._connection.execute("INSERT INTO operations (method, kwargs) VALUES (?, ?)", (method, json.dumps(kwargs)))
+            self._pending += 1
+            was_empty = self._pending == 1
+            if method == "create_entry":
+                self._add_spooled_location(kwargs)
+
+        # only the first write of an outage wakes the flush thread; later writes wait for its next retry
+        if was_empty is True:
+            self._wake_event.set()
+
+    def is_spooled(self, resource_node_name: str, location: str) -> bool:
+        """Return True if a create_entry call for the artifact is waiting in the spool."""
+        with self._lock:
+            return location in self._spooled_locations.get(resource_node_name, ())
+
+    def _read_batch(self) -> List[tuple]:
+        with self._lock:
+            return self._connection.execute(
+                "SELECT id, method, kwargs FROM operations ORDER BY id LIMIT ?", (self.batch_size,)
+            ).fetchall()
+
+    def flush(self) -> int:
+        """
+        Replay the spooled writes to the root in order, one /batch/ request per batch_size writes.
+        Returns the number of writes replayed.
+        Raises the client's exception (e.g., httpx.ConnectError) if the root cannot be reached, 
+        or SpooledWriteFailed if the root fails to apply a write for a reason a retry may fix;
+        the writes that were not replayed (from the failed write onward) stay in the spool.
+        """
+
+        replayed = 0
+        with self._flush_lock:
+            while True:
+                rows = self._read_batch()
+                if len(rows) == 0:
+                    return replayed
+
+                operations = [{"method": method, "kwargs": json.loads(kwargs)} for _, method, kwargs in rows]
+                results = self.client.execute_batch(operations, stop_on_error=True)
+
+                # each write in a batch is applied on its own, so a write the root rejects (e.g., an entry the root already has)
+                # does not hold back the writes after it; it cannot succeed on a retry, so it is dropped from the spool.
+                # the root stops the batch at the first write that failed for any other reason (e.g., a locked database);
+                # that write and the writes after it were not applied and stay in the spool to be retried in order
+                failure = None
+                num_done = 0
+                for operation, result in zip(operations, results):
+                    if "error" in result:
+                        if result.get("error_type") not in REJECTED_ERROR_TYPES:
+                            failure = f"Metadata store failed to apply spooled {operation['method']} call: {result['error']}"
+                            break
+                        self._log(
+                            "Spooled %s call was rejected by the metadata store and dropped: %s", "WARNING", operation["method"], result["error"]
+                        )
+                    num_done += 1
+
+                # writes are removed only after the root has committed them, so a crash during the replay replays them again
+                if num_done > 0:
+                    with self._lock:
+                        self._connection.execute("DELETE FROM operations WHERE id <= ?", (rows[num_done - 1][0],))
+                        self._pending -= num_done
+                        for operation in operations[:num_done]:
+                            if operation["method"] == "create_entry":
+                                self._discard_spooled_location(operation["kwargs"])
+
+                replayed += num_done
+                if failure is not None:
+                    raise SpooledWriteFailed(failure)
+
+    def _run(self) -> None:
+        interval = self.retry_interval
+        while self._stop_event.is_set() is False:
+            if self.is_empty() is False and self.can_flush() is True:
+                try:
+                    replayed = self.flush()
+                    if replayed > 0:
+                        self._log("Replayed %s spooled metadata writes to the metadata store", "INFO", replayed)
+                    interval = self.retry_interval
+
+                except httpx.TransportError:
+                    interval = min(interval * 2, self.max_retry_interval)
+
+                except SpooledWriteFailed as e:
+                    self._log("%s; the write will be retried", "WARNING", e)
+                    interval = min(interval * 2, self.max_retry_interval)
+
+                except Exception as e:
+                    self._log("Error replaying spooled metadata writes: %s", "ERROR", e)
+                    interval = min(interval * 2, self.max_retry_interval)
+
+            self._wake_event.wait(interval)
+            self._wake_event.clear()
+
+    def start(self) -> None:
+        """Start the thread that replays the spooled writes whenever the root can be reached."""
+
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(name=f"metadata_spool_{os.path.basename(self.path)}", target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self._wake_event.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+            self._thread = None
+
+    def close(self) -> None:
+        self.stop()
+        with self._lock:
+            self._connection.close()
@@ -1,13 +1,54 @@
-from typing import List, Union, Dict
+from typing import List, Union, Dict, Any, Callable, Awaitable, Iterable, Optional
 from logging import Logger
+from contextlib import contextmanager
 import json
-from datetime import datetime
 import asyncio
+import threading
+import tempfile
+import os
 
-from fastapi import Request, status
+from fastapi import Request, Query, HTTPException, status
+from fastapi.responses import StreamingResponse
 import httpx
 
-from anacostia_pipeline.nodes.metadata.api import BaseMetadataStoreServer, BaseMetadataStoreClient
+from anacostia_pipeline.nodes.api import client_coroutine
+from anacostia_pipeline.utils.run_context import current_run_id, run_context
+from anacostia_pipeline.utils.serialization import as_datetime, parse_datetimes, dumps_ndjson_line, iter_ndjson_chunks, NDJSON_MEDIA_TYPE
+from anacostia_pipeline.nodes.metadata.api import BaseMetadataStoreServer, BaseMetadataStoreClient, REJECTED_ERROR_TYPES
+from anacostia_pipeline.nodes.metadata.utils import ArtifactRow, rows_to_columns, validate_artifact_columns
+from anacostia_pipeline.nodes.metadata.replication import (
+    ChangeFeed, MetadataReplica, REPLICATED_TABLES, CHANGE_SEQUENCE_HEADER, parse_change_sequence
+)
+from anacostia_pipeline.nodes.metadata.sql.bulk import get_table, iter_ipc_stream, read_ipc_stream, read_record_batches, write_record_batches
+
+
+
+# metadata store methods that may be called through the /transaction/ and /batch/ endpoints
+TRANSACTION_OPERATIONS = {
+    "create_entry",
+    "merge_artifacts_table",
+    "mark_using",
+    "mark_used",
+    "log_metrics",
+    "log_params",
+    "set_tags",
+    "tag_artifact",
+    "log_trigger",
+    "entry_exists",
+    "get_num_entries",
+}
+
+
+def _operation(method: str, kwargs: Dict, run_id: int = None) -> Dict:
+    """Build a /transaction/ or /batch/ operation; run_id is the run the call was made in (see SQLMetadataStoreServer.run_operation())."""
+    operation = {"method": method, "kwargs": kwargs}
+    if run_id is not None:
+        operation["run_id"] = run_id
+    return operation
+
+
+# returned by the client's cache lookup when a value is not cached (None is a valid cached value)
+_MISSING = object()
 
 
 
@@ -37,6 +78,30 @@ class SQLMetadataStoreServer(BaseMetadataStoreServer):
         )
         self.metadata_store = metadata_store
 
+        # queues of the clients subscribed to /invalidations/; the queues are only touched on the event loop serving the stream
+        self._invalidation_subscribers: List[asyncio.Queue] = []
+        self._invalidation_loop: asyncio.AbstractEventLoop = None
+        self._invalidation_sequence = 0
+        self.invalidation_queue_size = 10_000
+        self.invalidation_heartbeat_interval = 15.0
+        self.metadata_store.add_change_listener(self.publish_invalidation)
+
+        # id of the last entry committed by each streaming merge that is in progress (or was interrupted), keyed by merge id
+        self._merge_checkpoints: Dict[str, int] = {}
+
+        # change feed followed by the clients that serve reads from a local replica (see SQLMetadataStoreClient's replicate_reads);
+        # every response carries the position of the feed so those clients can tell whether their replica has caught up with their own writes
+        self.change_feed: ChangeFeed = None
+        if self.metadata_store.supports_change_feed is True:
+            self.change_feed = ChangeFeed(self.metadata_store)
+
+            @self.middleware("http")
+            async def add_change_sequence(request: Request, call_next):
+                response = await call_next(request)
+                epoch, sequence = self.change_feed.position()
+                response.headers[CHANGE_SEQUENCE_HEADER] = f"{epoch}:{sequence}"
+                return response
+
         @self.post("/add_node/")
         async def add_node(request: Request):
             data = await request.json()
@@ -69,14 +134,33 @@ class SQLMetadataStoreServer(BaseMetadataStoreServer):
         
         @self.post("/merge_artifacts_table/")
         async def merge_artifacts_table(resource_node_name: str, request: Request):
-            entries = await request.json()
-            entries = json.loads(entries)
+            entries = await self.decode_request(request)
+            if isinstance(entries, str):
+                # clients before msgpack/columnar support sent the entries as a JSON-encoded string
+                entries = json.loads(entries)
             
-            for entry in entries:
-                entry["created_at"] = datetime.fromisoformat(entry["created_at"])
+            parse_datetimes(entries)
             
             self.metadata_store.merge_artifacts_table(resource_node_name, entries)
         
+        @self.get("/merge_artifacts_checkpoint/")
+        async def merge_artifacts_checkpoint(merge_id: str):
+            return {"checkpoint": self._merge_checkpoints.get(merge_id)}
+
+        @self.post("/merge_artifacts_stream/")
+        async def merge_artifacts_stream(resource_node_name: str, merge_id: str, request: Request, chunk_size: int = 1000):
+            # entries are read from the NDJSON body and merged chunk by chunk, each chunk in its own transaction,
+            # so memory usage is bounded by chunk_size and an interrupted merge keeps the chunks committed before the interruption
+            num_entries = 0
+            async for entries in iter_ndjson_chunks(request.stream(), chunk_size):
+                parse_datetimes(entries)
+                self.metadata_store.merge_artifacts_table(resource_node_name, entries, skip_existing=True)
+                self._merge_checkpoints[merge_id] = entries[-1].get("id")
+                num_entries += len(entries)
+
+            checkpoint = self._merge_checkpoints.pop(merge_id, None)
+            return {"num_entries": num_entries, "checkpoint": checkpoint}
+
         @self.get("/entry_exists/")
         async def entry_exists(resource_node_name: str, location: str):
             exists = self.metadata_store.entry_exists(resource_node_name, location)
@@ -85,9 +169,11 @@ class SQLMetadataStoreServer(BaseMetadataStoreServer):
             else:
                 return {"exists": False}
 
+        # writes from leaf pipelines carry the run they were made in; without one, the store's current run is used,
+        # which may be a later run than the leaf's when several runs are in flight
         @self.post("/mark_using/")
-        async def mark_using(resource_node_name: str, location: str):
-            self.metadata_store.mark_using(resource_node_name, location)
+        async def mark_using(resource_node_name: str, location: str, run_id: int = None):
+            self.metadata_store.mark_using(resource_node_name, location, run_id=run_id)
 
         @self.post("/mark_used/")
         async def mark_used(resource_node_name: str, location: str):
@@ -98,34 +184,37 @@ class SQLMetadataStoreServer(BaseMetadataStoreServer):
             self.metadata_store.mark_unused(resource_node_name, location)
 
         @self.post("/log_metrics/")
-        async def log_metrics(node_name: str, request: Request):
+        async def log_metrics(node_name: str, request: Request, run_id: int = None):
             data = await request.json()
-            self.metadata_store.log_metrics(node_name, **data)
+            with run_context(run_id):
+                self.metadata_store.log_metrics(node_name, **data)
         
         @self.post("/log_params/")
-        async def log_params(node_name: str, request: Request):
+        async def log_params(node_name: str, request: Request, run_id: int = None):
             data = await request.json()
-            self.metadata_store.log_params(node_name, **data)
+            with run_context(run_id):
+                self.metadata_store.log_params(node_name, **data)
 
         @self.post("/set_tags/")
-        async def set_tags(node_name: str, request: Request):
+        async def set_tags(node_name: str, request: Request, run_id: int = None):
             data = await request.json()
-            self.metadata_store.set_tags(node_name, **data)
+            with run_context(run_id):
+                self.metadata_store.set_tags(node_name, **data)
         
         @self.get("/get_metrics/")
-        async def get_metrics(node_name: str = None, run_id: int = None):
+        async def get_metrics(request: Request, node_name: str = None, run_id: int = None):
             metrics = self.metadata_store.get_metrics(node_name=node_name, run_id=run_id)
-            return metrics
+            return self.encode_response(request, metrics)
         
         @self.get("/get_params/")
-        async def get_params(node_name: str = None, run_id: int = None):
+        async def get_params(request: Request, node_name: str = None, run_id: int = None):
             params = self.metadata_store.get_params(node_name=node_name, run_id=run_id)
-            return params
+            return self.encode_response(request, params)
 
         @self.get("/get_tags/")
-        async def get_tags(node_name: str = None, run_id: int = None):
+        async def get_tags(request: Request, node_name: str = None, run_id: int = None):
             tags = self.metadata_store.get_tags(node_name=node_name, run_id=run_id)
-            return tags
+            return self.encode_response(request, tags)
         
         @self.post("/log_trigger/")
         async def log_trigger(node_name: str, request: Request):
@@ -138,12 +227,204 @@ class SQLMetadataStoreServer(BaseMetadataStoreServer):
             return {"num_entries": num_entries}
         
         @self.get("/get_entries/")
-        async def get_entries(resource_node_name: str, state: str):
+        async def get_entries(request: Request, resource_node_name: str, state: str):
             entries = self.metadata_store.get_entries(resource_node_name, state)
-            return entries
+            return self.encode_response(request, entries)
+
+        @self.get("/get_entries_columnar/")
+        async def get_entries_columnar(request: Request, resource_node_name: str = None, state: str = "all", columns: List[str] = Query(None)):
+            columns = self.metadata_store.get_entries_columnar(resource_node_name, state, columns=columns)
+            return self.encode_response(request, columns)
+
+        @self.get("/search_artifacts/")
+        async def search_artifacts(request: Request, query: str, node: str = None, limit: int = 100, offset: int = 0):
+            results = self.metadata_store.search_artifacts(query, node=node, limit=limit, offset=offset)
+            return self.encode_response(request, results)
+
+        @self.get("/get_lineage/")
+        async def get_lineage(
+            request: Request, artifact_id: int = None, location: str = None, direction: str = "downstream", depth: int = None, node: str = None
+        ):
+            artifact = artifact_id if artifact_id is not None else location
+            lineage = self.metadata_store.get_lineage(artifact, direction=direction, depth=depth, node=node)
+            return self.encode_response(request, lineage)
+
+        @self.get("/export_table/", response_class=StreamingResponse)
+        async def export_table(table_name: str, min_run_id: int = None, max_run_id: int = None, chunk_size: int = 50_000):
+            self._check_bulk_support()
+            get_table(table_name)   # validate the table name before the response starts streaming
+            batches = self.metadata_store.iter_table_batches(
+                table_name, min_run_id=min_run_id, max_run_id=max_run_id, chunk_size=chunk_size
+            )
+            return StreamingResponse(iter_ipc_stream(batches, table_name), media_type="application/vnd.apache.arrow.stream")
+
+        @self.post("/import_table/")
+        async def import_table(table_name: str, request: Request):
+            self._check_bulk_support()
+            # spool the incoming Arrow IPC stream to disk once it grows past 64MB instead of holding it in memory
+            with tempfile.SpooledTemporaryFile(max_size=64 * 1024 * 1024) as spool:
+                async for chunk in request.stream():
+                    spool.write(chunk)
+                spool.seek(0)
+                num_rows = self.metadata_store.import_table(table_name, batches=read_ipc_stream(spool))
+            return {"num_rows": num_rows}
+
+        @self.get("/invalidations/", response_class=StreamingResponse)
+        async def invalidations():
+            self._invalidation_loop = asyncio.get_running_loop()
+            queue = asyncio.Queue(maxsize=self.invalidation_queue_size)
+            self._invalidation_subscribers.append(queue)
+            return StreamingResponse(self._iter_invalidations(queue), media_type="application/x-ndjson")
+
+        @self.get("/changes/")
+        async def changes(request: Request, epoch: str = None, since: int = None, limit: int = 5000, wait: float = 0.0):
+            if self.change_feed is None:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="The metadata store does not support the change feed.")
+
+            # long poll: hold the request until there are changes after since (or wait seconds have passed)
+            if wait > 0:
+                await self.change_feed.wait_for_changes(epoch, since, timeout=min(wait, 60.0))
+            return self.encode_response(request, self.change_feed.changes_since(epoch, since, limit=limit))
+
+        @self.get("/snapshot/")
+        async def snapshot(request: Request, table: str):
+            if self.change_feed is None:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="The metadata store does not support the change feed.")
+
+            readers = {
+                "artifacts": self.metadata_store.get_entries,
+                "metrics": self.metadata_store.get_metrics,
+                "params": self.metadata_store.get_params,
+                "tags": self.metadata_store.get_tags,
+            }
+            if table not in readers:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Table must be one of {REPLICATED_TABLES}")
+            return self.encode_response(request, readers[table]())
+
+        @self.post("/batch/")
+        async def batch(request: Request, stop_on_error: bool = False):
+            operations = await request.json()
+            return self.run_batch(operations, stop_on_error=stop_on_error)
+
+        @self.post("/transaction/")
+        async def transaction(request: Request):
+            operations = await request.json()
+            with self.metadata_store.transaction():
+                results = [
+                    self.run_operation(operation["method"], operation["kwargs"], run_id=operation.get("run_id")) for operation in operations
+                ]
+            return results
+
+    def _check_bulk_support(self) -> None:
+        # bulk export and import read and write the SQL tables directly (see SQLMetadataStoreNode.iter_table_batches() and import_table())
+        if hasattr(self.metadata_store, "iter_table_batches") is False or hasattr(self.metadata_store, "import_table") is False:
+            raise HTTPException(
+                status_code=status.HTTP_501_NOT_IMPLEMENTED, 
+                detail=f"The metadata store '{self.metadata_store.name}' does not support bulk export and import of tables."
+            )
+
+    def publish_invalidation(self, event: Dict) -> None:
+        """
+        Change listener registered with the metadata store; forwards the change to every client subscribed to /invalidations/.
+        Called from whichever thread made the change, so the event is handed over to the event loop serving the stream.
+        """
+
+        # row-level changes are sent over the change feed (/changes/); clients of the invalidation stream drop their whole cache on event types they do not know
+        if event["type"] in ("rows_changed", "rows_reset"):
+            return
+
+        loop = self._invalidation_loop
+        if loop is None or len(self._invalidation_subscribers) == 0 or loop.is_closed():
+            return
+        loop.call_soon_threadsafe(self._publish_invalidation, event)
+
+    def _publish_invalidation(self, event: Dict) -> None:
+        self._invalidation_sequence += 1
+        event = {**event, "sequence": self._invalidation_sequence}
+
+        for queue in list(self._invalidation_subscribers):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # the subscriber is not keeping up; disconnect it so it drops its whole cache instead of serving stale values
+                self.log("Invalidation subscriber fell behind by %s events, disconnecting it", "WARNING", queue.qsize())
+                self._invalidation_subscribers.remove(queue)
+                while queue.empty() is False:
+                    queue.get_nowait()
+                queue.put_nowait(None)
+
+    async def _iter_invalidations(self, queue: asyncio.Queue):
+        try:
+            # the first line carries the current sequence number so the client knows where the stream starts
+            yield json.dumps({"type": "subscribed", "sequence": self._invalidation_sequence}) + "\n"
+
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=self.invalidation_heartbeat_interval)
+                except asyncio.TimeoutError:
+                    # heartbeats let the client tell an idle stream apart from a dead connection
+                    yield json.dumps({"type": "heartbeat"}) + "\n"
+                    continue
+
+                if event is None:
+                    return
+                yield json.dumps(event) + "\n"
+        finally:
+            if queue in self._invalidation_subscribers:
+                self._invalidation_subscribers.remove(queue)
+
+    def run_batch(self, operations: List[Dict], stop_on_error: bool = False) -> List[Dict]:
+        """
+        Apply a list of operations (dictionaries with the keys "method", "kwargs", and optionally "run_id") in order inside a single transaction.
+        Unlike /transaction/, a failed operation does not abort the batch: each operation runs in its own savepoint,
+        so only the failed operation is rolled back and the rest of the batch is committed.
+        Returns one dictionary per operation, either {"result": <return value>} or {"error": <message>, "error_type": <exception class name>}.
+
+        If stop_on_error is True, the batch stops at the first operation that fails with an error a retry may fix
+        (i.e., not one of REJECTED_ERROR_TYPES, e.g., a locked database); the operations after it are not applied and have no result,
+        so a client replaying writes in order (see MetadataSpool) can send them again without applying any of them twice.
+        """
+
+        results = []
+        with self.metadata_store.transaction():
+            for operation in operations:
+                try:
+                    with self.metadata_store.savepoint():
+                        result = self.run_operation(operation["method"], operation["kwargs"], run_id=operation.get("run_id"))
+                    results.append({"result": result})
+                except Exception as e:
+                    results.append({"error": str(e), "error_type": type(e).__name__})
+                    if stop_on_error is True and type(e).__name__ not in REJECTED_ERROR_TYPES:
+                        break
+        return results
+
+    def run_operation(self, method: str, kwargs: Dict[str, Any], run_id: int = None) -> Any:
+        """
+        Call a single metadata store method on behalf of a client.
+        Only the methods listed in TRANSACTION_OPERATIONS can be called.
+        run_id is the run the client made the call in (the "run_id" key of an operation, if any);
+        metrics, params, tags, and usage marks are recorded for it instead of the store's current run.
+        """
+
+        if method not in TRANSACTION_OPERATIONS:
+            raise ValueError(f"Method '{method}' cannot be called through the metadata store transaction API.")
+
+        if method == "merge_artifacts_table":
+            parse_datetimes(kwargs["entries"])
+
+        with run_context(run_id):
+            return getattr(self.metadata_store, method)(**kwargs)
 
 
 class SQLMetadataStoreClient(BaseMetadataStoreClient):
+    """
+    Client for the SQLMetadataStoreServer on the root pipeline.
+
+    Every method has an async variant prefixed with "a" (e.g., aget_entries, acreate_entry) that can be awaited from any event loop,
+    so async code (e.g., GUIs and async execute methods) can issue many calls concurrently with asyncio.gather instead of blocking a thread per call.
+    The synchronous methods are thin wrappers that run the async variant on the client's event loop and wait for its result.
+    """
+
     def __init__(
         self, 
         client_name, 
@@ -154,6 +435,11 @@ class SQLMetadataStoreClient(BaseMetadataStoreClient):
         ssl_keyfile: str = None, 
         ssl_certfile: str = None, 
         ssl_ca_certs: str = None, 
+        batch_window: float = None,
+        max_batch_size: int = 1000,
+        cache_reads: bool = False,
+        replicate_reads: bool = False,
+        replica_poll_timeout: float = 30.0,
         *args, **kwargs
     ):
         super().__init__(
@@ -168,69 +454,468 @@ class SQLMetadataStoreClient(BaseMetadataStoreClient):
             *args, **kwargs
         )
 
+        # per-thread list of operations buffered by transaction(); None when the thread is not inside a transaction
+        self._transaction_state = threading.local()
+
+        # when batch_window is set, calls to entry_exists, create_entry, mark_using, mark_used, and log_trigger made within batch_window seconds of each other 
+        # (e.g., by several threads or by concurrent coroutines) are coalesced into a single /batch/ request of up to max_batch_size operations
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+        self._batch_queue: List[tuple] = []
+        self._batch_flush_handle: asyncio.TimerHandle = None
+        self._batch_send_lock = asyncio.Lock()
+
+        # when cache_reads is True, get_run_id, get_node_id, and get_num_entries are answered from a local cache;
+        # the cache is kept up to date by the invalidations the server pushes over /invalidations/,
+        # and it is only used while the client is subscribed to the stream (i.e., reads go to the server while the stream is down)
+        self.cache_reads = cache_reads
+        self._cache: Dict[tuple, Any] = {}
+        self._cache_lock = threading.Lock()
+        self._cache_generation = 0
+        self._cache_active = False
+        self._invalidation_task: asyncio.Task = None
+
+        # when replicate_reads is True, get_entries, get_entries_columnar, get_metrics, get_params, and get_tags are answered
+        # from a local replica of the root's tables that follows the server's change feed (/changes/);
+        # the replica is only used once it has caught up with the newest feed position seen on any response,
+        # so a read made after a write always sees the write (reads go to the server until the replica catches up)
+        self.replicate_reads = replicate_reads
+        self.replica_poll_timeout = replica_poll_timeout
+        self._replica = MetadataReplica()
+        self._replica_active = False
+        self._replica_task: asyncio.Task = None
+        self._seen_change_sequence = (None, 0)
+
         if server_url is not None:
             self.start_client()  # Start the client to connect to the metadata store server
             self.add_node(node_name=client_name, node_type=type(self).__name__, base_type="BaseMetadataStoreClient")
 
-    def add_node(self, node_name: str, node_type: str, base_type: str):
+    # ---- read cache ---- #
+
+    def _cache_lookup(self, key: tuple) -> Any:
+        """Return the cached value for key, or _MISSING if the value is not cached."""
+
+        if self.cache_reads is False:
+            return _MISSING
+
+        with self._cache_lock:
+            if self._cache_active is True and key in self._cache:
+                return self._cache[key]
+        return _MISSING
+
+    async def _cached_read(self, key: tuple, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value for key, or await fetch() and cache its result. Must run on the client's event loop."""
+
+        if self.cache_reads is False:
+            return await fetch()
+
+        if self._invalidation_task is None:
+            self._invalidation_task = asyncio.get_running_loop().create_task(self._listen_for_invalidations())
+
+        with self._cache_lock:
+            if self._cache_active is True and key in self._cache:
+                return self._cache[key]
+            generation = self._cache_generation
+
+        value = await fetch()
+
+        # an invalidation that arrived while the value was being fetched may mean the value is already stale, so it is not cached
+        with self._cache_lock:
+            if self._cache_active is True and self._cache_generation == generation:
+                self._cache[key] = value
+        return value
+
+    def _invalidate(self, match=None) -> None:
+        """Drop the cached values whose key satisfies match (all cached values if match is None)."""
+
+        with self._cache_lock:
+            self._cache_generation += 1
+            if match is None:
+                self._cache.clear()
+            else:
+                for key in [key for key in self._cache if match(key)]:
+                    del self._cache[key]
+
+    def _invalidate_num_entries(self, resource_node_name: str = None) -> None:
+        if self.cache_reads is False:
+            return
+        self._invalidate(
+            lambda key: key[0] == "num_entries" and (resource_node_name is None or key[1] == resource_node_name)
+        )
+
+    def _apply_invalidation(self, event: Dict) -> None:
+        event_type = event["type"]
+        if event_type in ("run_started", "run_ended"):
+            self._invalidate(lambda key: key[0] == "run_id")
+        elif event_type == "node_added":
+            node_name = event.get("node_name")
+            self._invalidate(lambda key: key[0] == "node_id" and (node_name is None or key[1] == node_name))
+        elif event_type == "entries_changed":
+            self._invalidate_num_entries(event.get("node_name"))
+        else:
+            # unknown change; drop everything rather than risk serving a stale value
+            self._invalidate()
+
+    async def _listen_for_invalidations(self) -> None:
         """
-        Register node with metadata store on root pipeline.
+        Subscribe to the server's /invalidations/ stream and apply each pushed change to the read cache.
+        The cache is cleared and disabled whenever the stream is down (a change may have been missed),
+        and the stream is reconnected with exponential backoff.
         """
 
-        async def _add_node(node_name: str, node_type: str, base_type: str):
+        backoff = 0.5
+        while True:
+            sequence = None
             try:
-                response = await self.client.post(
-                    url="/add_node/", 
-                    json={"node_name": node_name, "node_type": node_type, "base_type": base_type}
+                async with self.client.stream("GET", "/invalidations/", timeout=httpx.Timeout(10.0, read=60.0)) as response:
+                    if response.status_code != status.HTTP_200_OK:
+                        raise ValueError(f"Subscribing to invalidations failed with status code {response.status_code}")
+
+                    async for line in response.aiter_lines():
+                        if line.strip() == "":
+                            continue
+
+                        event = json.loads(line)
+                        if event["type"] == "heartbeat":
+                            continue
+
+                        if event["type"] == "subscribed":
+                            sequence = event["sequence"]
+                            with self._cache_lock:
+                                self._cache_generation += 1
+                                self._cache.clear()
+                                self._cache_active = True
+                            backoff = 0.5
+                            continue
+
+                        if sequence is not None and event["sequence"] != sequence + 1:
+                            self._invalidate()
+                        else:
+                            self._apply_invalidation(event)
+                        sequence = event["sequence"]
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.log("Invalidation stream disconnected: %s", "WARNING", e)
+
+            with self._cache_lock:
+                self._cache_active = False
+                self._cache_generation += 1
+                self._cache.clear()
+
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 10.0)
+
+    # ---- read replica ---- #
+
+    async def _record_change_sequence(self, response: httpx.Response) -> None:
+        """Response hook; remembers the newest change feed position the server reported."""
+
+        value = response.headers.get(CHANGE_SEQUENCE_HEADER)
+        if value is None:
+            return
+
+        epoch, sequence = parse_change_sequence(value)
+        seen_epoch, seen_sequence = self._seen_change_sequence
+        if epoch is not None and (epoch != seen_epoch or sequence > seen_sequence):
+            self._seen_change_sequence = (epoch, sequence)
+
+    def _replica_read(self, read: Callable[[MetadataReplica], Any]) -> Any:
+        """Return read(replica) if the replica is up to date, or _MISSING if the read has to go to the server. Must run on the client's event loop."""
+
+        if self.replicate_reads is False:
+            return _MISSING
+
+        if self._replica_task is None:
+            self._replica_task = asyncio.get_running_loop().create_task(self._replicate())
+
+        if self._replica_active is False or self._replica.is_current(*self._seen_change_sequence) is False:
+            return _MISSING
+        return read(self._replica)
+
+    async def _replicate(self) -> None:
+        """
+        Keep the local replica up to date: load a snapshot of each replicated table, then long-poll /changes/ and apply the changes.
+        The replica is reloaded whenever the server reports a reset (e.g., the root pipeline restarted or a table was bulk imported),
+        it is not used while the server cannot be reached, and the replica is disabled if the server's metadata store has no change feed.
+        """
+
+        backoff = 0.5
+        while True:
+            # the http client is recreated when the client reconnects, so the hook is installed on whichever client is current
+            if self._record_change_sequence not in self.client.event_hooks["response"]:
+                self.client.event_hooks["response"].append(self._record_change_sequence)
+
+            params = {"limit": 5000, "wait": self.replica_poll_timeout}
+            if self._replica.epoch is not None:
+                params.update({"epoch": self._replica.epoch, "since": self._replica.sequence})
+
+            try:
+                feed = await self.request_payload(
+                    "GET", "/changes/", params=params, timeout=httpx.Timeout(10.0, read=self.replica_poll_timeout + 10.0)
                 )
-                if response.status_code != 200:
-                    raise Exception(f"Failed to add node: {response.status_code}, {response.text}")
+
+                if feed["reset"] is True:
+                    tables = {}
+                    for table in REPLICATED_TABLES:
+                        tables[table] = await self.request_payload("GET", "/snapshot/", params={"table": table}, timeout=None)
+                    self._replica.load(feed["epoch"], feed["sequence"], tables)
+                    self.log("Loaded replica of the metadata store at sequence %s", "INFO", feed['sequence'])
+                else:
+                    self._replica.apply(feed["epoch"], feed["sequence"], feed["changes"])
+
+                self._replica_active = True
+                backoff = 0.5
+                continue
+
+            except asyncio.CancelledError:
+                raise
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code == status.HTTP_404_NOT_FOUND:
+                    self.log("Metadata store server has no change feed, reads are sent to the server", level="WARNING")
+                    self._replica_active = False
+                    self.replicate_reads = False
+                    return
+                self.log("Error following the metadata store change feed: %s", "WARNING", e)
             except Exception as e:
-                self.log(f"Error adding node: {e}", level="ERROR")
-                raise e
-        
-        task = asyncio.run_coroutine_threadsafe(_add_node(node_name, node_type, base_type), self.loop)
-        return task.result()
+                self.log("Error following the metadata store change feed: %s", "WARNING", e)
+
+            self._replica_active = False
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 10.0)
+
+    # ---- transactions and batches ---- #
+
+    def _buffer_operation(self, method: str, kwargs: Dict, run_id: int = None) -> bool:
+        """
+        Buffer a write operation (made in the given run, if any) if the calling thread is inside a transaction() block.
+        Returns True if the operation was buffered, False if it should be sent to the server right away.
+        """
+
+        operations = getattr(self._transaction_state, "operations", None)
+        if operations is None:
+            return False
+
+        operations.append(_operation(method, kwargs, run_id))
+        return True
+
+    @client_coroutine
+    async def aexecute_operations(self, operations: List[Dict]) -> List[Any]:
+        """
+        Send a list of operations (dictionaries with the keys "method", "kwargs", and optionally "run_id") to the metadata store server,
+        the server applies all of the operations in order inside a single transaction.
+        Returns the result of each operation.
+        """
+
+        if len(operations) == 0:
+            return []
+
+        try:
+            response = await self.client.post("/transaction/", json=operations)
+            if response.status_code != status.HTTP_200_OK:
+                raise ValueError(f"Transaction failed with status code {response.status_code}")
+            results = response.json()
+        except Exception as e:
+            self.log("Error executing transaction: %s", "ERROR", e)
+            raise e
 
-    def get_run_id(self):
+        self._invalidate_num_entries()
+        return results
+
+    def execute_operations(self, operations: List[Dict]) -> List[Any]:
+        """Synchronous version of aexecute_operations."""
+        return self.run_sync(self.aexecute_operations(operations))
+
+    async def _post_batch(self, operations: List[Dict], stop_on_error: bool = False) -> List[Dict]:
+        response = await self.client.post("/batch/", json=operations, params={"stop_on_error": stop_on_error})
+        if response.status_code != status.HTTP_200_OK:
+            raise ValueError(f"Batch failed with status code {response.status_code}")
+        return response.json()
+
+    @client_coroutine
+    async def aexecute_batch(self, operations: List[Dict], stop_on_error: bool = False) -> List[Dict]:
+        """
+        Send a list of operations (dictionaries with the keys "method", "kwargs", and optionally "run_id") to the metadata store server in one request.
+        The server applies the operations in order inside a single transaction; a failed operation is rolled back on its own
+        and does not prevent the other operations from being committed.
+        Returns one dictionary per operation, either {"result": <return value>} or {"error": <message>, "error_type": <exception class name>}.
+        With stop_on_error=True, the server stops at the first operation that may succeed on a retry (see SQLMetadataStoreServer.run_batch()),
+        and only the results of the operations up to that one are returned.
+        """
+
+        if len(operations) == 0:
+            return []
+
+        try:
+            results = await self._post_batch(operations, stop_on_error=stop_on_error)
+        except Exception as e:
+            self.log("Error executing batch: %s", "ERROR", e)
+            raise e
+
+        self._invalidate_num_entries()
+        return results
+
+    def execute_batch(self, operations: List[Dict], stop_on_error: bool = False) -> List[Dict]:
+        """Synchronous version of aexecute_batch."""
+        return self.run_sync(self.aexecute_batch(operations, stop_on_error=stop_on_error))
+
+    async def _submit_batched(self, method: str, kwargs: Dict, run_id: int = None) -> Any:
+        """Queue an operation (made in the given run, if any) to be sent in the next /batch/ request and wait for its result."""
+
+        # runs on the client's event loop, so the queue is only ever touched by one thread
+        future = asyncio.get_running_loop().create_future()
+        self._batch_queue.append((_operation(method, kwargs, run_id), future))
+
+        if len(self._batch_queue) >= self.max_batch_size:
+            self._flush_batch()
+        elif self._batch_flush_handle is None:
+            self._batch_flush_handle = asyncio.get_running_loop().call_later(self.batch_window, self._flush_batch)
+
+        return await future
+
+    def _flush_batch(self) -> None:
+        if self._batch_flush_handle is not None:
+            self._batch_flush_handle.cancel()
+            self._batch_flush_handle = None
+
+        queue, self._batch_queue = self._batch_queue, []
+        if len(queue) > 0:
+            asyncio.ensure_future(self._send_batch(queue))
+
+    async def _send_batch(self, queue: List[tuple]) -> None:
+        # batches are sent one at a time so the server applies them in the order the calls were made
+        async with self._batch_send_lock:
+            try:
+                results = await self._post_batch([operation for operation, _ in queue])
+            except Exception as e:
+                self.log("Error sending batch of %s operations: %s", "ERROR", len(queue), e)
+                for _, future in queue:
+                    if future.done() is False:
+                        future.set_exception(e)
+                return
+
+        # drop the cached counts before any caller is resumed so callers read their own writes
+        self._invalidate_num_entries()
+
+        for (operation, future), result in zip(queue, results):
+            if future.done():
+                continue
+            if "error" in result:
+                future.set_exception(ValueError(f"{operation['method']} failed: {result['error']}"))
+            else:
+                future.set_result(result["result"])
+
+    @contextmanager
+    def transaction(self):
+        """
+        Buffer the write calls (create_entry, mark_using, mark_used, log_metrics, log_params, set_tags, log_trigger, merge_artifacts_table)
+        made by the current thread inside the with block and send them to the server in one request when the block exits.
+        The server applies the buffered calls inside a single transaction; if one of them fails, none of them are committed.
+        Note: read calls made inside the block are sent right away and do not see the buffered writes.
+        Note: only the synchronous methods are buffered; async code should build the list of operations and await aexecute_operations instead.
+
+        Example:
+        ```
+        with metadata_store_client.transaction():
+            metadata_store_client.log_metrics(node_name, acc=0.91)
+            metadata_store_client.log_params(node_name, batch_size=64)
+        ```
+        """
+
+        # nested transactions join the outermost transaction
+        if getattr(self._transaction_state, "operations", None) is not None:
+            yield self
+            return
+
+        self._transaction_state.operations = []
+        try:
+            yield self
+            operations = self._transaction_state.operations
+        finally:
+            self._transaction_state.operations = None
+
+        self.execute_operations(operations)
+
+    # ---- nodes and runs ---- #
+
+    @client_coroutine
+    async def aadd_node(self, node_name: str, node_type: str, base_type: str):
+        """
+        Register node with metadata store on root pipeline.
+        """
+
+        try:
+            response = await self.client.post(
+                url="/add_node/", 
+                json={"node_name": node_name, "node_type": node_type, "base_type": base_type}
+            )
+            if response.status_code != 200:
+                raise Exception(f"Failed to add node: {response.status_code}, {response.text}")
+        except Exception as e:
+            self.log("Error adding node: %s", "ERROR", e)
+            raise e
+
+    def add_node(self, node_name: str, node_type: str, base_type: str):
+        """Synchronous version of aadd_node."""
+        return self.run_sync(self.aadd_node(node_name, node_type, base_type))
+
+    @client_coroutine
+    async def aget_run_id(self) -> int:
         """
         Get the run ID from the metadata store.
         This method sends a GET request to the server to retrieve the run ID.
         """
 
-        async def _get_run_id():
+        async def fetch():
             response = await self.client.get(f"/get_run_id/")
             run_id = response.json()["run_id"]
             return run_id
 
-        task = asyncio.run_coroutine_threadsafe(_get_run_id(), self.loop)
         try:
-            result = task.result()
-            return result
+            return await self._cached_read(("run_id",), fetch)
         except Exception as e:
-            self.log(f"Error occurred while getting run ID: {e}", level="ERROR")
+            self.log("Error occurred while getting run ID: %s", "ERROR", e)
             raise e
 
-    def get_node_id(self, node_name: str):
+    def get_run_id(self) -> int:
+        """Synchronous version of aget_run_id."""
+
+        run_id = self._cache_lookup(("run_id",))
+        if run_id is not _MISSING:
+            return run_id
+        return self.run_sync(self.aget_run_id())
+
+    @client_coroutine
+    async def aget_node_id(self, node_name: str) -> int:
         """
         Get the node ID from the metadata store.
         This method sends a GET request to the server to retrieve the node ID.
         """
 
-        async def _get_node_id(node_name: str):
+        async def fetch():
             response = await self.client.get(f"/get_node_id/?node_name={node_name}")
             node_id = response.json()["node_id"]
             return node_id
 
-        task = asyncio.run_coroutine_threadsafe(_get_node_id(node_name), self.loop)
         try:
-            result = task.result()
-            return result
+            return await self._cached_read(("node_id", node_name), fetch)
         except Exception as e:
-            self.log(f"Error occurred while getting node ID: {e}", level="ERROR")
+            self.log("Error occurred while getting node ID: %s", "ERROR", e)
             raise e
-    
-    def create_entry(
+
+    def get_node_id(self, node_name: str) -> int:
+        """Synchronous version of aget_node_id."""
+
+        node_id = self._cache_lookup(("node_id", node_name))
+        if node_id is not _MISSING:
+            return node_id
+        return self.run_sync(self.aget_node_id(node_name))
+
+    # ---- artifacts ---- #
+
+    @client_coroutine
+    async def acreate_entry(
         self, resource_node_name: str, filepath: str, hash: str, hash_algorithm: str, 
         state: str = "new", run_id: int = None, file_size: int = None, content_type: str = None
     ):
@@ -245,286 +930,637 @@ class SQLMetadataStoreClient(BaseMetadataStoreClient):
             "content_type": content_type
         }
 
-        async def _create_entry(data: Dict):
-            try:
-                response = await self.client.post(f"/create_entry/", json=data)
-                if response.status_code != status.HTTP_200_OK:
-                    raise ValueError(f"Create entry failed with status code {response.status_code}")
-            except Exception as e:
-                self.log(f"Error creating entry: {e}", level="ERROR")
-                raise e
+        if self.batch_window is not None:
+            return await self._submit_batched("create_entry", data)
+
+        try:
+            response = await self.client.post(f"/create_entry/", json=data)
+            if response.status_code != status.HTTP_200_OK:
+                raise ValueError(f"Create entry failed with status code {response.status_code}")
+        except Exception as e:
+            self.log("Error creating entry: %s", "ERROR", e)
+            raise e
 
-        task = asyncio.run_coroutine_threadsafe(_create_entry(data), self.loop)
-        return task.result()
+        self._invalidate_num_entries(resource_node_name)
 
-    def merge_artifacts_table(self, resource_node_name: str, entries: List[Dict]):
+    def create_entry(
+        self, resource_node_name: str, filepath: str, hash: str, hash_algorithm: str, 
+        state: str = "new", run_id: int = None, file_size: int = None, content_type: str = None
+    ):
+        """Synchronous version of acreate_entry; buffered when called inside transaction()."""
+
+        if self._buffer_operation(
+            "create_entry", 
+            dict(
+                resource_node_name=resource_node_name, filepath=filepath, hash=hash, hash_algorithm=hash_algorithm, 
+                state=state, run_id=run_id, file_size=file_size, content_type=content_type
+            )
+        ):
+            return
+
+        return self.run_sync(
+            self.acreate_entry(
+                resource_node_name, filepath, hash, hash_algorithm, 
+                state=state, run_id=run_id, file_size=file_size, content_type=content_type
+            )
+        )
+
+    @client_coroutine
+    async def amerge_artifacts_table(self, resource_node_name: str, entries: List[Dict]):
         """
         Merge artifacts table with the provided entries.
         This method sends a POST request to the server to merge the artifacts table.
         """
 
-        async def _merge_artifacts_table(resource_node_name: str, entries: List[Dict]):
-            for entry in entries:
-                entry["created_at"] = entry["created_at"].isoformat()
-            json_data = json.dumps(entries, indent=4)
-        
+        try:
+            await self.request_payload(
+                "POST", "/merge_artifacts_table/", payload=entries, params={"resource_node_name": resource_node_name}
+            )
+        except Exception as e:
+            self.log("Error merging artifacts table: %s", "ERROR", e)
+            raise e
+
+        self._invalidate_num_entries(resource_node_name)
+
+    def merge_artifacts_table(self, resource_node_name: str, entries: List[Dict]):
+        """Synchronous version of amerge_artifacts_table; buffered when called inside transaction()."""
+
+        if self._buffer_operation(
+            "merge_artifacts_table", 
+            dict(resource_node_name=resource_node_name, entries=[{**entry, "created_at": entry["created_at"].isoformat()} for entry in entries])
+        ):
+            return
+
+        return self.run_sync(self.amerge_artifacts_table(resource_node_name, entries))
+
+    @client_coroutine
+    async def amerge_artifacts_stream(
+        self, resource_node_name: str, entries: Callable[[Optional[int], int], Iterable[Union[Dict, ArtifactRow]]], merge_id: str = None, 
+        chunk_size: int = 1000, max_retries: int = 5
+    ) -> None:
+        """
+        Merge a resource node's local artifacts table into the metadata store on the root pipeline,
+        streaming the entries as NDJSON instead of sending them in one request body.
+        entries is a function that takes an id (None for the first page) and a limit and returns a page of entries
+        (dictionaries or ArtifactRow objects): at most limit entries whose id is greater than the given id, in ascending order of id,
+        e.g., lambda after_id, limit: metadata_store.iter_entries(resource_node_name, after_id=after_id, limit=limit).
+        Pages are read on a worker thread, so reading the local metadata store never blocks the event loop
+        and no database session is held open while a chunk is being sent.
+
+        The server merges the stream chunk_size entries at a time, each chunk in its own transaction, and checkpoints the id of the last entry committed.
+        If the connection drops, the merge is resumed from the checkpoint (up to max_retries times):
+        the entries are read again starting after the checkpoint, so the entries already merged are neither read nor sent again.
+        Entries whose location already exists on the root are skipped, so a merge can safely be repeated.
+        Neither side holds more than one chunk of entries in memory.
+        """
+
+        if merge_id is None:
+            merge_id = f"{self.client_name}:{resource_node_name}"
+
+        attempt = 0
+        while True:
             try:
-                response = await self.client.post(f"/merge_artifacts_table/?resource_node_name={resource_node_name}", json=json_data)
+                response = await self.client.get("/merge_artifacts_checkpoint/", params={"merge_id": merge_id})
+                if response.status_code != status.HTTP_200_OK:
+                    raise ValueError(f"Get merge checkpoint failed with status code {response.status_code}")
+                checkpoint = response.json()["checkpoint"]
+
+                response = await self.client.post(
+                    "/merge_artifacts_stream/",
+                    params={"resource_node_name": resource_node_name, "merge_id": merge_id, "chunk_size": chunk_size},
+                    content=self._iter_merge_stream(entries, checkpoint, chunk_size),
+                    headers={"Content-Type": NDJSON_MEDIA_TYPE},
+                    timeout=None
+                )
                 if response.status_code != status.HTTP_200_OK:
-                    raise ValueError(f"Merge artifacts table failed with status code {response.status_code}")
+                    raise ValueError(f"Merge artifacts stream failed with status code {response.status_code}")
+                break
+
+            except httpx.TransportError as e:
+                attempt += 1
+                if attempt > max_retries:
+                    self.log("Error merging artifacts table: %s", "ERROR", e)
+                    raise e
+
+                self.log("Merge of artifacts table for node '%s' interrupted (%s), resuming from checkpoint", "WARNING", resource_node_name, e)
+                await asyncio.sleep(min(0.5 * 2 ** (attempt - 1), 10.0))
+
             except Exception as e:
-                self.log(f"Error merging artifacts table: {e}", level="ERROR")
+                self.log("Error merging artifacts table: %s", "ERROR", e)
                 raise e
-        
-        task = asyncio.run_coroutine_threadsafe(_merge_artifacts_table(resource_node_name, entries), self.loop)
-        return task.result()
-    
-    def entry_exists(self, resource_node_name: str, location: str):
-        async def _entry_exists(resource_node_name: str, location: str):
-            response = await self.client.get(f"/entry_exists/?resource_node_name={resource_node_name}&location={location}")
-            exists = response.json()["exists"]
-            return exists
 
-        task = asyncio.run_coroutine_threadsafe(_entry_exists(resource_node_name, location), self.loop)
-        return task.result()
+        self._invalidate_num_entries(resource_node_name)
+
+    def merge_artifacts_stream(
+        self, resource_node_name: str, entries: Callable[[Optional[int], int], Iterable[Union[Dict, ArtifactRow]]], merge_id: str = None, 
+        chunk_size: int = 1000, max_retries: int = 5
+    ) -> None:
+        """Synchronous version of amerge_artifacts_stream."""
+        return self.run_sync(
+            self.amerge_artifacts_stream(resource_node_name, entries, merge_id=merge_id, chunk_size=chunk_size, max_retries=max_retries)
+        )
 
-    def get_num_entries(self, resource_node_name: str, state: str):
+    async def _iter_merge_stream(
+        self, entries: Callable[[Optional[int], int], Iterable[Union[Dict, ArtifactRow]]], checkpoint: Optional[int], chunk_size: int
+    ):
+        def read_chunk(after_id: Optional[int]):
+            last_id = None
+            lines = []
+            for entry in entries(after_id, chunk_size):
+                if isinstance(entry, ArtifactRow):
+                    entry = entry.to_dict()
+                last_id = entry["id"]
+                lines.append(dumps_ndjson_line(entry))
+            return last_id, b"".join(lines)
+
+        loop = asyncio.get_running_loop()
+        after_id = checkpoint
+        while True:
+            # each page is read (and encoded) in one short query on a worker thread, starting after the last id sent
+            last_id, chunk = await loop.run_in_executor(None, read_chunk, after_id)
+            if last_id is None:
+                return
+
+            yield chunk
+            after_id = last_id
+
+    @client_coroutine
+    async def aentry_exists(self, resource_node_name: str, location: str) -> bool:
+        if self.batch_window is not None:
+            return await self._submit_batched("entry_exists", {"resource_node_name": resource_node_name, "filepath": location})
+
+        response = await self.client.get(f"/entry_exists/?resource_node_name={resource_node_name}&location={location}")
+        exists = response.json()["exists"]
+        return exists
+
+    def entry_exists(self, resource_node_name: str, location: str) -> bool:
+        """Synchronous version of aentry_exists."""
+        return self.run_sync(self.aentry_exists(resource_node_name, location))
+
+    @client_coroutine
+    async def aget_num_entries(self, resource_node_name: str, state: str) -> int:
         """
         Get the number of entries for a specific resource node and state.
         This method sends a GET request to the server to retrieve the number of entries.
         """
         
-        async def _get_num_entries(resource_node_name: str, state: str):
+        async def fetch():
             try:
                 response = await self.client.get(f"/get_num_entries/?resource_node_name={resource_node_name}&state={state}")
                 num_entries = response.json()["num_entries"]
                 return num_entries
             except Exception as e:
-                self.log(f"Error getting number of entries: {e}", level="ERROR")
+                self.log("Error getting number of entries: %s", "ERROR", e)
                 raise e
 
-        task = asyncio.run_coroutine_threadsafe(_get_num_entries(resource_node_name, state), self.loop)
-        return task.result()
+        return await self._cached_read(("num_entries", resource_node_name, state), fetch)
+
+    def get_num_entries(self, resource_node_name: str, state: str) -> int:
+        """Synchronous version of aget_num_entries."""
 
-    def mark_using(self, resource_node_name: str, location: str) -> None:
+        num_entries = self._cache_lookup(("num_entries", resource_node_name, state))
+        if num_entries is not _MISSING:
+            return num_entries
+        return self.run_sync(self.aget_num_entries(resource_node_name, state))
+
+    @client_coroutine
+    async def amark_using(self, resource_node_name: str, location: str, run_id: int = None) -> None:
         """
-        Mark an artifact as 'using'.
-        This method is a placeholder to maintain compatibility with the BaseMetadataStoreClient interface.
-        Actual implementation may vary based on specific requirements.
+        Mark an artifact as 'using' in the given run
+        (by default, the run the calling node is working on if several runs are in flight, otherwise the root's current run).
         """
 
-        async def _mark_using(resource_node_name: str, location: str):
-            try:
-                response = await self.client.post(f"/mark_using/?resource_node_name={resource_node_name}&location={location}")
-                if response.status_code != status.HTTP_200_OK:
-                    raise ValueError(f"Log metrics failed with status code {response.status_code}")
-            except Exception as e:
-                self.log(f"Error marking artifact as 'using': {e}", level="ERROR")
-                raise e
+        run_id = run_id if run_id is not None else current_run_id()
 
-        task = asyncio.run_coroutine_threadsafe(_mark_using(resource_node_name, location), self.loop)
-        return task.result()
+        if self.batch_window is not None:
+            return await self._submit_batched("mark_using", {"resource_node_name": resource_node_name, "filepath": location}, run_id)
 
-    def mark_used(self, resource_node_name: str, location: str) -> None:
+        try:
+            params = {"resource_node_name": resource_node_name, "location": location}
+            if run_id is not None:
+                params["run_id"] = run_id
+            response = await self.client.post("/mark_using/", params=params)
+            if response.status_code != status.HTTP_200_OK:
+                raise ValueError(f"Log metrics failed with status code {response.status_code}")
+        except Exception as e:
+            self.log("Error marking artifact as 'using': %s", "ERROR", e)
+            raise e
+
+        self._invalidate_num_entries(resource_node_name)
+
+    def mark_using(self, resource_node_name: str, location: str, run_id: int = None) -> None:
+        """Synchronous version of amark_using; buffered when called inside transaction()."""
+
+        run_id = run_id if run_id is not None else current_run_id()
+        if self._buffer_operation("mark_using", dict(resource_node_name=resource_node_name, filepath=location), run_id):
+            return
+
+        return self.run_sync(self.amark_using(resource_node_name, location, run_id=run_id))
+
+    @client_coroutine
+    async def amark_used(self, resource_node_name: str, location: str) -> None:
         """
         Mark an artifact as 'used'.
         This method is a placeholder to maintain compatibility with the BaseMetadataStoreClient interface.
         Actual implementation may vary based on specific requirements.
         """
 
-        async def _mark_used(resource_node_name: str, location: str):
-            try:
-                response = await self.client.post(f"/mark_used/?resource_node_name={resource_node_name}&location={location}")
-                if response.status_code != status.HTTP_200_OK:
-                    raise ValueError(f"Log metrics failed with status code {response.status_code}")
-            except Exception as e:
-                self.log(f"Error marking artifact as 'using': {e}", level="ERROR")
-                raise e
+        if self.batch_window is not None:
+            return await self._submit_batched("mark_used", {"resource_node_name": resource_node_name, "filepath": location})
+
+        try:
+            response = await self.client.post(f"/mark_used/?resource_node_name={resource_node_name}&location={location}")
+            if response.status_code != status.HTTP_200_OK:
+                raise ValueError(f"Log metrics failed with status code {response.status_code}")
+        except Exception as e:
+            self.log("Error marking artifact as 'using': %s", "ERROR", e)
+            raise e
 
-        task = asyncio.run_coroutine_threadsafe(_mark_used(resource_node_name, location), self.loop)
-        return task.result()
+        self._invalidate_num_entries(resource_node_name)
 
     def mark_used(self, resource_node_name: str, location: str) -> None:
-        """
-        Mark an artifact as 'used'.
-        This method is a placeholder to maintain compatibility with the BaseMetadataStoreClient interface.
-        Actual implementation may vary based on specific requirements.
-        """
+        """Synchronous version of amark_used; buffered when called inside transaction()."""
 
-        async def _mark_used(resource_node_name: str, location: str):
-            try:
-                response = await self.client.post(f"/mark_used/?resource_node_name={resource_node_name}&location={location}")
-                if response.status_code != status.HTTP_200_OK:
-                    raise ValueError(f"Log metrics failed with status code {response.status_code}")
-            except Exception as e:
-                self.log(f"Error marking artifact as 'using': {e}", level="ERROR")
-                raise e
+        if self._buffer_operation("mark_used", dict(resource_node_name=resource_node_name, filepath=location)):
+            return
+
+        return self.run_sync(self.amark_used(resource_node_name, location))
 
-        task = asyncio.run_coroutine_threadsafe(_mark_used(resource_node_name, location), self.loop)
-        return task.result()
+    # ---- metrics, params, tags, and triggers ---- #
 
-    def log_metrics(self, node_name: str, **kwargs):
+    @client_coroutine
+    async def alog_metrics(self, node_name: str, run_id: int = None, **kwargs):
         """
         Log metrics for a specific node.
         This method sends a POST request to the server to log metrics.
+        The metrics are recorded for the given run (by default, the run the calling node is working on if several runs are in flight,
+        otherwise the root's current run).
         """
 
-        async def _log_metrics(node_name: str, **kwargs):
-            try:
-                response = await self.client.post(f"/log_metrics/?node_name={node_name}", json=kwargs)
-                if response.status_code != status.HTTP_200_OK:
-                    raise ValueError(f"Log metrics failed with status code {response.status_code}")
-            except Exception as e:
-                self.log(f"Error logging metrics: {e}", level="ERROR")
-                raise e
+        run_id = run_id if run_id is not None else current_run_id()
 
-        task = asyncio.run_coroutine_threadsafe(_log_metrics(node_name, **kwargs), self.loop)
-        return task.result()
+        try:
+            params = {"node_name": node_name}
+            if run_id is not None:
+                params["run_id"] = run_id
+            response = await self.client.post("/log_metrics/", params=params, json=kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                raise ValueError(f"Log metrics failed with status code {response.status_code}")
+        except Exception as e:
+            self.log("Error logging metrics: %s", "ERROR", e)
+            raise e
+
+    def log_metrics(self, node_name: str, run_id: int = None, **kwargs):
+        """Synchronous version of alog_metrics; buffered when called inside transaction()."""
+
+        run_id = run_id if run_id is not None else current_run_id()
+        if self._buffer_operation("log_metrics", dict(node_name=node_name, **kwargs), run_id):
+            return
 
-    def log_params(self, node_name: str, **kwargs):
+        return self.run_sync(self.alog_metrics(node_name, run_id=run_id, **kwargs))
+
+    @client_coroutine
+    async def alog_params(self, node_name: str, run_id: int = None, **kwargs):
         """
         Log parameters for a specific node.
         This method sends a POST request to the server to log parameters.
+        The params are recorded for the given run (by default, the run the calling node is working on if several runs are in flight,
+        otherwise the root's current run).
         """
-        async def _log_params(node_name: str, **kwargs):
-            try:
-                response = await self.client.post(f"/log_params/?node_name={node_name}", json=kwargs)
-                if response.status_code != status.HTTP_200_OK:
-                    raise ValueError(f"Log params failed with status code {response.status_code}")
-            except Exception as e:
-                self.log(f"Error logging params: {e}", level="ERROR")
-                raise e
 
-        task = asyncio.run_coroutine_threadsafe(_log_params(node_name, **kwargs), self.loop)
-        return task.result()
+        run_id = run_id if run_id is not None else current_run_id()
+
+        try:
+            params = {"node_name": node_name}
+            if run_id is not None:
+                params["run_id"] = run_id
+            response = await self.client.post("/log_params/", params=params, json=kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                raise ValueError(f"Log params failed with status code {response.status_code}")
+        except Exception as e:
+            self.log("Error logging params: %s", "ERROR", e)
+            raise e
+
+    def log_params(self, node_name: str, run_id: int = None, **kwargs):
+        """Synchronous version of alog_params; buffered when called inside transaction()."""
 
-    def set_tags(self, node_name: str, **kwargs):
+        run_id = run_id if run_id is not None else current_run_id()
+        if self._buffer_operation("log_params", dict(node_name=node_name, **kwargs), run_id):
+            return
+
+        return self.run_sync(self.alog_params(node_name, run_id=run_id, **kwargs))
+
+    @client_coroutine
+    async def aset_tags(self, node_name: str, run_id: int = None, **kwargs):
         """
         Set tags for a specific node.
         This method sends a POST request to the server to set tags.
+        The tags are recorded for the given run (by default, the run the calling node is working on if several runs are in flight,
+        otherwise the root's current run).
         """
-        async def _set_tags(node_name: str, **kwargs):
-            try:
-                response = await self.client.post(f"/set_tags/?node_name={node_name}", json=kwargs)
-                if response.status_code != status.HTTP_200_OK:
-                    raise ValueError(f"Set tags failed with status code {response.status_code}")
-            except Exception as e:
-                self.log(f"Error setting tags: {e}", level="ERROR")
-                raise e
 
-        task = asyncio.run_coroutine_threadsafe(_set_tags(node_name, **kwargs), self.loop)
-        return task.result()
+        run_id = run_id if run_id is not None else current_run_id()
 
-    def get_metrics(self, node_name: str = None, run_id: int = None):
+        try:
+            params = {"node_name": node_name}
+            if run_id is not None:
+                params["run_id"] = run_id
+            response = await self.client.post("/set_tags/", params=params, json=kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                raise ValueError(f"Set tags failed with status code {response.status_code}")
+        except Exception as e:
+            self.log("Error setting tags: %s", "ERROR", e)
+            raise e
+
+    def set_tags(self, node_name: str, run_id: int = None, **kwargs):
+        """Synchronous version of aset_tags; buffered when called inside transaction()."""
+
+        run_id = run_id if run_id is not None else current_run_id()
+        if self._buffer_operation("set_tags", dict(node_name=node_name, **kwargs), run_id):
+            return
+
+        return self.run_sync(self.aset_tags(node_name, run_id=run_id, **kwargs))
+
+    async def _get_run_records(self, endpoint: str, node_name: str = None, run_id: int = None) -> List[Dict]:
+        params = {}
+        if node_name is not None:
+            params["node_name"] = node_name
+        if run_id is not None:
+            params["run_id"] = run_id
+
+        return await self.request_payload("GET", endpoint, params=params)
+
+    @client_coroutine
+    async def aget_metrics(self, node_name: str = None, run_id: int = None) -> List[Dict]:
         """
         Get metrics for a specific node or run ID.
         This method sends a GET request to the server to retrieve metrics.
         """
 
-        async def _get_metrics(node_name: str = None, run_id: int = None):
+        records = self._replica_read(lambda replica: replica.get_metrics(node_name=node_name, run_id=run_id))
+        if records is not _MISSING:
+            return records
 
-            if node_name is not None and run_id is not None:
-                response = await self.client.get(f"/get_metrics/?node_name={node_name}&run_id={run_id}")
-            elif node_name is not None:
-                response = await self.client.get(f"/get_metrics/?node_name={node_name}")
-            elif run_id is not None:
-                response = await self.client.get(f"/get_metrics/?run_id={run_id}")
-            else:
-                response = await self.client.get(f"/get_metrics/")
-
-            metrics = response.json()
-            return metrics
-
-        task = asyncio.run_coroutine_threadsafe(_get_metrics(node_name, run_id), self.loop)
-        return task.result()
-    
-    def get_params(self, node_name: str = None, run_id: int = None):
-        async def _get_params(node_name: str = None, run_id: int = None):
-
-            if node_name is not None and run_id is not None:
-                response = await self.client.get(f"/get_params/?node_name={node_name}&run_id={run_id}")
-            elif node_name is not None:
-                response = await self.client.get(f"/get_params/?node_name={node_name}")
-            elif run_id is not None:
-                response = await self.client.get(f"/get_params/?run_id={run_id}")
-            else:
-                response = await self.client.get(f"/get_params/")
+        try:
+            return await self._get_run_records("/get_metrics/", node_name=node_name, run_id=run_id)
+        except Exception as e:
+            self.log("Error occurred while getting metrics: %s", "ERROR", e)
+            raise e
+
+    def get_metrics(self, node_name: str = None, run_id: int = None) -> List[Dict]:
+        """Synchronous version of aget_metrics."""
+        return self.run_sync(self.aget_metrics(node_name=node_name, run_id=run_id))
+
+    @client_coroutine
+    async def aget_params(self, node_name: str = None, run_id: int = None) -> List[Dict]:
+        records = self._replica_read(lambda replica: replica.get_params(node_name=node_name, run_id=run_id))
+        if records is not _MISSING:
+            return records
 
-            params = response.json()
-            return params
-        
-        task = asyncio.run_coroutine_threadsafe(_get_params(node_name, run_id), self.loop)
         try:
-            result = task.result()
-            return result
+            return await self._get_run_records("/get_params/", node_name=node_name, run_id=run_id)
         except Exception as e:
-            self.log(f"Error occurred while getting params: {e}", level="ERROR")
+            self.log("Error occurred while getting params: %s", "ERROR", e)
             raise e
-    
-    def get_tags(self, node_name: str = None, run_id: int = None):
-        async def _get_tags(node_name: str = None, run_id: int = None):
-
-            if node_name is not None and run_id is not None:
-                response = await self.client.get(f"/get_tags/?node_name={node_name}&run_id={run_id}")
-            elif node_name is not None:
-                response = await self.client.get(f"/get_tags/?node_name={node_name}")
-            elif run_id is not None:
-                response = await self.client.get(f"/get_tags/?run_id={run_id}")
-            else:
-                response = await self.client.get(f"/get_tags/")
 
-            tags = response.json()
-            return tags
+    def get_params(self, node_name: str = None, run_id: int = None) -> List[Dict]:
+        """Synchronous version of aget_params."""
+        return self.run_sync(self.aget_params(node_name=node_name, run_id=run_id))
+
+    @client_coroutine
+    async def aget_tags(self, node_name: str = None, run_id: int = None) -> List[Dict]:
+        records = self._replica_read(lambda replica: replica.get_tags(node_name=node_name, run_id=run_id))
+        if records is not _MISSING:
+            return records
 
-        task = asyncio.run_coroutine_threadsafe(_get_tags(node_name, run_id), self.loop)
         try:
-            result = task.result()
-            return result
+            return await self._get_run_records("/get_tags/", node_name=node_name, run_id=run_id)
         except Exception as e:
-            self.log(f"Error occurred while getting tags: {e}", level="ERROR")
+            self.log("Error occurred while getting tags: %s", "ERROR", e)
             raise e
 
-    def log_trigger(self, node_name: str, message: str = None):
+    def get_tags(self, node_name: str = None, run_id: int = None) -> List[Dict]:
+        """Synchronous version of aget_tags."""
+        return self.run_sync(self.aget_tags(node_name=node_name, run_id=run_id))
+
+    @client_coroutine
+    async def alog_trigger(self, node_name: str, message: str = None):
         """
         Log a trigger for a specific node.
         This method sends a POST request to the server to log the trigger.
         """
 
-        async def _log_trigger(node_name: str, message: str = None):
-            try:
-                response = await self.client.post(f"/log_trigger/?node_name={node_name}", json={"message": message})
-                if response.status_code != status.HTTP_200_OK:
-                    raise ValueError(f"Log trigger failed with status code {response.status_code}")
-            except Exception as e:
-                self.log(f"Error logging trigger for node {node_name}: {e}", level="ERROR")
+        if self.batch_window is not None:
+            return await self._submit_batched("log_trigger", {"node_name": node_name, "message": message})
 
-        task = asyncio.run_coroutine_threadsafe(_log_trigger(node_name, message), self.loop)
         try:
-            result = task.result()
-            return result
+            response = await self.client.post(f"/log_trigger/?node_name={node_name}", json={"message": message})
+            if response.status_code != status.HTTP_200_OK:
+                raise ValueError(f"Log trigger failed with status code {response.status_code}")
         except Exception as e:
-            self.log(f"Error occurred while logging trigger: {e}", level="ERROR")
-            raise e
+            self.log("Error logging trigger for node %s: %s", "ERROR", node_name, e)
 
-    def get_entries(self, resource_node_name: str, state: str = "all") -> List[Dict]:
+    def log_trigger(self, node_name: str, message: str = None):
+        """Synchronous version of alog_trigger; buffered when called inside transaction()."""
+
+        if self._buffer_operation("log_trigger", dict(node_name=node_name, message=message)):
+            return
+
+        return self.run_sync(self.alog_trigger(node_name, message))
+
+    # ---- queries ---- #
+
+    @client_coroutine
+    async def aget_entries(self, resource_node_name: str, state: str = "all") -> List[Dict]:
         """
         Get entries from the metadata store for a specific resource node and state.
         This method sends a GET request to the server to retrieve entries.
         """
 
-        async def _get_entries(resource_node_name: str, state: str):
-            response = await self.client.get(f"/get_entries/?resource_node_name={resource_node_name}&state={state}")
-            entries = response.json()
+        entries = self._replica_read(lambda replica: replica.get_entries(resource_node_name, state))
+        if entries is not _MISSING:
+            return entries
 
-            for entry in entries:
-                entry["created_at"] = datetime.fromisoformat(entry["created_at"])
+        try:
+            entries = await self.request_payload("GET", "/get_entries/", params={"resource_node_name": resource_node_name, "state": state})
+        except Exception as e:
+            self.log("Error occurred while getting entries: %s", "ERROR", e)
+            raise e
 
-            return entries
+        return parse_datetimes(entries)
+
+    def get_entries(self, resource_node_name: str, state: str = "all") -> List[Dict]:
+        """Synchronous version of aget_entries."""
+        return self.run_sync(self.aget_entries(resource_node_name, state))
+
+    @client_coroutine
+    async def asearch_artifacts(self, query: str, node: str = None, limit: int = 100, offset: int = 0) -> List[Dict]:
+        """
+        Search artifacts in the metadata store by location and tags.
+        This method sends a GET request to the server to retrieve the matching entries.
+        """
+
+        params = {"query": query, "limit": limit, "offset": offset}
+        if node is not None:
+            params["node"] = node
+
+        try:
+            results = await self.request_payload("GET", "/search_artifacts/", params=params)
+        except Exception as e:
+            self.log("Error occurred while searching artifacts: %s", "ERROR", e)
+            raise e
+
+        return parse_datetimes(results)
+
+    def search_artifacts(self, query: str, node: str = None, limit: int = 100, offset: int = 0) -> List[Dict]:
+        """Synchronous version of asearch_artifacts."""
+        return self.run_sync(self.asearch_artifacts(query, node=node, limit=limit, offset=offset))
+
+    @client_coroutine
+    async def aget_lineage(
+        self, artifact: Union[int, str], direction: str = "downstream", depth: int = None, node: str = None
+    ) -> Dict[str, List[Dict]]:
+        """
+        Get the runs and artifacts upstream or downstream of an artifact (given by id or location).
+        This method sends a GET request to the server to retrieve the lineage.
+        """
+
+        params = {"direction": direction}
+        if isinstance(artifact, int):
+            params["artifact_id"] = artifact
+        else:
+            params["location"] = artifact
+        if depth is not None:
+            params["depth"] = depth
+        if node is not None:
+            params["node"] = node
 
-        task = asyncio.run_coroutine_threadsafe(_get_entries(resource_node_name, state), self.loop)
         try:
-            result = task.result()
+            lineage = await self.request_payload("GET", "/get_lineage/", params=params)
+        except Exception as e:
+            self.log("Error occurred while getting lineage: %s", "ERROR", e)
+            raise e
+
+        parse_datetimes(lineage["artifacts"])
+        return lineage
+
+    def get_lineage(self, artifact: Union[int, str], direction: str = "downstream", depth: int = None, node: str = None) -> Dict[str, List[Dict]]:
+        """Synchronous version of aget_lineage."""
+        return self.run_sync(self.aget_lineage(artifact, direction=direction, depth=depth, node=node))
+
+    @client_coroutine
+    async def aget_entries_columnar(
+        self, resource_node_name: str, state: str = "all", columns: List[str] = None, array_type: str = "list"
+    ) -> Dict:
+        """
+        Get entries from the metadata store as a dictionary of column arrays.
+        Only the requested columns are sent over the network (e.g., columns=["location"]).
+        """
+
+        columns = validate_artifact_columns(columns)
+
+        result = self._replica_read(
+            lambda replica: replica.get_entries_columnar(resource_node_name, state, columns=columns, array_type=array_type)
+        )
+        if result is not _MISSING:
             return result
+
+        params = {"resource_node_name": resource_node_name, "state": state, "columns": list(columns)}
+        try:
+            result = await self.request_payload("GET", "/get_entries_columnar/", params=params)
+        except Exception as e:
+            self.log("Error occurred while getting entries: %s", "ERROR", e)
+            raise e
+
+        if "created_at" in result:
+            result["created_at"] = [as_datetime(created_at) for created_at in result["created_at"]]
+
+        if array_type == "list":
+            return result
+
+        rows = list(zip(*[result[column] for column in columns]))
+        return rows_to_columns(rows, columns, array_type=array_type)
+
+    def get_entries_columnar(self, resource_node_name: str, state: str = "all", columns: List[str] = None, array_type: str = "list") -> Dict:
+        """Synchronous version of aget_entries_columnar."""
+        return self.run_sync(self.aget_entries_columnar(resource_node_name, state=state, columns=columns, array_type=array_type))
+
+    # ---- bulk export and import ---- #
+
+    @client_coroutine
+    async def aexport_table(
+        self, table_name: str, path: str, min_run_id: int = None, max_run_id: int = None, 
+        chunk_size: int = 50_000, format: str = "parquet"
+    ) -> int:
+        """
+        Export a table of the metadata store on the root pipeline to a local Parquet file (format="parquet") or Arrow IPC file (format="arrow").
+        The table is streamed from the server as an Arrow IPC stream and written to disk chunk by chunk.
+        Returns the number of rows exported.
+        """
+
+        params = {"table_name": table_name, "chunk_size": chunk_size}
+        if min_run_id is not None:
+            params["min_run_id"] = min_run_id
+        if max_run_id is not None:
+            params["max_run_id"] = max_run_id
+
+        fd, stream_path = tempfile.mkstemp(suffix=".arrows", dir=os.path.dirname(os.path.abspath(path)))
+        os.close(fd)
+        try:
+            async with self.client.stream("GET", "/export_table/", params=params, timeout=None) as response:
+                if response.status_code != status.HTTP_200_OK:
+                    raise ValueError(f"Export table failed with status code {response.status_code}")
+                with open(stream_path, "wb") as f:
+                    async for chunk in response.aiter_bytes():
+                        f.write(chunk)
+
+            # converting the stream to the output format is CPU-bound, so it is done off the event loop
+            return await asyncio.get_running_loop().run_in_executor(
+                None, lambda: write_record_batches(read_record_batches(stream_path), table_name, path, format=format)
+            )
         except Exception as e:
-            self.log(f"Error occurred while getting entries: {e}", level="ERROR")
-            raise e
\ No newline at end of file
+            self.log("Error exporting table '%s': %s", "ERROR", table_name, e)
+            raise e
+        finally:
+            os.remove(stream_path)
+
+    def export_table(
+        self, table_name: str, path: str, min_run_id: int = None, max_run_id: int = None, 
+        chunk_size: int = 50_000, format: str = "parquet"
+    ) -> int:
+        """Synchronous version of aexport_table."""
+        return self.run_sync(
+            self.aexport_table(table_name, path, min_run_id=min_run_id, max_run_id=max_run_id, chunk_size=chunk_size, format=format)
+        )
+
+    @client_coroutine
+    async def aimport_table(self, table_name: str, path: str, chunk_size: int = 50_000) -> int:
+        """
+        Import a local Parquet/Arrow file into a table of the metadata store on the root pipeline.
+        The file is streamed to the server as an Arrow IPC stream; the server inserts all rows in a single transaction.
+        Returns the number of rows imported.
+        """
+
+        get_table(table_name)
+
+        try:
+            response = await self.client.post(
+                f"/import_table/?table_name={table_name}",
+                content=self._iter_import_stream(table_name, path, chunk_size),
+                headers={"Content-Type": "application/vnd.apache.arrow.stream"},
+                timeout=None
+            )
+            if response.status_code != status.HTTP_200_OK:
+                raise ValueError(f"Import table failed with status code {response.status_code}")
+            return response.json()["num_rows"]
+        except Exception as e:
+            self.log("Error importing table '%s': %s", "ERROR", table_name, e)
+            raise e
+
+    def import_table(self, table_name: str, path: str, chunk_size: int = 50_000) -> int:
+        """Synchronous version of aimport_table."""
+        return self.run_sync(self.aimport_table(table_name, path, chunk_size=chunk_size))
+
+    async def _iter_import_stream(self, table_name: str, path: str, chunk_size: int):
+        for data in iter_ipc_stream(read_record_batches(path, chunk_size=chunk_size), table_name):
+            yield data
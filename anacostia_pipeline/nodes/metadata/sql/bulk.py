@@ -0,0 +1,221 @@
+from typing import Iterator, List, Dict, Any, BinaryIO
+import io
+
+from sqlalchemy import Table, Integer, String, Text, Float, Boolean, DateTime, select
+from sqlalchemy.orm import Session
+
+from anacostia_pipeline.nodes.metadata.sql.models import Base
+
+
+
+# tables that can be exported and imported; nodes and runs come first so foreign keys resolve when importing in this order
+EXPORT_TABLES = ("nodes", "runs", "artifacts", "metrics", "params", "tags", "artifact_tags", "triggers", "lineage_edges")
+
+# column used by the run-range filter of each table; tables without a run column are always exported in full
+RUN_COLUMNS = {
+    "runs": "run_id",
+    "artifacts": "run_id",
+    "metrics": "run_id",
+    "params": "run_id",
+    "tags": "run_id",
+    "triggers": "run_triggered",
+    "lineage_edges": "run_id",
+}
+
+EXPORT_FORMATS = ("parquet", "arrow")
+
+
+def import_pyarrow():
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise ImportError("Bulk export and import of the metadata store requires pyarrow; install it with `pip install pyarrow`")
+    return pa
+
+
+def get_table(table_name: str) -> Table:
+    if table_name not in EXPORT_TABLES:
+        raise ValueError(f"Invalid table: '{table_name}'. Must be one of {EXPORT_TABLES}")
+    return Base.metadata.tables[table_name]
+
+
+def table_schema(table: Table):
+    """Build the Arrow schema of a metadata store table from its SQLAlchemy column types."""
+
+    pa = import_pyarrow()
+
+    fields = []
+    for column in table.columns:
+        if isinstance(column.type, Boolean):
+            arrow_type = pa.bool_()
+        elif isinstance(column.type, Integer):
+            arrow_type = pa.int64()
+        elif isinstance(column.type, Float):
+            arrow_type = pa.float64()
+        elif isinstance(column.type, DateTime):
+            arrow_type = pa.timestamp("us")
+        elif isinstance(column.type, (String, Text)):
+            arrow_type = pa.string()
+        else:
+            raise TypeError(f"Column '{table.name}.{column.name}' has unsupported type {column.type}")
+        fields.append(pa.field(column.name, arrow_type, nullable=column.nullable or column.primary_key))
+
+    return pa.schema(fields)
+
+
+def table_statement(table: Table, min_run_id: int = None, max_run_id: int = None):
+    """Build the SELECT statement for a table, restricted to runs in [min_run_id, max_run_id] when the table has a run column."""
+
+    stmt = select(table).order_by(*table.primary_key.columns)
+
+    if min_run_id is None and max_run_id is None:
+        return stmt
+
+    if table.name in RUN_COLUMNS:
+        run_column = table.columns[RUN_COLUMNS[table.name]]
+        if min_run_id is not None:
+            stmt = stmt.where(run_column >= min_run_id)
+        if max_run_id is not None:
+            stmt = stmt.where(run_column <= max_run_id)
+
+    elif table.name == "artifact_tags":
+        # artifact tags follow the run of the artifact they belong to
+        artifacts = Base.metadata.tables["artifacts"]
+        artifact_ids = select(artifacts.c.id)
+        if min_run_id is not None:
+            artifact_ids = artifact_ids.where(artifacts.c.run_id >= min_run_id)
+        if max_run_id is not None:
+            artifact_ids = artifact_ids.where(artifacts.c.run_id <= max_run_id)
+        stmt = stmt.where(table.c.artifact_id.in_(artifact_ids))
+
+    return stmt
+
+
+def iter_record_batches(
+    session: Session, table_name: str, min_run_id: int = None, max_run_id: int = None, chunk_size: int = 50_000
+) -> Iterator[Any]:
+    """
+    Stream the rows of a table as pyarrow.RecordBatch objects of at most chunk_size rows.
+    Only one chunk of rows is held in memory at a time.
+    """
+
+    pa = import_pyarrow()
+    table = get_table(table_name)
+    schema = table_schema(table)
+
+    stmt = table_statement(table, min_run_id=min_run_id, max_run_id=max_run_id)
+    result = session.execute(stmt.execution_options(yield_per=chunk_size))
+
+    for rows in result.partitions(chunk_size):
+        columns = [list(values) for values in zip(*rows)]
+        arrays = [pa.array(values, type=field.type) for values, field in zip(columns, schema)]
+        yield pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def write_record_batches(batches: Iterator[Any], table_name: str, path: str, format: str = "parquet") -> int:
+    """
+    Write record batches to a Parquet file (format="parquet") or an Arrow IPC file (format="arrow").
+    Returns the number of rows written.
+    """
+
+    pa = import_pyarrow()
+
+    if format not in EXPORT_FORMATS:
+        raise ValueError(f"Invalid format: '{format}'. Must be one of {EXPORT_FORMATS}")
+
+    schema = table_schema(get_table(table_name))
+    num_rows = 0
+
+    if format == "parquet":
+        import pyarrow.parquet as pq
+        with pq.ParquetWriter(path, schema) as writer:
+            for batch in batches:
+                writer.write_batch(batch)
+                num_rows += batch.num_rows
+    else:
+        with pa.OSFile(path, "wb") as sink:
+            with pa.ipc.new_file(sink, schema) as writer:
+                for batch in batches:
+                    writer.write_batch(batch)
+                    num_rows += batch.num_rows
+
+    return num_rows
+
+
+def read_record_batches(path: str, chunk_size: int = 50_000) -> Iterator[Any]:
+    """Stream record batches from a Parquet file, an Arrow IPC file, or an Arrow IPC stream file."""
+
+    pa = import_pyarrow()
+
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        parquet_file = pq.ParquetFile(path)
+        yield from parquet_file.iter_batches(batch_size=chunk_size)
+        return
+
+    with pa.memory_map(path, "r") as source:
+        try:
+            reader = pa.ipc.open_file(source)
+            for i in range(reader.num_record_batches):
+                yield reader.get_batch(i)
+        except pa.ArrowInvalid:
+            source.seek(0)
+            yield from pa.ipc.open_stream(source)
+
+
+def iter_ipc_stream(batches: Iterator[Any], table_name: str) -> Iterator[bytes]:
+    """
+    Encode record batches as an Arrow IPC stream, yielding the encoded bytes one batch at a time.
+    Used to stream a table over HTTP without buffering the whole table.
+    """
+
+    pa = import_pyarrow()
+    schema = table_schema(get_table(table_name))
+
+    sink = io.BytesIO()
+    writer = pa.ipc.new_stream(sink, schema)
+
+    def drain() -> bytes:
+        data = sink.getvalue()
+        sink.seek(0)
+        sink.truncate(0)
+        return data
+
+    for batch in batches:
+        writer.write_batch(batch)
+        yield drain()
+
+    writer.close()
+    yield drain()
+
+
+def read_ipc_stream(source: BinaryIO) -> Iterator[Any]:
+    """Decode record batches from a file-like object containing an Arrow IPC stream."""
+    pa = import_pyarrow()
+    yield from pa.ipc.open_stream(source)
+
+
+def insert_record_batches(session: Session, table_name: str, batches: Iterator[Any]) -> int:
+    """
+    Insert record batches into a table using executemany-style bulk inserts, one batch at a time.
+    Primary keys are preserved so that exported stores can be replicated exactly.
+    Returns the number of rows inserted.
+    """
+
+    table = get_table(table_name)
+    column_names = {column.name for column in table.columns}
+    num_rows = 0
+
+    for batch in batches:
+        rows: List[Dict] = batch.to_pylist()
+        if len(rows) == 0:
+            continue
+
+        unknown_columns = set(rows[0].keys()) - column_names
+        if len(unknown_columns) > 0:
+            raise ValueError(f"Columns {unknown_columns} do not exist in table '{table_name}'")
+
+        session.execute(table.insert(), rows)
+        num_rows += len(rows)
+
+    return num_rows
@@ -1,4 +1,6 @@
 from typing import List, Dict
+from html import escape
+from urllib.parse import quote
 from anacostia_pipeline.pipelines.fragments import head_template
 
 
@@ -238,4 +240,64 @@ def sqlmetadatastore_triggers_table(triggers: List[Dict[str, str]], triggers_end
                 }
             </tbody>
         </table>
-    """
\ No newline at end of file
+    """
+
+
+def sqlmetadatastore_search_results(results: List[Dict[str, str]], search_endpoint: str, query: str, page: int, page_size: int):
+    previous_button = f'''
+        <button class="button" hx-get="{ search_endpoint }/results?query={ quote(query) }&page={ page - 1 }" 
+            hx-target="#search_results" hx-swap="innerHTML">Previous</button>
+    ''' if page > 0 else ""
+
+    # search_artifacts is asked for page_size + 1 results so we know whether there is a next page without counting all matches
+    next_button = f'''
+        <button class="button" hx-get="{ search_endpoint }/results?query={ quote(query) }&page={ page + 1 }" 
+            hx-target="#search_results" hx-swap="innerHTML">Next</button>
+    ''' if len(results) > page_size else ""
+
+    return f"""
+        <table class="table is-bordered is-striped is-hoverable">
+            <thead>
+                <tr>
+                    <th>Sample ID</th>
+                    <th>Run ID</th>
+                    <th>Node Name</th>
+                    <th>Location</th>
+                    <th>State</th>
+                    <th>Tags</th>
+                </tr>
+            </thead>
+            <tbody>
+                {
+                    newline.join([
+                        f'''
+                        <tr>
+                            <th>{ escape(str(result["id"])) }</th>
+                            <td>{ escape(str(result["run_id"])) }</td>
+                            <td>{ escape(result["node_name"]) }</td>
+                            <td>{ escape(result["location"]) }</td>
+                            <td>{ escape(result["state"]) }</td>
+                            <td>{ escape(", ".join(f"{name}={value}" for name, value in result["tags"].items())) }</td>
+                        </tr>
+                        ''' for result in results[:page_size]
+                    ])
+                }
+            </tbody>
+        </table>
+        <div class="search_pagination">
+            { previous_button }
+            <span>Page { page + 1 }</span>
+            { next_button }
+        </div>
+    """
+
+
+def sqlmetadatastore_search(search_endpoint: str):
+    return f"""
+        <div class="search_container">
+            <input class="input" type="search" name="query" placeholder="Search artifacts by location or tag..."
+                hx-get="{ search_endpoint }/results" hx-trigger="input changed delay:300ms, search" 
+                hx-target="#search_results" hx-swap="innerHTML">
+        </div>
+        <div id="search_results"></div>
+    """
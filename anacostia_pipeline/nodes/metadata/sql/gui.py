@@ -18,7 +18,9 @@ class SQLMetadataStoreGUI(BaseGUI):
             "tags": f"{self.get_node_prefix()}/tags",
             "samples": f"{self.get_node_prefix()}/samples",
             "triggers": f"{self.get_node_prefix()}/triggers",
+            "search": f"{self.get_node_prefix()}/search",
         }
+        self.search_page_size = 50
 
         @self.get("/home", response_class=HTMLResponse)
         async def endpoint(request: Request):
@@ -69,4 +71,19 @@ class SQLMetadataStoreGUI(BaseGUI):
             for trigger in triggers:
                 trigger['trigger_time'] = trigger['trigger_time'].strftime("%m/%d/%Y, %H:%M:%S")
             
-            return sqlmetadatastore_triggers_table(triggers, self.data_options["triggers"])
\ No newline at end of file
+            return sqlmetadatastore_triggers_table(triggers, self.data_options["triggers"])
+        
+        @self.get("/search", response_class=HTMLResponse)
+        async def search(request: Request):
+            return sqlmetadatastore_search(self.data_options["search"])
+
+        @self.get("/search/results", response_class=HTMLResponse)
+        async def search_results(request: Request, query: str = "", page: int = 0):
+            if query.strip() == "":
+                return ""
+
+            page = max(page, 0)
+            results = self.node.search_artifacts(
+                query, limit=self.search_page_size + 1, offset=page * self.search_page_size
+            )
+            return sqlmetadatastore_search_results(results, self.data_options["search"], query, page, self.search_page_size)
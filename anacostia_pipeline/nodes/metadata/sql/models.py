@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, Text, Table, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, Text, Table, Boolean, Index, UniqueConstraint
 from sqlalchemy.orm import declarative_base, relationship
 
 
@@ -132,11 +132,15 @@ class Artifact(Base):
     """
 
     __tablename__ = 'artifacts'
+    __table_args__ = (
+        # entry_exists, mark_using, and mark_used look artifacts up by (node_id, location)
+        Index("ix_artifacts_node_id_location", "node_id", "location"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     run_id = Column(Integer, ForeignKey('runs.run_id'), nullable=True)
     node_id = Column(Integer, ForeignKey('nodes.id'))
-    location = Column(String)
+    location = Column(String, index=True)       # get_artifact_tags and get_artifact_hash look artifacts up by location
     created_at = Column(DateTime)
     state = Column(String, default='new')
     hash = Column(String, nullable=False)
@@ -152,6 +156,45 @@ class Artifact(Base):
     tags = relationship("Tag", secondary="artifact_tags", back_populates="artifacts")
 
 
+class LineageEdge(Base):
+    """
+    Represents an edge in the artifact lineage graph.
+
+    The lineage graph is a bipartite graph between runs and artifacts: an "input" edge records that a run used an artifact,
+    and an "output" edge records that a run produced an artifact. 
+    An artifact is downstream of another artifact if a run used the first artifact and produced the second.
+    Unlike Artifact.run_id, which is overwritten every time the artifact is marked as "using", edges are never modified,
+    so the full history of which runs used which artifacts is preserved.
+
+    Attributes
+    ----------
+    id : int
+        Primary key identifier for the edge.
+    run_id : int
+        Foreign key to the `runs` table.
+    artifact_id : int
+        Foreign key to the `artifacts` table.
+    direction : str
+        "input" if the run used the artifact, "output" if the run produced the artifact.
+    created_at : datetime
+        Timestamp when the edge was recorded.
+    """
+
+    __tablename__ = 'lineage_edges'
+    __table_args__ = (
+        UniqueConstraint("run_id", "artifact_id", "direction", name="uq_lineage_edges_run_artifact_direction"),
+        # upstream and downstream queries walk the edges from an artifact to its runs and from a run to its artifacts
+        Index("ix_lineage_edges_artifact_id_direction", "artifact_id", "direction"),
+        Index("ix_lineage_edges_run_id_direction", "run_id", "direction"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    run_id = Column(Integer, ForeignKey('runs.run_id'), nullable=False)
+    artifact_id = Column(Integer, ForeignKey('artifacts.id'), nullable=False)
+    direction = Column(String, nullable=False)
+    created_at = Column(DateTime)
+
+
 class Trigger(Base):
     """
     Represents a trigger event that initiates a pipeline run.
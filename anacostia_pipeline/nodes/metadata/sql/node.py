@@ -1,19 +1,25 @@
-from typing import List, Dict, Union
+from typing import List, Dict, Union, Sequence, Iterator, Any
 from logging import Logger
 from abc import ABC, abstractmethod
 from contextlib import contextmanager
+import threading
 import traceback
 from datetime import datetime
+from collections import Counter
 import hashlib
-import json
+import os
 
 from sqlalchemy.orm import sessionmaker, scoped_session, Session
-from sqlalchemy import exists, select, update
+from sqlalchemy import exists, select, insert, update, or_, and_, func, literal
 
 from anacostia_pipeline.nodes.metadata.node import BaseMetadataStoreNode
+from anacostia_pipeline.nodes.metadata.utils import ARTIFACT_COLUMNS, ArtifactRow, rows_to_columns, validate_artifact_columns
 from anacostia_pipeline.nodes.metadata.sql.gui import SQLMetadataStoreGUI
 from anacostia_pipeline.nodes.metadata.sql.api import SQLMetadataStoreServer
-from anacostia_pipeline.nodes.metadata.sql.models import Artifact, Metric, Param, Run, Tag, Trigger, Node
+from anacostia_pipeline.nodes.metadata.sql.models import Artifact, Metric, Param, Run, Tag, Trigger, Node, LineageEdge, artifact_tags
+from anacostia_pipeline.nodes.metadata.sql.bulk import (
+    EXPORT_TABLES, iter_record_batches, write_record_batches, read_record_batches, insert_record_batches
+)
 
 
 
@@ -27,6 +33,9 @@ class BaseSQLMetadataStoreNode(BaseMetadataStoreNode, ABC):
     (e.g., setting check_same_thread=True when creating an engine for SQLite).
     """
 
+    # the node describes every change to the artifacts, metrics, params, and tags tables with a "rows_changed" event (see get_changed_rows)
+    supports_change_feed = True
+
     def __init__(
         self,
         name: str,
@@ -37,6 +46,9 @@ class BaseSQLMetadataStoreNode(BaseMetadataStoreNode, ABC):
     ) -> None:
         super().__init__(name, uri, remote_successors=remote_successors, client_url=client_url, loggers=loggers)
         self._ScopedSession: Session = None
+
+        # per-thread transaction depth; when > 0, get_session() reuses the thread's session and defers the commit to transaction()
+        self._transaction_state = threading.local()
     
     @abstractmethod
     def setup(self):
@@ -63,19 +75,98 @@ class BaseSQLMetadataStoreNode(BaseMetadataStoreNode, ABC):
         """Call this from the child class after engine setup."""
         self._ScopedSession = scoped_session(session_factory)
 
+    def in_transaction(self) -> bool:
+        """Return True if the calling thread is inside a transaction() block."""
+        return getattr(self._transaction_state, "depth", 0) > 0
+
     @contextmanager
     def get_session(self):
         session = self._ScopedSession()
+
+        # inside a transaction, the session is shared by all calls made by this thread;
+        # committing, rolling back, and removing the session is left to transaction()
+        if self.in_transaction():
+            yield session
+            return
+
         try:
             yield session
             session.commit()
         except Exception as e:
             session.rollback()
             self.log(traceback.format_exc(), level="ERROR")
-            self.log(f"Node {self.name} rolled back session.", level="ERROR")
+            self.log("Node %s rolled back session.", "ERROR", self.name)
             raise
         finally:
             self._ScopedSession.remove()
+
+    @contextmanager
+    def transaction(self):
+        """
+        Group metadata store calls made by the current thread into one session and one commit.
+        If any call inside the block raises an exception, every change made inside the block is rolled back.
+        Nested transaction() blocks join the outermost transaction.
+
+        Example:
+        ```
+        with metadata_store.transaction():
+            metadata_store.create_entry("data_store", filepath="a.txt", hash=hash_a, hash_algorithm="sha256")
+            metadata_store.mark_using("data_store", "b.txt")
+            metadata_store.log_metrics("training_node", acc=0.91, loss=0.23)
+        ```
+        """
+
+        depth = getattr(self._transaction_state, "depth", 0)
+        self._transaction_state.depth = depth + 1
+
+        if depth > 0:
+            try:
+                yield self
+            finally:
+                self._transaction_state.depth = depth
+            return
+
+        session = self._ScopedSession()
+        self._transaction_state.changes = []
+        try:
+            yield self
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            self.log(traceback.format_exc(), level="ERROR")
+            self.log("Node %s rolled back transaction.", "ERROR", self.name)
+            raise
+        finally:
+            self._transaction_state.depth = 0
+            changes, self._transaction_state.changes = self._transaction_state.changes, []
+            self._ScopedSession.remove()
+
+        # change notifications are only sent once the changes are committed
+        for event_type, fields in changes:
+            super().notify_change(event_type, **fields)
+
+    def notify_change(self, event_type: str, **fields) -> None:
+        # inside a transaction, hold the notification until the transaction commits (and drop it if the transaction rolls back)
+        if self.in_transaction():
+            self._transaction_state.changes.append((event_type, fields))
+            return
+        super().notify_change(event_type, **fields)
+
+    @contextmanager
+    def savepoint(self):
+        """
+        Inside transaction(), run the calls made inside the with block in a SAVEPOINT, 
+        so an exception raised inside the block only rolls back the changes made inside the block and the transaction can continue.
+        Outside of a transaction, every call already commits or rolls back on its own, so no SAVEPOINT is needed.
+        """
+
+        if self.in_transaction() is False:
+            yield self
+            return
+
+        session = self._ScopedSession()
+        with session.begin_nested():
+            yield self
     
     def node_exists(self, node_name: str) -> bool:
         with self.get_session() as session:
@@ -89,6 +180,8 @@ class BaseSQLMetadataStoreNode(BaseMetadataStoreNode, ABC):
         with self.get_session() as session:
             node = Node(node_name=node_name, node_type=node_type, base_type=base_type, init_time=datetime.now())
             session.add(node)
+
+        self.notify_change("node_added", node_name=node_name)
     
     def start_run(self):
         run_id = self.get_run_id()
@@ -111,37 +204,27 @@ class BaseSQLMetadataStoreNode(BaseMetadataStoreNode, ABC):
             )
             session.execute(stmt_triggers)
 
-        self.log(f"--------------------------- started run {run_id} at {start_time}")
+        self.log("--------------------------- started run %s at %s", "DEBUG", run_id, start_time)
     
-    def hash_run_metadata(self, metrics: List[Dict], params: List[Dict], tags: List[Dict]) -> str:
-        def stable_hash(records: List[Dict], sort_key: str) -> str:
-            sorted_records = sorted(records, key=lambda r: r[sort_key])
-            serialized = json.dumps(sorted_records, sort_keys=True)
-            return hashlib.sha256(serialized.encode()).hexdigest()
-
-        metrics_hash = stable_hash(metrics, sort_key="id")
-        params_hash = stable_hash(params, sort_key="id")
-        tags_hash = stable_hash(tags, sort_key="id")
-
-        # Combine into a final hash for the run
-        combined = metrics_hash + params_hash + tags_hash
-        return hashlib.sha256(combined.encode()).hexdigest()
-
     def end_run(self) -> None:
         end_time = datetime.now()
+        run_id = self.get_run_id()
 
         # Create the hash for the run by retrieving the hashes of all artifacts, metrics, params, and tags associated with the current run into a list,
         # sorting the list, concatenating the hashes in the list into a string, and then hashing the string
+        # (artifacts of runs started after this one, which are still in flight when runs are pipelined, are left out)
         using_artifact_entries = self.get_entries(state="using")
         produced_artifact_entries = self.get_entries(state="produced")
-        entries = using_artifact_entries + produced_artifact_entries
+        entries = [
+            entry for entry in using_artifact_entries + produced_artifact_entries if entry["run_id"] is None or entry["run_id"] <= run_id
+        ]
         artifact_hashes = [entry["hash"] for entry in entries]
         artifact_hashes = ''.join(sorted(artifact_hashes))
 
         run_metadata_hash = self.hash_run_metadata(
-            metrics=self.get_metrics(run_id=self.get_run_id()),
-            params=self.get_params(run_id=self.get_run_id()),
-            tags=self.get_tags(run_id=self.get_run_id())
+            metrics=self.get_metrics(run_id=run_id),
+            params=self.get_params(run_id=run_id),
+            tags=self.get_tags(run_id=run_id)
         )
 
         combined_hash = artifact_hashes + run_metadata_hash
@@ -151,33 +234,50 @@ class BaseSQLMetadataStoreNode(BaseMetadataStoreNode, ABC):
             # Update runs
             stmt_run = (
                 update(Run)
-                .where(Run.end_time.is_(None))
+                .where(Run.end_time.is_(None), Run.run_id <= run_id)
                 .values(end_time=end_time, hash=run_hash)
             )
             session.execute(stmt_run)
 
             # if artifacts have not been marked as "used" yet, update artifacts with state = "using" and state = "produced" to have state = "unused"
+            in_run = and_(
+                or_(Artifact.state == "using", Artifact.state == "produced"), 
+                or_(Artifact.run_id.is_(None), Artifact.run_id <= run_id)
+            )
+            changed_ids = session.execute(select(Artifact.id).where(in_run)).scalars().all()
             stmt_artifact = (
                 update(Artifact)
-                .where(Artifact.state == "using" or Artifact.state == "produced")
+                .where(in_run)
                 .values(state="unused")
             )
             session.execute(stmt_artifact)
 
-        self.log(f"--------------------------- ended run {self.get_run_id()} at {end_time}")
+        self.notify_change("entries_changed", node_name=None)
+        self.notify_change("rows_changed", table="artifacts", ids=changed_ids)
+        self.log("--------------------------- ended run %s at %s", "DEBUG", run_id, end_time)
 
-    def mark_using(self, resource_node_name: str, filepath: str) -> None:
+    def mark_using(self, resource_node_name: str, filepath: str, run_id: int = None) -> None:
         node_id = self.get_node_id(resource_node_name)
+        run_id = run_id if run_id is not None else self.get_run_id()
 
         with self.get_session() as session:
             stmt = (
                 update(Artifact)
                 .where(Artifact.node_id == node_id, Artifact.location == filepath)
-                .values(state="using", run_id=self.get_run_id())
+                .values(state="using", run_id=run_id)
             )
             result = session.execute(stmt)
             if result.rowcount == 0:
                 raise ValueError(f"No artifact found for node '{resource_node_name}' with location '{filepath}' to mark as using.")
+
+            artifact_ids = session.execute(
+                select(Artifact.id).where(Artifact.node_id == node_id, Artifact.location == filepath)
+            ).scalars().all()
+            for artifact_id in artifact_ids:
+                self._add_lineage_edge(session, run_id=run_id, artifact_id=artifact_id, direction="input")
+
+        self.notify_change("entries_changed", node_name=resource_node_name)
+        self.notify_change("rows_changed", table="artifacts", ids=artifact_ids)
     
     def mark_used(self, resource_node_name: str, filepath: str) -> None:
         node_id = self.get_node_id(resource_node_name)
@@ -192,6 +292,25 @@ class BaseSQLMetadataStoreNode(BaseMetadataStoreNode, ABC):
             if result.rowcount == 0:
                 raise ValueError(f"No artifact found for node '{resource_node_name}' with location '{filepath}' to mark as used.")
 
+        self.notify_change("entries_changed", node_name=resource_node_name)
+        self.notify_change("rows_changed", table="artifacts", resource_node_name=resource_node_name, locations=[filepath])
+
+    def _add_lineage_edge(self, session: Session, run_id: int, artifact_id: int, direction: str) -> None:
+        """Record that a run used (direction="input") or produced (direction="output") an artifact, unless the edge already exists."""
+
+        if run_id is None:
+            return
+
+        stmt = select(exists().where(
+            LineageEdge.run_id == run_id,
+            LineageEdge.artifact_id == artifact_id,
+            LineageEdge.direction == direction
+        ))
+        if session.execute(stmt).scalar() is False:
+            session.add(
+                LineageEdge(run_id=run_id, artifact_id=artifact_id, direction=direction, created_at=datetime.now())
+            )
+
     def get_node_id(self, node_name: str) -> int:
         with self.get_session() as session:
             node = session.query(Node).filter_by(node_name=node_name).first()
@@ -242,27 +361,69 @@ class BaseSQLMetadataStoreNode(BaseMetadataStoreNode, ABC):
                 content_type=content_type
             )
             session.add(entry)
+
+            # flush to get the id of the new artifact (for its lineage edge and the change notification)
+            session.flush()
+            entry_id = entry.id
+
+            if state in ("using", "produced"):
+                direction = "input" if state == "using" else "output"
+                self._add_lineage_edge(session, run_id=entry.run_id, artifact_id=entry.id, direction=direction)
+
+        self.notify_change("entries_changed", node_name=resource_node_name)
+        self.notify_change("rows_changed", table="artifacts", ids=[entry_id])
     
-    def merge_artifacts_table(self, resource_node_name: str, entries: List[Dict]) -> None:
+    def merge_artifacts_table(self, resource_node_name: str, entries: List[Dict], skip_existing: bool = False) -> None:
+        """
+        Insert the entries of a resource node's artifacts table (e.g., the local history of a leaf pipeline) into the metadata store.
+        Raises ValueError if an entry's location already exists for the node, unless skip_existing is True, in which case those entries are skipped
+        (this makes merges idempotent, so an interrupted merge can be sent again).
+        """
+
         node_id = self.get_node_id(resource_node_name)
 
+        locations = [entry["location"] for entry in entries]
+        if len(set(locations)) != len(locations):
+            duplicates = sorted(location for location, count in Counter(locations).items() if count > 1)
+            raise ValueError(f"Entries with locations {duplicates} appear more than once in the merged entries for node '{resource_node_name}'.")
+
         with self.get_session() as session:
-            for entry in entries:
-                if self.entry_exists(resource_node_name, entry["location"]):
-                    raise ValueError(f"Entry with location '{entry['location']}' already exists for node '{resource_node_name}'.")
+            # look up existing locations in chunks (one query per chunk instead of one query per entry);
+            # chunks stay below SQLite's limit on the number of bound parameters
+            existing_locations = set()
+            for i in range(0, len(locations), 500):
+                stmt = select(Artifact.location).where(Artifact.node_id == node_id, Artifact.location.in_(locations[i:i + 500]))
+                if skip_existing is True:
+                    existing_locations.update(session.execute(stmt).scalars())
+                else:
+                    existing = session.execute(stmt.limit(1)).scalar_one_or_none()
+                    if existing is not None:
+                        raise ValueError(f"Entry with location '{existing}' already exists for node '{resource_node_name}'.")
+
+            rows = [
+                {
+                    "run_id": entry["run_id"],
+                    "node_id": node_id,
+                    "location": entry["location"],
+                    "created_at": entry["created_at"],
+                    "state": "new",
+                    "hash": entry["hash"],
+                    "hash_algorithm": entry["hash_algorithm"],
+                    "size": entry["size"],
+                    "content_type": entry["content_type"],
+                    "used": False,
+                }
+                for entry in entries
+                if entry["location"] not in existing_locations
+            ]
+            if len(rows) > 0:
+                # executemany-style bulk insert instead of one ORM object per entry
+                session.execute(insert(Artifact), rows)
 
-                new_entry = Artifact(
-                    run_id=entry["run_id"],
-                    node_id=node_id,
-                    location=entry["location"],
-                    created_at=entry["created_at"],
-                    state="new",
-                    hash=entry["hash"],
-                    hash_algorithm=entry["hash_algorithm"],
-                    size=entry["size"],
-                    content_type=entry["content_type"]
-                )
-                session.add(new_entry)
+        self.notify_change("entries_changed", node_name=resource_node_name)
+        self.notify_change(
+            "rows_changed", table="artifacts", resource_node_name=resource_node_name, locations=[row["location"] for row in rows]
+        )
 
     def entry_exists(self, resource_node_name: str, filepath: str) -> bool:
         node_id = self.get_node_id(resource_node_name)
@@ -288,39 +449,44 @@ class BaseSQLMetadataStoreNode(BaseMetadataStoreNode, ABC):
 
             return query.count()
 
-    #def get_entries(self, resource_node_name: str = None, location: str = None, state: str = "all") -> List[Dict]:
-    def get_entries(self, resource_node_name: str = None, state: str = "all", run_id: int = None) -> List[Dict]:
-        with self.get_session() as session:
-            stmt = (
-                select(
-                    Artifact.id,
-                    Artifact.run_id,
-                    Artifact.location,
-                    Artifact.created_at,
-                    Artifact.state,
-                    Artifact.hash,
-                    Artifact.hash_algorithm,
-                    Artifact.size,
-                    Artifact.content_type,
-                    Node.node_name
-                )
-                .join(Node, Artifact.node_id == Node.id)
-            )
+    def _entries_statement(self, resource_node_name: str = None, state: str = "all", run_id: int = None, columns: Sequence[str] = ARTIFACT_COLUMNS):
+        """Build the SELECT statement shared by get_entries(), get_entries_columnar(), and iter_entries()."""
+        
+        column_map = {
+            "id": Artifact.id,
+            "run_id": Artifact.run_id,
+            "location": Artifact.location,
+            "created_at": Artifact.created_at,
+            "state": Artifact.state,
+            "hash": Artifact.hash,
+            "hash_algorithm": Artifact.hash_algorithm,
+            "size": Artifact.size,
+            "content_type": Artifact.content_type,
+            "node_name": Node.node_name,
+        }
+
+        stmt = (
+            select(*[column_map[column] for column in columns])
+            .select_from(Artifact)
+            .join(Node, Artifact.node_id == Node.id)
+        )
 
-            if resource_node_name is not None:
-                stmt = stmt.where(Node.node_name == resource_node_name)
-            """
-            if location is not None:
-                stmt = stmt.where(Artifact.location == location)
-            """
-            if state != "all":
-                stmt = stmt.where(Artifact.state == state)
-            
-            if run_id is not None:
-                if run_id < 0:
-                    raise ValueError("Run ID must be a positive integer.")
-                stmt = stmt.where(Artifact.run_id == run_id)
+        if resource_node_name is not None:
+            stmt = stmt.where(Node.node_name == resource_node_name)
+        
+        if state != "all":
+            stmt = stmt.where(Artifact.state == state)
+        
+        if run_id is not None:
+            if run_id < 0:
+                raise ValueError("Run ID must be a positive integer.")
+            stmt = stmt.where(Artifact.run_id == run_id)
+
+        return stmt
 
+    def get_entries(self, resource_node_name: str = None, state: str = "all", run_id: int = None) -> List[Dict]:
+        with self.get_session() as session:
+            stmt = self._entries_statement(resource_node_name=resource_node_name, state=state, run_id=run_id)
             result = session.execute(stmt).all()
 
             return [
@@ -338,7 +504,79 @@ class BaseSQLMetadataStoreNode(BaseMetadataStoreNode, ABC):
                 }
                 for row in result
             ]
+
+    def get_entries_columnar(
+        self, resource_node_name: str = None, state: str = "all", run_id: int = None, 
+        columns: List[str] = None, array_type: str = "list"
+    ) -> Dict[str, Sequence]:
+        columns = validate_artifact_columns(columns)
+
+        with self.get_session() as session:
+            stmt = self._entries_statement(resource_node_name=resource_node_name, state=state, run_id=run_id, columns=columns)
+            rows = session.execute(stmt).tuples().all()
+            return rows_to_columns(rows, columns, array_type=array_type)
+
+    def iter_entries(
+        self, resource_node_name: str = None, state: str = "all", run_id: int = None, 
+        columns: List[str] = None, chunk_size: int = 10_000, after_id: int = None, limit: int = None
+    ) -> Iterator[ArtifactRow]:
+        columns = validate_artifact_columns(columns)
+
+        with self.get_session() as session:
+            # rows are returned in the order they were inserted so callers can checkpoint their progress by id and
+            # read the rows a page at a time from the checkpoint (see merge_artifacts_stream), using the primary key instead of skipping rows
+            stmt = self._entries_statement(resource_node_name=resource_node_name, state=state, run_id=run_id, columns=columns)
+            if after_id is not None:
+                stmt = stmt.where(Artifact.id > after_id)
+            stmt = stmt.order_by(Artifact.id)
+            if limit is not None:
+                stmt = stmt.limit(limit)
+            result = session.execute(stmt.execution_options(yield_per=chunk_size)).tuples()
+            for values in result:
+                yield ArtifactRow.from_values(columns, values)
     
+    def get_changed_rows(
+        self, table: str, ids: List[int] = None, resource_node_name: str = None, locations: List[str] = None
+    ) -> List[Dict]:
+        """
+        Return the current rows identified by a "rows_changed" event, in the format of get_entries(), get_metrics(), get_params(), or get_tags().
+        Rows of the artifacts table are identified by ids or by resource_node_name and locations; rows of the other tables by ids.
+        """
+
+        models = {"metrics": (Metric, "metric"), "params": (Param, "param"), "tags": (Tag, "tag")}
+        if table != "artifacts" and table not in models:
+            raise ValueError(f"Table '{table}' is not part of the change feed.")
+
+        keys = ids if ids is not None else locations
+        rows = []
+        with self.get_session() as session:
+            # keys are looked up in chunks to stay below SQLite's limit on the number of bound parameters
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+
+                if table == "artifacts":
+                    stmt = self._entries_statement(resource_node_name=resource_node_name)
+                    if ids is not None:
+                        stmt = stmt.where(Artifact.id.in_(chunk))
+                    else:
+                        stmt = stmt.where(Artifact.location.in_(chunk))
+                    rows.extend(ArtifactRow.from_values(ARTIFACT_COLUMNS, values).to_dict() for values in session.execute(stmt).tuples())
+                    continue
+
+                model, prefix = models[table]
+                name_column = getattr(model, f"{prefix}_name")
+                value_column = getattr(model, f"{prefix}_value")
+                stmt = (
+                    select(model.id, model.run_id, name_column, value_column, Node.node_name)
+                    .join(Node, model.node_id == Node.id)
+                    .where(model.id.in_(chunk))
+                )
+                rows.extend(
+                    {"id": id, "run_id": run_id, f"{prefix}_name": name, f"{prefix}_value": value, "node_name": node_name}
+                    for id, run_id, name, value, node_name in session.execute(stmt).tuples()
+                )
+        return rows
+
     def get_runs(self) -> List[Dict]:
         with self.get_session() as session:
             result = session.execute(select(Run)).scalars().all()
@@ -365,6 +603,10 @@ class BaseSQLMetadataStoreNode(BaseMetadataStoreNode, ABC):
                 for key, value in kwargs.items()
             ]
             session.add_all(metrics)
+            session.flush()
+            ids = [record.id for record in metrics]
+
+        self.notify_change("rows_changed", table="metrics", ids=ids)
 
     def log_params(self, node_name: str, **kwargs) -> None:
         run_id = self.get_run_id()
@@ -379,6 +621,10 @@ class BaseSQLMetadataStoreNode(BaseMetadataStoreNode, ABC):
                 for key, value in kwargs.items()
             ]
             session.add_all(params)
+            session.flush()
+            ids = [record.id for record in params]
+
+        self.notify_change("rows_changed", table="params", ids=ids)
 
     def set_tags(self, node_name: str, **kwargs) -> None:
         run_id = self.get_run_id()
@@ -393,6 +639,10 @@ class BaseSQLMetadataStoreNode(BaseMetadataStoreNode, ABC):
                 for key, value in kwargs.items()
             ]
             session.add_all(tags)
+            session.flush()
+            ids = [record.id for record in tags]
+
+        self.notify_change("rows_changed", table="tags", ids=ids)
     
     def tag_artifact(self, node_name: str, location: str, **kwargs) -> None:
         run_id = self.get_run_id()
@@ -411,6 +661,10 @@ class BaseSQLMetadataStoreNode(BaseMetadataStoreNode, ABC):
                 for key, value in kwargs.items()
             ]
             artifact.tags.extend(tags)
+            session.flush()
+            ids = [tag.id for tag in tags]
+
+        self.notify_change("rows_changed", table="tags", ids=ids)
 
     def get_metrics(self, node_name: str = None, run_id: int = None) -> List[Dict]:
         with self.get_session() as session:
@@ -562,3 +816,281 @@ class BaseSQLMetadataStoreNode(BaseMetadataStoreNode, ABC):
                 raise ValueError(f"Artifact with location '{location}' does not exist.")
 
             return artifact.hash
+
+    def _search_statement(self, query: str, node: str = None):
+        """
+        Build the statement used by search_artifacts().
+        The default implementation does a case-insensitive substring match on artifact locations and tag names/values,
+        which works on any SQL database but requires a full scan; 
+        override to use a full-text index (see SQLiteMetadataStoreNode).
+        """
+
+        pattern = f"%{query}%"
+        tag_match = Artifact.tags.any(or_(Tag.tag_name.ilike(pattern), Tag.tag_value.ilike(pattern)))
+        stmt = self._entries_statement(resource_node_name=node)
+        return stmt.where(or_(Artifact.location.ilike(pattern), tag_match)).order_by(Artifact.id)
+
+    def search_artifacts(self, query: str, node: str = None, limit: int = 100, offset: int = 0) -> List[Dict]:
+        """
+        Search artifacts by location and by tag names/values.
+        Args:
+            query: text to search for, e.g., "train" or "images/cat".
+            node: only return artifacts recorded by the resource node with this name.
+            limit: maximum number of results to return.
+            offset: number of results to skip (used for pagination).
+        Returns:
+            List[Dict]: entries in the same format as get_entries(), each with an additional "tags" dictionary.
+        """
+
+        with self.get_session() as session:
+            stmt = self._search_statement(query, node=node).limit(limit).offset(offset)
+            result = session.execute(stmt).all()
+
+            artifact_ids = [row.id for row in result]
+            tags = {artifact_id: {} for artifact_id in artifact_ids}
+            if len(artifact_ids) > 0:
+                tag_stmt = (
+                    select(artifact_tags.c.artifact_id, Tag.tag_name, Tag.tag_value)
+                    .join(Tag, artifact_tags.c.tag_id == Tag.id)
+                    .where(artifact_tags.c.artifact_id.in_(artifact_ids))
+                )
+                for artifact_id, tag_name, tag_value in session.execute(tag_stmt):
+                    tags[artifact_id][tag_name] = tag_value
+
+            return [
+                {
+                    "id": row.id,
+                    "run_id": row.run_id,
+                    "location": row.location,
+                    "created_at": row.created_at,
+                    "state": row.state,
+                    "hash": row.hash,
+                    "hash_algorithm": row.hash_algorithm,
+                    "size": row.size,
+                    "content_type": row.content_type,
+                    "node_name": row.node_name,
+                    "tags": tags[row.id],
+                }
+                for row in result
+            ]
+
+    def _resolve_artifact_id(self, session: Session, artifact: Union[int, str], node: str = None) -> int:
+        if isinstance(artifact, int):
+            stmt = select(Artifact.id).where(Artifact.id == artifact)
+        else:
+            stmt = select(Artifact.id).where(Artifact.location == artifact)
+            if node is not None:
+                stmt = stmt.join(Node, Artifact.node_id == Node.id).where(Node.node_name == node)
+
+        artifact_id = session.execute(stmt.order_by(Artifact.id).limit(1)).scalar()
+        if artifact_id is None:
+            raise ValueError(f"Artifact '{artifact}' does not exist.")
+        return artifact_id
+
+    def get_lineage(self, artifact: Union[int, str], direction: str = "downstream", depth: int = None, node: str = None) -> Dict[str, List[Dict]]:
+        """
+        Get the runs and artifacts upstream or downstream of an artifact.
+        The lineage graph is walked with a single recursive query (WITH RECURSIVE) over the lineage_edges table.
+
+        Args:
+            artifact: id or location of the artifact to start from.
+            direction: "downstream" returns the runs that used the artifact, the artifacts those runs produced, the runs that used those artifacts, etc.
+                       "upstream" returns the run that produced the artifact, the artifacts that run used, the runs that produced those artifacts, etc.
+            depth: maximum number of run hops to follow; None follows the lineage all the way.
+            node: name of the resource node the artifact belongs to, used to disambiguate locations recorded by several nodes.
+        Returns:
+            Dict[str, List[Dict]]: 
+                "runs": list of {"run_id", "depth"}, 
+                "artifacts": entries in the same format as get_entries(), each with an additional "depth".
+                depth is the number of run hops between the starting artifact and the run or artifact.
+        """
+
+        valid_directions = {"upstream", "downstream"}
+        if direction not in valid_directions:
+            raise ValueError(f"Invalid direction: '{direction}'. Must be one of {valid_directions}")
+        if depth is not None and depth < 1:
+            raise ValueError(f"Invalid depth: {depth}. Must be a positive integer or None")
+
+        # downstream: artifact -(input edge)-> run -(output edge)-> artifact; upstream follows the same edges in reverse
+        from_direction, to_direction = ("input", "output") if direction == "downstream" else ("output", "input")
+
+        with self.get_session() as session:
+            artifact_id = self._resolve_artifact_id(session, artifact, node=node)
+
+            if depth is None:
+                # every hop moves to a different run, so a path can never be longer than the number of runs;
+                # bounding the recursion this way also guarantees termination if the graph contains a cycle
+                depth = session.execute(select(func.count(Run.run_id))).scalar() or 1
+
+            from_edge = LineageEdge.__table__.alias("from_edge")
+            to_edge = LineageEdge.__table__.alias("to_edge")
+
+            # anchor: the runs directly connected to the starting artifact
+            lineage = (
+                select(
+                    from_edge.c.run_id.label("run_id"),
+                    to_edge.c.artifact_id.label("artifact_id"),
+                    literal(1).label("depth"),
+                )
+                .select_from(from_edge)
+                .outerjoin(
+                    to_edge, 
+                    and_(
+                        to_edge.c.run_id == from_edge.c.run_id, 
+                        to_edge.c.direction == to_direction,
+                        to_edge.c.artifact_id != from_edge.c.artifact_id
+                    )
+                )
+                .where(from_edge.c.artifact_id == artifact_id, from_edge.c.direction == from_direction)
+                .cte("lineage", recursive=True)
+            )
+
+            # recursive step: the runs connected to the artifacts found in the previous step, and the artifacts on the other side of those runs
+            next_from_edge = LineageEdge.__table__.alias("next_from_edge")
+            next_to_edge = LineageEdge.__table__.alias("next_to_edge")
+            lineage = lineage.union(
+                select(
+                    next_from_edge.c.run_id,
+                    next_to_edge.c.artifact_id,
+                    lineage.c.depth + 1,
+                )
+                .select_from(lineage)
+                .join(
+                    next_from_edge, 
+                    and_(
+                        next_from_edge.c.artifact_id == lineage.c.artifact_id, 
+                        next_from_edge.c.direction == from_direction,
+                        next_from_edge.c.run_id != lineage.c.run_id
+                    )
+                )
+                .outerjoin(
+                    next_to_edge, 
+                    and_(
+                        next_to_edge.c.run_id == next_from_edge.c.run_id, 
+                        next_to_edge.c.direction == to_direction,
+                        next_to_edge.c.artifact_id != next_from_edge.c.artifact_id
+                    )
+                )
+                .where(lineage.c.depth < depth)
+            )
+
+            run_stmt = (
+                select(lineage.c.run_id, func.min(lineage.c.depth).label("depth"))
+                .group_by(lineage.c.run_id)
+                .order_by("depth", lineage.c.run_id)
+            )
+            runs = [{"run_id": row.run_id, "depth": row.depth} for row in session.execute(run_stmt)]
+
+            artifact_depths = (
+                select(lineage.c.artifact_id, func.min(lineage.c.depth).label("depth"))
+                .where(lineage.c.artifact_id.is_not(None), lineage.c.artifact_id != artifact_id)
+                .group_by(lineage.c.artifact_id)
+                .subquery()
+            )
+            artifact_stmt = (
+                self._entries_statement()
+                .add_columns(artifact_depths.c.depth)
+                .join(artifact_depths, artifact_depths.c.artifact_id == Artifact.id)
+                .order_by(artifact_depths.c.depth, Artifact.id)
+            )
+            artifacts = [
+                {**dict(zip(ARTIFACT_COLUMNS, row[:len(ARTIFACT_COLUMNS)])), "depth": row.depth} 
+                for row in session.execute(artifact_stmt)
+            ]
+
+            return {"runs": runs, "artifacts": artifacts}
+
+    def iter_table_batches(
+        self, table_name: str, min_run_id: int = None, max_run_id: int = None, chunk_size: int = 50_000
+    ) -> Iterator[Any]:
+        """
+        Stream the rows of a metadata store table as pyarrow.RecordBatch objects of at most chunk_size rows.
+        If min_run_id and/or max_run_id are given, only rows belonging to runs in [min_run_id, max_run_id] are returned
+        (the nodes table is always returned in full).
+        """
+
+        # a consumer such as a StreamingResponse may advance this generator from different threads,
+        # so it uses its own session from the sessionmaker rather than the thread-local scoped session
+        session: Session = self._ScopedSession.session_factory()
+        try:
+            yield from iter_record_batches(session, table_name, min_run_id=min_run_id, max_run_id=max_run_id, chunk_size=chunk_size)
+        finally:
+            session.close()
+
+    def export_table(
+        self, table_name: str, path: str, min_run_id: int = None, max_run_id: int = None, 
+        chunk_size: int = 50_000, format: str = "parquet"
+    ) -> int:
+        """
+        Export a metadata store table to a Parquet file (format="parquet") or an Arrow IPC file (format="arrow").
+        Rows are streamed from the database in chunks of chunk_size rows, so memory usage does not grow with the size of the table.
+        Returns the number of rows exported.
+        """
+
+        batches = self.iter_table_batches(table_name, min_run_id=min_run_id, max_run_id=max_run_id, chunk_size=chunk_size)
+        num_rows = write_record_batches(batches, table_name, path, format=format)
+        self.log("Node %s exported %s rows from table '%s' to %s", "INFO", self.name, num_rows, table_name, path)
+        return num_rows
+
+    def export_tables(
+        self, directory: str, min_run_id: int = None, max_run_id: int = None, 
+        chunk_size: int = 50_000, format: str = "parquet"
+    ) -> Dict[str, str]:
+        """
+        Export every metadata store table into directory, one file per table (e.g., directory/metrics.parquet).
+        Returns a dictionary mapping each table name to the path of its file.
+        """
+
+        os.makedirs(directory, exist_ok=True)
+        extension = "parquet" if format == "parquet" else "arrow"
+
+        paths = {}
+        for table_name in EXPORT_TABLES:
+            path = os.path.join(directory, f"{table_name}.{extension}")
+            self.export_table(table_name, path, min_run_id=min_run_id, max_run_id=max_run_id, chunk_size=chunk_size, format=format)
+            paths[table_name] = path
+        return paths
+
+    def import_table(self, table_name: str, path: str = None, batches: Iterator[Any] = None, chunk_size: int = 50_000) -> int:
+        """
+        Bulk insert rows into a metadata store table from a Parquet/Arrow file (path) or from an iterator of pyarrow.RecordBatch objects (batches).
+        Primary keys are preserved, so importing into an empty store creates an exact replica; importing rows that already exist raises an error.
+        All rows are inserted inside a single transaction. Returns the number of rows imported.
+        """
+
+        if (path is None) == (batches is None):
+            raise ValueError("Exactly one of path or batches must be provided.")
+
+        if path is not None:
+            batches = read_record_batches(path, chunk_size=chunk_size)
+
+        with self.transaction():
+            with self.get_session() as session:
+                num_rows = insert_record_batches(session, table_name, batches)
+
+            if table_name == "nodes":
+                self.notify_change("node_added", node_name=None)
+            elif table_name == "artifacts":
+                self.notify_change("entries_changed", node_name=None)
+
+            # bulk imports are not described row by row; replicas reload their tables instead
+            self.notify_change("rows_reset", table=table_name)
+
+        self.log("Node %s imported %s rows into table '%s'", "INFO", self.name, num_rows, table_name)
+        return num_rows
+
+    def import_tables(self, directory: str, chunk_size: int = 50_000) -> Dict[str, int]:
+        """
+        Import every table file found in directory (as written by export_tables()) inside a single transaction.
+        Returns a dictionary mapping each imported table name to the number of rows imported.
+        """
+
+        num_rows = {}
+        with self.transaction():
+            for table_name in EXPORT_TABLES:
+                for extension in ("parquet", "arrow"):
+                    path = os.path.join(directory, f"{table_name}.{extension}")
+                    if os.path.exists(path):
+                        num_rows[table_name] = self.import_table(table_name, path=path, chunk_size=chunk_size)
+                        break
+        return num_rows
@@ -2,11 +2,54 @@ from typing import List, Union
 from logging import Logger
 import os
 
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, text, Integer, Float
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.engine import Engine
 
 from anacostia_pipeline.nodes.metadata.sql.node import BaseSQLMetadataStoreNode
-from anacostia_pipeline.nodes.metadata.sql.models import Base   # This is our declarative base
+from anacostia_pipeline.nodes.metadata.sql.models import Base, Artifact   # This is our declarative base
+
+
+
+# Full-text index over artifact locations and tags. 
+# The rowid of each row in artifact_search is the id of the artifact it indexes; 
+# the tags column holds the names and values of all tags attached to the artifact.
+# The triggers keep the index in sync with every write to the artifacts and artifact_tags tables 
+# (create_entry, merge_artifacts_table, tag_artifact, import_table, etc.).
+ARTIFACT_TAGS_TEXT = """
+    (SELECT group_concat(tags.tag_name || ' ' || coalesce(tags.tag_value, ''), ' ') 
+     FROM tags JOIN artifact_tags ON artifact_tags.tag_id = tags.id 
+     WHERE artifact_tags.artifact_id = {artifact_id})
+"""
+
+SEARCH_INDEX_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS artifact_search USING fts5(location, tags)",
+    """
+    CREATE TRIGGER IF NOT EXISTS artifact_search_insert AFTER INSERT ON artifacts BEGIN
+        INSERT INTO artifact_search(rowid, location, tags) VALUES (new.id, new.location, '');
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS artifact_search_update AFTER UPDATE OF location ON artifacts BEGIN
+        UPDATE artifact_search SET location = new.location WHERE rowid = new.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS artifact_search_delete AFTER DELETE ON artifacts BEGIN
+        DELETE FROM artifact_search WHERE rowid = old.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS artifact_search_tag_insert AFTER INSERT ON artifact_tags BEGIN
+        UPDATE artifact_search SET tags = {ARTIFACT_TAGS_TEXT.format(artifact_id="new.artifact_id")} WHERE rowid = new.artifact_id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS artifact_search_tag_delete AFTER DELETE ON artifact_tags BEGIN
+        UPDATE artifact_search SET tags = coalesce({ARTIFACT_TAGS_TEXT.format(artifact_id="old.artifact_id")}, '') WHERE rowid = old.artifact_id;
+    END
+    """,
+]
 
 
 class SQLiteMetadataStoreNode(BaseSQLMetadataStoreNode):
@@ -50,6 +93,66 @@ class SQLiteMetadataStoreNode(BaseSQLMetadataStoreNode):
         # Create all tables in the engine (this is equivalent to "Create Table" statements in raw SQL).
         Base.metadata.create_all(bind=engine)
 
+        # create_all() does not add new indexes to tables that already exist, so create them explicitly for older databases
+        for index in Artifact.__table__.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+        self.create_search_index(engine)
+
         # Create a sessionmaker, binding it to the engine
         self.session_factory = sessionmaker(bind=engine, expire_on_commit=False)
-        self.init_scoped_session(self.session_factory)
\ No newline at end of file
+        self.init_scoped_session(self.session_factory)
+
+    def create_search_index(self, engine: Engine) -> None:
+        """
+        Create the FTS5 full-text index over artifact locations and tags (and the triggers that keep it in sync).
+        If the index is created for a database that already has artifacts, the index is populated from the existing rows.
+        """
+
+        with engine.begin() as conn:
+            index_exists = conn.execute(
+                text("SELECT count(*) FROM sqlite_master WHERE type = 'table' AND name = 'artifact_search'")
+            ).scalar() > 0
+
+            for statement in SEARCH_INDEX_DDL:
+                conn.execute(text(statement))
+
+            if index_exists is False:
+                self._populate_search_index(conn)
+
+    def rebuild_search_index(self) -> None:
+        """Drop and repopulate the contents of the full-text index from the artifacts and tags tables."""
+        with self.get_session() as session:
+            session.execute(text("DELETE FROM artifact_search"))
+            self._populate_search_index(session)
+
+    def _populate_search_index(self, conn) -> None:
+        conn.execute(
+            text(
+                f"""
+                INSERT INTO artifact_search(rowid, location, tags) 
+                SELECT artifacts.id, artifacts.location, coalesce({ARTIFACT_TAGS_TEXT.format(artifact_id="artifacts.id")}, '') 
+                FROM artifacts
+                """
+            )
+        )
+
+    def _search_statement(self, query: str, node: str = None):
+        """Search the FTS5 index; results are ordered by relevance (bm25)."""
+
+        # quote every term so characters like '/', '.', and '-' in file paths are not parsed as FTS5 syntax;
+        # the last term is matched as a prefix so partially typed words still match
+        terms = ['"' + term.replace('"', '""') + '"' for term in query.split()]
+        if len(terms) == 0:
+            return super()._search_statement(query, node=node)
+        terms[-1] = terms[-1] + "*"
+
+        matches = (
+            text("SELECT rowid AS artifact_id, rank FROM artifact_search WHERE artifact_search MATCH :match_query")
+            .bindparams(match_query=" ".join(terms))
+            .columns(artifact_id=Integer, rank=Float)
+            .subquery()
+        )
+
+        stmt = self._entries_statement(resource_node_name=node)
+        return stmt.join(matches, matches.c.artifact_id == Artifact.id).order_by(matches.c.rank)
@@ -0,0 +1,147 @@
+from typing import List, Dict, Any, Iterable, Sequence, Tuple
+from array import array
+from datetime import datetime
+
+
+
+# columns of an artifact entry, in the order they are returned by get_entries()
+ARTIFACT_COLUMNS = (
+    "id", "run_id", "location", "created_at", "state", "hash", "hash_algorithm", "size", "content_type", "node_name"
+)
+
+# integer columns that can be packed into array.array('q', ...) when they contain no NULLs
+INTEGER_ARTIFACT_COLUMNS = {"id", "run_id", "size"}
+
+ARRAY_TYPES = ("list", "array", "numpy", "arrow")
+
+
+class ArtifactRow:
+    """
+    Compact, read-only view of a single artifact entry.
+    ArtifactRow uses __slots__ instead of a per-row __dict__, so iterating over millions of entries costs a fraction of the memory of dicts.
+    Columns that were not requested are set to None.
+    Rows support attribute access (row.location) as well as dictionary-style access (row["location"])
+    so they can be used in place of the dictionaries returned by get_entries().
+    """
+
+    __slots__ = ARTIFACT_COLUMNS
+
+    def __init__(self, **kwargs) -> None:
+        for column in ARTIFACT_COLUMNS:
+            object.__setattr__(self, column, kwargs.get(column))
+
+    @classmethod
+    def from_values(cls, columns: Sequence[str], values: Sequence[Any]) -> "ArtifactRow":
+        row = cls.__new__(cls)
+        for column in ARTIFACT_COLUMNS:
+            object.__setattr__(row, column, None)
+        for column, value in zip(columns, values):
+            object.__setattr__(row, column, value)
+        return row
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("ArtifactRow is read-only")
+
+    def __getitem__(self, column: str) -> Any:
+        if column not in ARTIFACT_COLUMNS:
+            raise KeyError(column)
+        return getattr(self, column)
+
+    def __repr__(self) -> str:
+        return f"ArtifactRow({', '.join(f'{column}={getattr(self, column)!r}' for column in ARTIFACT_COLUMNS)})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {column: getattr(self, column) for column in ARTIFACT_COLUMNS}
+
+
+def validate_artifact_columns(columns: Iterable[str] = None) -> Tuple[str]:
+    """
+    Validate the requested artifact columns and return them as a tuple.
+    If columns is None, all artifact columns are returned.
+    """
+
+    if columns is None:
+        return ARTIFACT_COLUMNS
+
+    columns = tuple(columns)
+    invalid_columns = [column for column in columns if column not in ARTIFACT_COLUMNS]
+    if len(invalid_columns) > 0:
+        raise ValueError(f"Invalid artifact columns: {invalid_columns}. Must be a subset of {ARTIFACT_COLUMNS}")
+    return columns
+
+
+def rows_to_columns(rows: Sequence[Sequence[Any]], columns: Sequence[str], array_type: str = "list") -> Dict[str, Any]:
+    """
+    Transpose a sequence of row tuples into a dictionary of column arrays.
+
+    Args:
+        rows: sequence of tuples, each tuple holds the values of one row in the order given by columns.
+        columns: names of the columns.
+        array_type: container used for each column:
+            - "list": plain Python lists (default).
+            - "array": array.array('q') for integer columns without NULLs, lists for everything else.
+            - "numpy": numpy arrays (requires numpy).
+            - "arrow": pyarrow arrays (requires pyarrow).
+    """
+
+    if array_type not in ARRAY_TYPES:
+        raise ValueError(f"Invalid array_type: '{array_type}'. Must be one of {ARRAY_TYPES}")
+
+    # zip(*rows) does the transpose in C, so no intermediate per-row objects are created
+    if len(rows) > 0:
+        transposed = [list(column_values) for column_values in zip(*rows)]
+    else:
+        transposed = [[] for _ in columns]
+
+    if array_type == "list":
+        return dict(zip(columns, transposed))
+
+    if array_type == "array":
+        result = {}
+        for column, values in zip(columns, transposed):
+            if column in INTEGER_ARTIFACT_COLUMNS and None not in values:
+                result[column] = array("q", values)
+            else:
+                result[column] = values
+        return result
+
+    if array_type == "numpy":
+        try:
+            import numpy as np
+        except ImportError:
+            raise ImportError("array_type='numpy' requires numpy; install it with `pip install numpy`")
+
+        result = {}
+        for column, values in zip(columns, transposed):
+            if column in INTEGER_ARTIFACT_COLUMNS and None not in values:
+                result[column] = np.array(values, dtype=np.int64)
+            else:
+                result[column] = np.array(values, dtype=object)
+        return result
+
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise ImportError("array_type='arrow' requires pyarrow; install it with `pip install pyarrow`")
+
+    return {column: pa.array(values) for column, values in zip(columns, transposed)}
+
+
+def entries_to_columns(entries: List[Dict], columns: Sequence[str], array_type: str = "list") -> Dict[str, Any]:
+    """Convert a list of entry dictionaries (as returned by get_entries()) into a dictionary of column arrays."""
+    rows = [tuple(entry.get(column) for column in columns) for entry in entries]
+    return rows_to_columns(rows, columns, array_type=array_type)
+
+
+def encode_json_value(value: Any) -> Any:
+    """json.dumps() default hook that encodes datetimes as {"$datetime": "<ISO 8601 string>"}."""
+    if isinstance(value, datetime):
+        return {"$datetime": value.isoformat()}
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def decode_json_object(obj: Dict) -> Any:
+    """json.loads() object hook that decodes the datetimes encoded by encode_json_value()."""
+    if len(obj) == 1 and "$datetime" in obj:
+        return datetime.fromisoformat(obj["$datetime"])
+    return obj
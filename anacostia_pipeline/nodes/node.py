@@ -1,15 +1,18 @@
 from __future__ import annotations
-from threading import Thread, Lock, Event
-from queue import Queue
-from typing import List, Union, Dict
+from threading import Thread, Event
+from typing import List, Union, Dict, Collection
 from logging import Logger
 from datetime import datetime
 from functools import wraps
 import traceback
-import json
+import inspect
 import httpx
 
 from anacostia_pipeline.utils.constants import Status, Result
+from anacostia_pipeline.utils.latch import CountdownLatch
+from anacostia_pipeline.utils.status_bus import StatusBus
+from anacostia_pipeline.utils.run_context import current_run_id
+from anacostia_pipeline.utils.log import log_to_loggers, is_enabled_for
 from anacostia_pipeline.nodes.utils import NodeModel
 from anacostia_pipeline.nodes.gui import BaseGUI
 from anacostia_pipeline.nodes.connector import Connector
@@ -57,7 +60,7 @@ class BaseNode(Thread):
             loggers (Union[Logger, List[Logger]], optional): Logger or list of loggers for logging. Defaults to None.
         """
 
-        self._status_lock = Lock()
+        self._status: Status | None = None
         self.client_url = client_url
         self.wait_for_connection = wait_for_connection
         
@@ -71,32 +74,55 @@ class BaseNode(Thread):
         
         self.predecessors = list() if predecessors is None else predecessors
         self.remote_predecessors = list() if remote_predecessors is None else remote_predecessors
-        self.predecessors_events: Dict[str, Event] = {predecessor.name: Event() for predecessor in self.predecessors}
+        # arrivals of the signals from the predecessors (keyed by local node name or remote node url) and the successors for the current run
+        self.predecessors_latch = CountdownLatch((predecessor.name for predecessor in self.predecessors), name="predecessors_latch", log=self.log)
 
         self.successors: List[BaseNode] = list()
         self.remote_successors = list() if remote_successors is None else remote_successors
-        self.successor_events: Dict[str, Event] = {url: Event() for url in self.remote_successors}
+        self.successors_latch = CountdownLatch(self.remote_successors, name="successors_latch", log=self.log)
 
-        # add node to each predecessor's successors list and create an event for each predecessor's successor_events
+        # when several runs are in flight, successors signal that they are ready for the next run (see run_concurrency)
+        self.run_concurrency = 1
+        self.ready_latch = CountdownLatch(self.remote_successors, name="ready_latch", log=self.log)
+
+        # add node to each predecessor's successors list and to the parties of each predecessor's successors_latch
         for predecessor in self.predecessors:
             predecessor.successors.append(self)
-            predecessor.successor_events[name] = Event()
+            predecessor.successors_latch.add_party(name)
+            predecessor.ready_latch.add_party(name)
 
         self.exit_event = Event()
         self.pause_event = Event()
         self.connection_event = Event()
         self.pause_event.set()
-        self.queue: Queue | None = None
+        self.status_bus: StatusBus | None = None
+        self._status_slot: int | None = None
         self.gui: BaseGUI | None = None
         self.node_server: BaseServer | None = None
         self.connector: Connector | None = None
 
         super().__init__(name=name)
     
+    def set_run_concurrency(self, run_concurrency: int) -> None:
+        """
+        Set the maximum number of runs in flight at once (see Pipeline's run_concurrency argument).
+        With run_concurrency > 1, the node hands a run to its successors as soon as they are ready for it
+        instead of waiting for the previous run to finish (see run_pipelined()).
+        """
+        if run_concurrency < 1:
+            raise ValueError(f"run_concurrency must be at least 1, got {run_concurrency}")
+
+        self.run_concurrency = run_concurrency
+        for latch in (self.predecessors_latch, self.successors_latch, self.ready_latch):
+            latch.set_max_pending(run_concurrency)
+
+    def is_pipelined(self) -> bool:
+        return self.run_concurrency > 1
+
     def add_remote_predecessor(self, url: str):
         if url not in self.remote_predecessors:
             self.remote_predecessors.append(url)
-            self.predecessors_events[url] = Event()
+            self.predecessors_latch.add_party(url)
 
     def setup_connector(
         self, host: str, port: int, ssl_keyfile: str = None, ssl_certfile: str = None, ssl_ca_certs: str = None
@@ -137,111 +163,144 @@ class BaseNode(Thread):
         else:
             self.loggers.extend(loggers)
 
-    def log(self, message: str, level="DEBUG") -> None:
-        if len(self.loggers) > 0:
-            for logger in self.loggers:
-                if level == "DEBUG":
-                    logger.debug(message)
-                elif level == "INFO":
-                    logger.info(message)
-                elif level == "WARNING":
-                    logger.warning(message)
-                elif level == "ERROR":
-                    logger.error(message)
-                elif level == "CRITICAL":
-                    logger.critical(message)
-                else:
-                    raise ValueError(f"Invalid log level: {level}")
-        else:
-            print(message)
+    def log(self, message: str, level="DEBUG", *args, **fields) -> None:
+        """
+        Log a message to the node's loggers without blocking the node (the loggers' handlers run on a background thread, see LogListener).
+        The message is %-formatted with args only if a logger is enabled for the level, e.g., self.log("started run %s", "INFO", run_id).
+        Records carry the node, run_id and phase fields (phase is the node's status by default); keyword arguments override them.
+        """
+        if is_enabled_for(self.loggers, level) is False:
+            return
+
+        log_to_loggers(
+            self.loggers, message, level, args, 
+            {"node": self.name, "run_id": self.log_run_id(), "phase": repr(self._status) if self._status is not None else None, **fields}
+        )
+
+    def log_run_id(self) -> int | None:
+        """Return the id of the run the node is working on, for the run_id field of the node's log records."""
+        run_id = current_run_id()
+        return run_id if run_id is not None else self.predecessors_latch.run_id
 
     @property
     def status(self):
-        while not self.exit_event.is_set():
-            with self._status_lock:
-                return self._status
+        if self.exit_event.is_set():
+            return None
+        return self._status
 
     @status.setter
     def status(self, value: Status):
-        while not self.exit_event.is_set():
-            with self._status_lock:
-                self._status = value
-
-                # if pipeline app has set the queue, send a message to the queue when the status changes
-                if self.queue is not None:
-                    data = {
-                        "id": self.name,
-                        "status": repr(value)
-                    }
+        if self.exit_event.is_set():
+            return
 
-                    self.queue.put_nowait(
-                        {
-                            "event": "WorkUpdate",
-                            "data": json.dumps(data)
-                        }
-                    )
+        self._status = value
 
-                break
+        # if the pipeline app has set the status bus, publish the new status (cheap; consumers read the bus at their own pace)
+        if self.status_bus is not None:
+            self.status_bus.publish(self._status_slot, value)
 
-    def set_queue(self, queue: Queue):
-        self.queue = queue
+    def set_status_bus(self, status_bus: StatusBus):
+        self.status_bus = status_bus
+        self._status_slot = status_bus.register(self.name)
+        if self._status is not None:
+            status_bus.publish(self._status_slot, self._status)
 
     def log_exception(func):
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_log_exception_wrapper(self: BaseNode, *args, **kwargs):
+                try:
+                    return await func(self, *args, **kwargs)
+                except Exception as e:
+                    self.log("Error in user-defined method '%s' of node '%s': %s", "ERROR", func.__name__, self.name, traceback.format_exc())
+                    return
+            return async_log_exception_wrapper
+
         @wraps(func)
         def log_exception_wrapper(self: BaseNode, *args, **kwargs):
             try: 
                 ret = func(self, *args, **kwargs)
                 return ret
             except Exception as e:
-                self.log(f"Error in user-defined method '{func.__name__}' of node '{self.name}': {traceback.format_exc()}", level="ERROR")
+                self.log("Error in user-defined method '%s' of node '%s': %s", "ERROR", func.__name__, self.name, traceback.format_exc())
                 return
         return log_exception_wrapper
     
-    def signal_successors(self, result: Result):
+    def signal_successors(self, result: Result, run_id: int = None, skip: Collection[str] = ()):
+        """
+        Signal the successors to start the run; 
+        the successors in skip (local node names or remote node urls) are told that they are skipped in the run (see Status.SKIPPED).
+        """
         # self.log(f"'{self.name}' signaling local successors", level="INFO")
         if len(self.successors) > 0:
             for successor in self.successors:
-                successor.predecessors_events[self.name].set()
+                successor.predecessors_latch.arrive(self.name, run_id, skip=successor.name in skip)
 
         # self.log(f"'{self.name}' signaling remote successors", level="INFO")
         try:
-            self.connector.signal_remote_successors()
-            self.log(f"'{self.name}' finished signalling remote successors", level="INFO")
+            self.connector.signal_remote_successors(run_id=run_id, skip=skip)
+            self.log("'%s' finished signalling remote successors", "INFO", self.name)
         except httpx.ConnectError:
-            self.log(f"'{self.name}' failed to signal successors from {self.name}", level="ERROR")
+            self.log("'%s' failed to signal successors from %s", "ERROR", self.name, self.name)
             self.exit()
 
-    def wait_for_successors(self):
-        # self.log(f"'{self.name}' waiting for successors", level="INFO")
-        for event in self.successor_events.values():
-            event.wait()
-        
-        # self.log(f"'{self.name}' finished waiting for successors", level="INFO")
-        for event in self.successor_events.values():
-            event.clear()
+    def wait_for_successors(self, timeout: float = None) -> bool:
+        """
+        Wait for every successor to signal that it has finished the current run.
+        Returns False if the timeout (in seconds) expired first; the successors that have not signalled are logged.
+        """
+        if self.successors_latch.wait(timeout=timeout) is False:
+            self.log("'%s' timed out waiting for successors %s", "WARNING", self.name, self.successors_latch.pending())
+            return False
+        return True
     
-    def signal_predecessors(self, result: Result):
+    def signal_predecessors(self, result: Result, run_id: int = None):
         # self.log(f"'{self.name}' signaling local predecessors", level="INFO")
         if len(self.predecessors) > 0:
             for predecessor in self.predecessors:
-                predecessor.successor_events[self.name].set()
+                predecessor.successors_latch.arrive(self.name, run_id)
         
         # self.log(f"'{self.name}' signaling remote predecessors", level="INFO")
         try:
-            self.connector.signal_remote_predecessors()
-            self.log(f"'{self.name}' finished signalling remote predecessors", level="INFO")
+            self.connector.signal_remote_predecessors(run_id=run_id)
+            self.log("'%s' finished signalling remote predecessors", "INFO", self.name)
         except httpx.ConnectError:
-            self.log(f"'{self.name}' failed to signal remote predecessors", level="ERROR")
+            self.log("'%s' failed to signal remote predecessors", "ERROR", self.name)
             self.exit()
 
-    def wait_for_predecessors(self):
-        # self.log(f"'{self.name}' waiting for predecessors", level="INFO")
-        for event in self.predecessors_events.values():
-            event.wait()
-        
-        #self.log(f"'{self.name}' finished waiting for predecessors", level="INFO")
-        for event in self.predecessors_events.values():
-            event.clear()
+    def signal_predecessors_ready(self, run_id: int = None):
+        """Signal the predecessors that the node has taken the given run and is ready for the next one (used when runs are pipelined)."""
+        for predecessor in self.predecessors:
+            predecessor.ready_latch.arrive(self.name, run_id)
+
+        try:
+            self.connector.signal_remote_predecessors(ready=True, run_id=run_id)
+        except httpx.ConnectError:
+            self.log("'%s' failed to signal remote predecessors", "ERROR", self.name)
+            self.exit()
+
+    def wait_for_successors_ready(self, timeout: float = None) -> bool:
+        """
+        Wait for every successor to signal that it is ready for the next run (used when runs are pipelined).
+        Returns False if the timeout (in seconds) expired first.
+        """
+        if self.ready_latch.wait(timeout=timeout) is False:
+            self.log("'%s' timed out waiting for successors %s to be ready", "WARNING", self.name, self.ready_latch.pending())
+            return False
+        return True
+
+    def has_successors(self) -> bool:
+        return len(self.successors_latch.parties) > 0
+
+    def wait_for_predecessors(self, timeout: float = None) -> bool:
+        """
+        Wait for every predecessor to signal the start of the next run.
+        Returns False if the timeout (in seconds) expired first; the predecessors that have not signalled are logged.
+        """
+        if self.predecessors_latch.wait(timeout=timeout) is False:
+            self.log("'%s' timed out waiting for predecessors %s", "WARNING", self.name, self.predecessors_latch.pending())
+            return False
+        return True
 
     def pause(self):
         self.status = Status.PAUSED
@@ -252,20 +311,17 @@ class BaseNode(Thread):
 
     def exit(self):
         # setting all events forces the loop to continue to the next checkpoint which will break out of the loop
-        self.log(f"Node '{self.name}' exiting at {datetime.now()}", level='INFO')
+        self.log("Node '%s' exiting at %s", "INFO", self.name, datetime.now())
         
-        # set all events so loop can continue to next checkpoint and break out of loop
+        # set all events and release the latches so loop can continue to next checkpoint and break out of loop
         self.connection_event.set()
         self.pause_event.set()
         self.exit_event.set()
+        self.successors_latch.release()
+        self.predecessors_latch.release()
+        self.ready_latch.release()
 
-        for event in self.successor_events.values():
-            event.set()
-
-        for event in self.predecessors_events.values():
-            event.set()
-
-        self.log(f"Node '{self.name}' exited at {datetime.now()}", level='INFO')
+        self.log("Node '%s' exited at %s", "INFO", self.name, datetime.now())
 
     @log_exception
     def setup(self) -> None:
@@ -1,11 +1,10 @@
 from typing import List, Union
 from logging import Logger
-import asyncio
 
 from fastapi import HTTPException
 from fastapi.responses import JSONResponse
 
-from anacostia_pipeline.nodes.api import BaseClient, BaseServer
+from anacostia_pipeline.nodes.api import BaseClient, BaseServer, client_coroutine
 
 
 
@@ -77,47 +76,49 @@ class BaseResourceClient(BaseClient):
             *args, **kwargs
         )
 
-    def get_num_artifacts(self, state: str = "all") -> int:
+    @client_coroutine
+    async def aget_num_artifacts(self, state: str = "all") -> int:
         """
         Get the number of artifacts in the storage directory.
         Returns:
             int: The number of artifacts in the storage directory.
         """
         
-        async def _get_num_artifacts(state: str):
-            try:
-                response = await self.client.get(f"/get_num_artifacts/?state={state}")
-                if response.status_code == 200:
-                    return response.json()["num_artifacts"]
-                else:
-                    self.log(f"Error: Received status code {response.status_code}", level="ERROR")
-                    raise HTTPException(status_code=response.status_code, detail=f"Error: {response.text}")
+        try:
+            response = await self.client.get(f"/get_num_artifacts/?state={state}")
+            if response.status_code == 200:
+                return response.json()["num_artifacts"]
+            else:
+                self.log("Error: Received status code %s", "ERROR", response.status_code)
+                raise HTTPException(status_code=response.status_code, detail=f"Error: {response.text}")
 
-            except Exception as e:
-                self.log(f"Error: An exception occurred while getting the number of artifacts: {str(e)}", level="ERROR")
-                raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+        except Exception as e:
+            self.log("Error: An exception occurred while getting the number of artifacts: %s", "ERROR", str(e))
+            raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
-        task = asyncio.run_coroutine_threadsafe(_get_num_artifacts(state), self.loop)
-        return task.result()
+    def get_num_artifacts(self, state: str = "all") -> int:
+        """Synchronous version of aget_num_artifacts."""
+        return self.run_sync(self.aget_num_artifacts(state))
 
-    def list_artifacts(self, state: str = "all") -> List[str]:
+    @client_coroutine
+    async def alist_artifacts(self, state: str = "all") -> List[str]:
         """
         List all artifacts in the storage directory.
         Returns:
             List[str]: A list of artifact names.
         """
 
-        async def _list_artifacts(state: str):
-            try:
-                response = await self.client.get(f"/list_artifacts/?state={state}")
-                if response.status_code == 200:
-                    return response.json()["artifacts"]
-                else:
-                    self.log(f"Error: Received status code {response.status_code}", level="ERROR")
-                    raise HTTPException(status_code=response.status_code, detail=f"Error: {response.text}")
-            except Exception as e:
-                self.log(f"Error: An exception occurred while listing artifacts: {str(e)}", level="ERROR")
-                raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
-        
-        task = asyncio.run_coroutine_threadsafe(_list_artifacts(state), self.loop)
-        return task.result()
\ No newline at end of file
+        try:
+            response = await self.client.get(f"/list_artifacts/?state={state}")
+            if response.status_code == 200:
+                return response.json()["artifacts"]
+            else:
+                self.log("Error: Received status code %s", "ERROR", response.status_code)
+                raise HTTPException(status_code=response.status_code, detail=f"Error: {response.text}")
+        except Exception as e:
+            self.log("Error: An exception occurred while listing artifacts: %s", "ERROR", str(e))
+            raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+
+    def list_artifacts(self, state: str = "all") -> List[str]:
+        """Synchronous version of alist_artifacts."""
+        return self.run_sync(self.alist_artifacts(state))
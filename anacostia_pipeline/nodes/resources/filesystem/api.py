@@ -7,6 +7,7 @@ import asyncio
 from fastapi import Request, HTTPException, Header
 from fastapi.responses import FileResponse, JSONResponse
 
+from anacostia_pipeline.nodes.api import client_coroutine
 from anacostia_pipeline.nodes.resources.api import BaseResourceServer, BaseResourceClient
 
 
@@ -31,12 +32,12 @@ class FilesystemStoreServer(BaseResourceServer):
 
         @self.get("/get_artifact/{filepath:path}", response_class=FileResponse)
         async def get_artifact(filepath: str):
-            self.log(f"Received request to get artifact: {filepath}", level="INFO")
+            self.log("Received request to get artifact: %s", "INFO", filepath)
             try:
                 # validate the file path exists
                 artifact_path = os.path.join(self.resource_path, filepath)
                 if os.path.exists(artifact_path) is False:
-                    self.log(f"Error: File not found - {artifact_path}", level="ERROR")
+                    self.log("Error: File not found - %s", "ERROR", artifact_path)
                     raise HTTPException(status_code=404, detail=f"Resource path not found: {artifact_path}")
 
                 # Compute SHA-256 hash of the file
@@ -44,11 +45,11 @@ class FilesystemStoreServer(BaseResourceServer):
                 headers = {"X-File-Hash": file_hash}
 
                 # Return the file as a response
-                self.log(f"Sending file: {artifact_path}", level="INFO")
+                self.log("Sending file: %s", "INFO", artifact_path)
                 return FileResponse(path=artifact_path, media_type="application/octet-stream", headers=headers)
 
             except HTTPException as e:
-                self.log(f"HTTPException: {str(e)}", level="ERROR")
+                self.log("HTTPException: %s", "ERROR", str(e))
                 raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
         
         @self.post("/upload_stream")
@@ -57,7 +58,7 @@ class FilesystemStoreServer(BaseResourceServer):
                 # Check if the file already exists
                 file_path = os.path.join(self.resource_path, x_filename)
                 if os.path.exists(file_path) is True:
-                    self.log(f"Error: File already exists: {file_path}", level="ERROR")
+                    self.log("Error: File already exists: %s", "ERROR", file_path)
                     raise HTTPException(status_code=409, detail=f"File already exists: {file_path}")
                 
                 # Create the directory if it doesn't exist
@@ -83,7 +84,7 @@ class FilesystemStoreServer(BaseResourceServer):
                         # Optional: Add progress logging here
                         if total_size:
                             progress = bytes_received / total_size * 100
-                            self.log(f"Received: {bytes_received/1024/1024:.2f}MB / {total_size/1024/1024:.2f}MB ({progress:.1f}%)", level="INFO")
+                            self.log("Received: %.2fMB / %.2fMB (%.1f%%)", "INFO", bytes_received/1024/1024, total_size/1024/1024, progress)
 
                 # Compute SHA-256 hash of the file
                 expected_hash = request.headers.get("x-file-hash")
@@ -93,7 +94,7 @@ class FilesystemStoreServer(BaseResourceServer):
                 # Verify file hash
                 actual_hash = self.node.hash_file(file_path)
                 if actual_hash != expected_hash:
-                    self.log(f"Hash mismatch! Expected: {expected_hash}, Actual: {actual_hash}", level="ERROR")
+                    self.log("Hash mismatch! Expected: %s, Actual: %s", "ERROR", expected_hash, actual_hash)
                     raise HTTPException(status_code=500, detail="Downloaded file hash mismatch")
 
                 # enter the uploaded file into the metadata store
@@ -155,7 +156,8 @@ class FilesystemStoreClient(BaseResourceClient):
                 sha256.update(chunk)
         return sha256.hexdigest()
     
-    def download_artifact(self, filepath: str) -> Any:
+    @client_coroutine
+    async def adownload_artifact(self, filepath: str) -> bool:
         """
         Download an artifact from the FilesystemStoreRPCserver on the root pipeline.
         Args:
@@ -165,47 +167,49 @@ class FilesystemStoreClient(BaseResourceClient):
             HTTPException: If the response code from /get_artifact is not 200.
         """
 
-        async def _get_artifact(local_filepath: str, filepath: str):
+        local_filepath = os.path.join(self.storage_directory, filepath)
 
+        try:
             # Stream the response to handle large files efficiently
             url = f"/get_artifact/{filepath}"
             async with self.client.stream("GET", url) as response:
                 if response.status_code != 200:
-                    self.log(f"Error in download_artifact: Server returned status code {response.status_code}", level="ERROR")
-                    self.log(f"Response: {await response.text()}", level="ERROR")
-                    raise HTTPException(status_code=response.status_code, detail=f"Error: Server returned status code {await response.text()}")
+                    text = (await response.aread()).decode(errors="replace")
+                    self.log("Error in download_artifact: Server returned status code %s", "ERROR", response.status_code)
+                    self.log("Response: %s", "ERROR", text)
+                    raise HTTPException(status_code=response.status_code, detail=f"Error: Server returned status code {text}")
                 
-                else:
-                    self.log(f"Downloading file from {url}...", level="INFO")
-
-                    # Create the file and write the content chunk by chunk
-                    with open(local_filepath, "wb") as f:
-                        async for chunk in response.aiter_bytes():
-                            f.write(chunk)
-                    
-                    # Get expected hash from header
-                    expected_hash = response.headers.get("x-file-hash")
-                    if not expected_hash:
-                        raise HTTPException(status_code=500, detail="Missing file hash in response headers")
-                    
-                    # Verify file hash
-                    actual_hash = self.hash_file(local_filepath)
-                    if actual_hash != expected_hash:
-                        self.log(f"Hash mismatch! Expected: {expected_hash}, Actual: {actual_hash}", level="ERROR")
-                        raise HTTPException(status_code=500, detail="Downloaded file hash mismatch")
-
-                    self.log(f"File downloaded successfully: {local_filepath}", level="INFO")
-                    return True
-            
-        try:
-            local_filepath = os.path.join(self.storage_directory, filepath)
-            asyncio.run_coroutine_threadsafe(_get_artifact(local_filepath, filepath), self.loop)
+                self.log("Downloading file from %s...", "INFO", url)
+
+                # Create the file and write the content chunk by chunk
+                with open(local_filepath, "wb") as f:
+                    async for chunk in response.aiter_bytes():
+                        f.write(chunk)
+                
+                # Get expected hash from header
+                expected_hash = response.headers.get("x-file-hash")
+                if not expected_hash:
+                    raise HTTPException(status_code=500, detail="Missing file hash in response headers")
+                
+            # Verify file hash; hashing is done off the event loop so other calls are not blocked while a large file is hashed
+            actual_hash = await asyncio.get_running_loop().run_in_executor(None, self.hash_file, local_filepath)
+            if actual_hash != expected_hash:
+                self.log("Hash mismatch! Expected: %s, Actual: %s", "ERROR", expected_hash, actual_hash)
+                raise HTTPException(status_code=500, detail="Downloaded file hash mismatch")
+
+            self.log("File downloaded successfully: %s", "INFO", local_filepath)
+            return True
 
         except Exception as e:
-            self.log(f"Error: An exception occurred while downloading the file: {str(e)}", level="ERROR")
+            self.log("Error: An exception occurred while downloading the file: %s", "ERROR", str(e))
             raise HTTPException(status_code=500, detail=f"Error: An exception occurred while downloading the file: {str(e)}")
 
-    def upload_artifact(self, filepath: str, remote_path: str = None):
+    def download_artifact(self, filepath: str) -> bool:
+        """Synchronous version of adownload_artifact."""
+        return self.run_sync(self.adownload_artifact(filepath))
+
+    @client_coroutine
+    async def aupload_artifact(self, filepath: str, remote_path: str = None) -> bool:
         """
         Upload a file back to the FilesystemStoreRPCserver on the root pipeline.
         Args:
@@ -223,7 +227,7 @@ class FilesystemStoreClient(BaseResourceClient):
 
         # Check if file exists
         if os.path.exists(filepath) is False:
-            self.log(f"Error: File not found - {filepath}", level="ERROR")
+            self.log("Error: File not found - %s", "ERROR", filepath)
             raise FileNotFoundError(f"File not found: {filepath}")
         
         filename = remote_path.lstrip("/")          # remove leading slash
@@ -231,9 +235,9 @@ class FilesystemStoreClient(BaseResourceClient):
         try:
             filesize = os.path.getsize(filepath)
 
-            self.log(f"Preparing to upload: {filename} ({filesize/1024/1024:.2f} MB)", level="INFO")
+            self.log("Preparing to upload: %s (%.2f MB)", "INFO", filename, filesize/1024/1024)
 
-            file_hash = self.hash_file(filepath)
+            file_hash = await asyncio.get_running_loop().run_in_executor(None, self.hash_file, filepath)
             
             # Set up headers with file metadata
             headers = {
@@ -250,34 +254,34 @@ class FilesystemStoreClient(BaseResourceClient):
                         yield chunk
 
                         # Optional: Add progress reporting
-                        self.log(f"Sent chunk: {len(chunk)/1024/1024:.2f} MB", level="INFO")
+                        self.log("Sent chunk: %.2f MB", "INFO", len(chunk)/1024/1024)
             
             # Send the file using streaming upload
-            async def _upload_file():
-                response = await self.client.post(
-                    f"/upload_stream",
-                    headers=headers,
-                    content=file_generator(),
-                    timeout=None  # Disable timeout for large uploads
-                )
-            
-                # self.log the response
-                if response.status_code == 200:
-                    self.log(f"Success: File {filename} sent successfully", level="INFO")
-                    response_data = response.json()
-                    self.log(f"remote storage path: {response_data['stored_path']}", level="INFO")
-                    return True
-                else:
-                    self.log(f"Error in upload_artifact: Received status code {response.status_code}", level="ERROR")
-                    self.log(f"Response: {response.text}", level="ERROR")
-                    raise HTTPException(status_code=response.status_code, detail=f"Error: {response.text}")
-                
-            # Run the upload in an async context
-            asyncio.run_coroutine_threadsafe(_upload_file(), self.loop)
+            response = await self.client.post(
+                f"/upload_stream",
+                headers=headers,
+                content=file_generator(),
+                timeout=None  # Disable timeout for large uploads
+            )
+        
+            # self.log the response
+            if response.status_code == 200:
+                self.log("Success: File %s sent successfully", "INFO", filename)
+                response_data = response.json()
+                self.log("remote storage path: %s", "INFO", response_data['stored_path'])
+                return True
+            else:
+                self.log("Error in upload_artifact: Received status code %s", "ERROR", response.status_code)
+                self.log("Response: %s", "ERROR", response.text)
+                raise HTTPException(status_code=response.status_code, detail=f"Error: {response.text}")
                 
         except Exception as e:
-            self.log(f"Error: An exception occurred while sending the file: {str(e)}", level="ERROR")
+            self.log("Error: An exception occurred while sending the file: %s", "ERROR", str(e))
             raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+
+    def upload_artifact(self, filepath: str, remote_path: str = None) -> bool:
+        """Synchronous version of aupload_artifact."""
+        return self.run_sync(self.aupload_artifact(filepath, remote_path=remote_path))
     
     # TODO: add the load_artifact method to BaseResourceRPCclient
     def load_artifact(self, filepath: str, load_fn: Callable[[str, Any], Any], *args, **kwargs) -> Any:
@@ -308,5 +312,5 @@ class FilesystemStoreClient(BaseResourceClient):
         try:
             return load_fn(artifact_save_path, *args, **kwargs)
         except Exception as e:
-            self.log(f"Failed to load artifact '{filepath}': {e}", level="ERROR")
+            self.log("Failed to load artifact '%s': %s", "ERROR", filepath, e)
             raise e
\ No newline at end of file
@@ -23,6 +23,7 @@ class DatasetRegistryNode(FilesystemStoreNode):
         client_url: str = None, 
         wait_for_connection: bool = False, 
         loggers: Union[Logger, List[Logger]] = None, 
+        spool_path: str = None
     ):
         super().__init__(
             name=name, 
@@ -36,7 +37,8 @@ class DatasetRegistryNode(FilesystemStoreNode):
             client_url=client_url, 
             wait_for_connection=wait_for_connection, 
             loggers=loggers, 
-            monitoring=False   # disable monitoring for the Croissant data store
+            monitoring=False,   # disable monitoring for the Croissant data store
+            spool_path=spool_path
         )
     
     def setup_node_GUI(self, host, port, ssl_keyfile = None, ssl_certfile = None, ssl_ca_certs = None):
@@ -82,5 +84,5 @@ class DatasetRegistryNode(FilesystemStoreNode):
                 self.tag_artifact(filepath=data_card_path, dataset_path=dataset_path)
 
         except Exception as e:
-            self.log(f"Failed to save data card {data_card_path}: {e}", level="ERROR")
+            self.log("Failed to save data card %s: %s", "ERROR", data_card_path, e)
             raise e
\ No newline at end of file
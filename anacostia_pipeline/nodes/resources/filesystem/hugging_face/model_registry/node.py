@@ -23,7 +23,8 @@ class HuggingFaceModelRegistryNode(FilesystemStoreNode):
         client_url: str = None, 
         wait_for_connection: bool = False, 
         loggers: Union[Logger, List[Logger]] = None, 
-        monitoring: bool = True
+        monitoring: bool = True,
+        spool_path: str = None
     ):
         super().__init__(
             name=name, 
@@ -37,7 +38,8 @@ class HuggingFaceModelRegistryNode(FilesystemStoreNode):
             client_url=client_url, 
             wait_for_connection=wait_for_connection, 
             loggers=loggers, 
-            monitoring=monitoring
+            monitoring=monitoring,
+            spool_path=spool_path
         )
     
     def save_model_card(self, model_path: str, model_card_path: str, card: ModelCard):
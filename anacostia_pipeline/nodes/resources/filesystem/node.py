@@ -33,7 +33,8 @@ class FilesystemStoreNode(BaseResourceNode, ABC):
         client_url: str = None,
         wait_for_connection: bool = False,
         loggers: Union[Logger, List[Logger]] = None, 
-        monitoring: bool = True
+        monitoring: bool = True,
+        spool_path: str = None
     ) -> None:
 
         # TODO: add max_old_samples functionality
@@ -60,7 +61,8 @@ class FilesystemStoreNode(BaseResourceNode, ABC):
             client_url=client_url,
             wait_for_connection=wait_for_connection,
             loggers=loggers, 
-            monitoring=monitoring
+            monitoring=monitoring,
+            spool_path=spool_path
         )
     
     def setup_node_GUI(self, host: str, port: int, ssl_keyfile: str = None, ssl_certfile: str = None, ssl_ca_certs: str = None) -> FilesystemStoreGUI:
@@ -85,7 +87,7 @@ class FilesystemStoreNode(BaseResourceNode, ABC):
     def start_monitoring(self) -> None:
 
         def _monitor_thread_func():
-            self.log(f"Starting observer thread for node '{self.name}'", level="INFO")
+            self.log("Starting observer thread for node '%s'", "INFO", self.name)
             while self.exit_event.is_set() is False:
                 for root, dirnames, filenames in os.walk(self.path):
                     for filename in filenames:
@@ -100,13 +102,13 @@ class FilesystemStoreNode(BaseResourceNode, ABC):
                             entry_exists = self.entry_exists(filepath) 
                             if entry_exists is False:
                                 self.record_new(filepath, hash=hash, hash_algorithm="sha256")
-                                self.log(f"detected file {filepath}", level="INFO")
+                                self.log("detected file %s", "INFO", filepath)
                         
                         except Exception as e:
-                            self.log(f"Unexpected error in monitoring logic for '{self.name}': {traceback.format_exc()}", level="ERROR")
+                            self.log("Unexpected error in monitoring logic for '%s': %s", "ERROR", self.name, traceback.format_exc())
 
                 if self.exit_event.is_set() is True: 
-                    self.log(f"Observer thread for node '{self.name}' exiting", level="INFO")
+                    self.log("Observer thread for node '%s' exiting", "INFO", self.name)
                     return
                 try:
                     self.resource_trigger()
@@ -115,7 +117,7 @@ class FilesystemStoreNode(BaseResourceNode, ABC):
                     pass
 
                 except Exception as e:
-                    self.log(f"Error checking resource in node '{self.name}': {traceback.format_exc()}", level="ERROR")
+                    self.log("Error checking resource in node '%s': %s", "ERROR", self.name, traceback.format_exc())
                     # Note: we continue here because we want to keep trying to check the resource until it is available
                     # with that said, we should add an option for the user to specify the number of times to try before giving up
                     # and throwing an exception
@@ -127,7 +129,7 @@ class FilesystemStoreNode(BaseResourceNode, ABC):
                 # sleep for a while before checking again
                 time.sleep(0.1)
 
-            self.log(f"Observer thread for node '{self.name}' exited", level="INFO")
+            self.log("Observer thread for node '%s' exited", "INFO", self.name)
 
         # since we are using asyncio.run, we need to create a new thread to run the event loop 
         # because we can't run an event loop in the same thread as the FilesystemStoreNode
@@ -276,7 +278,7 @@ class FilesystemStoreNode(BaseResourceNode, ABC):
             # Hash and record after the file is finalized
             file_hash = self.hash_file(artifact_path)
             self.record_produced_artifact(filepath, hash=file_hash, hash_algorithm="sha256")
-            self.log(f"Saved artifact to {artifact_path}", level="INFO")
+            self.log("Saved artifact to %s", "INFO", artifact_path)
 
         except Exception as e:
             # Best-effort cleanup of temp file on failure
@@ -284,11 +286,8 @@ class FilesystemStoreNode(BaseResourceNode, ABC):
                 try:
                     os.remove(tmp_path)
                 except Exception as cleanup_err:
-                    self.log(
-                        f"Cleanup warning: could not remove temp file '{tmp_path}': {cleanup_err}",
-                        level="WARNING",
-                    )
-            self.log(f"Failed to save artifact '{filepath}': {e}", level="ERROR")
+                    self.log("Cleanup warning: could not remove temp file '%s': %s", "WARNING", tmp_path, cleanup_err)
+            self.log("Failed to save artifact '%s': %s", "ERROR", filepath, e)
             raise
 
     @contextmanager
@@ -347,10 +346,7 @@ class FilesystemStoreNode(BaseResourceNode, ABC):
             expected_hash = self.get_artifact_hash(relative_path)
 
             if expected_hash != actual_hash:
-                self.log(
-                    f"Warning: hash mismatch for '{filepath}': expected {expected_hash}, got {actual_hash}",
-                    level="WARNING"
-                )
+                self.log("Warning: hash mismatch for '%s': expected %s, got %s", "WARNING", filepath, expected_hash, actual_hash)
  
             self.mark_using(relative_path)
 
@@ -360,7 +356,7 @@ class FilesystemStoreNode(BaseResourceNode, ABC):
             self.mark_used(relative_path)
 
         except Exception as e:
-            self.log(f"Failed to load artifact '{filepath}': {e}", level="ERROR")
+            self.log("Failed to load artifact '%s': %s", "ERROR", filepath, e)
             raise
 
     def before_run_starts(self):
@@ -370,6 +366,6 @@ class FilesystemStoreNode(BaseResourceNode, ABC):
         pass
 
     def stop_monitoring(self) -> None:
-        self.log(f"Stopping observer thread for node '{self.name}'", level="INFO")
+        self.log("Stopping observer thread for node '%s'", "INFO", self.name)
         self.observer_thread.join()
-        self.log(f"Observer stopped for node '{self.name}'", level="INFO")
\ No newline at end of file
+        self.log("Observer stopped for node '%s'", "INFO", self.name)
\ No newline at end of file
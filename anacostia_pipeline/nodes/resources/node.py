@@ -1,4 +1,4 @@
-from typing import List, Union, Dict, Any
+from typing import List, Union, Dict, Any, Callable
 from logging import Logger
 import threading
 from abc import ABC, abstractmethod
@@ -8,8 +8,10 @@ import httpx
 from anacostia_pipeline.nodes.node import BaseNode
 from anacostia_pipeline.nodes.metadata.node import BaseMetadataStoreNode
 from anacostia_pipeline.nodes.metadata.api import BaseMetadataStoreClient
+from anacostia_pipeline.nodes.metadata.spool import MetadataSpool
 from anacostia_pipeline.utils.constants import Result, Status
 from anacostia_pipeline.nodes.utils import NodeModel
+from anacostia_pipeline.utils.run_context import current_run_id, set_current_run_id
 
 
 
@@ -31,7 +33,8 @@ class BaseResourceNode(BaseNode, ABC):
         wait_for_connection: bool = False,
         client_url: str = None,
         loggers: Union[Logger, List[Logger]] = None, 
-        monitoring: bool = True
+        monitoring: bool = True,
+        spool_path: str = None
     ) -> None:
         
         super().__init__(
@@ -56,6 +59,22 @@ class BaseResourceNode(BaseNode, ABC):
         self.metadata_store_client = metadata_store_client
         self.resource_event = threading.Event()
 
+        # set when the resource is triggered or when the metadata store starts a run (see wait_for_resource())
+        self.wake_event = threading.Event()
+        self.predecessors_latch.add_listener(self.wake_event.set)
+        self.ready_signalled = False
+
+        # when spool_path is set, writes to the metadata store on the root pipeline are spooled to a local SQLite file
+        # while the root cannot be reached and replayed once it can (see MetadataSpool)
+        self.metadata_spool: MetadataSpool = None
+        if spool_path is not None and metadata_store_client is not None:
+            self.metadata_spool = MetadataSpool(
+                spool_path, metadata_store_client, can_flush=self.connection_event.is_set, log=self.log
+            )
+        
+        # locations the root is known to have; entries are never removed, so entry_exists() can answer from this set while the root is down
+        self._recorded_locations = set()
+
     def model(self) -> NodeModel:
         return NodeModel(
             name = self.name,
@@ -116,13 +135,54 @@ class BaseResourceNode(BaseNode, ABC):
         
         if self.connection_event.is_set() is True:
             if self.metadata_store_client is not None:
+                if self.metadata_spool is not None:
+                    if filepath in self._recorded_locations or self.metadata_spool.is_spooled(self.name, filepath):
+                        return True
+
                 try:
-                    return self.metadata_store_client.entry_exists(self.name, filepath)
-                except httpx.ConnectError as e:
-                    self.log(f"FilesystemStoreNode '{self.name}' is no longer connected", level="ERROR")
+                    exists = self.metadata_store_client.entry_exists(self.name, filepath)
+                except httpx.TransportError as e:
+                    if self.metadata_spool is not None:
+                        # the entry is not in the spool; while the root is down, the artifact is treated as new
+                        # (if the root already has it, the spooled create_entry call is rejected and dropped when it is replayed)
+                        return False
+
+                    self.log("FilesystemStoreNode '%s' is no longer connected", "ERROR", self.name)
                     raise e
                     # if an exception is raised here, it means the node is no longer connected to the metadata store on the root pipeline
 
+                if exists is True and self.metadata_spool is not None:
+                    self._recorded_locations.add(filepath)
+                return exists
+
+    def _write_metadata(self, write: Callable[[], Any], method: str, **kwargs) -> None:
+        """
+        Send a write to the metadata store on the root pipeline by calling write().
+        If the node has a spool, the write is appended to the spool instead when the root cannot be reached,
+        or when earlier writes are still waiting in the spool (so the root receives the writes in the order they were made).
+        method and kwargs describe the write as a /batch/ operation (i.e., the metadata store method and its arguments).
+        """
+
+        if self.metadata_spool is not None and self.metadata_spool.is_empty() is False:
+            self.metadata_spool.append(method, **kwargs)
+            return
+
+        try:
+            write()
+        except httpx.TransportError as e:
+            if self.metadata_spool is None:
+                self.log("Resource node '%s' is no longer connected", "ERROR", self.name)
+                raise e
+
+            self.log("Resource node '%s' cannot reach the metadata store, spooling %s call: %s", "WARNING", self.name, method, e)
+            self.metadata_spool.append(method, **kwargs)
+        except httpx.HTTPStatusError as e:
+            self.log("HTTP error: %s", "ERROR", e)
+            raise e
+        except Exception as e:
+            self.log("Unexpected error: %s", "ERROR", e)
+            raise e
+
     def record_new(self, filepath: str, hash: str, hash_algorithm: str) -> None:
         """
         Record a new artifact in the metadata store.
@@ -136,17 +196,12 @@ class BaseResourceNode(BaseNode, ABC):
 
         if self.connection_event.is_set() is True:
             if self.metadata_store_client is not None:
-                try:
-                    self.metadata_store_client.create_entry(self.name, filepath=filepath, state="new", hash=hash, hash_algorithm=hash_algorithm)
-                except httpx.ConnectError as e:
-                    self.log(f"FilesystemStoreNode '{self.name}' is no longer connected", level="ERROR")
-                    raise e
-                except httpx.HTTPStatusError as e:
-                    self.log(f"HTTP error: {e}", level="ERROR")
-                    raise e
-                except Exception as e:
-                    self.log(f"Unexpected error: {e}", level="ERROR")
-                    raise e
+                self._write_metadata(
+                    lambda: self.metadata_store_client.create_entry(
+                        self.name, filepath=filepath, state="new", hash=hash, hash_algorithm=hash_algorithm
+                    ),
+                    "create_entry", resource_node_name=self.name, filepath=filepath, state="new", hash=hash, hash_algorithm=hash_algorithm
+                )
                                 
     def record_produced_artifact(self, filepath: str, hash: str, hash_algorithm: str) -> None:
         """
@@ -164,19 +219,13 @@ class BaseResourceNode(BaseNode, ABC):
 
         if self.connection_event.is_set() is True:
             if self.metadata_store_client is not None:
-                try:
-                    self.metadata_store_client.create_entry(
+                self._write_metadata(
+                    lambda: self.metadata_store_client.create_entry(
                         self.name, filepath=filepath, state="produced", hash=hash, hash_algorithm=hash_algorithm, run_id=run_id
-                    )
-                except httpx.ConnectError as e:
-                    self.log(f"FilesystemStoreNode '{self.name}' is no longer connected", level="ERROR")
-                    raise e
-                except httpx.HTTPStatusError as e:
-                    self.log(f"HTTP error: {e}", level="ERROR")
-                    raise e
-                except Exception as e:
-                    self.log(f"Unexpected error: {e}", level="ERROR")
-                    raise e
+                    ),
+                    "create_entry", 
+                    resource_node_name=self.name, filepath=filepath, state="produced", hash=hash, hash_algorithm=hash_algorithm, run_id=run_id
+                )
     
     def mark_using(self, filepath: str) -> None:
         """
@@ -191,17 +240,13 @@ class BaseResourceNode(BaseNode, ABC):
 
         if self.connection_event.is_set() is True:
             if self.metadata_store_client is not None:
-                try:
-                    self.metadata_store_client.mark_current(self.name, filepath=filepath)
-                except httpx.ConnectError as e:
-                    self.log(f"FilesystemStoreNode '{self.name}' is no longer connected", level="ERROR")
-                    raise e
-                except httpx.HTTPStatusError as e:
-                    self.log(f"HTTP error: {e}", level="ERROR")
-                    raise e
-                except Exception as e:
-                    self.log(f"Unexpected error: {e}", level="ERROR")
-                    raise e
+                # the call carries the run it was made in, since the root may have started another run in the meantime
+                # (when runs are pipelined, or by the time a spooled call is replayed)
+                run_id = self.get_run_id()
+                self._write_metadata(
+                    lambda: self.metadata_store_client.mark_using(self.name, filepath, run_id=run_id),
+                    "mark_using", resource_node_name=self.name, filepath=filepath, run_id=run_id
+                )
 
     def mark_used(self, filepath: str) -> None:
         """
@@ -216,20 +261,15 @@ class BaseResourceNode(BaseNode, ABC):
 
         if self.connection_event.is_set() is True:
             if self.metadata_store_client is not None:
-                try:
-                    self.metadata_store_client.mark_used(self.name, filepath=filepath)
-                except httpx.ConnectError as e:
-                    self.log(f"FilesystemStoreNode '{self.name}' is no longer connected", level="ERROR")
-                    raise e
-                except httpx.HTTPStatusError as e:
-                    self.log(f"HTTP error: {e}", level="ERROR")
-                    raise e
-                except Exception as e:
-                    self.log(f"Unexpected error: {e}", level="ERROR")
-                    raise e
+                self._write_metadata(
+                    lambda: self.metadata_store_client.mark_used(self.name, filepath),
+                    "mark_used", resource_node_name=self.name, filepath=filepath
+                )
     
     def get_run_id(self) -> int:
-        return self.run_id
+        # while several runs are in flight, artifacts are recorded for the run the calling node is working on
+        run_id = current_run_id()
+        return run_id if run_id is not None else self.run_id
 
     def get_num_artifacts(self, state: str) -> int:
         """
@@ -267,13 +307,13 @@ class BaseResourceNode(BaseNode, ABC):
                 try:
                     self.metadata_store_client.tag_artifact(node_name=self.name, location=filepath, **kwargs)
                 except httpx.ConnectError as e:
-                    self.log(f"Resource node '{self.name}' is no longer connected", level="ERROR")
+                    self.log("Resource node '%s' is no longer connected", "ERROR", self.name)
                     raise e
                 except httpx.HTTPStatusError as e:
-                    self.log(f"HTTP error: {e}", level="ERROR")
+                    self.log("HTTP error: %s", "ERROR", e)
                     raise e
                 except Exception as e:
-                    self.log(f"Unexpected error: {e}", level="ERROR")
+                    self.log("Unexpected error: %s", "ERROR", e)
                     raise e
         
     def add_artifact(
@@ -293,19 +333,14 @@ class BaseResourceNode(BaseNode, ABC):
 
         if self.connection_event.is_set() is True:
             if self.metadata_store_client is not None:
-                try:
-                    self.metadata_store_client.create_entry(
+                self._write_metadata(
+                    lambda: self.metadata_store_client.create_entry(
                         self.name, filepath=filepath, hash=hash, hash_algorithm=hash_algorithm, state=state, run_id=run_id, file_size=file_size, content_type=content_type
-                    )
-                except httpx.ConnectError as e:
-                    self.log(f"Resource node '{self.name}' is no longer connected", level="ERROR")
-                    raise e
-                except httpx.HTTPStatusError as e:
-                    self.log(f"HTTP error: {e}", level="ERROR")
-                    raise e
-                except Exception as e:
-                    self.log(f"Unexpected error: {e}", level="ERROR")
-                    raise e
+                    ),
+                    "create_entry", 
+                    resource_node_name=self.name, filepath=filepath, hash=hash, hash_algorithm=hash_algorithm, 
+                    state=state, run_id=run_id, file_size=file_size, content_type=content_type
+                )
 
     def get_num_artifacts(self, state: str) -> int:
         """
@@ -351,13 +386,14 @@ class BaseResourceNode(BaseNode, ABC):
             List[str]: A list of file paths of the artifacts in the specified state
         """
 
+        # only the location column is fetched; there is no need to build a dictionary for every entry
         if self.metadata_store is not None:
-            entries = self.metadata_store.get_entries(self.name, state)
+            columns = self.metadata_store.get_entries_columnar(self.name, state, columns=["location"])
         
         if self.metadata_store_client is not None:
-            entries = self.metadata_store_client.get_entries(self.name, state)
+            columns = self.metadata_store_client.get_entries_columnar(self.name, state, columns=["location"])
 
-        return [entry["location"] for entry in entries]
+        return columns["location"]
     
     def get_artifact_hash(self, filepath: str) -> str:
         """
@@ -376,13 +412,13 @@ class BaseResourceNode(BaseNode, ABC):
                 try:
                     return self.metadata_store_client.get_artifact_hash(filepath)
                 except httpx.ConnectError as e:
-                    self.log(f"Resource node '{self.name}' is no longer connected", level="ERROR")
+                    self.log("Resource node '%s' is no longer connected", "ERROR", self.name)
                     raise e
                 except httpx.HTTPStatusError as e:
-                    self.log(f"HTTP error: {e}", level="ERROR")
+                    self.log("HTTP error: %s", "ERROR", e)
                     raise e
                 except Exception as e:
-                    self.log(f"Unexpected error: {e}", level="ERROR")
+                    self.log("Unexpected error: %s", "ERROR", e)
                     raise e
 
     def exit(self):
@@ -392,8 +428,12 @@ class BaseResourceNode(BaseNode, ABC):
         # set custom events like resource_event and implement custom exit logic after calling the parent class exit method
         if self.monitoring is True:
             self.stop_monitoring()
+
+        if self.metadata_spool is not None:
+            self.metadata_spool.stop()
         
         self.resource_event.set()
+        self.wake_event.set()
     
     def trigger(self, message: str = None) -> None:
         if self.resource_event.is_set() is False:
@@ -405,9 +445,33 @@ class BaseResourceNode(BaseNode, ABC):
                 
                 if self.connection_event.is_set() is True:
                     if self.metadata_store_client is not None:
-                        self.metadata_store_client.log_trigger(node_name=self.name, message=message)
+                        self._write_metadata(
+                            lambda: self.metadata_store_client.log_trigger(node_name=self.name, message=message),
+                            "log_trigger", node_name=self.name, message=message
+                        )
             
             self.resource_event.set()
+            self.wake_event.set()
+
+    def wait_for_resource(self) -> None:
+        """
+        Wait until the resource is triggered, or until the metadata store starts a run this node is skipped in
+        (a run started for other resource nodes; see BaseMetadataStoreNode.partial_runs).
+        """
+        while self.resource_event.is_set() is False and self.predecessors_latch.is_complete() is False:
+            self.wake_event.wait()
+            self.wake_event.clear()
+
+    def _signal_ready(self) -> None:
+        # tell the metadata store (once per run) that the resource is ready to be used for the next run
+        if self.ready_signalled is False and (self.monitoring is False or self.resource_event.is_set() is True):
+            self.signal_predecessors_ready()
+            self.ready_signalled = True
+
+    def _run_taken(self) -> None:
+        # the run has read the resource; the trigger can fire again for new resources
+        self.ready_signalled = False
+        self.resource_event.clear()
 
     def run(self) -> None:
         # if the node is not monitoring the resource, then we don't need to start the observer / monitoring thread
@@ -415,17 +479,27 @@ class BaseResourceNode(BaseNode, ABC):
             self.start_monitoring()
 
         if self.wait_for_connection:
-            self.log(f"'{self.name}' waiting for root predecessors to connect", level='INFO')
+            self.log("'%s' waiting for root predecessors to connect", "INFO", self.name)
             
-            # this event is set by the LeafPipeline when all root predecessors are connected and after it adds to predecessors_events
+            # this event is set by the LeafPipeline when all root predecessors are connected and after it adds to predecessors_latch
             self.connection_event.wait()
             if self.exit_event.is_set(): return
 
-            self.log(f"'{self.name}' connected to root predecessors {list(self.predecessors_events.keys())}", level='INFO')
+            self.log("'%s' connected to root predecessors %s", "INFO", self.name, self.predecessors_latch.parties)
 
         if self.metadata_store_client is not None and self.metadata_store is not None and self.wait_for_connection is True:
-            entries = self.metadata_store.get_entries(self.name)
-            self.metadata_store_client.merge_artifacts_table(self.name, entries)
+            # the local history is streamed to the root in chunks instead of being loaded and sent in one request
+            self.metadata_store_client.merge_artifacts_stream(
+                self.name, lambda after_id, limit: self.metadata_store.iter_entries(self.name, after_id=after_id, limit=limit)
+            )
+
+        # replay the writes spooled while the root was unreachable (including writes spooled before the leaf pipeline was restarted)
+        if self.metadata_spool is not None:
+            self.metadata_spool.start()
+
+        if self.is_pipelined() is True:
+            self.run_pipelined()
+            return
 
         while self.exit_event.is_set() is False:
             self.before_run_starts()
@@ -435,27 +509,33 @@ class BaseResourceNode(BaseNode, ABC):
             if self.monitoring is True:
                 # self.log(f"{self.name} checking for new resources", level='INFO')
                 self.status = Status.WAITING_RESOURCE
-                self.resource_event.wait()
+                self.wait_for_resource()
 
             # signal to metadata store node that the resource is ready to be used for the next run
             # i.e., tell the metadata store to create and start the next run
             # e.g., there is enough new data to trigger the next run
             # self.log(f"{self.name} signaling metadata store that the resource is ready to be used", level='INFO')
             if self.exit_event.is_set(): return
-            self.signal_predecessors(Result.SUCCESS)
+            self._signal_ready()
 
             # wait for metadata store node to finish creating the run 
             # self.log(f"{self.name} waiting for metadata store to finish creating the run", level='INFO')
             if self.exit_event.is_set(): return
             self.wait_for_predecessors()
 
-            if self.monitoring is True:
+            # the run may have been started for other resource nodes only, in which case the node and its successors are skipped
+            skipped = self.predecessors_latch.skipped
+            if skipped is True:
+                self.status = Status.SKIPPED
+            elif self.monitoring is True:
                 self.status = Status.TRIGGERED
                 
-            # signalling to all successors that the resource is ready to be used for the current run
+            # signalling to all successors that the resource is ready to be used for the current run (or that they are skipped)
             # self.log(f"{self.name} signaling successors that the resource is ready to be used", level='INFO')
             if self.exit_event.is_set(): return
-            self.signal_successors(Result.SUCCESS)
+            self.signal_successors(
+                Result.SUCCESS, run_id=self.predecessors_latch.run_id, skip=self.successors_latch.parties if skipped is True else ()
+            )
 
             # waiting for all successors to finish using the the resource for the current run
             # self.log(f"{self.name} waiting for successors to finish using the resource", level='INFO')
@@ -478,4 +558,69 @@ class BaseResourceNode(BaseNode, ABC):
 
             # we clear the resource_event after the run ends so the trigger won't execute more than once on the same resource
             # this is important so we don't trigger the same run multiple times if the resource is not changing
-            self.resource_event.clear()
\ No newline at end of file
+            if skipped is False:
+                self._run_taken()
+
+    def run_pipelined(self) -> None:
+        """
+        Run loop used when several runs can be in flight (run_concurrency > 1).
+        The node signals the metadata store that it is ready for the next run as soon as its successors have taken the current run
+        (i.e., the action nodes that read the resource have finished executing), instead of when the whole run has finished;
+        the end of each run is passed on to the metadata store by a second thread.
+        """
+
+        def _end_runs():
+            while self.exit_event.is_set() is False:
+                self.wait_for_successors()
+                if self.exit_event.is_set(): return
+                self._end_run(self.successors_latch.run_id)
+
+        if self.has_successors() is True:
+            threading.Thread(name=f"{self.name}_run_finisher", target=_end_runs, daemon=True).start()
+
+        while self.exit_event.is_set() is False:
+            self.before_run_starts()
+
+            if self.monitoring is True:
+                self.status = Status.WAITING_RESOURCE
+                self.wait_for_resource()
+
+            # tell the metadata store that the resource is ready to be used for the next run
+            if self.exit_event.is_set(): return
+            self._signal_ready()
+
+            # wait for the metadata store to start the run
+            if self.exit_event.is_set(): return
+            self.wait_for_predecessors()
+            if self.exit_event.is_set(): return
+
+            run_id = self.predecessors_latch.run_id
+            set_current_run_id(run_id)
+            self.run_id = run_id
+
+            skipped = self.predecessors_latch.skipped
+            if skipped is True:
+                self.status = Status.SKIPPED
+            elif self.monitoring is True:
+                self.status = Status.TRIGGERED
+
+            self.signal_successors(Result.SUCCESS, run_id=run_id, skip=self.successors_latch.parties if skipped is True else ())
+            if self.has_successors() is False:
+                self._end_run(run_id)
+                if skipped is False:
+                    self._run_taken()
+                continue
+
+            # once the successors have taken the run, the resource is not triggered again by the artifacts this run reads
+            if self.exit_event.is_set(): return
+            self.wait_for_successors_ready()
+            if skipped is False:
+                self._run_taken()
+
+    def _end_run(self, run_id: int) -> None:
+        set_current_run_id(run_id)
+        self.before_run_ends()
+
+        # signal the metadata store that the action nodes have finished the run
+        if self.exit_event.is_set(): return
+        self.signal_predecessors(Result.SUCCESS, run_id=run_id)
@@ -68,12 +68,12 @@ class S3Node(BaseResourceNode):
     def start_monitoring(self) -> None:
 
         def _monitor_thread_func():
-            self.log(f"Starting observer thread for node '{self.name}'")
+            self.log("Starting observer thread for node '%s'", "DEBUG", self.name)
             while self.exit_event.is_set() is False:
                 for obj in self.bucket.objects.limit(100):  # Limit to 10 objects
                     if self.metadata_store.entry_exists(self.name, obj.key) is False:
                         self.record_new(obj.key)
-                        self.log(f"'{self.name}' detected object: {obj.key}")
+                        self.log("'%s' detected object: %s", "DEBUG", self.name, obj.key)
     
                 if self.exit_event.is_set() is True: break
                 try:
@@ -83,7 +83,7 @@ class S3Node(BaseResourceNode):
                     self.base_trigger()
 
                 except Exception as e:
-                        self.log(f"Error checking resource in node '{self.name}': {traceback.format_exc()}")
+                        self.log("Error checking resource in node '%s': %s", "DEBUG", self.name, traceback.format_exc())
     
         self.observer_thread = Thread(name=f"{self.name}_observer", target=_monitor_thread_func)
         self.observer_thread.start()
@@ -105,9 +105,9 @@ class S3Node(BaseResourceNode):
             self.trigger()
 
     def stop_monitoring(self) -> None:
-        self.log(f"Beginning teardown for node '{self.name}'")
+        self.log("Beginning teardown for node '%s'", "DEBUG", self.name)
         self.observer_thread.join()
-        self.log(f"Observer stopped for node '{self.name}'")
+        self.log("Observer stopped for node '%s'", "DEBUG", self.name)
     
     def get_num_artifacts(self, state: str) -> int:
         return self.metadata_store.get_num_entries(self.name, state)
@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 from pydantic import BaseModel, ConfigDict
 
 
@@ -19,4 +19,18 @@ class NodeConnectionModel(NodeModel):
     """
     A Pydantic Model for validation and serialization of a BaseNode that is used to connect to a remote service.
     """
-    node_url: str
\ No newline at end of file
+    node_url: str
+
+
+class SignalModel(NodeConnectionModel):
+    """
+    A Pydantic Model for validation and serialization of a signal sent to a remote node.
+    run_id is the run the signal belongs to; ready is True for a backward signal that the sender is ready for the next run;
+    skip is True for a forward signal that tells the receiver it is skipped in the run.
+    signal_id identifies the signal, so a signal that is sent again (e.g., over HTTP after its delivery over a signal channel
+    could not be confirmed) is only counted once by the receiver.
+    """
+    run_id: Optional[int] = None
+    ready: bool = False
+    skip: bool = False
+    signal_id: Optional[str] = None
@@ -12,8 +12,10 @@ from anacostia_pipeline.nodes.node import BaseNode
 from anacostia_pipeline.nodes.utils import NodeModel
 from anacostia_pipeline.nodes.resources.node import BaseResourceNode
 from anacostia_pipeline.nodes.metadata.node import BaseMetadataStoreNode
-from anacostia_pipeline.nodes.actions.node import BaseActionNode
+from anacostia_pipeline.nodes.actions.node import BaseActionNode, AsyncActionNode
+from anacostia_pipeline.nodes.actions.process_pool import ProcessPool
 from anacostia_pipeline.utils.constants import Status
+from anacostia_pipeline.utils.log import flush_logs
 
 
 class InvalidNodeDependencyError(Exception):
@@ -41,9 +43,25 @@ class Pipeline:
         - Browser GUI will be added later.
     2. Saving graph as graph.json file and loading a graph.json file back into the pipeline to recreate the DAG. 
     2. Ensuring the user built the graph correctly (i.e., ensuring the graph is a DAG)
+
+    Runs are executed one at a time by default. With run_concurrency > 1, up to run_concurrency runs are in flight at once:
+    a node takes the next run as soon as it has handed the current run to its successors, so consecutive runs overlap
+    like the stages of a CPU pipeline (e.g., run N+1 trains a model while run N evaluates the previous one).
+    Pipelines connected to each other must be created with the same run_concurrency.
+
+    A run starts when every resource node has been triggered by default. With partial_runs=True, a run starts as soon as any resource node
+    is triggered and only covers the nodes reachable from the triggered resource nodes; the other nodes are skipped (Status.SKIPPED),
+    so independent data feeds do not wait for each other (see BaseMetadataStoreNode.set_partial_runs()).
     """
 
-    def __init__(self, name: str, nodes: Iterable[BaseNode], loggers: Union[Logger, List[Logger]] = None) -> None:
+    def __init__(
+        self, 
+        name: str, 
+        nodes: Iterable[BaseNode], 
+        loggers: Union[Logger, List[Logger]] = None, 
+        run_concurrency: int = 1,
+        partial_runs: bool = False
+    ) -> None:
         self.node_dict = dict()
         self.graph = nx.DiGraph()
         self.name = name
@@ -75,6 +93,16 @@ class Pipeline:
                 if successor not in nodes:
                     raise ValueError(f"Node '{successor.name}' has not been registered with pipeline. Check the 'nodes' parameter in the Pipeline class")
         
+        # AsyncActionNodes run as coroutines on the pipeline's event loop instead of in threads of their own
+        for node in nodes:
+            if isinstance(node, AsyncActionNode) is True:
+                node.set_event_loop(self.loop)
+
+        for node in nodes:
+            node.set_run_concurrency(run_concurrency)
+            if isinstance(node, BaseMetadataStoreNode) is True:
+                node.set_partial_runs(partial_runs)
+
         # Set logger for all nodes
         if loggers is not None:
             for node in nodes:
@@ -143,7 +171,7 @@ class Pipeline:
 
             threads: List[Thread] = []
             for node in nodes:
-                node.log(f"--------------------------- started setup phase of {node.name} at {datetime.now()}")
+                node.log("--------------------------- started setup phase of %s at %s", "DEBUG", node.name, datetime.now())
                 thread = Thread(target=node.setup)
                 node.status = Status.INITIALIZING
                 thread.start()
@@ -151,7 +179,7 @@ class Pipeline:
 
             for thread, node in zip(threads, nodes):
                 thread.join()
-                node.log(f"--------------------------- finished setup phase of {node.name} at {datetime.now()}")
+                node.log("--------------------------- finished setup phase of %s at %s", "DEBUG", node.name, datetime.now())
 
         # set up metadata store nodes
         metadata_stores: List[BaseMetadataStoreNode] = [node for node in self.nodes if isinstance(node, BaseMetadataStoreNode) is True]
@@ -174,6 +202,15 @@ class Pipeline:
                     node_model: NodeModel = node.model()
                     metadata_store.add_node(node_model.name, node_model.node_type, node_model.base_type)
 
+    def process_pools(self) -> List[ProcessPool]:
+        """Return the process pools used by the pipeline's action nodes (each pool once, even if several nodes share it)."""
+        process_pools = []
+        for node in self.nodes:
+            process_pool = getattr(node, "process_pool", None)
+            if process_pool is not None and all(process_pool is not pool for pool in process_pools):
+                process_pools.append(process_pool)
+        return process_pools
+
     # consider renaming this method to start_pipeline
     def launch_nodes(self):
         """
@@ -181,7 +218,12 @@ class Pipeline:
         """
         self.setup_nodes() 
 
+        # start the worker processes of the action nodes' process pools before the first run
+        for process_pool in self.process_pools():
+            process_pool.start()
+
         # Note: since node is a subclass of Thread, calling start() will run the run() method, thereby starting the node
+        # (an AsyncActionNode's start() schedules the node on the pipeline's event loop instead)
         for node in self.nodes:
             node.start()
 
@@ -199,12 +241,18 @@ class Pipeline:
             node.join()
         print("All nodes terminated")
 
+        for process_pool in self.process_pools():
+            process_pool.shutdown()
+
         # stop the event loop
         print("Stopping event loop")
         self.loop.call_soon_threadsafe(self.loop.stop)
         self.event_loop_thread.join()
         print("Event loop stopped")
 
+        # write out the records the nodes logged before they exited (the loggers' handlers run on a background thread)
+        flush_logs()
+
     # Note: this run method is only here to run the pipeline without the webserver
     # This method might be deprecated.
     def run(self) -> None:
@@ -1,7 +1,6 @@
 import threading
 from logging import Logger
 from contextlib import asynccontextmanager
-from queue import Queue
 import asyncio
 from pydantic import BaseModel
 from typing import List, Dict, Any
@@ -15,7 +14,7 @@ import time
 
 import uvicorn
 import httpx
-from fastapi import FastAPI, Request, Response, status
+from fastapi import FastAPI, Request, Response, WebSocket, WebSocketDisconnect, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import HTMLResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
@@ -27,12 +26,23 @@ from anacostia_pipeline.nodes.connector import Connector
 from anacostia_pipeline.nodes.api import BaseServer, BaseClient
 from anacostia_pipeline.nodes.metadata.api import BaseMetadataStoreClient
 from anacostia_pipeline.nodes.metadata.node import BaseMetadataStoreNode
+from anacostia_pipeline.utils.transport import TransportManager, is_unix_socket_url, unix_socket_url
+from anacostia_pipeline.utils.signalling import SignalChannel, SignalChannelManager
+from anacostia_pipeline.utils.status_bus import StatusBus
+from anacostia_pipeline.utils.constants import Status
+from anacostia_pipeline.utils.log import log_to_loggers
 from anacostia_pipeline.pipelines.fragments import node_bar_closed, node_bar_open, node_bar_invisible, index_template
 
 
+def work_update(node_id: str, status: Status) -> str:
+    """Encode a node's status as the data of a WorkUpdate event (sent to the /graph_sse stream and relayed to the root pipeline)."""
+    return json.dumps({"id": node_id, "status": repr(status)})
+
+
 class PipelineConnectionModel(BaseModel):
     predecessor_host: str
     predecessor_port: int
+    predecessor_url: str = None     # URL the leaf uses to reach the root (an http+unix URL when they share a host)
 
 
 class EventModel(BaseModel):
@@ -57,6 +67,9 @@ class PipelineServer(FastAPI):
         allow_credentials: bool = False,
         allow_methods: List[str] = ["*"],
         allow_headers: List[str] = ["*"],
+        transport_manager: TransportManager = None,
+        websocket_signals: bool = False,
+        uds: str = None,
         *args, **kwargs
     ):
         if remote_clients is not None:
@@ -71,13 +84,13 @@ class PipelineServer(FastAPI):
         @asynccontextmanager
         async def lifespan(app: PipelineServer):
             if app.logger is not None:
-                app.logger.info(f"Pipeline server '{app.name}' started")
+                app.log("Pipeline server '%s' started", "INFO", app.name)
 
-            # queue must be set for all nodes prior to starting the background task
+            # status bus must be set for all nodes prior to starting the background task
             for node in app.pipeline.nodes:
-                node.set_queue(app.queue)
+                node.set_status_bus(app.status_bus)
 
-            app.background_task = asyncio.create_task(app.process_queue())
+            app.background_task = asyncio.create_task(app.relay_statuses())
 
             app.pipeline.launch_nodes()   # Launch the nodes in the pipeline
             await app.connect()     # Connect to the leaf services
@@ -95,7 +108,7 @@ class PipelineServer(FastAPI):
             await app.disconnect()  # Disconnect from the leaf services
 
             if app.logger is not None:
-                app.logger.info(f"Pipeline server '{app.name}' shut down")
+                app.log("Pipeline server '%s' shut down", "INFO", app.name)
         
         super().__init__(lifespan=lifespan, *args, **kwargs)
         self.name = name
@@ -104,23 +117,42 @@ class PipelineServer(FastAPI):
         self.port = port
         self.logger = logger
         self.successor_pipeline_models = []
-        self.queue = Queue()
+        self.status_bus = StatusBus()
         self.background_task = None
         self.ssl_ca_certs = ssl_ca_certs
         self.ssl_keyfile = ssl_keyfile
         self.ssl_certfile = ssl_certfile
 
+        # path of a Unix domain socket the pipeline listens on in addition to its TCP port (see AnacostiaServer);
+        # pipelines on the same host address each other with http+unix URLs (see unix_socket_url()) to skip loopback TCP and TLS
+        self.uds = uds
+
         if self.ssl_ca_certs is None or self.ssl_certfile is None or self.ssl_keyfile is None:
-            # If no SSL certificates are provided, create a client without them
-            self.client = httpx.AsyncClient()
             self.scheme = "http"
         else:
-            # If SSL certificates are provided, use them to create the client
+            self.scheme = "https"
+
+        # all of the pipeline's clients (the server's client, the connectors, the node servers, and the remote clients)
+        # share the connection pools of one transport manager, so connections to other pipelines are kept alive and reused by every node
+        if transport_manager is None:
             try:
-                self.client = httpx.AsyncClient(verify=self.ssl_ca_certs, cert=(self.ssl_certfile, self.ssl_keyfile))
-                self.scheme = "https"
-            except httpx.ConnectError as e:
+                transport_manager = TransportManager(ssl_keyfile=ssl_keyfile, ssl_certfile=ssl_certfile, ssl_ca_certs=ssl_ca_certs)
+            except (OSError, ValueError) as e:
                 raise ValueError(f"Failed to create HTTP client with SSL certificates: {e}")
+        self.transport_manager = transport_manager
+        self.client = self.transport_manager.client()
+
+        # signals between this pipeline and a connected pipeline are sent over one persistent WebSocket channel per pipeline pair;
+        # channels opened by a remote pipeline are always accepted (and used to signal it back),
+        # channels to remote pipelines are only opened when websocket_signals is True; signals fall back to HTTP otherwise
+        self.signal_channels = SignalChannelManager(
+            pipeline_url=f"{self.scheme}://{self.host}:{self.port}",
+            dispatch=self.receive_signal,
+            open_channels=websocket_signals,
+            ssl_context=self.transport_manager.ssl_context,
+            log=self.log,
+            unix_socket=self.uds
+        )
 
         if allow_credentials is True and allow_origins == ["*"]:
             raise ValueError("allow_origins cannot be [\"*\"] when allow_credentials = True")
@@ -163,6 +195,10 @@ class PipelineServer(FastAPI):
             connector: Connector = node.setup_connector(
                 host=self.host, port=self.port, ssl_ca_certs=ssl_ca_certs, ssl_keyfile=ssl_keyfile, ssl_certfile=ssl_certfile
             )
+            connector.set_transport_manager(self.transport_manager)
+            connector.set_signal_channels(self.signal_channels)
+            if self.uds is not None:
+                connector.set_unix_socket(self.uds)
             self.mount(connector.get_connector_prefix(), connector)
             self.connectors.append(connector)
 
@@ -175,11 +211,15 @@ class PipelineServer(FastAPI):
             server: BaseServer = node.setup_node_server(
                 host=self.host, port=self.port, ssl_keyfile=ssl_keyfile, ssl_certfile=ssl_certfile, ssl_ca_certs=ssl_ca_certs
             )
+            server.set_transport_manager(self.transport_manager)
+            if self.uds is not None:
+                server.set_unix_socket(self.uds)
             self.mount(server.get_node_prefix(), server)                    # mount the BaseRPCserver to PipelineWebserver
             self.node_servers.append(server)                                # add the server to the list of node servers
 
         for rpc_client in self.remote_clients:
             rpc_client.add_loggers(self.logger)                             # add the logger to the rpc_client
+            rpc_client.set_transport_manager(self.transport_manager)
             rpc_client.set_credentials(
                 host=self.host, 
                 port=self.port, 
@@ -191,11 +231,15 @@ class PipelineServer(FastAPI):
         
         self.predecessor_host = None
         self.predecessor_port = None
+        self.predecessor_url = None
         @self.post("/connect", status_code=status.HTTP_200_OK)
         async def connect(connection: PipelineConnectionModel):
             self.predecessor_host = connection.predecessor_host
             self.predecessor_port = connection.predecessor_port
-            self.logger.info(f"Leaf server {self.name} connected to root server at {self.predecessor_host}:{self.predecessor_port}")
+            self.predecessor_url = connection.predecessor_url
+            if self.predecessor_url is None:
+                self.predecessor_url = f"{self.scheme}://{self.predecessor_host}:{self.predecessor_port}"
+            self.log("Leaf server %s connected to root server at %s:%s", "INFO", self.name, self.predecessor_host, self.predecessor_port)
             return self.frontend_json()
         
         self.connected = False
@@ -206,11 +250,12 @@ class PipelineServer(FastAPI):
             self.connected = True
         
         # in cases where there are other leaf pipelines connected to this leaf pipeline (e.g., root -> leaf1 -> leaf2), 
-        # the /send_event endpoint enables leaf2 to relay its messages to leaf1 by putting its messages into leaf1's queue,
-        # leaf1 then relays all of its messages and leaf2's messages back to the root pipeline
+        # the /send_event endpoint enables leaf2 to relay its messages to leaf1 by publishing the statuses of its nodes on leaf1's status bus,
+        # leaf1 then relays the statuses of its nodes and leaf2's nodes back to the root pipeline
         @self.post('/send_event')
         async def send_event(message: EventModel):
-            self.queue.put_nowait(message.model_dump())
+            message_data = json.loads(message.data)
+            self.status_bus.publish_status(message_data["id"], Status[message_data["status"]])
             return {"status": "ok"}
     
         @self.get('/', response_class=HTMLResponse)
@@ -238,28 +283,26 @@ class PipelineServer(FastAPI):
 
             return "\n".join(html_responses)
         
-        self.recent_messages = {}
         @self.get('/graph_sse', response_class=StreamingResponse)
         async def graph_sse(request: Request):
             async def event_stream():
 
-                # when the home page loads, if the queue is empty, display the most recent status of each node
-                for node_id, node_status in self.recent_messages.items():
-                    if node_status != "INITIALIZING":
-                        message_data = json.dumps({"id": node_id, "status": node_status})
+                # when the home page loads, display the most recent status of each node
+                version, statuses = self.status_bus.snapshot()
+                for node_id, node_status in statuses.items():
+                    if node_status != Status.INITIALIZING:
                         yield f"event: WorkUpdate\n"
-                        yield f"data: {message_data}\n\n"
+                        yield f"data: {work_update(node_id, node_status)}\n\n"
 
-                # if the queue is not empty, display the status of the nodes in the queue
+                # then display the latest status of the nodes whose status changed since the last update;
+                # transitions that happen within the same 0.1 seconds are coalesced into one update per node
                 while True:
                     try:
-                        if self.queue.empty() is False:
-                            message = self.queue.get_nowait()
-                            message_data = json.loads(message["data"])
-                            self.recent_messages[message_data["id"]] = message_data["status"]
-
-                            yield f"event: {message['event']}\n"
-                            yield f"data: {message['data']}\n\n"
+                        await self.status_bus.await_change(version)
+                        version, statuses = self.status_bus.changes_since(version)
+                        for node_id, node_status in statuses.items():
+                            yield f"event: WorkUpdate\n"
+                            yield f"data: {work_update(node_id, node_status)}\n\n"
 
                         await asyncio.sleep(0.1)
 
@@ -271,60 +314,90 @@ class PipelineServer(FastAPI):
 
             return StreamingResponse(event_stream(), media_type="text/event-stream")
 
+        @self.websocket('/signals')
+        async def signals(websocket: WebSocket):
+            await websocket.accept()
+            channel = SignalChannel(websocket.send_text, self.receive_signal, ack_timeout=self.signal_channels.ack_timeout)
+            remote_pipeline_url = None
+            try:
+                while True:
+                    text = await websocket.receive_text()
+                    if text.startswith('["h"'):
+                        # the remote pipeline introduced itself; signals to it are sent back over this channel
+                        remote_pipeline_url = json.loads(text)[1]
+                        self.signal_channels.register(remote_pipeline_url, channel)
+                        continue
+                    await channel.handle_frame(text)
+            except WebSocketDisconnect:
+                pass
+            finally:
+                channel.close()
+                if remote_pipeline_url is not None:
+                    self.signal_channels.unregister(remote_pipeline_url, channel)
+
+        @self.get('/transport_metrics')
+        async def transport_metrics():
+            return self.transport_manager.metrics()
+
         @self.get('/dag_page', response_class=HTMLResponse)
         def dag_page(response: Response):
             response.headers["HX-Redirect"] = "/"
 
-    def log(self, message: str, level="DEBUG") -> None:
-        if self.logger is not None:
-            if level == "DEBUG":
-                self.logger.debug(message)
-            elif level == "INFO":
-                self.logger.info(message)
-            elif level == "WARNING":
-                self.logger.warning(message)
-            elif level == "ERROR":
-                self.logger.error(message)
-            elif level == "CRITICAL":
-                self.logger.critical(message)
-            else:
-                raise ValueError(f"Invalid log level: {level}")
-        else:
-            print(message)
+    def log(self, message: str, level="DEBUG", *args, **fields) -> None:
+        log_to_loggers([self.logger] if self.logger is not None else [], message, level, args, fields)
 
-    async def process_queue(self):
+    def receive_signal(
+        self, kind: str, target: str, source: str, run_id: int = None, ready: bool = False, skip: bool = False, signal_id: str = None
+    ) -> None:
+        """Deliver a signal received over a signal channel to the connector of the target node."""
+
+        for connector in self.connectors:
+            if connector.node.name == target:
+                connector.receive_signal(kind, source, run_id=run_id, ready=ready, skip=skip, signal_id=signal_id)
+                return
+        raise ValueError(f"Node '{target}' is not part of pipeline '{self.name}'")
+
+    async def relay_statuses(self):
+        # relay the latest status of the nodes on the status bus (this pipeline's nodes and the nodes of its leaves) to the root pipeline;
+        # statuses that change while the root is unreachable are coalesced and relayed once the pipeline is connected again
+        version = 0
         while True:
-            if self.queue.empty() is False and self.connected is True:
-                message = self.queue.get()
-                
-                try:
-                    if self.predecessor_host is not None and self.predecessor_port is not None:
-                        await self.client.post(f"{self.scheme}://{self.predecessor_host}:{self.predecessor_port}/send_event", json=message)
-                
-                except httpx.ConnectError as e:
-                    self.log(f"Could not connect to root server at {self.predecessor_host}:{self.predecessor_port} - {str(e)}", "ERROR")
-                    self.queue.put(message)
-                    self.connected = False
-
-                except Exception as e:
-                    self.log(f"Error forwarding message from queue: {str(e)}", "ERROR")
-                    self.queue.put(message)
-                    self.connected = False
-                
-                finally:
-                    self.queue.task_done()
-            
             try:
+                if self.connected is True and self.predecessor_url is not None:
+                    current_version, statuses = self.status_bus.changes_since(version)
+                    for node_id, node_status in statuses.items():
+                        message = {"event": "WorkUpdate", "data": work_update(node_id, node_status)}
+                        await self.client.post(f"{self.predecessor_url}/send_event", json=message)
+                    version = current_version
+
+                    # wake up periodically to notice when the pipeline is disconnected
+                    await self.status_bus.await_change(version, timeout=1.0)
+
                 await asyncio.sleep(0.1)
+
+            except httpx.ConnectError as e:
+                self.log("Could not connect to root server at %s:%s - %s", "ERROR", self.predecessor_host, self.predecessor_port, str(e))
+                self.connected = False
+
             except asyncio.CancelledError:
-                self.log("Background task cancelled; breaking out of queue processing loop", "INFO")
-                break 
+                self.log("Background task cancelled; breaking out of status relay loop", "INFO")
+                break
+
+            except Exception as e:
+                self.log("Error relaying node statuses: %s", "ERROR", str(e))
+                self.connected = False
 
     async def connect(self):
         # Connect to leaf pipeline
         task = []
         for leaf_ip_address in self.successor_ip_addresses:
-            pipeline_server_model = PipelineConnectionModel(predecessor_host=self.host, predecessor_port=self.port).model_dump()
+            predecessor_url = f"{self.scheme}://{self.host}:{self.port}"
+            if self.uds is not None and is_unix_socket_url(leaf_ip_address) is True:
+                predecessor_url = unix_socket_url(self.uds)
+
+            pipeline_server_model = PipelineConnectionModel(
+                predecessor_host=self.host, predecessor_port=self.port, predecessor_url=predecessor_url
+            ).model_dump()
             task.append(self.client.post(f"{leaf_ip_address}/connect", json=pipeline_server_model))
 
         responses = await asyncio.gather(*task)
@@ -435,6 +508,8 @@ class PipelineServer(FastAPI):
         await self.client.aclose()
         for connector in self.connectors:
             await connector.client.aclose()
+        await self.signal_channels.aclose()
+        await self.transport_manager.aclose()
     
     def get_config(self):
         return uvicorn.Config(
@@ -448,10 +523,35 @@ class PipelineServer(FastAPI):
         )
 
 
+    def get_uds_config(self):
+        """
+        Config of the server listening on the pipeline's Unix domain socket.
+        The socket serves the same app as the TCP port without TLS (the traffic never leaves the host)
+        and without the lifespan events, which are handled by the TCP server.
+        """
+        return uvicorn.Config(app=self, uds=self.uds, lifespan="off", log_config=self.uvicorn_access_log_config)
+
+
 class AnacostiaServer(uvicorn.Server):
     def install_signal_handlers(self):
         pass
 
+    async def startup(self, sockets=None):
+        await super().startup(sockets=sockets)
+
+        # a PipelineServer with a Unix domain socket is also served on the socket, once the pipeline has started
+        self.uds_server: _UnixSocketServer = None
+        app = self.config.app
+        if self.config.uds is None and isinstance(app, PipelineServer) and app.uds is not None and self.should_exit is False:
+            self.uds_server = _UnixSocketServer(config=app.get_uds_config())
+            self.uds_server_task = asyncio.create_task(self.uds_server.serve())
+
+    async def shutdown(self, sockets=None):
+        if getattr(self, "uds_server", None) is not None:
+            self.uds_server.should_exit = True
+            await self.uds_server_task
+        await super().shutdown(sockets=sockets)
+
     @contextlib.contextmanager
     def run_in_thread(self):
         thread = threading.Thread(target=self.run)
@@ -463,3 +563,11 @@ class AnacostiaServer(uvicorn.Server):
         finally:
             self.should_exit = True
             thread.join()
+
+
+class _UnixSocketServer(AnacostiaServer):
+    """Server for a PipelineServer's Unix domain socket; runs alongside the TCP server, which owns the signal handlers."""
+
+    @contextlib.contextmanager
+    def capture_signals(self):
+        yield
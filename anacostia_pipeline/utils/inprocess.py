@@ -0,0 +1,265 @@
+from typing import Dict, List, Callable, Any, Tuple
+from urllib.parse import unquote
+import asyncio
+import threading
+
+import httpx
+
+
+
+def _base_url_key(url: httpx.URL) -> str:
+    return f"{url.scheme}://{url.netloc.decode('ascii')}".lower()
+
+
+class _InProcessResponseStream(httpx.AsyncByteStream):
+    """Body of a response served in-process; chunks are yielded as the app sends them, so streaming responses keep streaming."""
+
+    def __init__(self, queue: asyncio.Queue, cancel: Callable[[], Any]):
+        self._queue = queue
+        self._cancel = cancel
+        self._complete = False
+
+    async def __aiter__(self):
+        while True:
+            item = await self._queue.get()
+            if item[0] == "body":
+                yield item[1]
+            elif item[0] == "end":
+                self._complete = True
+                return
+            elif item[0] == "error":
+                self._complete = True
+                raise httpx.ReadError(f"In-process app failed while sending the response: {item[1]}")
+
+    async def aclose(self) -> None:
+        # closing a response before its body was read (e.g., a client leaving a stream) cancels the request, like a dropped connection
+        if self._complete is False:
+            self._cancel()
+
+
+class _InProcessServer:
+    """An ASGI app registered with an InProcessNetwork, served on its own event loop thread (like a uvicorn server)."""
+
+    def __init__(self, app, name: str):
+        self.app = app
+        self.name = name
+        self.loop: asyncio.AbstractEventLoop = None
+        self.thread: threading.Thread = None
+        self._lifespan = None
+
+    def start(self) -> None:
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(name=f"in_process_{self.name}", target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+        try:
+            asyncio.run_coroutine_threadsafe(self._startup(), self.loop).result()
+        except BaseException:
+            self._stop_loop()
+            raise
+
+    def _stop_loop(self) -> None:
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+        self.loop = None
+
+    def stop(self) -> None:
+        if self.loop is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._shutdown(), self.loop).result()
+        finally:
+            self._stop_loop()
+
+    async def _startup(self) -> None:
+        lifespan_context = getattr(getattr(self.app, "router", None), "lifespan_context", None)
+        if lifespan_context is not None:
+            self._lifespan = lifespan_context(self.app)
+            await self._lifespan.__aenter__()
+
+    async def _shutdown(self) -> None:
+        if self._lifespan is not None:
+            await self._lifespan.__aexit__(None, None, None)
+            self._lifespan = None
+
+    async def serve_request(self, scope: Dict, body: bytes, deliver: Callable[[Tuple], None]) -> None:
+        """Run the app on one request; the response is handed to deliver() as ("start", ...), ("body", ...), and ("end",) items."""
+
+        request_sent = False
+        response_complete = asyncio.Event()
+
+        async def receive():
+            nonlocal request_sent
+            if request_sent is False:
+                request_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            await response_complete.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                deliver(("start", message["status"], message.get("headers", [])))
+            elif message["type"] == "http.response.body":
+                chunk = message.get("body", b"")
+                if len(chunk) > 0:
+                    deliver(("body", chunk))
+                if message.get("more_body", False) is False:
+                    response_complete.set()
+                    deliver(("end",))
+
+        try:
+            await self.app(scope, receive, send)
+        except Exception as e:
+            # the app raises after sending its 500 response (like it does under uvicorn); the caller only sees the error if nothing was sent
+            if response_complete.is_set() is False:
+                deliver(("error", e))
+        finally:
+            if response_complete.is_set() is False:
+                response_complete.set()
+                deliver(("end",))
+
+
+class InProcessNetwork:
+    """
+    Runs several pipeline servers (e.g., a root PipelineServer and its leaf PipelineServers) in one process without sockets.
+
+    Each server is registered under the base URL the other servers use to reach it (e.g., http://127.0.0.1:8001);
+    clients created by a TransportManager that was given the network (see transport_manager()) send requests for registered URLs
+    straight to the server's ASGI app instead of over the network. Requests to URLs that are not registered are sent over the network as usual.
+    Each server runs on its own event loop thread, like it would under uvicorn, and streaming responses (e.g., /invalidations/) keep streaming.
+
+    The servers are started (i.e., their lifespan events are run) in dependency order: a server is started after the servers it connects to
+    (its PipelineServer.successor_ip_addresses), so leaf pipelines are up before the root pipeline connects to them.
+
+    Example:
+        network = InProcessNetwork()
+        leaf = PipelineServer(name="leaf", pipeline=leaf_pipeline, port=8001, transport_manager=network.transport_manager())
+        root = PipelineServer(name="root", pipeline=root_pipeline, port=8000, transport_manager=network.transport_manager())
+        network.add_server(leaf)
+        network.add_server(root)
+        with network:
+            ...
+
+    Request bodies are read into memory before they are handed to the app, and WebSocket signalling is not available in-process
+    (connectors fall back to signalling over HTTP, which is served in-process).
+    """
+
+    def __init__(self):
+        self._servers: Dict[str, _InProcessServer] = {}
+        self._order: List[_InProcessServer] = []
+        self._started: List[_InProcessServer] = []
+
+    def add_server(self, server, base_urls: List[str] = None) -> None:
+        """
+        Register a server; by default under the URL it advertises (scheme://host:port, and its http+unix URL if it was given a socket).
+        """
+
+        if base_urls is None:
+            base_urls = [f"{server.scheme}://{server.host}:{server.port}"]
+            if getattr(server, "uds", None) is not None:
+                from anacostia_pipeline.utils.transport import unix_socket_url
+                base_urls.append(unix_socket_url(server.uds))
+
+        in_process_server = _InProcessServer(server, name=getattr(server, "name", type(server).__name__))
+        for base_url in base_urls:
+            self._servers[_base_url_key(httpx.URL(base_url))] = in_process_server
+        self._order.append(in_process_server)
+
+    @property
+    def servers(self) -> List:
+        """The registered servers, in the order they were added."""
+        return [server.app for server in self._order]
+
+    def resolve(self, url: httpx.URL) -> _InProcessServer:
+        """Return the server registered for the URL, or None if requests to the URL are sent over the network."""
+        return self._servers.get(_base_url_key(url))
+
+    def transport_manager(self, **kwargs):
+        """Return a TransportManager whose clients send requests for the registered servers in-process."""
+        from anacostia_pipeline.utils.transport import TransportManager
+        return TransportManager(network=self, **kwargs)
+
+    def _dependencies(self, server: _InProcessServer) -> List[_InProcessServer]:
+        dependencies = []
+        for url in getattr(server.app, "successor_ip_addresses", []):
+            dependency = self.resolve(httpx.URL(url))
+            if dependency is not None and dependency is not server:
+                dependencies.append(dependency)
+        return dependencies
+
+    def start(self) -> None:
+        """Start the registered servers, each one after the servers it connects to."""
+
+        pending = list(self._order)
+        try:
+            while len(pending) > 0:
+                ready = [server for server in pending if all(dependency in self._started for dependency in self._dependencies(server))]
+                if len(ready) == 0:
+                    raise ValueError(f"Servers {[server.name for server in pending]} connect to each other in a cycle")
+
+                for server in ready:
+                    server.start()
+                    self._started.append(server)
+                    pending.remove(server)
+        except BaseException:
+            # stop the servers that were started, so their pipelines do not keep running
+            self.stop()
+            raise
+
+    def stop(self) -> None:
+        """Stop the servers in the reverse of the order they were started in."""
+        while len(self._started) > 0:
+            self._started.pop().stop()
+
+    def __enter__(self) -> "InProcessNetwork":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    async def handle_async_request(self, request: httpx.Request, server: _InProcessServer) -> httpx.Response:
+        """Send a request to a registered server and return its response; called by the TransportManager's transport."""
+
+        if server.loop is None:
+            raise httpx.ConnectError(f"In-process server '{server.name}' is not running", request=request)
+
+        body = await request.aread()
+        url = request.url
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": request.method,
+            "scheme": "https" if url.scheme == "https" else "http",
+            "path": unquote(url.path),
+            "raw_path": url.raw_path.split(b"?")[0],
+            "query_string": url.query,
+            "root_path": "",
+            "headers": [(key.lower(), value) for key, value in request.headers.raw],
+            "server": (url.host, url.port),
+            "client": ("127.0.0.1", 0),
+        }
+
+        caller_loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+
+        def deliver(item: Tuple) -> None:
+            caller_loop.call_soon_threadsafe(queue.put_nowait, item)
+
+        future = asyncio.run_coroutine_threadsafe(server.serve_request(scope, body, deliver), server.loop)
+
+        item = await queue.get()
+        if item[0] == "error":
+            raise item[1]
+        if item[0] == "end":
+            raise httpx.RemoteProtocolError(f"In-process server '{server.name}' closed the request without a response", request=request)
+
+        _, status_code, headers = item
+        return httpx.Response(
+            status_code=status_code,
+            headers=headers,
+            stream=_InProcessResponseStream(queue, future.cancel),
+            request=request,
+            extensions={"http_version": b"HTTP/1.1"},
+        )
@@ -0,0 +1,254 @@
+from typing import List, Iterable, Dict, Tuple, Deque, Optional, Callable
+from threading import Condition
+from collections import deque
+import asyncio
+import logging
+
+from anacostia_pipeline.utils.log import log_function
+
+
+
+logger = logging.getLogger(__name__)
+
+
+def _wake(waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]]) -> None:
+    for loop, future in waiters:
+        if loop.is_closed() is False:
+            loop.call_soon_threadsafe(lambda future=future: future.done() or future.set_result(None))
+
+
+class CountdownLatch:
+    """
+    Synchronizes a node with its predecessors (or successors) for one phase of a run at a time.
+
+    Every peer (a local node's name or a remote node's url) arrives once per phase; the waiting node is woken once,
+    when the last peer arrives, and the latch is reset for the next phase in the same step, so an arrival for the next phase
+    is never lost between the wake-up and the reset. Arriving more than once in a phase counts once.
+    Once released (e.g., when the node exits), the latch no longer blocks.
+    A node running on an event loop (see AsyncActionNode) awaits await_all() instead of calling wait(), so no thread is blocked.
+
+    When several runs are in flight (see Pipeline's run_concurrency argument), a peer can arrive for later phases
+    before the current phase is complete; up to max_pending arrivals per peer are queued and consumed one phase at a time.
+    An arrival can carry the id of the run it belongs to; run_id is the run of the last phase wait() completed.
+    An arrival can also tell the node that it is skipped in the run (see BaseMetadataStoreNode.partial_runs);
+    skipped is True if every peer skipped the node in the last phase wait() completed.
+
+    Args:
+        parties: the peers expected to arrive in every phase.
+        max_pending: number of phases a peer can arrive for ahead of the waiting node.
+        name: name of the latch in log messages (e.g., "predecessors_latch").
+        log: function used to log messages (e.g., BaseNode.log); arrivals dropped because of max_pending are logged as warnings.
+    """
+
+    def __init__(self, parties: Iterable[str] = None, max_pending: int = 1, name: str = "latch", log: Callable[..., None] = None):
+        self._condition = Condition()
+        # arrivals of every peer as (run id, skip) pairs
+        self._arrived: Dict[str, Deque[Tuple[Optional[int], bool]]] = {party: deque() for party in (parties if parties is not None else [])}
+        self._remaining = len(self._arrived)
+        self._released = False
+        self._async_waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+        self._any_waiters = 0
+        self._listeners: List[Callable[[], None]] = []
+        self.max_pending = max_pending
+        self.run_id: Optional[int] = None
+        self.skipped = False
+        self.name = name
+        self._log = log if log is not None else log_function(logger)
+
+    @property
+    def parties(self) -> List[str]:
+        with self._condition:
+            return list(self._arrived.keys())
+
+    def add_party(self, party: str) -> None:
+        """Expect a new peer to arrive in every phase, starting with the current one."""
+        with self._condition:
+            if party not in self._arrived:
+                self._arrived[party] = deque()
+                self._remaining += 1
+
+    def set_max_pending(self, max_pending: int) -> None:
+        with self._condition:
+            self.max_pending = max_pending
+
+    def add_listener(self, listener: Callable[[], None]) -> None:
+        """Register a callback that is called when every peer has arrived for a phase; called with the latch's lock held, so it must not block."""
+        with self._condition:
+            self._listeners.append(listener)
+
+    def arrive(self, party: str, run_id: int = None, skip: bool = False) -> None:
+        """
+        Record the arrival of a peer for its next phase (for the given run, if any); raises KeyError if the peer is not one of the parties.
+        Arrivals for a run the peer has already arrived for are ignored;
+        arrivals beyond max_pending are dropped and logged as a warning (the peer is further ahead than run_concurrency allows).
+        """
+        with self._condition:
+            arrivals = self._arrived[party]
+            if run_id is not None and any(arrival[0] == run_id for arrival in arrivals):
+                return
+
+            max_pending = self.max_pending
+            dropped = len(arrivals) >= max_pending
+            if dropped is False:
+                arrivals.append((run_id, skip))
+                if len(arrivals) == 1:
+                    self._remaining -= 1
+                    if self._remaining == 0:
+                        self._condition.notify_all()
+                        self._wake_async_waiters()
+                        for listener in self._listeners:
+                            listener()
+                    elif self._any_waiters > 0:
+                        self._condition.notify_all()
+
+        # logged without the latch's lock held
+        if dropped is True:
+            self._log(
+                "%s dropped the arrival of '%s' for run %s: '%s' already arrived for %s pending phases (max_pending)", 
+                "WARNING", self.name, party, run_id, party, max_pending
+            )
+
+    def wait(self, timeout: float = None) -> bool:
+        """
+        Wait until every peer has arrived (or the latch is released) and start the next phase.
+        Returns False if the timeout (in seconds) expired first; the arrivals are kept and pending() returns the peers that are late.
+        """
+        with self._condition:
+            if self._condition.wait_for(lambda: self._remaining == 0 or self._released is True, timeout=timeout) is False:
+                return False
+
+            self._next_phase()
+            return True
+
+    def wait_any(self, timeout: float = None) -> List[str]:
+        """
+        Wait until at least one peer has arrived (or the latch is released), consume one arrival of every peer that has arrived,
+        and return those peers (an empty list if the timeout expired or the latch was released first).
+        Used by a node that does not need every peer in every phase (see BaseMetadataStoreNode.partial_runs).
+        """
+        with self._condition:
+            self._any_waiters += 1
+            try:
+                self._condition.wait_for(
+                    lambda: self._remaining < len(self._arrived) or self._released is True, timeout=timeout
+                )
+            finally:
+                self._any_waiters -= 1
+
+            if self._released is True:
+                return []
+
+            parties = [party for party, arrivals in self._arrived.items() if len(arrivals) > 0]
+            for party in parties:
+                self._arrived[party].popleft()
+            self._remaining = sum(1 for arrivals in self._arrived.values() if len(arrivals) == 0)
+            return parties
+
+    def is_complete(self) -> bool:
+        """Return True if every peer has arrived for the current phase (or the latch is released), i.e., wait() would not block."""
+        with self._condition:
+            return self._remaining == 0 or self._released is True
+
+    async def await_all(self, timeout: float = None) -> bool:
+        """Async variant of wait(); the waiting coroutine is woken from the thread of the last arrival."""
+
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        while True:
+            with self._condition:
+                if self._remaining == 0 or self._released is True:
+                    self._next_phase()
+                    return True
+                waiter = (loop, loop.create_future())
+                self._async_waiters.append(waiter)
+
+            try:
+                remaining = None if deadline is None else max(deadline - loop.time(), 0.0)
+                await asyncio.wait_for(waiter[1], timeout=remaining)
+            except asyncio.TimeoutError:
+                return False
+            finally:
+                with self._condition:
+                    if waiter in self._async_waiters:
+                        self._async_waiters.remove(waiter)
+
+    def _next_phase(self) -> None:
+        # called with the condition held; arrivals queued for later phases count toward the next phase
+        if self._released is False:
+            phase = [arrivals.popleft() for arrivals in self._arrived.values()]
+            self.run_id = max((run_id for run_id, _ in phase if run_id is not None), default=None)
+            self.skipped = len(phase) > 0 and all(skip is True for _, skip in phase)
+            self._remaining = sum(1 for arrivals in self._arrived.values() if len(arrivals) == 0)
+
+    def _wake_async_waiters(self) -> None:
+        # called with the condition held
+        waiters, self._async_waiters = self._async_waiters, []
+        _wake(waiters)
+
+    def pending(self) -> List[str]:
+        """Return the peers that have not arrived in the current phase."""
+        with self._condition:
+            return [party for party, arrivals in self._arrived.items() if len(arrivals) == 0]
+
+    def release(self) -> None:
+        """Wake the waiting node and stop blocking; used to let the node's loop reach its exit checks."""
+        with self._condition:
+            self._released = True
+            self._condition.notify_all()
+            self._wake_async_waiters()
+
+    def is_released(self) -> bool:
+        with self._condition:
+            return self._released
+
+
+class AwaitableEvent:
+    """
+    Event (same interface as threading.Event) that can also be awaited from an event loop (see await_set());
+    set() wakes blocked threads and waiting coroutines.
+    """
+
+    def __init__(self):
+        self._condition = Condition()
+        self._flag = False
+        self._async_waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+    def is_set(self) -> bool:
+        with self._condition:
+            return self._flag
+
+    def set(self) -> None:
+        with self._condition:
+            self._flag = True
+            self._condition.notify_all()
+            waiters, self._async_waiters = self._async_waiters, []
+        _wake(waiters)
+
+    def clear(self) -> None:
+        with self._condition:
+            self._flag = False
+
+    def wait(self, timeout: float = None) -> bool:
+        """Block until the event is set; returns False if the timeout (in seconds) expired first."""
+        with self._condition:
+            return self._condition.wait_for(lambda: self._flag is True, timeout=timeout)
+
+    async def await_set(self, timeout: float = None) -> bool:
+        """Async variant of wait(); returns False if the timeout (in seconds) expired before the event was set."""
+
+        loop = asyncio.get_running_loop()
+        with self._condition:
+            if self._flag is True:
+                return True
+            waiter = (loop, loop.create_future())
+            self._async_waiters.append(waiter)
+
+        try:
+            await asyncio.wait_for(waiter[1], timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return self.is_set()
+        finally:
+            with self._condition:
+                if waiter in self._async_waiters:
+                    self._async_waiters.remove(waiter)
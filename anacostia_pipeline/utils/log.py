@@ -0,0 +1,168 @@
+from typing import List, Dict, Tuple, Any, Optional, Callable
+from logging import Logger, LogRecord
+from queue import SimpleQueue
+from threading import Thread, Lock, Event
+import logging
+import atexit
+import sys
+import traceback
+
+
+
+LOG_LEVELS: Dict[str, int] = {
+    "DEBUG": logging.DEBUG,
+    "INFO": logging.INFO,
+    "WARNING": logging.WARNING,
+    "ERROR": logging.ERROR,
+    "CRITICAL": logging.CRITICAL,
+}
+
+# structured fields set on every record logged by nodes, connectors and servers (None when they do not apply),
+# so formatters can refer to them, e.g., logging.Formatter(STRUCTURED_FORMAT);
+# handlers that also receive records from other libraries (e.g., uvicorn) need a LogFieldsFilter, see below
+LOG_FIELDS = ("node", "run_id", "phase")
+STRUCTURED_FORMAT = "%(asctime)s %(levelname)s [node=%(node)s run_id=%(run_id)s phase=%(phase)s] %(message)s"
+
+
+class LogFieldsFilter(logging.Filter):
+    """
+    Sets the fields in LOG_FIELDS to None on records that do not have them (records logged by other libraries), 
+    so a handler formatting with STRUCTURED_FORMAT does not fail on them, e.g.:
+
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter(STRUCTURED_FORMAT))
+        handler.addFilter(LogFieldsFilter())
+    """
+
+    def filter(self, record: LogRecord) -> bool:
+        for field in LOG_FIELDS:
+            if hasattr(record, field) is False:
+                setattr(record, field, None)
+        return True
+
+
+class LogListener:
+    """
+    Background thread that hands log records to the handlers of the loggers they were logged to.
+
+    Handlers (typically file handlers) run on the listener's thread instead of the thread that logged the record,
+    so logging never blocks a node's run loop or the event loop of a pipeline server; the records are handled in the order they were logged.
+    The thread is started when the first record is logged and handles the remaining records when the interpreter exits.
+    """
+
+    def __init__(self) -> None:
+        self._queue: SimpleQueue = SimpleQueue()
+        self._thread: Optional[Thread] = None
+        self._lock = Lock()
+
+    def enqueue(self, logger: Logger, record: LogRecord) -> None:
+        if self._thread is None:
+            self.start()
+        self._queue.put((logger, record))
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = Thread(target=self._handle_records, name="anacostia-log-listener", daemon=True)
+                self._thread.start()
+                atexit.register(self.stop)
+
+    def flush(self, timeout: float = None) -> bool:
+        """Wait until the records logged so far have been handled; return False if the timeout expired first."""
+        if self._thread is None:
+            return True
+        handled = Event()
+        self._queue.put((None, handled))
+        return handled.wait(timeout)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Handle the records logged so far and stop the thread; the thread is started again if another record is logged."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+            if thread is None:
+                return
+            self._queue.put((None, None))
+        thread.join(timeout)
+
+    def _handle_records(self) -> None:
+        while True:
+            logger, record = self._queue.get()
+            if logger is None:
+                if record is None:
+                    return
+                record.set()    # flush() marker
+                continue
+
+            try:
+                logger.handle(record)
+            except Exception:
+                traceback.print_exc()
+
+
+log_listener = LogListener()
+
+
+# messages of nodes, connectors and servers without loggers are printed to stdout by this logger's handler on the listener's thread
+_print_logger = logging.Logger("anacostia_pipeline.print", logging.DEBUG)
+_print_handler = logging.StreamHandler(sys.stdout)
+_print_handler.setFormatter(logging.Formatter("%(message)s"))
+_print_logger.addHandler(_print_handler)
+
+
+def flush_logs(timeout: float = None) -> bool:
+    """Wait until every record logged by nodes, connectors and servers so far has been handled (see LogListener.flush())."""
+    return log_listener.flush(timeout)
+
+
+def log_function(logger: Logger) -> Callable[..., None]:
+    """
+    Return a function with the signature of BaseNode.log (message, level="DEBUG", *args) that logs to the given logger through the listener;
+    used by components that are given no log function (e.g., a latch or a metadata spool created outside of a node).
+    """
+    def log(message: str, level: str = "DEBUG", *args) -> None:
+        log_to_loggers([logger], message, level, args)
+    return log
+
+
+def log_level(level: str) -> int:
+    try:
+        return LOG_LEVELS[level]
+    except KeyError:
+        raise ValueError(f"Invalid log level: {level}")
+
+
+def is_enabled_for(loggers: List[Logger], level: str) -> bool:
+    """Return True if a message logged at the level would be logged (or printed, if there are no loggers); cheap, so callers check it before building records."""
+    levelno = log_level(level)
+    return len(loggers) == 0 or any(logger.isEnabledFor(levelno) for logger in loggers)
+
+
+def log_to_loggers(
+    loggers: List[Logger], message: str, level: str = "DEBUG", args: Tuple[Any, ...] = (), fields: Dict[str, Any] = None, stacklevel: int = 2
+) -> None:
+    """
+    Log a message to every logger that is enabled for the level, without blocking on the loggers' handlers (see LogListener).
+    The message is %-formatted with args by the handlers, so nothing is formatted for the loggers that are not enabled for the level.
+    fields are set as attributes of the record (see LOG_FIELDS). If there are no loggers, the message is printed on the listener's thread.
+    stacklevel is the number of frames between this function and the code that logged the message (used for %(filename)s, %(lineno)d, ...).
+    """
+    levelno = log_level(level)
+
+    if len(loggers) == 0:
+        loggers = [_print_logger]
+
+    frame = None
+    for logger in loggers:
+        if logger.isEnabledFor(levelno) is False:
+            continue
+
+        # the record is created here so it has the time, thread and caller of the call, and handled on the listener's thread
+        if frame is None:
+            frame = sys._getframe(stacklevel)
+        extra = {field: None for field in LOG_FIELDS}
+        if fields is not None:
+            extra.update(fields)
+        record = logger.makeRecord(
+            logger.name, levelno, frame.f_code.co_filename, frame.f_lineno, message, args, None, frame.f_code.co_name, extra
+        )
+        log_listener.enqueue(logger, record)
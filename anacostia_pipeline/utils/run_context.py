@@ -0,0 +1,35 @@
+from typing import Optional, Iterator
+from contextvars import ContextVar
+from contextlib import contextmanager
+
+
+
+# id of the run the calling thread (or coroutine) is working on; only set when several runs are in flight (see Pipeline's run_concurrency),
+# so metadata logged by a node while it works on one run is not attributed to a later run that has started in the meantime
+_current_run_id: ContextVar[Optional[int]] = ContextVar("anacostia_current_run_id", default=None)
+
+
+def current_run_id() -> Optional[int]:
+    """Return the id of the run the calling thread or coroutine is working on, or None if it was not set."""
+    return _current_run_id.get()
+
+
+def set_current_run_id(run_id: Optional[int]) -> None:
+    _current_run_id.set(run_id)
+
+
+@contextmanager
+def run_context(run_id: Optional[int]) -> Iterator[None]:
+    """
+    Set the id of the run the calling thread or coroutine is working on for the duration of the with block;
+    does nothing if run_id is None (e.g., when the metadata store server applies a write a leaf pipeline made without a run id).
+    """
+    if run_id is None:
+        yield
+        return
+
+    token = _current_run_id.set(run_id)
+    try:
+        yield
+    finally:
+        _current_run_id.reset(token)
@@ -0,0 +1,264 @@
+from typing import Any, Dict, List, Tuple, AsyncIterator
+from datetime import datetime
+from operator import itemgetter
+import json
+import gzip
+
+
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# request header a client sets to tell the server it can decode columnar payloads (see to_columnar())
+COLUMNAR_HEADER = "X-Anacostia-Columnar"
+
+# payloads smaller than this are not compressed; compressing small payloads costs more CPU time than it saves on the network
+COMPRESSION_THRESHOLD = 64 * 1024
+
+# gzip level 1 compresses the repetitive column arrays of the artifact table well at a fraction of the CPU cost of the default level
+COMPRESSION_LEVEL = 1
+
+# msgpack extension type used for datetimes; the value is the ISO 8601 string of the datetime
+MSGPACK_DATETIME_EXT = 1
+
+# key of the envelope that marks a columnar payload
+COLUMNAR_KEY = "$columnar"
+
+
+
+def import_msgpack():
+    """Return the msgpack module, or None if msgpack is not installed (payloads are then sent as JSON)."""
+    try:
+        import msgpack
+    except ImportError:
+        return None
+    return msgpack
+
+
+def import_orjson():
+    """Return the orjson module, or None if orjson is not installed (the json module is then used)."""
+    try:
+        import orjson
+    except ImportError:
+        return None
+    return orjson
+
+
+def accepted_media_types() -> str:
+    """
+    Value of the Accept header sent by clients.
+    JSON encoded with orjson is preferred when orjson is installed (orjson encodes the datetimes in the artifact table several times
+    faster than msgpack can), msgpack is preferred when only msgpack is installed, and plain JSON is used otherwise.
+    """
+
+    if import_orjson() is None and import_msgpack() is not None:
+        return f"{MSGPACK_MEDIA_TYPE}, {JSON_MEDIA_TYPE};q=0.9"
+    if import_msgpack() is not None:
+        return f"{JSON_MEDIA_TYPE}, {MSGPACK_MEDIA_TYPE};q=0.9"
+    return JSON_MEDIA_TYPE
+
+
+def negotiate_media_type(accept: str = None) -> str:
+    """Pick the media type of a response: the supported media type with the highest q value in the Accept header (JSON by default)."""
+
+    if accept is None:
+        return JSON_MEDIA_TYPE
+
+    candidates = []
+    for position, item in enumerate(accept.split(",")):
+        media_type, *parameters = [part.strip() for part in item.split(";")]
+        q = 1.0
+        for parameter in parameters:
+            if parameter.startswith("q="):
+                try:
+                    q = float(parameter[2:])
+                except ValueError:
+                    q = 0.0
+        candidates.append((-q, position, media_type))
+
+    for _, _, media_type in sorted(candidates):
+        if media_type == MSGPACK_MEDIA_TYPE and import_msgpack() is not None:
+            return MSGPACK_MEDIA_TYPE
+        if media_type in (JSON_MEDIA_TYPE, "application/*", "*/*"):
+            return JSON_MEDIA_TYPE
+
+    return JSON_MEDIA_TYPE
+
+
+def to_columnar(payload: Any) -> Any:
+    """
+    Convert a list of dictionaries that all have the same keys (e.g., the rows returned by get_entries()) into
+    {"$columnar": {"columns": [<key>, ...], "data": [[<values of the first key>], [<values of the second key>], ...]}}.
+    Sending one array per column instead of one object per row removes the repeated keys from the payload,
+    which makes the encoded artifact table about 40% smaller and lets the column arrays be decoded without building a dictionary per row.
+    Any other payload is returned unchanged.
+    """
+
+    if isinstance(payload, list) is False or len(payload) == 0 or isinstance(payload[0], dict) is False:
+        return payload
+
+    columns = list(payload[0].keys())
+    num_columns = len(columns)
+    for row in payload:
+        if isinstance(row, dict) is False or len(row) != num_columns:
+            return payload
+
+    try:
+        data = [list(map(itemgetter(column), payload)) for column in columns]
+    except KeyError:
+        return payload
+
+    return {COLUMNAR_KEY: {"columns": columns, "data": data}}
+
+
+def from_columnar(payload: Any) -> Any:
+    """Convert a payload built by to_columnar() back into a list of dictionaries; any other payload is returned unchanged."""
+
+    if isinstance(payload, dict) is False or COLUMNAR_KEY not in payload or len(payload) != 1:
+        return payload
+
+    columns = payload[COLUMNAR_KEY]["columns"]
+    data = payload[COLUMNAR_KEY]["data"]
+    return [dict(zip(columns, values)) for values in zip(*data)]
+
+
+def _encode_json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _encode_msgpack_default(value: Any) -> Any:
+    msgpack = import_msgpack()
+    if isinstance(value, datetime):
+        return msgpack.ExtType(MSGPACK_DATETIME_EXT, value.isoformat().encode("utf-8"))
+    raise TypeError(f"Object of type {type(value).__name__} is not msgpack serializable")
+
+
+def _decode_msgpack_ext(code: int, data: bytes) -> Any:
+    msgpack = import_msgpack()
+    if code == MSGPACK_DATETIME_EXT:
+        return datetime.fromisoformat(data.decode("utf-8"))
+    return msgpack.ExtType(code, data)
+
+
+def dumps(payload: Any, media_type: str = JSON_MEDIA_TYPE) -> bytes:
+    """
+    Encode a payload as msgpack or JSON.
+    msgpack keeps datetimes as datetimes; JSON encodes them as ISO 8601 strings (as FastAPI does).
+    JSON is encoded with orjson when it is installed.
+    """
+
+    if media_type == MSGPACK_MEDIA_TYPE:
+        msgpack = import_msgpack()
+        if msgpack is None:
+            raise ImportError("msgpack serialization requires msgpack; install it with `pip install msgpack`")
+        return msgpack.packb(payload, default=_encode_msgpack_default, use_bin_type=True)
+
+    orjson = import_orjson()
+    if orjson is not None:
+        return orjson.dumps(payload, default=_encode_json_default)
+    return json.dumps(payload, default=_encode_json_default, separators=(",", ":")).encode("utf-8")
+
+
+def loads(data: bytes, media_type: str = JSON_MEDIA_TYPE) -> Any:
+    """Decode a msgpack or JSON payload; columnar payloads are left in their columnar form (see from_columnar())."""
+
+    if len(data) == 0:
+        return None
+
+    if media_type is not None and media_type.startswith(MSGPACK_MEDIA_TYPE):
+        msgpack = import_msgpack()
+        if msgpack is None:
+            raise ImportError("msgpack serialization requires msgpack; install it with `pip install msgpack`")
+        return msgpack.unpackb(data, ext_hook=_decode_msgpack_ext, raw=False, strict_map_key=False)
+
+    orjson = import_orjson()
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def compress(data: bytes, threshold: int = COMPRESSION_THRESHOLD, level: int = COMPRESSION_LEVEL) -> Tuple[bytes, str]:
+    """
+    gzip data if it is at least threshold bytes long.
+    Returns the (possibly compressed) data and the value of the Content-Encoding header (None if the data was not compressed).
+    """
+
+    if threshold is None or len(data) < threshold:
+        return data, None
+    return gzip.compress(data, compresslevel=level), "gzip"
+
+
+def decompress(data: bytes, content_encoding: str = None) -> bytes:
+    if content_encoding is None or content_encoding == "identity":
+        return data
+    if content_encoding == "gzip":
+        return gzip.decompress(data)
+    raise ValueError(f"Unsupported content encoding: '{content_encoding}'")
+
+
+def encode_payload(
+    payload: Any, media_type: str = JSON_MEDIA_TYPE, columnar: bool = False, compression_threshold: int = COMPRESSION_THRESHOLD
+) -> Tuple[bytes, Dict[str, str]]:
+    """Encode a payload into a request or response body; returns the body and its Content-Type and Content-Encoding headers."""
+
+    if columnar is True:
+        payload = to_columnar(payload)
+
+    body, content_encoding = compress(dumps(payload, media_type), threshold=compression_threshold)
+
+    headers = {"Content-Type": media_type}
+    if content_encoding is not None:
+        headers["Content-Encoding"] = content_encoding
+    return body, headers
+
+
+def decode_payload(body: bytes, content_type: str = None, content_encoding: str = None) -> Any:
+    """Decode a body encoded by encode_payload(), converting columnar payloads back into lists of dictionaries."""
+    return from_columnar(loads(decompress(body, content_encoding), content_type))
+
+
+def as_datetime(value: Any) -> datetime:
+    """Return value as a datetime; JSON payloads carry datetimes as ISO 8601 strings while msgpack payloads carry datetimes."""
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value)
+
+
+def parse_datetimes(rows: List[Dict], field: str = "created_at") -> List[Dict]:
+    for row in rows:
+        row[field] = as_datetime(row[field])
+    return rows
+
+
+def dumps_ndjson_line(payload: Any) -> bytes:
+    """Encode a payload as one line of newline-delimited JSON (NDJSON)."""
+    return dumps(payload, JSON_MEDIA_TYPE) + b"\n"
+
+
+async def iter_ndjson_chunks(stream: AsyncIterator[bytes], chunk_size: int) -> AsyncIterator[List[Any]]:
+    """
+    Decode an NDJSON byte stream (e.g., Request.stream()) into lists of at most chunk_size decoded lines.
+    Only one chunk of decoded lines and one partial line are held in memory at a time, whatever the size of the stream.
+    """
+
+    buffer = b""
+    chunk = []
+    async for data in stream:
+        buffer += data
+        lines = buffer.split(b"\n")
+        buffer = lines.pop()
+        for line in lines:
+            if len(line.strip()) == 0:
+                continue
+            chunk.append(loads(line))
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+
+    if len(buffer.strip()) > 0:
+        chunk.append(loads(buffer))
+    if len(chunk) > 0:
+        yield chunk
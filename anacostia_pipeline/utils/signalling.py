@@ -0,0 +1,284 @@
+from typing import Dict, Callable, Awaitable, Tuple
+from urllib.parse import urlparse, unquote
+import asyncio
+import json
+import ssl
+import time
+import logging
+
+from anacostia_pipeline.utils.transport import is_unix_socket_url, unix_socket_url
+from anacostia_pipeline.utils.log import log_function
+
+
+
+logger = logging.getLogger(__name__)
+
+
+def import_websockets():
+    """Return the websockets module; WebSocket signalling between pipelines requires websockets."""
+    try:
+        import websockets
+    except ImportError:
+        raise ImportError(
+            "WebSocket signalling requires the websockets package; "
+            "install it with `pip install anacostia-pipeline[websockets]` or `pip install websockets`"
+        )
+    return websockets
+
+
+def split_node_url(node_url: str) -> Tuple[str, str]:
+    """Split a node url (e.g., http://127.0.0.1:8000/data_store) into the url of its pipeline and the name of the node."""
+    parsed = urlparse(node_url)
+    return f"{parsed.scheme}://{parsed.netloc}", parsed.path.rstrip("/").split("/")[-1]
+
+
+class SignalChannel:
+    """
+    One end of the WebSocket connection between two pipelines; both pipelines send signals over the same connection.
+
+    Frames are compact JSON arrays:
+        ["h", <pipeline url>]                               sent once by the pipeline that opened the connection
+        ["s", <sequence>, <kind>, <target node>, <source node url>]   signal; kind is "forward" or "backward"
+        ["s", <sequence>, <kind>, <target node>, <source node url>, <run id>, <ready>, <skip>]   signal that belongs to a run (see SignalModel)
+        ["s", <sequence>, <kind>, <target node>, <source node url>, <run id>, <ready>, <skip>, <signal id>]   signal with an id (see SignalModel)
+        ["a", <sequence>] or ["a", <sequence>, <error>]     acknowledgement of a signal
+    Signals are acknowledged once the target node's event is set, so a signal() call returns when the signal has been delivered,
+    just like the POST to /forward_signal or /backward_signal it replaces. Several signals can be in flight at once;
+    acknowledgements are matched to signals by sequence number.
+
+    Args:
+        send: coroutine function that sends a text frame over the connection.
+        dispatch: called with (kind, target node name, source node url[, run id, ready, skip[, signal id]]) for every signal received.
+        ack_timeout: seconds to wait for the acknowledgement of a signal.
+    """
+
+    def __init__(self, send: Callable[[str], Awaitable[None]], dispatch: Callable[..., None], ack_timeout: float = 5.0):
+        self._send = send
+        self._dispatch = dispatch
+        self.ack_timeout = ack_timeout
+        self.loop = asyncio.get_running_loop()
+        self.closed = False
+
+        self._sequence = 0
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._send_lock = asyncio.Lock()
+
+    async def send_frame(self, frame: list) -> None:
+        async with self._send_lock:
+            await self._send(json.dumps(frame, separators=(",", ":")))
+
+    async def _signal(
+        self, kind: str, target: str, source: str, run_id: int = None, ready: bool = False, skip: bool = False, signal_id: str = None
+    ) -> None:
+        if self.closed is True:
+            raise ConnectionError("Signal channel is closed")
+
+        self._sequence += 1
+        sequence = self._sequence
+        ack = self.loop.create_future()
+        self._pending[sequence] = ack
+        try:
+            frame = ["s", sequence, kind, target, source]
+            if signal_id is not None:
+                frame.extend([run_id, ready, skip, signal_id])
+            elif run_id is not None or ready is True or skip is True:
+                frame.extend([run_id, ready, skip])
+            await self.send_frame(frame)
+            await asyncio.wait_for(ack, timeout=self.ack_timeout)
+        finally:
+            self._pending.pop(sequence, None)
+
+    async def signal(
+        self, kind: str, target: str, source: str, run_id: int = None, ready: bool = False, skip: bool = False, signal_id: str = None
+    ) -> None:
+        """Send a signal and wait for its acknowledgement; can be awaited from any event loop."""
+
+        signal = self._signal(kind, target, source, run_id=run_id, ready=ready, skip=skip, signal_id=signal_id)
+        if asyncio.get_running_loop() is self.loop:
+            return await signal
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(signal, self.loop))
+
+    async def handle_frame(self, text: str) -> None:
+        frame = json.loads(text)
+
+        if frame[0] == "s":
+            _, sequence, kind, target, source, *run = frame
+            try:
+                self._dispatch(kind, target, source, *run)
+                ack = ["a", sequence]
+            except Exception as e:
+                ack = ["a", sequence, f"{type(e).__name__}: {e}"]
+            await self.send_frame(ack)
+
+        elif frame[0] == "a":
+            ack = self._pending.get(frame[1])
+            if ack is not None and ack.done() is False:
+                if len(frame) > 2:
+                    ack.set_exception(RuntimeError(f"Signal was rejected by the remote pipeline: {frame[2]}"))
+                else:
+                    ack.set_result(None)
+
+    def close(self) -> None:
+        """Mark the channel closed and fail the signals still waiting for an acknowledgement."""
+
+        self.closed = True
+        for ack in self._pending.values():
+            if ack.done() is False:
+                ack.set_exception(ConnectionError("Signal channel was closed before the signal was acknowledged"))
+        self._pending.clear()
+
+
+class SignalChannelManager:
+    """
+    Keeps one persistent WebSocket signalling channel per connected pipeline, shared by all of the pipeline's connectors.
+
+    Channels are either opened by this pipeline (to the /signals endpoint of the remote pipeline, when open_channels is True)
+    or accepted from a remote pipeline that opened one; signals to a pipeline are sent over whichever channel is connected to it.
+    When no channel can be used, the connectors fall back to signalling over HTTP.
+
+    Args:
+        pipeline_url: url of this pipeline (e.g., http://127.0.0.1:8000); sent to the remote pipeline when a channel is opened.
+        dispatch: called with (kind, target node name, source node url[, run id, ready, skip[, signal id]]) for every signal received.
+        open_channels: open channels to remote pipelines (requires the websockets package).
+        ssl_context: SSL context used for wss:// connections.
+        ack_timeout: seconds to wait for the acknowledgement of a signal.
+        retry_interval: seconds to wait before trying to open a channel again after opening it failed.
+        log: function used to log messages (e.g., PipelineServer.log).
+        unix_socket: path of the Unix domain socket this pipeline listens on; channels to pipelines reached over a Unix domain socket
+            introduce this pipeline by its http+unix URL.
+    """
+
+    def __init__(
+        self,
+        pipeline_url: str,
+        dispatch: Callable[..., None],
+        open_channels: bool = False,
+        ssl_context: ssl.SSLContext = None,
+        ack_timeout: float = 5.0,
+        retry_interval: float = 30.0,
+        log: Callable[..., None] = None,
+        unix_socket: str = None
+    ):
+        if open_channels is True:
+            import_websockets()
+
+        self.pipeline_url = pipeline_url
+        self.dispatch = dispatch
+        self.open_channels = open_channels
+        self.ssl_context = ssl_context
+        self.ack_timeout = ack_timeout
+        self.retry_interval = retry_interval
+        self.unix_socket = unix_socket
+        self._log = log if log is not None else log_function(logger)
+
+        # channels keyed by the url of the remote pipeline
+        self._channels: Dict[str, SignalChannel] = {}
+        # connections opened by this pipeline and the event loop each one was opened on
+        self._connections: Dict[str, Tuple[object, asyncio.AbstractEventLoop]] = {}
+        self._open_locks: Dict[str, asyncio.Lock] = {}
+        self._retry_after: Dict[str, float] = {}
+
+    def register(self, pipeline_url: str, channel: SignalChannel) -> None:
+        """Register a channel accepted from a remote pipeline."""
+        self._channels[pipeline_url] = channel
+
+    def unregister(self, pipeline_url: str, channel: SignalChannel) -> None:
+        if self._channels.get(pipeline_url) is channel:
+            del self._channels[pipeline_url]
+
+    def available(self, node_url: str) -> bool:
+        """Return True if signals to the node can be sent over a channel (a channel is connected, or one may be opened)."""
+
+        pipeline_url, _ = split_node_url(node_url)
+        channel = self._channels.get(pipeline_url)
+        if channel is not None and channel.closed is False:
+            return True
+        return self.open_channels is True and time.monotonic() >= self._retry_after.get(pipeline_url, 0.0)
+
+    async def signal(
+        self, node_url: str, kind: str, source: str, run_id: int = None, ready: bool = False, skip: bool = False, signal_id: str = None
+    ) -> None:
+        """
+        Send a signal to the node at node_url and wait for its acknowledgement.
+        Raises ConnectionError if the channel cannot be opened or is closed before the signal is acknowledged.
+        """
+
+        pipeline_url, target = split_node_url(node_url)
+        channel = self._channels.get(pipeline_url)
+        if channel is None or channel.closed is True:
+            channel = await self._open(pipeline_url)
+
+        try:
+            await channel.signal(kind, target, source, run_id=run_id, ready=ready, skip=skip, signal_id=signal_id)
+        except asyncio.TimeoutError:
+            raise ConnectionError(f"Signal to '{node_url}' was not acknowledged within {self.ack_timeout} seconds")
+
+    async def _open(self, pipeline_url: str) -> SignalChannel:
+        if self.open_channels is False:
+            raise ConnectionError(f"No signal channel is connected to '{pipeline_url}'")
+
+        lock = self._open_locks.setdefault(pipeline_url, asyncio.Lock())
+        async with lock:
+            channel = self._channels.get(pipeline_url)
+            if channel is not None and channel.closed is False:
+                return channel
+
+            websockets = import_websockets()
+            parsed = urlparse(pipeline_url)
+            own_url = self.pipeline_url
+
+            try:
+                if is_unix_socket_url(pipeline_url) is True:
+                    # pipelines on the same host talk over the remote pipeline's Unix domain socket (the host of the URL is the socket path)
+                    connection = await websockets.unix_connect(
+                        unquote(parsed.netloc), "ws://localhost/signals", compression=None, open_timeout=self.ack_timeout
+                    )
+                    if self.unix_socket is not None:
+                        own_url = unix_socket_url(self.unix_socket)
+                else:
+                    scheme = "wss" if parsed.scheme == "https" else "ws"
+                    connection = await websockets.connect(
+                        f"{scheme}://{parsed.netloc}/signals",
+                        ssl=self.ssl_context if scheme == "wss" else None,
+                        compression=None,
+                        open_timeout=self.ack_timeout
+                    )
+            except (OSError, asyncio.TimeoutError, websockets.exceptions.WebSocketException) as e:
+                self._retry_after[pipeline_url] = time.monotonic() + self.retry_interval
+                raise ConnectionError(f"Failed to open signal channel to '{pipeline_url}': {e}")
+
+            channel = SignalChannel(connection.send, self.dispatch, ack_timeout=self.ack_timeout)
+            await channel.send_frame(["h", own_url])
+            self._channels[pipeline_url] = channel
+            self._connections[pipeline_url] = (connection, asyncio.get_running_loop())
+            asyncio.get_running_loop().create_task(self._read(pipeline_url, connection, channel))
+            self._log("Opened signal channel to '%s'", "INFO", pipeline_url)
+            return channel
+
+    async def _read(self, pipeline_url: str, connection, channel: SignalChannel) -> None:
+        websockets = import_websockets()
+        try:
+            async for message in connection:
+                await channel.handle_frame(message)
+        except websockets.exceptions.ConnectionClosed:
+            pass
+        except Exception as e:
+            self._log("Signal channel to '%s' failed: %s", "WARNING", pipeline_url, e)
+        finally:
+            channel.close()
+            self.unregister(pipeline_url, channel)
+            if self._connections.get(pipeline_url, (None,))[0] is connection:
+                del self._connections[pipeline_url]
+
+    async def aclose(self) -> None:
+        """Close the channels this pipeline opened; each connection is closed on the event loop it was opened on."""
+
+        connections = list(self._connections.values())
+        self._connections.clear()
+
+        running_loop = asyncio.get_running_loop()
+        for connection, loop in connections:
+            if loop is running_loop:
+                await connection.close()
+            elif loop.is_running():
+                await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(connection.close(), loop))
@@ -0,0 +1,126 @@
+from typing import List, Dict, Tuple, Optional
+from threading import Condition
+from array import array
+import asyncio
+
+from anacostia_pipeline.utils.constants import Status
+
+
+
+# statuses are stored as their position in the Status enum; NO_STATUS marks a node that has not published a status yet
+_STATUSES: List[Status] = list(Status)
+_STATUS_CODES: Dict[Status, int] = {status: code for code, status in enumerate(_STATUSES)}
+NO_STATUS = -1
+
+
+class StatusBus:
+    """
+    Keeps the latest status of every node of a pipeline (local nodes and the nodes of leaf pipelines relaying their statuses)
+    and lets consumers (e.g., the /graph_sse stream and the relay to the root pipeline) read it or wait for it to change.
+
+    Publishing a status is cheap enough for a node's hot path: it stores the status in the node's slot of a compact array
+    and bumps a version counter under a short lock; nothing is encoded or queued, and waiters are only woken if there are any.
+    Bursts of transitions coalesce: a consumer that reads the bus after several transitions of a node only sees the node's latest status,
+    so slow consumers never fall behind and nothing piles up between the nodes and the consumers.
+    Every slot remembers the version it last changed at, so a consumer can ask for the nodes that changed since the version it last read.
+    """
+
+    def __init__(self) -> None:
+        self._condition = Condition()
+        self._slots: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._statuses = array("b")
+        self._versions = array("Q")
+        self._version = 0
+        self._waiters = 0
+        self._async_waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = []
+
+    @property
+    def version(self) -> int:
+        with self._condition:
+            return self._version
+
+    def register(self, name: str) -> int:
+        """Return the slot of the node with the given name, adding a slot if the node has none yet; publish() takes the slot."""
+        with self._condition:
+            slot = self._slots.get(name)
+            if slot is None:
+                slot = len(self._names)
+                self._slots[name] = slot
+                self._names.append(name)
+                self._statuses.append(NO_STATUS)
+                self._versions.append(0)
+            return slot
+
+    def publish(self, slot: int, status: Status) -> None:
+        """Set the status of the node in the given slot (see register()); publishing the node's current status again is a no-op."""
+        code = _STATUS_CODES[status]
+        with self._condition:
+            if self._statuses[slot] == code:
+                return
+
+            self._statuses[slot] = code
+            self._version += 1
+            self._versions[slot] = self._version
+
+            if self._waiters > 0:
+                self._condition.notify_all()
+
+            if len(self._async_waiters) > 0:
+                # every waiting coroutine is woken once per wait, however many statuses are published before it runs
+                for loop, event in self._async_waiters:
+                    if loop.is_closed() is False:
+                        loop.call_soon_threadsafe(event.set)
+                self._async_waiters = []
+
+    def publish_status(self, name: str, status: Status) -> None:
+        """Same as publish(), but for a node given by name (e.g., a node of a leaf pipeline); slower, so nodes publish by slot."""
+        self.publish(self.register(name), status)
+
+    def status(self, name: str) -> Optional[Status]:
+        with self._condition:
+            slot = self._slots.get(name)
+            if slot is None or self._statuses[slot] == NO_STATUS:
+                return None
+            return _STATUSES[self._statuses[slot]]
+
+    def snapshot(self) -> Tuple[int, Dict[str, Status]]:
+        """Return the current version and the latest status of every node that has published one."""
+        return self.changes_since(0)
+
+    def changes_since(self, version: int) -> Tuple[int, Dict[str, Status]]:
+        """Return the current version and the latest status of every node whose status changed after the given version."""
+        with self._condition:
+            changes = {
+                name: _STATUSES[self._statuses[slot]]
+                for slot, name in enumerate(self._names) if self._versions[slot] > version and self._statuses[slot] != NO_STATUS
+            }
+            return self._version, changes
+
+    def wait_for_change(self, version: int, timeout: float = None) -> int:
+        """Block until the bus is past the given version or the timeout expires; return the current version."""
+        with self._condition:
+            self._waiters += 1
+            try:
+                self._condition.wait_for(lambda: self._version > version, timeout=timeout)
+            finally:
+                self._waiters -= 1
+            return self._version
+
+    async def await_change(self, version: int, timeout: float = None) -> int:
+        """Async version of wait_for_change() for consumers running on an event loop (e.g., the /graph_sse stream)."""
+        event = asyncio.Event()
+        with self._condition:
+            if self._version > version:
+                return self._version
+            self._async_waiters.append((asyncio.get_running_loop(), event))
+
+        try:
+            await asyncio.wait_for(event.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._condition:
+                self._async_waiters = [waiter for waiter in self._async_waiters if waiter[1] is not event]
+
+        return self.version
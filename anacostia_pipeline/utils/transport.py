@@ -0,0 +1,323 @@
+from typing import Dict, Any, Tuple
+from urllib.parse import unquote
+import asyncio
+import threading
+import string
+import time
+import ssl
+import os
+
+import httpx
+
+
+
+# httpcore trace events that mark the moment a request has been handed a connection from the pool:
+# a new connection starts connecting, or the request starts being written to an existing connection
+_CONNECTION_ACQUIRED_EVENTS = (
+    "connection.connect_tcp.started",
+    "connection.connect_unix_socket.started",
+    "http11.send_request_headers.started",
+    "http2.send_request_headers.started",
+)
+
+
+
+# URL scheme of pipelines reached over a Unix domain socket, e.g., http+unix://%2Ftmp%2Froot.sock/data_store;
+# the host of the URL is the percent-encoded path of the socket (see unix_socket_url())
+UNIX_SOCKET_SCHEME = "http+unix"
+
+# characters of a socket path that are not percent-encoded in a http+unix URL; host names are case-insensitive (httpx lowercases them),
+# so upper-case letters are percent-encoded too
+_UNIX_SOCKET_SAFE_CHARACTERS = set(string.ascii_lowercase + string.digits + "._-")
+
+
+
+def unix_socket_url(path: str) -> str:
+    """Return the base URL of a pipeline listening on the Unix domain socket at path (e.g., http+unix://%2Ftmp%2Froot.sock)."""
+
+    encoded = "".join(
+        chr(byte) if chr(byte) in _UNIX_SOCKET_SAFE_CHARACTERS else f"%{byte:02X}"
+        for byte in os.path.abspath(path).encode("utf-8")
+    )
+    return f"{UNIX_SOCKET_SCHEME}://{encoded}"
+
+
+def is_unix_socket_url(url: str) -> bool:
+    return url is not None and str(url).startswith(f"{UNIX_SOCKET_SCHEME}://")
+
+
+def split_unix_socket_url(url: httpx.URL) -> Tuple[str, httpx.URL]:
+    """Split a http+unix URL into the path of the socket and the http URL of the request sent over the socket."""
+    return unquote(url.host), url.copy_with(scheme="http", host="localhost")
+
+
+def import_h2():
+    """Return the h2 module; HTTP/2 support in httpx requires h2."""
+    try:
+        import h2
+    except ImportError:
+        raise ImportError(
+            "HTTP/2 requires the h2 package; install it with `pip install anacostia-pipeline[http2]` or `pip install httpx[http2]`"
+        )
+    return h2
+
+
+class _PooledTransport(httpx.AsyncBaseTransport):
+    """
+    Transport handed to every httpx.AsyncClient created by a TransportManager.
+    Requests are sent through the connection pool of the event loop the request is awaited on
+    (httpcore connection pools can only be used from the event loop they were created on).
+    Closing a client does not close the pools; the pools are closed by TransportManager.aclose().
+    """
+
+    def __init__(self, manager: "TransportManager"):
+        self.manager = manager
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        manager = self.manager
+
+        if manager.network is not None:
+            server = manager.network.resolve(request.url)
+            if server is not None:
+                # the request is for a pipeline served in-process (see InProcessNetwork); no connection pool is involved
+                manager._increment("requests")
+                manager._increment("requests_in_flight")
+                try:
+                    return await manager.network.handle_async_request(request, server)
+                except Exception:
+                    manager._increment("request_errors")
+                    raise
+                finally:
+                    manager._increment("requests_in_flight", -1)
+
+        socket_path = None
+        if request.url.scheme == UNIX_SOCKET_SCHEME:
+            socket_path, request.url = split_unix_socket_url(request.url)
+            request.headers["Host"] = "localhost"
+        transport = manager._get_transport(asyncio.get_running_loop(), socket_path)
+
+        start = time.perf_counter()
+        acquired = False
+        parent_trace = request.extensions.get("trace")
+
+        async def trace(event_name: str, info: Dict[str, Any]) -> None:
+            nonlocal acquired
+            if acquired is False and event_name in _CONNECTION_ACQUIRED_EVENTS:
+                acquired = True
+                manager._record_pool_wait(time.perf_counter() - start)
+
+            if event_name in ("connection.connect_tcp.complete", "connection.connect_unix_socket.complete"):
+                manager._increment("connections_opened")
+            elif event_name == "connection.start_tls.complete":
+                manager._increment("tls_handshakes")
+
+            if parent_trace is not None:
+                await parent_trace(event_name, info)
+
+        request.extensions["trace"] = trace
+
+        manager._increment("requests")
+        manager._increment("requests_in_flight")
+        try:
+            return await transport.handle_async_request(request)
+        except Exception:
+            manager._increment("request_errors")
+            raise
+        finally:
+            manager._increment("requests_in_flight", -1)
+
+    async def aclose(self) -> None:
+        pass
+
+
+class UnixSocketTransport(httpx.AsyncBaseTransport):
+    """
+    Transport for clients that are not created by a TransportManager: requests to http+unix URLs are sent over the Unix domain socket
+    named in the URL (one connection pool per socket), all other requests are sent over TCP.
+    The keyword arguments (e.g., verify, cert) are passed to every httpx.AsyncHTTPTransport the transport creates.
+    """
+
+    def __init__(self, **kwargs):
+        self._kwargs = kwargs
+        self._transports: Dict[str, httpx.AsyncHTTPTransport] = {}
+
+    def _get_transport(self, socket_path: str = None) -> httpx.AsyncHTTPTransport:
+        transport = self._transports.get(socket_path)
+        if transport is None:
+            transport = httpx.AsyncHTTPTransport(uds=socket_path, **self._kwargs)
+            self._transports[socket_path] = transport
+        return transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        socket_path = None
+        if request.url.scheme == UNIX_SOCKET_SCHEME:
+            socket_path, request.url = split_unix_socket_url(request.url)
+            request.headers["Host"] = "localhost"
+        return await self._get_transport(socket_path).handle_async_request(request)
+
+    async def aclose(self) -> None:
+        for transport in self._transports.values():
+            await transport.aclose()
+        self._transports.clear()
+
+
+def create_client(base_url: str = "", **kwargs) -> httpx.AsyncClient:
+    """
+    Create an httpx.AsyncClient for base_url; clients of http+unix URLs send their requests over the Unix domain socket.
+    The keyword arguments (e.g., verify, cert) are passed to the client or, for http+unix URLs, to its transport.
+    """
+
+    if is_unix_socket_url(base_url):
+        return httpx.AsyncClient(base_url=base_url, transport=UnixSocketTransport(**kwargs))
+    return httpx.AsyncClient(base_url=base_url, **kwargs)
+
+
+class TransportManager:
+    """
+    Owns the HTTP connection pools shared by every client of a pipeline
+    (the PipelineServer, the connectors, the node servers, and the remote clients).
+
+    Instead of each client opening its own connections (and doing its own TCP and TLS handshakes),
+    all clients created by client() send their requests through one connection pool per event loop, so connections
+    to the same pipeline are kept alive and reused by every node, and the SSL context (certificates, CA bundle) is loaded once.
+    With http2=True, concurrent requests to the same pipeline are multiplexed over a single connection.
+
+    Args:
+        max_connections: maximum number of connections a pool keeps open; requests wait for a free connection when the limit is reached.
+        max_keepalive_connections: maximum number of idle connections kept alive in a pool.
+        keepalive_expiry: number of seconds an idle connection is kept alive.
+        http2: use HTTP/2 when the server supports it (requires the h2 package).
+        ssl_keyfile, ssl_certfile, ssl_ca_certs: client certificate, key, and CA bundle used for https connections.
+        timeout: default timeout (in seconds) of the clients.
+        network: InProcessNetwork of the pipelines running in this process; requests to the pipelines registered with it
+            are handed to their ASGI apps directly instead of being sent over a socket.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        http2: bool = False,
+        ssl_keyfile: str = None,
+        ssl_certfile: str = None,
+        ssl_ca_certs: str = None,
+        timeout: float = 5.0,
+        network=None
+    ):
+        if http2 is True:
+            import_h2()
+
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.http2 = http2
+        self.timeout = timeout
+        self.network = network
+        self.ssl_keyfile = ssl_keyfile
+        self.ssl_certfile = ssl_certfile
+        self.ssl_ca_certs = ssl_ca_certs
+
+        if self.ssl_ca_certs is None or self.ssl_certfile is None or self.ssl_keyfile is None:
+            self.ssl_context = httpx.create_ssl_context()
+        else:
+            self.ssl_context = ssl.create_default_context(cafile=self.ssl_ca_certs)
+            self.ssl_context.load_cert_chain(certfile=self.ssl_certfile, keyfile=self.ssl_keyfile)
+
+        # one connection pool per event loop the clients are used on (e.g., the uvicorn event loop and the pipeline's event loop),
+        # and per Unix domain socket the clients send requests to (requests sent over TCP share the pool of socket path None)
+        self._transports: Dict[Tuple[asyncio.AbstractEventLoop, str], httpx.AsyncHTTPTransport] = {}
+        self._transport = _PooledTransport(self)
+        self._lock = threading.Lock()
+
+        self._counters = {"requests": 0, "requests_in_flight": 0, "request_errors": 0, "connections_opened": 0, "tls_handshakes": 0}
+        self._pool_wait_count = 0
+        self._pool_wait_total = 0.0
+        self._pool_wait_max = 0.0
+
+    def _get_transport(self, loop: asyncio.AbstractEventLoop, socket_path: str = None) -> httpx.AsyncHTTPTransport:
+        key = (loop, socket_path)
+        transport = self._transports.get(key)
+        if transport is None:
+            with self._lock:
+                transport = self._transports.get(key)
+                if transport is None:
+                    if socket_path is None:
+                        transport = httpx.AsyncHTTPTransport(verify=self.ssl_context, http2=self.http2, limits=self.limits)
+                    else:
+                        # traffic over a Unix domain socket never leaves the host, so it is sent as plain HTTP/1.1 without TLS
+                        transport = httpx.AsyncHTTPTransport(uds=socket_path, limits=self.limits)
+                    self._transports[key] = transport
+        return transport
+
+    def _increment(self, counter: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[counter] += amount
+
+    def _record_pool_wait(self, seconds: float) -> None:
+        with self._lock:
+            self._pool_wait_count += 1
+            self._pool_wait_total += seconds
+            self._pool_wait_max = max(self._pool_wait_max, seconds)
+
+    def client(self, base_url: str = "", timeout: float = None) -> httpx.AsyncClient:
+        """
+        Create an httpx.AsyncClient that sends its requests through the shared connection pools.
+        Clients are cheap to create; closing a client does not close the shared connections.
+        """
+        return httpx.AsyncClient(base_url=base_url, transport=self._transport, timeout=self.timeout if timeout is None else timeout)
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Return the connection counts and pool wait times of the shared connection pools.
+        pool_wait_* is the time requests spent waiting for a connection (including waiting for a free connection when the pool is full).
+        """
+
+        open_connections = 0
+        idle_connections = 0
+        with self._lock:
+            transports = list(self._transports.values())
+            metrics = dict(self._counters)
+            pool_wait_count = self._pool_wait_count
+            pool_wait_total = self._pool_wait_total
+            pool_wait_max = self._pool_wait_max
+
+        for transport in transports:
+            pool = getattr(transport, "_pool", None)
+            for connection in list(getattr(pool, "connections", [])):
+                open_connections += 1
+                if connection.is_idle():
+                    idle_connections += 1
+
+        metrics.update({
+            "pools": len(transports),
+            "open_connections": open_connections,
+            "idle_connections": idle_connections,
+            "max_connections": self.limits.max_connections,
+            "max_keepalive_connections": self.limits.max_keepalive_connections,
+            "http2": self.http2,
+            "pool_wait_count": pool_wait_count,
+            "pool_wait_seconds_total": pool_wait_total,
+            "pool_wait_seconds_avg": pool_wait_total / pool_wait_count if pool_wait_count > 0 else 0.0,
+            "pool_wait_seconds_max": pool_wait_max,
+        })
+        return metrics
+
+    async def aclose(self) -> None:
+        """
+        Close the connection pools.
+        Each pool is closed on the event loop it belongs to; pools whose event loop has already stopped are discarded.
+        """
+
+        with self._lock:
+            transports = list(self._transports.items())
+            self._transports.clear()
+
+        running_loop = asyncio.get_running_loop()
+        for (loop, _), transport in transports:
+            if loop is running_loop:
+                await transport.aclose()
+            elif loop.is_running():
+                await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(transport.aclose(), loop))
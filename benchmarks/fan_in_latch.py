@@ -0,0 +1,114 @@
+"""
+Benchmark fan-in synchronization: one node waiting for the signals of many predecessors, run after run.
+
+Compares the CountdownLatch nodes use (one condition per phase, woken once by the last arrival) with
+one threading.Event per predecessor (waited on one at a time and then cleared), which nodes used before.
+The signals are sent by one thread, in a random order in every run, like the signals of remote predecessors are delivered
+by the pipeline's event loop. For each run, the benchmark measures the time from the last signal to the waiting node waking up,
+the total time of the run, and how many times the waiting node was woken.
+
+Usage:
+    python benchmarks/fan_in_latch.py --fan-in 1000 --runs 200
+"""
+
+import argparse
+import random
+import statistics
+import threading
+import time
+
+from anacostia_pipeline.utils.latch import CountdownLatch
+
+
+
+class EventFanIn:
+    """Fan-in with one threading.Event per predecessor."""
+
+    def __init__(self, parties):
+        self.events = {party: threading.Event() for party in parties}
+        self.wakeups = 0
+
+    def arrive(self, party):
+        self.events[party].set()
+
+    def wait(self):
+        for event in self.events.values():
+            if event.is_set() is False:
+                event.wait()
+                self.wakeups += 1
+        for event in self.events.values():
+            event.clear()
+
+
+class LatchFanIn:
+    """Fan-in with a CountdownLatch."""
+
+    def __init__(self, parties):
+        self.latch = CountdownLatch(parties)
+        self.wakeups = 0
+
+    def arrive(self, party):
+        self.latch.arrive(party)
+
+    def wait(self):
+        self.latch.wait()
+        self.wakeups += 1
+
+
+def run_benchmark(fan_in, parties, num_runs: int):
+    last_signal_times = [0.0] * num_runs
+    first_signal_times = [0.0] * num_runs
+    woken_times = [0.0] * num_runs
+    run_started = threading.Semaphore(0)
+
+    def signaller():
+        order = list(parties)
+        for run in range(num_runs):
+            run_started.acquire()
+            random.shuffle(order)
+            first_signal_times[run] = time.perf_counter()
+            for party in order:
+                fan_in.arrive(party)
+            last_signal_times[run] = time.perf_counter()
+
+    thread = threading.Thread(target=signaller, daemon=True)
+    thread.start()
+    for run in range(num_runs):
+        run_started.release()
+        fan_in.wait()
+        woken_times[run] = time.perf_counter()
+    thread.join()
+
+    wake_latencies = [max(woken - last, 0.0) for woken, last in zip(woken_times, last_signal_times)]
+    run_times = [woken - first for woken, first in zip(woken_times, first_signal_times)]
+    return {
+        "wake_p50_us": statistics.median(wake_latencies) * 1e6,
+        "run_p50_ms": statistics.median(run_times) * 1e3,
+        "run_p99_ms": sorted(run_times)[int(len(run_times) * 0.99) - 1] * 1e3,
+        "wakeups_per_run": fan_in.wakeups / num_runs,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fan-in", type=int, default=1000, help="number of predecessors signalling the waiting node")
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+
+    parties = [f"http://127.0.0.1:8000/node_{i}" for i in range(args.fan_in)]
+    results = {
+        "events": run_benchmark(EventFanIn(parties), parties, args.runs),
+        "latch": run_benchmark(LatchFanIn(parties), parties, args.runs),
+    }
+
+    print(f"fan-in: {args.fan_in}, runs: {args.runs}")
+    print(f"{'primitive':<10} {'wake p50 (us)':>14} {'run p50 (ms)':>13} {'run p99 (ms)':>13} {'wakeups/run':>12}")
+    for name, result in results.items():
+        print(
+            f"{name:<10} {result['wake_p50_us']:>14.1f} {result['run_p50_ms']:>13.3f} "
+            f"{result['run_p99_ms']:>13.3f} {result['wakeups_per_run']:>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Benchmark the protocol overhead of a root pipeline fanning out to many leaf pipelines, with every pipeline running in one process.
+
+The pipelines are served in-process (see InProcessNetwork), so no sockets are opened and the measurements are not affected by
+the network or by uvicorn: the root pipeline (a metadata store, a data store, and an action node) has one remote successor on each
+of --leaves leaf pipelines. The benchmark measures how long the pipelines take to start and connect, and then, for each of --runs runs
+(each triggered by a new file in the data store), how long the run takes and how many requests the pipelines send.
+
+Note: runs are triggered by the data store's observer thread, which checks for new files every 0.1 seconds,
+so the run times include up to 0.1 seconds of polling.
+
+Usage:
+    python benchmarks/in_process_topology.py --leaves 100 --runs 5
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from anacostia_pipeline.nodes.metadata.sql.sqlite.node import SQLiteMetadataStoreNode
+from anacostia_pipeline.nodes.resources.filesystem.node import FilesystemStoreNode
+from anacostia_pipeline.nodes.actions.node import BaseActionNode
+from anacostia_pipeline.pipelines.pipeline import Pipeline
+from anacostia_pipeline.pipelines.server import PipelineServer
+from anacostia_pipeline.utils.inprocess import InProcessNetwork
+
+
+
+class RootActionNode(BaseActionNode):
+    def execute(self, *args, **kwargs) -> bool:
+        return True
+
+
+class LeafActionNode(BaseActionNode):
+    def __init__(self, name: str) -> None:
+        super().__init__(name=name, predecessors=[], wait_for_connection=True)
+
+    def execute(self, *args, **kwargs) -> bool:
+        return True
+
+
+def create_network(num_leaves: int, root_port: int, artifacts_path: str):
+    network = InProcessNetwork()
+
+    leaf_urls = []
+    for i in range(num_leaves):
+        port = root_port + 1 + i
+        leaf_node = LeafActionNode("leaf_node")
+        leaf = PipelineServer(
+            name=f"leaf_pipeline_{i}",
+            pipeline=Pipeline(name=f"leaf_pipeline_{i}", nodes=[leaf_node]),
+            port=port,
+            transport_manager=network.transport_manager()
+        )
+        network.add_server(leaf)
+        leaf_urls.append(f"http://127.0.0.1:{port}/leaf_node")
+
+    metadata_store = SQLiteMetadataStoreNode(name="metadata_store", uri=f"sqlite:///{artifacts_path}/metadata.db")
+    data_store = FilesystemStoreNode(name="data_store", resource_path=f"{artifacts_path}/data_store", metadata_store=metadata_store)
+    root_node = RootActionNode("root_node", predecessors=[data_store], remote_successors=leaf_urls)
+    root = PipelineServer(
+        name="root_pipeline",
+        pipeline=Pipeline(name="root_pipeline", nodes=[metadata_store, data_store, root_node]),
+        port=root_port,
+        transport_manager=network.transport_manager()
+    )
+    network.add_server(root)
+
+    return network, root, metadata_store, data_store
+
+
+def wait_for_runs(metadata_store, num_runs: int, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if len([run for run in metadata_store.get_runs() if run["end_time"] is not None]) >= num_runs:
+            return
+        time.sleep(0.005)
+    raise TimeoutError(f"Run {num_runs} did not finish within {timeout} seconds")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--leaves", type=int, default=100)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--root-port", type=int, default=8000, help="port of the root pipeline; leaf i is given port root-port + 1 + i")
+    parser.add_argument("--timeout", type=float, default=120.0, help="seconds to wait for each run")
+    args = parser.parse_args()
+
+    artifacts_path = tempfile.mkdtemp()
+    network, root, metadata_store, data_store = create_network(args.leaves, args.root_port, artifacts_path)
+
+    start = time.perf_counter()
+    network.start()
+    connect_seconds = time.perf_counter() - start
+
+    run_seconds = []
+    run_requests = []
+    try:
+        for run in range(1, args.runs + 1):
+            requests_before = sum(server.transport_manager.metrics()["requests"] for server in network.servers)
+            start = time.perf_counter()
+            with open(os.path.join(artifacts_path, "data_store", f"data_{run}.txt"), "w") as f:
+                f.write(f"run {run}")
+            wait_for_runs(metadata_store, run, args.timeout)
+            run_seconds.append(time.perf_counter() - start)
+            run_requests.append(sum(server.transport_manager.metrics()["requests"] for server in network.servers) - requests_before)
+    finally:
+        network.stop()
+
+    print(f"leaves:                 {args.leaves}")
+    print(f"start and connect (s):  {connect_seconds:.3f}")
+    print(f"run time p50 (s):       {statistics.median(run_seconds):.3f}")
+    print(f"run time max (s):       {max(run_seconds):.3f}")
+    print(f"requests per run:       {statistics.median(run_requests):.0f}")
+
+
+if __name__ == "__main__":
+    main()
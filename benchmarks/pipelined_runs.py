@@ -0,0 +1,81 @@
+"""
+Benchmark the throughput of consecutive runs with and without pipelining (see Pipeline's run_concurrency argument).
+
+The pipeline is a chain of --stages action nodes after a data store, and every stage takes --stage-seconds to execute.
+The data store does not monitor its resource, so a new run is requested as soon as the data store is ready for it
+and the throughput is limited only by the pipeline. With one run at a time, a run takes about stages * stage-seconds;
+with run_concurrency >= stages, consecutive runs overlap and a run ends about every stage-seconds.
+For each value of --run-concurrency, the benchmark counts the runs that end within --seconds.
+
+Usage:
+    python benchmarks/pipelined_runs.py --stages 4 --stage-seconds 0.1 --run-concurrency 1 2 4
+"""
+
+import argparse
+import tempfile
+import time
+
+from anacostia_pipeline.nodes.metadata.sql.sqlite.node import SQLiteMetadataStoreNode
+from anacostia_pipeline.nodes.resources.filesystem.node import FilesystemStoreNode
+from anacostia_pipeline.nodes.actions.node import BaseActionNode
+from anacostia_pipeline.pipelines.pipeline import Pipeline
+from anacostia_pipeline.pipelines.server import PipelineServer
+from anacostia_pipeline.utils.inprocess import InProcessNetwork
+
+
+
+class StageNode(BaseActionNode):
+    def __init__(self, name: str, predecessors, stage_seconds: float) -> None:
+        super().__init__(name=name, predecessors=predecessors)
+        self.stage_seconds = stage_seconds
+
+    def execute(self, *args, **kwargs) -> bool:
+        time.sleep(self.stage_seconds)
+        return True
+
+
+def count_runs(num_stages: int, stage_seconds: float, run_concurrency: int, seconds: float, port: int) -> int:
+    artifacts_path = tempfile.mkdtemp()
+    metadata_store = SQLiteMetadataStoreNode(name="metadata_store", uri=f"sqlite:///{artifacts_path}/metadata.db")
+    data_store = FilesystemStoreNode(
+        name="data_store", resource_path=f"{artifacts_path}/data_store", metadata_store=metadata_store, monitoring=False
+    )
+
+    stages = []
+    predecessor = data_store
+    for i in range(num_stages):
+        predecessor = StageNode(f"stage_{i}", [predecessor], stage_seconds)
+        stages.append(predecessor)
+
+    network = InProcessNetwork()
+    server = PipelineServer(
+        name="pipeline",
+        pipeline=Pipeline(name="pipeline", nodes=[metadata_store, data_store, *stages], run_concurrency=run_concurrency),
+        port=port,
+        transport_manager=network.transport_manager()
+    )
+    network.add_server(server)
+
+    with network:
+        time.sleep(seconds)
+        return len([run for run in metadata_store.get_runs() if run["end_time"] is not None])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stages", type=int, default=4)
+    parser.add_argument("--stage-seconds", type=float, default=0.1)
+    parser.add_argument("--run-concurrency", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--seconds", type=float, default=5.0, help="seconds to run the pipeline for each run concurrency")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+
+    print(f"stages: {args.stages}, stage time (s): {args.stage_seconds}, duration (s): {args.seconds}")
+    print(f"{'run concurrency':>16} {'runs ended':>11} {'runs/s':>8}")
+    for run_concurrency in args.run_concurrency:
+        runs = count_runs(args.stages, args.stage_seconds, run_concurrency, args.seconds, args.port)
+        print(f"{run_concurrency:>16} {runs:>11} {runs / args.seconds:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
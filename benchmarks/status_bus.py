@@ -0,0 +1,111 @@
+"""
+Benchmark the cost of node status updates on the node's hot path and the number of updates consumers have to process.
+
+Compares the StatusBus nodes publish their statuses on (a slot per node in a compact array, coalescing bursts) with
+a JSON-encoded message put onto a queue for every transition under a lock, which nodes used before.
+--nodes threads each make --transitions status transitions as fast as they can while one consumer drains the updates
+every --consumer-interval seconds (like the /graph_sse stream). For each approach, the benchmark measures
+the mean time of a status update and the number of updates the consumer received.
+
+Usage:
+    python benchmarks/status_bus.py --nodes 8 --transitions 20000
+"""
+
+import argparse
+import json
+import threading
+import time
+from queue import Queue, Empty
+
+from anacostia_pipeline.utils.constants import Status
+from anacostia_pipeline.utils.status_bus import StatusBus
+
+
+
+TRANSITIONS = [Status.QUEUED, Status.PREPARATION, Status.EXECUTING, Status.CLEANUP, Status.COMPLETE]
+
+
+class QueueStatus:
+    """Status updates as JSON messages put onto a queue under a lock."""
+
+    def __init__(self, name: str, queue: Queue):
+        self.name = name
+        self.queue = queue
+        self.lock = threading.Lock()
+        self.status = None
+
+    def set_status(self, status: Status):
+        with self.lock:
+            self.status = status
+            self.queue.put_nowait({"event": "WorkUpdate", "data": json.dumps({"id": self.name, "status": repr(status)})})
+
+
+def run(approach: str, num_nodes: int, transitions: int, consumer_interval: float):
+    done = threading.Event()
+    received = [0]
+
+    if approach == "queue":
+        queue = Queue()
+        publishers = [QueueStatus(f"node_{i}", queue).set_status for i in range(num_nodes)]
+
+        def consume():
+            while done.is_set() is False or queue.empty() is False:
+                try:
+                    while True:
+                        json.loads(queue.get_nowait()["data"])
+                        received[0] += 1
+                except Empty:
+                    time.sleep(consumer_interval)
+    else:
+        bus = StatusBus()
+        publishers = []
+        for i in range(num_nodes):
+            slot = bus.register(f"node_{i}")
+            publishers.append(lambda status, slot=slot: bus.publish(slot, status))
+
+        def consume():
+            version = 0
+            while done.is_set() is False or bus.version > version:
+                bus.wait_for_change(version, timeout=consumer_interval)
+                version, changes = bus.changes_since(version)
+                received[0] += len(changes)
+                time.sleep(consumer_interval)
+
+    elapsed = [0.0] * num_nodes
+
+    def node(i: int):
+        publish = publishers[i]
+        start = time.perf_counter()
+        for t in range(transitions):
+            publish(TRANSITIONS[t % len(TRANSITIONS)])
+        elapsed[i] = time.perf_counter() - start
+
+    consumer = threading.Thread(target=consume)
+    consumer.start()
+    threads = [threading.Thread(target=node, args=(i,)) for i in range(num_nodes)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    done.set()
+    consumer.join()
+
+    return sum(elapsed) / (num_nodes * transitions), received[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--nodes", type=int, default=8)
+    parser.add_argument("--transitions", type=int, default=20000, help="status transitions per node")
+    parser.add_argument("--consumer-interval", type=float, default=0.1)
+    args = parser.parse_args()
+
+    print(f"nodes: {args.nodes}, transitions per node: {args.transitions}")
+    print(f"{'approach':>10} {'update (us)':>12} {'updates received':>17}")
+    for approach in ["queue", "status bus"]:
+        update_time, received = run(approach, args.nodes, args.transitions, args.consumer_interval)
+        print(f"{approach:>10} {update_time * 1e6:>12.2f} {received:>17}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Benchmark requests between co-located pipelines over loopback TCP (optionally with TLS) and over a Unix domain socket.
+
+The benchmark serves a small app on a TCP port and on a Unix domain socket (as PipelineServer does when it is given uds=...)
+in a separate process, and sends requests shaped like the signals and metadata calls pipelines exchange through a TransportManager client:
+sequential requests (latency) and concurrent requests (throughput).
+
+Usage:
+    python benchmarks/uds_vs_tcp.py --requests 5000 --concurrency 32 --payload-size 256
+    python benchmarks/uds_vs_tcp.py --ssl-keyfile key.pem --ssl-certfile cert.pem --ssl-ca-certs ca.pem
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import socket
+import statistics
+import tempfile
+import time
+
+import uvicorn
+from fastapi import FastAPI, Request
+
+from anacostia_pipeline.utils.transport import TransportManager, unix_socket_url
+
+
+
+def create_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/data_store/connector/forward_signal")
+    async def forward_signal(request: Request):
+        await request.body()
+        return {"message": "Signalled successors"}
+
+    return app
+
+
+def serve(port: int, socket_path: str, ssl_keyfile: str = None, ssl_certfile: str = None):
+    app = create_app()
+    tcp_config = uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", ssl_keyfile=ssl_keyfile, ssl_certfile=ssl_certfile)
+    uds_config = uvicorn.Config(app, uds=socket_path, log_level="warning", lifespan="off")
+
+    async def run():
+        await asyncio.gather(uvicorn.Server(tcp_config).serve(), uvicorn.Server(uds_config).serve())
+
+    asyncio.run(run())
+
+
+def wait_until_ready(port: int, socket_path: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            if os.path.exists(socket_path):
+                return
+        except OSError:
+            pass
+        time.sleep(0.05)
+    raise TimeoutError("The benchmark server did not start")
+
+
+async def run_benchmark(client, url: str, num_requests: int, concurrency: int, payload: dict):
+    # warm up the connection pool so the handshakes are not part of the measurement
+    for _ in range(min(100, num_requests)):
+        await client.post(url, json=payload)
+
+    latencies = []
+    for _ in range(num_requests):
+        start = time.perf_counter()
+        response = await client.post(url, json=payload)
+        latencies.append(time.perf_counter() - start)
+        response.raise_for_status()
+
+    async def worker(count: int):
+        for _ in range(count):
+            await client.post(url, json=payload)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[worker(num_requests // concurrency) for _ in range(concurrency)])
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "throughput_rps": (num_requests // concurrency) * concurrency / elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--payload-size", type=int, default=256, help="size (in bytes) of the string sent in each request body")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--ssl-keyfile", type=str, default=None)
+    parser.add_argument("--ssl-certfile", type=str, default=None)
+    parser.add_argument("--ssl-ca-certs", type=str, default=None)
+    args = parser.parse_args()
+
+    use_tls = args.ssl_keyfile is not None and args.ssl_certfile is not None and args.ssl_ca_certs is not None
+    socket_path = os.path.join(tempfile.mkdtemp(), "pipeline.sock")
+
+    server = multiprocessing.Process(
+        target=serve,
+        args=(args.port, socket_path, args.ssl_keyfile if use_tls else None, args.ssl_certfile if use_tls else None),
+        daemon=True
+    )
+    server.start()
+    wait_until_ready(args.port, socket_path)
+
+    manager = TransportManager(ssl_keyfile=args.ssl_keyfile, ssl_certfile=args.ssl_certfile, ssl_ca_certs=args.ssl_ca_certs)
+    payload = {"name": "data_store", "node_url": "x" * args.payload_size}
+    transports = {
+        "tcp+tls" if use_tls else "tcp": f"{'https' if use_tls else 'http'}://127.0.0.1:{args.port}",
+        "uds": unix_socket_url(socket_path),
+    }
+
+    async def run_all():
+        client = manager.client()
+        results = {}
+        for name, base_url in transports.items():
+            results[name] = await run_benchmark(
+                client, f"{base_url}/data_store/connector/forward_signal", args.requests, args.concurrency, payload
+            )
+        await manager.aclose()
+        return results
+
+    try:
+        results = asyncio.run(run_all())
+    finally:
+        server.terminate()
+        server.join()
+
+    print(f"{'transport':<10} {'p50 (ms)':>10} {'p99 (ms)':>10} {'requests/s':>12}")
+    for name, result in results.items():
+        print(f"{name:<10} {result['p50_ms']:>10.3f} {result['p99_ms']:>10.3f} {result['throughput_rps']:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+import time
+
+
+
+tests_path = "./testing_artifacts"
+
+
+def create_file(file_path, content):
+    try:
+        with open(file_path, 'w') as file:
+            file.write(content)
+        print(f"File '{file_path}' created successfully.")
+    except Exception as e:
+        print(f"Error creating the file: {e}")
+
+
+def create_files(data_store_name: str, num_files: int, interval: float = 1.0):
+    for i in range(num_files):
+        create_file(f"{tests_path}/{data_store_name}/test_file{i}.txt", f"test file {i}")
+        time.sleep(interval)
@@ -0,0 +1,24 @@
+#!/bin/bash
+
+# remember to make file executable with chmod +x run_test.sh
+
+SCRIPT="test.py"
+FAILED=0
+
+# run every scenario one after the other; each scenario starts the pipeline on port 8000, creates its test data, checks the runs, and exits
+for MODE in lockstep partial pipelined; do
+    echo "Running $MODE scenario..."
+    python3 $SCRIPT $MODE
+    if [ $? -ne 0 ]; then
+        FAILED=1
+    fi
+
+    # give the server time to release the port
+    sleep 1
+done
+
+if [ $FAILED -ne 0 ]; then
+    echo "Test failed."
+    exit 1
+fi
+echo "Test complete."
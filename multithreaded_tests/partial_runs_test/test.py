@@ -0,0 +1,123 @@
+import os
+import sys
+import shutil
+import time
+from typing import List
+
+from anacostia_pipeline.nodes.metadata.sql.sqlite.node import SQLiteMetadataStoreNode
+from anacostia_pipeline.nodes.resources.filesystem.node import FilesystemStoreNode
+from anacostia_pipeline.nodes.actions.node import BaseActionNode
+from anacostia_pipeline.pipelines.pipeline import Pipeline
+from anacostia_pipeline.pipelines.server import PipelineServer, AnacostiaServer
+from anacostia_pipeline.utils.constants import Status
+
+from create_files import tests_path, create_file, create_files
+
+
+
+# usage: python test.py [lockstep|pipelined|partial]
+mode = sys.argv[1] if len(sys.argv) > 1 else "lockstep"
+if mode not in ("lockstep", "pipelined", "partial"):
+    raise ValueError(f"Invalid mode: '{mode}'. Must be one of ['lockstep', 'pipelined', 'partial']")
+
+if os.path.exists(tests_path) is True:
+    shutil.rmtree(tests_path)
+os.makedirs(tests_path)
+metadata_store_path = f"{tests_path}/metadata_store"
+
+executed: List[str] = []
+
+
+class BranchNode(BaseActionNode):
+    """Action node that reads the new artifacts of its data store and records that it executed."""
+
+    def __init__(self, name: str, data_store: FilesystemStoreNode) -> None:
+        super().__init__(name=name, predecessors=[data_store])
+        self.data_store = data_store
+    
+    def execute(self, *args, **kwargs) -> bool:
+        for artifact_path in self.data_store.list_artifacts(state="new"):
+            with self.data_store.load_artifact(filepath=artifact_path) as fullpath:
+                with open(fullpath, "r", encoding="utf-8") as f:
+                    f.read()
+
+        time.sleep(0.2)     # long enough for the next run to start while this one is in flight when runs are pipelined
+        executed.append(self.name)
+        return True
+
+
+# two independent branches: data_store_1 -> branch_1 and data_store_2 -> branch_2
+metadata_store = SQLiteMetadataStoreNode(name="metadata_store", uri=f"sqlite:///{metadata_store_path}/metadata.db")
+data_store_1 = FilesystemStoreNode(name="data_store_1", resource_path=f"{tests_path}/data_store_1", metadata_store=metadata_store)
+data_store_2 = FilesystemStoreNode(name="data_store_2", resource_path=f"{tests_path}/data_store_2", metadata_store=metadata_store)
+branch_1 = BranchNode("branch_1", data_store=data_store_1)
+branch_2 = BranchNode("branch_2", data_store=data_store_2)
+
+pipeline = Pipeline(
+    name="test_pipeline", 
+    nodes=[metadata_store, data_store_1, data_store_2, branch_1, branch_2],
+    run_concurrency=2 if mode == "pipelined" else 1,
+    partial_runs=(mode == "partial")
+)
+
+service = PipelineServer(name="test_pipeline", pipeline=pipeline, host="127.0.0.1", port=8000)
+config = service.get_config()
+server = AnacostiaServer(config=config)
+
+
+def ended_runs() -> List[dict]:
+    return [run for run in metadata_store.get_runs() if run["end_time"] is not None]
+
+
+def wait_for(condition, timeout: float = 20.0) -> bool:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.1)
+    return condition()
+
+
+failures = []
+
+def check(condition: bool, message: str) -> None:
+    print(f"{'PASS' if condition else 'FAIL'}: {message}")
+    if condition is False:
+        failures.append(message)
+
+
+with server.run_in_thread():
+    if mode == "lockstep":
+        # by default, a run only starts once every resource node has been triggered
+        create_files("data_store_1", 3)
+        time.sleep(2)
+        check(len(metadata_store.get_runs()) == 0, "no run starts while only data_store_1 has new files")
+        check(len(executed) == 0, "no branch executes while only data_store_1 has new files")
+
+        create_file(f"{tests_path}/data_store_2/test_file0.txt", "test file 0")
+        check(wait_for(lambda: len(ended_runs()) >= 1), "a run ends once data_store_2 has new files too")
+        check(wait_for(lambda: {"branch_1", "branch_2"} <= set(executed)), "both branches execute in the run")
+        check(branch_2.status != Status.SKIPPED, "branch_2 is not skipped")
+
+    elif mode == "pipelined":
+        # with run_concurrency=2, up to two runs are in flight at once; every run still has to end
+        for i in range(4):
+            create_file(f"{tests_path}/data_store_1/test_file{i}.txt", f"test file {i}")
+            create_file(f"{tests_path}/data_store_2/test_file{i}.txt", f"test file {i}")
+            time.sleep(0.3)
+        wait_for(lambda: len(metadata_store.get_runs()) >= 2 and len(ended_runs()) == len(metadata_store.get_runs()))
+        time.sleep(2)   # let the runs triggered by the last files end
+        runs = metadata_store.get_runs()
+        check(len(runs) >= 2, f"at least two runs started ({len(runs)} runs)")
+        check(all(run["end_time"] is not None for run in runs), "every run has an end time")
+
+    else:
+        # with partial_runs=True, a run starts as soon as data_store_1 is triggered and branch_2 is skipped in it
+        create_files("data_store_1", 3)
+        check(wait_for(lambda: len(ended_runs()) >= 1), "a run ends while only data_store_1 has new files")
+        check(wait_for(lambda: branch_2.status == Status.SKIPPED), "branch_2 reports Status.SKIPPED")
+        check("branch_1" in executed, "branch_1 executes")
+        check("branch_2" not in executed, "branch_2 does not execute")
+
+print(f"{mode}: {'FAILED' if len(failures) > 0 else 'PASSED'}")
+sys.exit(1 if len(failures) > 0 else 0)
@@ -53,6 +53,11 @@ setup(
         "httpx" 
     ],
     extras_require={
-        "aws": ["boto3"]
+        "aws": ["boto3"],
+        "numpy": ["numpy"],
+        "arrow": ["pyarrow"],
+        "serialization": ["msgpack", "orjson"],
+        "http2": ["httpx[http2]"],
+        "websockets": ["websockets"]
     }
 )
\ No newline at end of file